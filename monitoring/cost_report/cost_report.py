@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cost and slot attribution report from INFORMATION_SCHEMA.JOBS_BY_PROJECT.
+
+Every job the system submits is labelled with pipeline, job_name, task,
+job_action, date and run_id (utilities/labels.py). This report reads the
+project's jobs metadata over a date range and breaks down bytes billed,
+slot-hours and duration per pipeline, job and task, with the top offenders
+and the day-over-day change of the last day.
+
+python monitoring/cost_report/cost_report.py ppltx-m--tutorial-dev
+python monitoring/cost_report/cost_report.py ppltx-m--tutorial-dev --start 2026-10-05 --end 2026-10-18 --format table
+python monitoring/cost_report/cost_report.py local --fixture monitoring/cost_report/fixtures/jobs_sample.csv --end 2026-10-18
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root = Path(__file__).resolve().parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from utilities.io import header, read_file, write_file, read_json
+from utilities.bq import get_bq_client
+from utilities.cli import create_standard_cli
+from utilities.formatting import get_date_params, df_to_string_table, df_to_markdown_table
+from utilities.paths import get_standard_paths, get_cost_report_paths
+from utilities.retry import run_query_with_retry
+from utilities.labels import build_job_labels
+from utilities.constants import DEFAULT_MONITOR_QUERY_TIMEOUT_SEC
+from utilities.cost_analytics import (
+    DEFAULT_COST_SETTINGS,
+    UNLABELED,
+    normalize_jobs,
+    summarize_costs,
+    daily_costs,
+    day_over_day,
+)
+
+# --- setup paths ---
+paths = get_standard_paths(__file__)
+project_root = paths['project_root']
+config_path, sql_template_path, logs_path, error_path = get_cost_report_paths(project_root)
+
+
+def load_jobs(project_id: str, client, start_date: str, end_date: str, settings: dict, run_time, dry_run: bool = False, fixture=None) -> pd.DataFrame:
+    """
+    Load job metadata from BigQuery, or from a local CSV fixture.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        client: BigQuery client or None in dry-run
+        start_date (str): First job date
+        end_date (str): Last job date
+        settings (dict): cost_report config block
+        run_time (datetime): Current run time
+        dry_run (bool): Render the query without executing it
+        fixture (Optional[Path]): CSV with the columns of jobs_usage.sql
+
+    Returns:
+        pd.DataFrame: One row per job
+    """
+    if fixture is not None:
+        jobs = pd.read_csv(fixture, dtype={"job_date": str})
+        return jobs[(jobs["job_date"] >= start_date) & (jobs["job_date"] <= end_date)]
+
+    query = read_file(sql_template_path).format(
+        run_time=run_time,
+        project=project_id,
+        region=settings["region"],
+        start_date=start_date,
+        end_date=end_date,
+        job_types=", ".join(f"'{job_type}'" for job_type in settings["job_types"]),
+    )
+    write_file(logs_path / "jobs_usage.sql", query)
+    if dry_run or client is None:
+        header("[DRY-RUN] Would execute: jobs_usage.sql")
+        return pd.DataFrame(columns=["job_date", "total_bytes_billed", "total_slot_ms", "duration_ms"])
+
+    timeout_sec = settings.get("deadlines", {}).get("query_timeout_sec", DEFAULT_MONITOR_QUERY_TIMEOUT_SEC)
+    labels = build_job_labels("cost_report", "cost_report", task="jobs_usage")
+    return run_query_with_retry(client, query, timeout_sec=timeout_sec, to_dataframe=True, labels=labels)
+
+
+def compose_cost_report(jobs: pd.DataFrame, start_date: str, end_date: str, settings: dict, run_time, fmt: str = "markdown") -> str:
+    """
+    Build the cost report of a date range.
+
+    Args:
+        jobs (pd.DataFrame): Output of normalize_jobs
+        start_date (str): First job date
+        end_date (str): Last job date; its last day with jobs is compared
+            with the day before
+        settings (dict): Cost settings (top_n, usd_per_tib, ...)
+        run_time (datetime): Current run time
+        fmt (str): markdown or table
+
+    Returns:
+        str: Report text
+    """
+    to_table = df_to_markdown_table if fmt == "markdown" else df_to_string_table
+    top_n = settings["top_n"]
+    summary = summarize_costs(jobs)
+    per_job = summarize_costs(jobs, ["pipeline", "job_name"])
+    unlabeled = jobs[jobs["pipeline"] == UNLABELED]
+    by_slots = summary.sort_values("slot_hours", ascending=False).head(top_n)
+    # The last day with jobs: an explicit --end may name a day still in progress or not yet run
+    compared_day = min(end_date, jobs["job_date"].max())
+    deltas = day_over_day(jobs, compared_day).head(top_n)
+
+    sections = [
+        f"# BigQuery Cost Report - {start_date} to {end_date}",
+        "## Summary",
+        "\n".join([
+            f"- **Jobs**: {len(jobs)}",
+            f"- **GiB billed**: {jobs['gib_billed'].sum():,.1f}",
+            f"- **Slot-hours**: {jobs['slot_hours'].sum():,.2f}",
+            f"- **Estimated cost**: ${jobs['est_cost_usd'].sum():,.2f} (on-demand, ${settings['usd_per_tib']}/TiB)",
+            f"- **Unlabeled**: {len(unlabeled)} jobs, ${unlabeled['est_cost_usd'].sum():,.2f}",
+            f"- **Generated**: {run_time.strftime('%Y-%m-%d %H:%M:%S')}",
+        ]),
+        f"## Top {top_n} by Estimated Cost",
+        to_table(summary.head(top_n)),
+        f"## Top {top_n} by Slot-Hours",
+        to_table(by_slots.reset_index(drop=True)),
+        f"## Day over Day ({compared_day} vs previous day)",
+        to_table(deltas),
+        "## Daily Totals",
+        to_table(daily_costs(jobs)),
+        "## Per Job",
+        to_table(per_job),
+    ]
+    return "\n\n".join(sections) + "\n"
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--start", default=None, help="First job date (default: end - lookback_days + 1)")
+    parser.add_argument("--end", default=None, help="Last job date (default: the day before the processing date, the last complete day)")
+    parser.add_argument("--fixture", default=None, help="CSV of job metadata instead of BigQuery")
+    parser.add_argument("--format", dest="fmt", default="markdown", choices=["markdown", "table"], help="Report format")
+    flags = parser.parse_args()
+
+    settings = {**DEFAULT_COST_SETTINGS, **read_json(config_path).get("cost_report", {})}
+
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+    end_date = flags.end or (datetime.strptime(y_m_d, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+    start_date = flags.start or (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=settings["lookback_days"] - 1)).strftime("%Y-%m-%d")
+
+    client = None if flags.fixture else get_bq_client(flags.project_id, flags.dry_run)
+    header(f"Cost report {start_date} to {end_date}")
+    raw_jobs = load_jobs(flags.project_id, client, start_date, end_date, settings, run_time, flags.dry_run, flags.fixture)
+    if raw_jobs.empty:
+        print("[WARNING] No jobs in range")
+        sys.exit(0)
+
+    jobs = normalize_jobs(raw_jobs, settings["usd_per_tib"])
+    report = compose_cost_report(jobs, start_date, end_date, settings, run_time, flags.fmt)
+    suffix = "md" if flags.fmt == "markdown" else "txt"
+    report_file = logs_path / f"cost_report_{start_date}_{end_date}.{suffix}"
+    write_file(report_file, report)
+    print(report)
+    print(f"Report written to: {report_file}")
@@ -0,0 +1,32 @@
+/*
+Run time
+{run_time}
+Bytes billed, slot time and duration of every job between {start_date} and {end_date},
+attributed through the job labels (utilities/labels.py). Metadata only.
+*/
+SELECT
+  DATE(creation_time)                                         AS job_date,
+  job_id,
+  job_type,
+  statement_type,
+  user_email,
+  (SELECT value FROM UNNEST(labels) WHERE key = 'pipeline')   AS pipeline,
+  (SELECT value FROM UNNEST(labels) WHERE key = 'job_name')   AS job_name,
+  (SELECT value FROM UNNEST(labels) WHERE key = 'task')       AS task,
+  (SELECT value FROM UNNEST(labels) WHERE key = 'job_action') AS job_action,
+  (SELECT value FROM UNNEST(labels) WHERE key = 'date')       AS processing_date,
+  (SELECT value FROM UNNEST(labels) WHERE key = 'run_id')     AS run_id,
+  total_bytes_processed,
+  total_bytes_billed,
+  total_slot_ms,
+  TIMESTAMP_DIFF(end_time, start_time, MILLISECOND)           AS duration_ms,
+  error_result.reason                                         AS error_reason
+FROM `{project}.region-{region}.INFORMATION_SCHEMA.JOBS_BY_PROJECT`
+WHERE TRUE
+  AND creation_time >= TIMESTAMP('{start_date}')
+  AND creation_time < TIMESTAMP(DATE_ADD(DATE('{end_date}'), INTERVAL 1 DAY))
+  AND job_type IN ({job_types})
+  AND state = 'DONE'
+  -- A script's parent job repeats the totals of its child statements
+  AND IFNULL(statement_type, '') != 'SCRIPT'
+ORDER BY creation_time;
@@ -9,15 +9,32 @@ This script monitors KPI metrics such as DAU, Installs, and Last Activity,
 compares them against previous days, and raises alerts when significant 
 deviations are detected.
 
+Daily KPI values are kept in a local columnar history (state/kpi_history/),
+so each run only fetches the newest dates from the warehouse and computes
+previous-day, rolling-mean, same-weekday and z-score baselines locally.
+
+With --sample the KPIs are read from the sandbox dataset, count KPIs
+("sample_scaling": "count") are scaled to full-population size and the
+history is kept apart from the production one.
+
+With --start/--end the monitor replays a date range instead: every KPI is
+evaluated on every day of the range from one series query per KPI (or from
+the local history with --from-history), and a per-day alert timeline is
+written. Replays neither touch the history nor send Slack messages.
+
 Usage:
     python monitoring/kpis_monitoring/kpis_monitoring.py <project_id> [--job_name <name>] [--job_action <action>] [--dry-run]
 
 Examples:
     python monitoring/kpis_monitoring/kpis_monitoring.py ppltx-m--tutorial-dev --job_name kpis --job_action daily
     python monitoring/kpis_monitoring/kpis_monitoring.py ppltx-m--tutorial-dev --job_name kpis --job_action daily --dry-run
+    python monitoring/kpis_monitoring/kpis_monitoring.py ppltx-m--tutorial-dev --job_name kpis --job_action daily --sample 1
+    python monitoring/kpis_monitoring/kpis_monitoring.py ppltx-m--tutorial-dev --job_name kpis --start 2026-09-01 --end 2026-09-30
+    python monitoring/kpis_monitoring/kpis_monitoring.py ppltx-m--tutorial-dev --job_name kpis --start 2026-09-01 --from-history
 """
 
 import sys
+import time
 from pathlib import Path
 import pandas as pd
 
@@ -31,136 +48,371 @@ from utilities.io import header, read_file, write_file, read_json
 from utilities.bq import get_bq_client
 from utilities.daily_logs import insert_log, next_step_id
 from utilities.cli import create_standard_cli
-from utilities.formatting import get_date_params, df_to_string_table
+from utilities.formatting import get_date_params, df_to_markdown_table
 from utilities.paths import get_standard_paths, get_kpi_monitoring_paths
-from utilities.slack import send_alert_notification, send_success_notification
-from utilities.monitoring_utils import compose_alert_markdown, write_and_notify, require_keys
+from utilities.slack import send_success_notification
+from utilities.monitoring_utils import compose_alert_markdown, write_and_notify, require_keys, MonitorResult
+from utilities.watchdog import Deadline, QueryTimeoutError, record_timeout
+from utilities.retry import run_query_with_retry
+from utilities.labels import build_job_labels
+from utilities.sampling import get_sampling, apply_sampling, scale_metric
+from utilities.constants import DEFAULT_MONITOR_QUERY_TIMEOUT_SEC, KPI_HISTORY_DIR, DEFAULT_KPI_BACKFILL_DAYS, DEFAULT_KPI_REFETCH_DAYS, DEFAULT_KPI_COMPACT_AFTER_PARTS
+from utilities.kpi_history import (
+    get_kpi_history_dir,
+    load_kpi_history,
+    append_kpi_history,
+    compact_kpi_history,
+    get_fetch_start_date,
+    compute_kpi_baselines,
+    evaluate_kpis,
+    evaluate_kpi_range,
+    build_alert_timeline,
+)
 
 # --- setup paths ---
 paths = get_standard_paths(__file__)
 project_root = paths['project_root']
 config_path, queries_path, logs_path, error_path, alerts_path = get_kpi_monitoring_paths(project_root)
 
-# --- CLI ---
-parser = create_standard_cli()
-flags = parser.parse_args()
-
-project_id = flags.project_id
-job_name = flags.job_name
-job_action = flags.job_action
-days_back = flags.days_back
-dry_run = flags.dry_run
-
-# Get BigQuery client
-client = get_bq_client(project_id, dry_run)
-
-# Get standardized date parameters
-date_today, run_time, y_m_d = get_date_params(days_back)
-
-# Get KPI configuration
-insert_log(project_id, job_name, job_action, "init_config", "Loading KPI configuration", client, dry_run, step_id=next_step_id())
-kpis_config = read_json(config_path)
-
-if not kpis_config or "tables" not in kpis_config:
-    header(f"Could not load KPI configuration at: {config_path}")
-    sys.exit(1)
-
-insert_log(project_id, job_name, job_action, "validate_config", "Configuration validation completed", client, dry_run, step_id=next_step_id())
-
-check_flag_column = 'raise_flag'
-
-df_all = pd.DataFrame()   # Initialize empty DataFrame
-
-# Iterate all the KPI groups in the config
-for kpi_group_name, kpi_config in kpis_config["tables"].items():
-    header(kpi_group_name)
-    
-    for kpi_name, kpi_conf in kpi_config["kpis"].items():
-        if not kpi_conf.get("isEnable", True):
-            continue
-            
-        insert_log(project_id, job_name, job_action, "load_query", f"Loading SQL template for KPI: {kpi_name}", client, dry_run, step_id=next_step_id())
-        
-        # Load SQL template
-        sql_template_path = project_root / f"monitoring/kpis_monitoring/queries/{kpi_name}_alerts.sql"
-        query_sql = read_file(sql_template_path)
-        
-        insert_log(project_id, job_name, job_action, "render_query", f"Rendering SQL query for KPI: {kpi_name}", client, dry_run, step_id=next_step_id())
-        
-        # Query parameters
-        query_params_base = {
-            "date": y_m_d,
-            "run_time": run_time,
-            "project": project_id,
-            "job_action": job_action,
-            "kpi_name": kpi_name,
-        }
-        
-        # Validate and enrich query params
-        require_keys(kpi_conf, ["thresh_in_percent", "d1"], f"kpis_config.tables[{kpi_group_name}].kpis[{kpi_name}]")
-        # Enriched query params
-        query_params = dict(query_params_base)
-        query_params.update(kpi_conf)
-        
-        query = query_sql.format(**query_params)
-        
-        insert_log(project_id, job_name, job_action, "write_outputs", f"Writing SQL to temp folder for KPI: {kpi_name}", client, dry_run, step_id=next_step_id())
-        # Write query to log
-        write_file(logs_path / f"kpi_{kpi_name}.sql", query)
-        
-        if not dry_run:
+
+def get_kpi_template_path(kpi_name: str, kpi_conf: dict) -> Path:
+    """Return the series template of a KPI; KPIs may share one (e.g. wau/mau over rolling_actives_series.sql)."""
+    return queries_path / f"{kpi_conf.get('template', kpi_name)}_series.sql"
+
+
+def build_kpi_query_params(project_id: str, job_action: str, y_m_d: str, run_time, kpi_name: str, kpi_conf: dict, start_date: str) -> dict:
+    """
+    Return the format parameters of a KPI series template.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        job_action (str): Job action (e.g., 'daily')
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        kpi_name (str): KPI name
+        kpi_conf (dict): KPI config entry
+        start_date (str): First date to fetch
+
+    Returns:
+        dict: Standard parameters enriched with the KPI config
+    """
+    query_params = {
+        "date": y_m_d,
+        "start_date": start_date,
+        "run_time": run_time,
+        "project": project_id,
+        "job_action": job_action,
+        "kpi_name": kpi_name,
+    }
+    query_params.update(kpi_conf)
+    return query_params
+
+
+def run_kpis_monitoring(project_id: str, job_name: str, job_action: str, y_m_d: str, run_time, client, dry_run: bool = False, notify: bool = True) -> MonitorResult:
+    """
+    Fetch new KPI values into the local history and evaluate them against baselines.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        job_name (str): Logical job name used in logs and alert file names
+        job_action (str): Job action (e.g., 'daily')
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        client: BigQuery client (may be shared with other checks)
+        dry_run (bool): If True, render queries without executing them
+        notify (bool): If True, send this check's own Slack alert/success message
+
+    Returns:
+        MonitorResult: Evaluated KPI rows, errors and alert file
+    """
+    started = time.monotonic()
+    result = MonitorResult(name="kpis_monitoring", alert_type="KPI")
+
+    # Get KPI configuration
+    insert_log(project_id, job_name, job_action, "init_config", "Loading KPI configuration", client, dry_run, step_id=next_step_id())
+    kpis_config = read_json(config_path)
+
+    if not kpis_config or "tables" not in kpis_config:
+        header(f"Could not load KPI configuration at: {config_path}")
+        raise ValueError(f"Could not load KPI configuration at: {config_path}")
+
+    # Deadlines: cancel slow queries, hedge slow read-only ones
+    deadlines = kpis_config.get("deadlines", {})
+    run_deadline = Deadline(deadlines.get("run_timeout_sec"))
+    query_timeout_sec = deadlines.get("query_timeout_sec", DEFAULT_MONITOR_QUERY_TIMEOUT_SEC)
+    hedge_after_sec = deadlines.get("hedge_after_sec")
+
+    insert_log(project_id, job_name, job_action, "validate_config", "Configuration validation completed", client, dry_run, step_id=next_step_id())
+
+    # Local KPI history: only the newest dates are fetched, comparisons are computed locally
+    history_conf = kpis_config.get("history", {})
+    backfill_days = history_conf.get("backfill_days", DEFAULT_KPI_BACKFILL_DAYS)
+    refetch_days = history_conf.get("refetch_days", DEFAULT_KPI_REFETCH_DAYS)
+    sampling = get_sampling()
+    history_key = f"{project_id}.{sampling['dataset']}" if sampling else project_id
+    history_dir = get_kpi_history_dir(KPI_HISTORY_DIR, history_key)
+    history = load_kpi_history(history_dir)
+
+    kpi_confs = {}
+
+    # Iterate all the KPI groups in the config
+    for kpi_group_name, kpi_config in kpis_config["tables"].items():
+        header(kpi_group_name)
+
+        for kpi_name, kpi_conf in kpi_config["kpis"].items():
+            if not kpi_conf.get("isEnable", True):
+                continue
+
+            insert_log(project_id, job_name, job_action, "load_query", f"Loading SQL template for KPI: {kpi_name}", client, dry_run, step_id=next_step_id())
+
+            # Load SQL template
+            query_sql = read_file(get_kpi_template_path(kpi_name, kpi_conf))
+
+            insert_log(project_id, job_name, job_action, "render_query", f"Rendering SQL query for KPI: {kpi_name}", client, dry_run, step_id=next_step_id())
+
+            # Validate and enrich query params; fetch only dates not yet in the local history
+            require_keys(kpi_conf, ["thresh_in_percent"], f"kpis_config.tables[{kpi_group_name}].kpis[{kpi_name}]")
+            kpi_confs[kpi_name] = kpi_conf
+            start_date = get_fetch_start_date(history, kpi_name, y_m_d, backfill_days, refetch_days)
+            query_params = build_kpi_query_params(project_id, job_action, y_m_d, run_time, kpi_name, kpi_conf, start_date)
+
+            # Sampled mode reads the sandbox copy of the KPI tables
+            kpi_sql, query_params = apply_sampling(query_sql, query_params)
+            query = kpi_sql.format(**query_params)
+
+            insert_log(project_id, job_name, job_action, "write_outputs", f"Writing SQL to temp folder for KPI: {kpi_name}", client, dry_run, step_id=next_step_id())
+            # Write query to log
+            write_file(logs_path / f"kpi_{kpi_name}.sql", query)
+
+            if not dry_run:
+                try:
+                    insert_log(project_id, job_name, job_action, "execute_query", f"Executing BigQuery query for KPI: {kpi_name} ({query_params['start_date']} to {y_m_d})", client, dry_run, step_id=next_step_id())
+                    query_df = run_query_with_retry(
+                        client, query, timeout_sec=query_timeout_sec, deadline=run_deadline, hedge_after_sec=hedge_after_sec, to_dataframe=True,
+                        labels=build_job_labels("monitoring", job_name, job_action, y_m_d, kpi_name),
+                    )
+
+                    # Sampled counts are scaled back so thresholds keep their meaning
+                    query_df["metric"] = scale_metric(pd.to_numeric(query_df["metric"], errors="coerce"), kpi_conf.get("sample_scaling"))
+
+                    insert_log(project_id, job_name, job_action, "aggregate_results", f"Appending {len(query_df)} days to KPI history for KPI: {kpi_name}", client, dry_run, step_id=next_step_id())
+                    append_kpi_history(history_dir, query_df, kpi_name, run_time)
+
+                except QueryTimeoutError as error:
+                    record_timeout(project_id, job_name, job_action, kpi_name, error, client, dry_run)
+                    write_file(error_path / f"{kpi_name}_error.md", f"The error is {error}")
+                    result.errors[kpi_name] = str(error)
+                except Exception as error:
+                    error_message = f"The error is {error}"
+                    header(f"Hi BI Developer we have a problem in {kpi_name} query\nOpen file {str(error_path)}/{kpi_name}_error.md")
+                    print(error_message)
+                    write_file(error_path / f"{kpi_name}_error.md", error_message)
+                    result.errors[kpi_name] = str(error)
+
+    # Compare every KPI against its stored series
+    if not dry_run:
+        # One part per KPI per run: fold them into one before they pile up
+        compacted = compact_kpi_history(history_dir, run_time, history_conf.get("compact_after_parts", DEFAULT_KPI_COMPACT_AFTER_PARTS))
+        if compacted:
+            insert_log(project_id, job_name, job_action, "compact_history", f"Compacted KPI history into: {compacted.name}", client, dry_run, step_id=next_step_id())
+        insert_log(project_id, job_name, job_action, "evaluate_kpis", "Computing KPI baselines from local history", client, dry_run, step_id=next_step_id())
+        baselines = compute_kpi_baselines(
+            load_kpi_history(history_dir),
+            rolling_days=history_conf.get("rolling_days", 7),
+            zscore_days=history_conf.get("zscore_days", 28),
+        )
+        result.df = evaluate_kpis(baselines, kpi_confs, y_m_d)
+
+    # Final check – only if df_all has data
+    if not result.alerts.empty:
+
+        # Create detailed alert report with table
+        alert_df = result.alerts
+        alert_content = compose_alert_markdown(
+            title=f"KPI Monitoring Alert - {y_m_d}",
+            summary="*There is a significant change in the KPIs*",
+            df=alert_df,
+            run_time=run_time,
+        )
+
+        if notify:
+            result.alert_file = write_and_notify(
+                alerts_path=alerts_path,
+                filename_stem=f"{job_name}_monitoring_alert_{y_m_d}",
+                content=alert_content,
+                alert_type=result.alert_type,
+                count=len(alert_df),
+                details="Significant changes detected in KPIs",
+            )
+        else:
+            result.alert_file = alerts_path / f"{job_name}_monitoring_alert_{y_m_d}.md"
+            write_file(result.alert_file, alert_content)
+
+        # Show brief message to user
+        header("🚨 KPI MONITORING ALERTS 🚨")
+        print(f"Hi BI Developer - you have NEW ALERTS!")
+        print(f"Check the detailed report at: {result.alert_file}")
+        print(f"Found {len(alert_df)} KPIs with significant changes.")
+        if notify:
+            print("Slack notification sent to #logs_monitoring_alerts")
+
+    # Send success notification if no alerts
+    elif notify:
+        send_success_notification(
+            monitoring_type=result.alert_type,
+            message="All KPIs within normal ranges"
+        )
+
+    insert_log(project_id, job_name, job_action, "end", "KPI monitoring completed", client, dry_run, step_id=next_step_id())
+    result.duration_sec = round(time.monotonic() - started, 1)
+    return result
+
+
+def replay_kpis(project_id: str, job_name: str, job_action: str, start_date: str, end_date: str, run_time, client, dry_run: bool = False, from_history: bool = False) -> tuple:
+    """
+    Evaluate every KPI on every day of a date range ("would we have alerted?").
+
+    Each KPI's series for the range plus the baseline lookback is fetched in
+    one query (or read from the local history with from_history), baselines
+    and flags are computed locally for all days at once, and a per-day alert
+    timeline is written. The local history is not modified and no Slack
+    message is sent.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        job_name (str): Logical job name used in logs and file names
+        job_action (str): Job action (e.g., 'daily')
+        start_date (str): First evaluated date (YYYY-MM-DD)
+        end_date (str): Last evaluated date (YYYY-MM-DD)
+        run_time (datetime): Current run time
+        client: BigQuery client (unused with from_history)
+        dry_run (bool): If True, render queries without executing them
+        from_history (bool): Read the local KPI history instead of the warehouse
+
+    Returns:
+        tuple: (evaluated rows per KPI and date, per-day timeline, errors)
+    """
+    kpis_config = read_json(config_path)
+    if not kpis_config or "tables" not in kpis_config:
+        raise ValueError(f"Could not load KPI configuration at: {config_path}")
+    if start_date > end_date:
+        raise ValueError(f"--start {start_date} is after --end {end_date}")
+
+    deadlines = kpis_config.get("deadlines", {})
+    run_deadline = Deadline(deadlines.get("run_timeout_sec"))
+    query_timeout_sec = deadlines.get("query_timeout_sec", DEFAULT_MONITOR_QUERY_TIMEOUT_SEC)
+    history_conf = kpis_config.get("history", {})
+    rolling_days = history_conf.get("rolling_days", 7)
+    zscore_days = history_conf.get("zscore_days", 28)
+    # Baselines of the first day need the days before it (same weekday looks back 7)
+    fetch_start = (pd.Timestamp(start_date) - pd.Timedelta(days=max(rolling_days, zscore_days, 7))).strftime("%Y-%m-%d")
+
+    sampling = get_sampling()
+    history_key = f"{project_id}.{sampling['dataset']}" if sampling else project_id
+    stored = load_kpi_history(get_kpi_history_dir(KPI_HISTORY_DIR, history_key)) if from_history else None
+    kpi_confs, series, errors = {}, [], {}
+
+    for kpi_group_name, kpi_config in kpis_config["tables"].items():
+        for kpi_name, kpi_conf in kpi_config["kpis"].items():
+            if not kpi_conf.get("isEnable", True):
+                continue
+            require_keys(kpi_conf, ["thresh_in_percent"], f"kpis_config.tables[{kpi_group_name}].kpis[{kpi_name}]")
+            kpi_confs[kpi_name] = kpi_conf
+            if from_history:
+                continue
+
+            query_params = build_kpi_query_params(project_id, job_action, end_date, run_time, kpi_name, kpi_conf, fetch_start)
+            kpi_sql, query_params = apply_sampling(read_file(get_kpi_template_path(kpi_name, kpi_conf)), query_params)
+            query = kpi_sql.format(**query_params)
+            write_file(logs_path / f"replay_kpi_{kpi_name}.sql", query)
+            if dry_run:
+                continue
             try:
-                insert_log(project_id, job_name, job_action, "execute_query", f"Executing BigQuery query for KPI: {kpi_name}", client, dry_run, step_id=next_step_id())
-                job_id = client.query(query)
-                query_df = job_id.to_dataframe()
-                
-                insert_log(project_id, job_name, job_action, "aggregate_results", f"Merging DataFrame for KPI: {kpi_name}", client, dry_run, step_id=next_step_id())
-                # Union the query results – skip empty frames to avoid pandas FutureWarning
-                if query_df is not None and not query_df.empty:
-                    if df_all.empty:
-                        df_all = query_df
-                    else:
-                        df_all = pd.concat([df_all, query_df], ignore_index=True)
-                    
+                insert_log(project_id, job_name, job_action, "execute_query", f"Replaying KPI: {kpi_name} ({fetch_start} to {end_date})", client, dry_run, step_id=next_step_id())
+                query_df = run_query_with_retry(
+                    client, query, timeout_sec=query_timeout_sec, deadline=run_deadline, to_dataframe=True,
+                    labels=build_job_labels("monitoring", job_name, job_action, end_date, f"replay_{kpi_name}"),
+                )
             except Exception as error:
-                error_message = f"The error is {error}"
-                header(f"Hi BI Developer we have a problem in {kpi_name} query\nOpen file {str(error_path)}/{kpi_name}_error.md")
-                print(error_message)
-                write_file(error_path / f"{kpi_name}_error.md", error_message)
-
-# Final check – only if df_all has data
-if not df_all.empty and (df_all[check_flag_column]).any():
-    
-    # Create detailed alert report with table
-    alert_df = df_all[df_all[check_flag_column]]
-    alert_content = compose_alert_markdown(
-        title=f"KPI Monitoring Alert - {y_m_d}",
-        summary="*There is a significant change in the KPIs*",
-        df=alert_df,
-        run_time=run_time,
-    )
+                print(f"[ERROR] Replay query for {kpi_name} failed: {error}")
+                errors[kpi_name] = str(error)
+                continue
+            series.append(pd.DataFrame({
+                "kpi": kpi_name,
+                "date": pd.to_datetime(query_df["date"]).dt.normalize(),
+                "metric": scale_metric(pd.to_numeric(query_df["metric"], errors="coerce"), kpi_conf.get("sample_scaling")).astype("float64"),
+                "table_name": query_df["table_name"].astype(str) if "table_name" in query_df else "",
+            }))
 
-    alert_file = write_and_notify(
-        alerts_path=alerts_path,
-        filename_stem=f"{job_name}_monitoring_alert_{y_m_d}",
-        content=alert_content,
-        alert_type="KPI",
-        count=len(alert_df),
-        details="Significant changes detected in KPIs",
-    )
-    
-    # Show brief message to user
-    header("🚨 KPI MONITORING ALERTS 🚨")
-    print(f"Hi BI Developer - you have NEW ALERTS!")
-    print(f"Check the detailed report at: {alert_file}")
-    print(f"Found {len(alert_df)} KPIs with significant changes.")
-    print("Slack notification sent to #logs_monitoring_alerts")
-
-# Send success notification if no alerts
-if df_all.empty or not (df_all[check_flag_column]).any():
-    send_success_notification(
-        monitoring_type="KPI",
-        message="All KPIs within normal ranges"
+    if dry_run and not from_history:
+        nothing = pd.DataFrame(columns=["raise_flag", "kpi", "date"])
+        return nothing, build_alert_timeline(nothing, start_date, end_date), errors
+    if from_history:
+        history = stored[stored["date"].between(pd.Timestamp(fetch_start), pd.Timestamp(end_date))]
+    else:
+        history = pd.concat(series, ignore_index=True) if series else pd.DataFrame(columns=["kpi", "date", "metric", "table_name"])
+    baselines = compute_kpi_baselines(history, rolling_days=rolling_days, zscore_days=zscore_days)
+    evaluated = evaluate_kpi_range(baselines, kpi_confs, start_date, end_date)
+    return evaluated, build_alert_timeline(evaluated, start_date, end_date), errors
+
+
+def compose_replay_report(evaluated: pd.DataFrame, timeline: pd.DataFrame, errors: dict, start_date: str, end_date: str, run_time, source: str) -> str:
+    """Build the markdown alert timeline of a KPI replay."""
+    alert_rows = evaluated.loc[evaluated["raise_flag"].astype(bool)]
+    per_kpi = (
+        alert_rows.groupby("kpi")["date"].agg(alert_days="count", first="min", last="max").reset_index()
+        if not alert_rows.empty else pd.DataFrame(columns=["kpi", "alert_days", "first", "last"])
     )
+    sections = [
+        f"# KPI Alert Replay - {start_date} to {end_date}",
+        "## Summary",
+        "\n".join([
+            f"- **Source**: {source}",
+            f"- **Days**: {len(timeline)} ({int((timeline['alerts'] > 0).sum())} with alerts)",
+            f"- **Alerts**: {len(alert_rows)}",
+            f"- **Days without data**: {int((timeline['evaluated'] == 0).sum())}",
+            f"- **Failed KPIs**: {', '.join(sorted(errors)) or 'none'}",
+            f"- **Generated**: {run_time.strftime('%Y-%m-%d %H:%M:%S')}",
+        ]),
+        "## Timeline",
+        df_to_markdown_table(timeline),
+        "## Alerts per KPI",
+        df_to_markdown_table(per_kpi) if not per_kpi.empty else "No KPI would have alerted",
+        "## Alerts",
+        df_to_markdown_table(alert_rows[["date", "kpi", "metric", "previous_metric", "pct_change", "zscore"]]) if not alert_rows.empty else "None",
+    ]
+    return "\n\n".join(sections) + "\n"
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--start", default=None, help="Replay: first date to evaluate (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="Replay: last date to evaluate (default: processing date)")
+    parser.add_argument("--from-history", action="store_true", help="Replay from the local KPI history instead of the warehouse")
+    flags = parser.parse_args()
+
+    # Get standardized date parameters
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+
+    if flags.start:
+        end_date = flags.end or y_m_d
+        client = None if flags.from_history else get_bq_client(flags.project_id, flags.dry_run)
+        header(f"KPI alert replay {flags.start} to {end_date}")
+        evaluated, timeline, errors = replay_kpis(
+            flags.project_id, flags.job_name, flags.job_action, flags.start, end_date, run_time, client, flags.dry_run, flags.from_history,
+        )
+        if flags.dry_run and not flags.from_history:
+            print(f"[DRY-RUN] Replay queries written to {logs_path}")
+            sys.exit(0)
+        source = "local KPI history" if flags.from_history else "warehouse, one query per KPI"
+        report = compose_replay_report(evaluated, timeline, errors, flags.start, end_date, run_time, source)
+        write_file(logs_path / f"kpi_replay_{flags.start}_{end_date}.md", report)
+        write_file(logs_path / f"kpi_replay_{flags.start}_{end_date}.csv", evaluated.to_csv(index=False))
+        print(report)
+        sys.exit(1 if errors else 0)
+
+    # Get BigQuery client
+    client = get_bq_client(flags.project_id, flags.dry_run)
 
-insert_log(project_id, job_name, job_action, "end", "KPI monitoring completed", client, dry_run, step_id=next_step_id())
+    run_kpis_monitoring(flags.project_id, flags.job_name, flags.job_action, y_m_d, run_time, client, flags.dry_run)
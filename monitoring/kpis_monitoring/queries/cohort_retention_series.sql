@@ -0,0 +1,21 @@
+/*
+Run_time
+{run_time}
+
+KPIs Name
+{kpi_name}
+
+Description
+{description}
+*/
+
+-- D{day_n} retention per install cohort read from the cohort retention matrix.
+-- Cohorts [start_date, date - {day_n}] matured on activity_dt [start_date + {day_n}, date].
+SELECT
+  cohort_dt AS date,
+  retention AS metric,
+  "{project}.{dataset}.{table_id}" AS table_name
+FROM `{project}.{dataset}.{table_id}`
+WHERE activity_dt BETWEEN DATE_ADD(DATE("{start_date}"), INTERVAL {day_n} DAY) AND DATE("{date}")
+  AND day_n = {day_n}
+ORDER BY date;
@@ -0,0 +1,19 @@
+/*
+ Run_time
+ {run_time}
+
+ KPIs Name
+ {kpi_name}
+
+ Description
+ {description}
+*/
+
+-- Installs per day read from the pre-aggregated kpi_daily table (one row per date)
+SELECT
+  dt AS date,
+  installs AS metric,
+  "{project}.{dataset}.{table_id}" AS table_name
+FROM `{project}.{dataset}.{table_id}`
+WHERE dt BETWEEN DATE("{start_date}") AND DATE("{date}")
+ORDER BY date;
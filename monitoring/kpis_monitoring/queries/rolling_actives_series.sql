@@ -0,0 +1,32 @@
+/*
+Run_time
+{run_time}
+
+KPIs Name
+{kpi_name}
+
+Description
+{description}
+*/
+
+-- Rolling {window_days}-day active users per day, merged from stored HLL++ sketches (no raw-row scan).
+-- Only sketches in [start_date - window_days + 1, date] are read.
+WITH days AS (
+  SELECT day
+  FROM UNNEST(GENERATE_DATE_ARRAY(DATE("{start_date}"), DATE("{date}"))) AS day
+),
+sketches AS (
+  SELECT dt, users_sketch
+  FROM `{project}.{dataset}.{table_id}`
+  WHERE dt BETWEEN DATE_SUB(DATE("{start_date}"), INTERVAL {window_days} - 1 DAY) AND DATE("{date}")
+    AND {segment_filter}
+)
+SELECT
+  d.day AS date,
+  HLL_COUNT.MERGE(s.users_sketch) AS metric,
+  "{project}.{dataset}.{table_id}" AS table_name
+FROM days d
+JOIN sketches s
+  ON s.dt BETWEEN DATE_SUB(d.day, INTERVAL {window_days} - 1 DAY) AND d.day
+GROUP BY d.day
+ORDER BY date;
@@ -6,6 +6,7 @@ python monitoring/logs_monitoring/logs_monitoring.py ppltx-m--tutorial-dev --job
 """
 from pathlib import Path
 import sys
+import time
 import pandas as pd
 
 # Ensure project root is on sys.path BEFORE importing utilities
@@ -17,10 +18,14 @@ from utilities.io import header, read_file, write_file, read_json
 from utilities.bq import get_bq_client
 from utilities.daily_logs import insert_log, next_step_id
 from utilities.cli import create_standard_cli
-from utilities.formatting import get_date_params, df_to_string_table
+from utilities.formatting import get_date_params
 from utilities.paths import get_standard_paths, get_monitoring_paths
-from utilities.slack import send_alert_notification, send_success_notification
-from utilities.monitoring_utils import compose_alert_markdown, write_and_notify, require_keys
+from utilities.slack import send_success_notification
+from utilities.monitoring_utils import compose_alert_markdown, write_and_notify, require_keys, MonitorResult
+from utilities.watchdog import Deadline, QueryTimeoutError, record_timeout
+from utilities.retry import run_query_with_retry
+from utilities.labels import build_job_labels
+from utilities.constants import DEFAULT_MONITOR_QUERY_TIMEOUT_SEC
 
 # --- setup paths ---
 paths = get_standard_paths(__file__)
@@ -28,112 +33,152 @@ paths = get_standard_paths(__file__)
 project_root = paths['project_root']
 config_path, sql_path, logs_path, error_path, alerts_path = get_monitoring_paths(project_root)
 
-# --- CLI ---
-parser = create_standard_cli()
-flags = parser.parse_args()
 
-project_id = flags.project_id
-job_name = flags.job_name
-job_action = flags.job_action
-days_back = flags.days_back
-dry_run = flags.dry_run
-
-# Get BigQuery client
-client = get_bq_client(project_id, dry_run)
-
-# Get standardized date parameters
-date_today, run_time, y_m_d = get_date_params(days_back)
-
-# get etl configuration
-insert_log(project_id, job_name, job_action, "init_config", "Loading monitoring configuration", client, dry_run, step_id=next_step_id())
-logs_config = read_json(config_path)
-if not logs_config or "tables" not in logs_config:
-    header(f"Could not load tables name to check at: {config_path}")
-    sys.exit(1)
-
-query_sql = read_file(sql_path)
-insert_log(project_id, job_name, job_action, "load_query_template", "SQL template loaded successfully", client, dry_run, step_id=next_step_id())
-
-check_flag_column = 'raise_flag'
-
-df_all = pd.DataFrame()   #  Initialize empty DataFrame
-
-# Iterate all the validation groups in the config
-for monitoring_name, monitoring_config in logs_config["tables"].items():
-    header(monitoring_name)
-
-    query_params_base = {
-         "date": y_m_d,
-         "run_time": run_time,
-         "project": project_id,
-         "job_action": job_action
+def build_log_query_params(project_id: str, job_action: str, y_m_d: str, run_time, monitoring_config: dict) -> dict:
+    """Return the format parameters of logs_query.sql: standard parameters merged with one monitoring config entry."""
+    query_params = {
+        "date": y_m_d,
+        "run_time": run_time,
+        "project": project_id,
+        "job_action": job_action
     }
-
-    insert_log(project_id, job_name, job_action, "render_query", f"Rendering SQL query for monitoring: {monitoring_name}", client, dry_run, step_id=next_step_id())
-    # Validate and merge query params with monitoring config
-    require_keys(monitoring_config, ["step_name", "thresh_in_hours"], f"logs_config.tables[{monitoring_name}]")
-    query_params = dict(query_params_base)
     query_params.update(monitoring_config)
-
-    query = query_sql.format(**query_params)
-    
-    # Write query to temp/logs folder
-    write_file(logs_path / f"log_{monitoring_name}.sql", query)
-    if not flags.dry_run:
-        try:
-            insert_log(project_id, job_name, job_action, "execute_query", f"Executing BigQuery query for monitoring: {monitoring_name}", client, dry_run, step_id=next_step_id())
-            job_id = client.query(query)
-            query_df = job_id.to_dataframe()
-
-            insert_log(project_id, job_name, job_action, "aggregate_results", f"Merging DataFrame for monitoring: {monitoring_name}", client, dry_run, step_id=next_step_id())
-            # Union the query results
-            if df_all.empty:
-                df_all = query_df
-            else:
-                df_all = pd.concat([df_all, query_df], ignore_index=True)
-        except Exception as error:
-            error_message = f"The error is {error}"
-            header(f"Hi BI Developer we have a problem\nOpen file {str(error_path)}/{monitoring_name}_error.md")
-            print(error_message)
-            write_file(error_path / f"{monitoring_name}_error.md", error_message)
-
-
-#  Final check – only if df_all has data
-if not df_all.empty and (df_all[check_flag_column]).any():
-    
-    # Get the threshold from config for the message
-    threshold_hours = logs_config["tables"][list(logs_config["tables"].keys())[0]]["thresh_in_hours"]
-    
-    # Create detailed alert report with table
-    alert_df = df_all[df_all[check_flag_column]]
-    alert_content = compose_alert_markdown(
-        title=f"ETL Process Monitoring Alert - {y_m_d}",
-        summary=f"*These processes hadn't run in more than {threshold_hours} hours*",
-        df=alert_df,
-        run_time=run_time,
-    )
-
-    alert_file = write_and_notify(
-        alerts_path=alerts_path,
-        filename_stem=f"{job_name}_monitoring_alert_{y_m_d}",
-        content=alert_content,
-        alert_type="ETL Process",
-        count=len(alert_df),
-        details=f"Processes haven't completed within {threshold_hours} hours",
-    )
-    
-    # Show brief message to user
-    header("🚨 ETL PROCESS MONITORING ALERTS 🚨")
-    print(f"Hi BI Developer - you have NEW ALERTS!")
-    print(f"Check the detailed report at: {alert_file}")
-    print(f"Found {len(alert_df)} processes that haven't completed within {threshold_hours} hours.")
-    print("Slack notification sent to #logs_monitoring_alerts")
-
-# Send success notification if no alerts
-if df_all.empty or not (df_all[check_flag_column]).any():
-    send_success_notification(
-        monitoring_type="ETL Process",
-        message="All ETL processes completed within expected timeframe"
-    )
-
-insert_log(project_id, job_name, job_action, "end", "Logs monitoring completed", client, dry_run, step_id=next_step_id())
+    return query_params
+
+
+def run_logs_monitoring(project_id: str, job_name: str, job_action: str, y_m_d: str, run_time, client, dry_run: bool = False, notify: bool = True) -> MonitorResult:
+    """
+    Check that every configured ETL step logged within its threshold.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        job_name (str): Logical job name used in logs and alert file names
+        job_action (str): Job action (e.g., 'daily')
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        client: BigQuery client (may be shared with other checks)
+        dry_run (bool): If True, render queries without executing them
+        notify (bool): If True, send this check's own Slack alert/success message
+
+    Returns:
+        MonitorResult: Check rows, errors and alert file
+    """
+    started = time.monotonic()
+    result = MonitorResult(name="logs_monitoring", alert_type="ETL Process")
+
+    # get etl configuration
+    insert_log(project_id, job_name, job_action, "init_config", "Loading monitoring configuration", client, dry_run, step_id=next_step_id())
+    logs_config = read_json(config_path)
+    if not logs_config or "tables" not in logs_config:
+        header(f"Could not load tables name to check at: {config_path}")
+        raise ValueError(f"Could not load tables name to check at: {config_path}")
+
+    # Deadlines: cancel slow queries, hedge slow read-only ones
+    deadlines = logs_config.get("deadlines", {})
+    run_deadline = Deadline(deadlines.get("run_timeout_sec"))
+    query_timeout_sec = deadlines.get("query_timeout_sec", DEFAULT_MONITOR_QUERY_TIMEOUT_SEC)
+    hedge_after_sec = deadlines.get("hedge_after_sec")
+
+    query_sql = read_file(sql_path)
+    insert_log(project_id, job_name, job_action, "load_query_template", "SQL template loaded successfully", client, dry_run, step_id=next_step_id())
+
+    df_all = pd.DataFrame()   #  Initialize empty DataFrame
+
+    # Iterate all the validation groups in the config
+    for monitoring_name, monitoring_config in logs_config["tables"].items():
+        header(monitoring_name)
+
+        insert_log(project_id, job_name, job_action, "render_query", f"Rendering SQL query for monitoring: {monitoring_name}", client, dry_run, step_id=next_step_id())
+        # Validate and merge query params with monitoring config
+        require_keys(monitoring_config, ["step_name", "thresh_in_hours"], f"logs_config.tables[{monitoring_name}]")
+        query = query_sql.format(**build_log_query_params(project_id, job_action, y_m_d, run_time, monitoring_config))
+
+        # Write query to temp/logs folder
+        write_file(logs_path / f"log_{monitoring_name}.sql", query)
+        if not dry_run:
+            try:
+                insert_log(project_id, job_name, job_action, "execute_query", f"Executing BigQuery query for monitoring: {monitoring_name}", client, dry_run, step_id=next_step_id())
+                query_df = run_query_with_retry(
+                    client, query, timeout_sec=query_timeout_sec, deadline=run_deadline, hedge_after_sec=hedge_after_sec, to_dataframe=True,
+                    labels=build_job_labels("monitoring", job_name, job_action, y_m_d, monitoring_name),
+                )
+
+                insert_log(project_id, job_name, job_action, "aggregate_results", f"Merging DataFrame for monitoring: {monitoring_name}", client, dry_run, step_id=next_step_id())
+                # Union the query results
+                if df_all.empty:
+                    df_all = query_df
+                else:
+                    df_all = pd.concat([df_all, query_df], ignore_index=True)
+            except QueryTimeoutError as error:
+                record_timeout(project_id, job_name, job_action, monitoring_name, error, client, dry_run)
+                write_file(error_path / f"{monitoring_name}_error.md", f"The error is {error}")
+                result.errors[monitoring_name] = str(error)
+            except Exception as error:
+                error_message = f"The error is {error}"
+                header(f"Hi BI Developer we have a problem\nOpen file {str(error_path)}/{monitoring_name}_error.md")
+                print(error_message)
+                write_file(error_path / f"{monitoring_name}_error.md", error_message)
+                result.errors[monitoring_name] = str(error)
+
+    result.df = df_all
+
+    #  Final check – only if df_all has data
+    if not result.alerts.empty:
+
+        # Get the threshold from config for the message
+        threshold_hours = logs_config["tables"][list(logs_config["tables"].keys())[0]]["thresh_in_hours"]
+
+        # Create detailed alert report with table
+        alert_df = result.alerts
+        alert_content = compose_alert_markdown(
+            title=f"ETL Process Monitoring Alert - {y_m_d}",
+            summary=f"*These processes hadn't run in more than {threshold_hours} hours*",
+            df=alert_df,
+            run_time=run_time,
+        )
+
+        if notify:
+            result.alert_file = write_and_notify(
+                alerts_path=alerts_path,
+                filename_stem=f"{job_name}_monitoring_alert_{y_m_d}",
+                content=alert_content,
+                alert_type=result.alert_type,
+                count=len(alert_df),
+                details=f"Processes haven't completed within {threshold_hours} hours",
+            )
+        else:
+            result.alert_file = alerts_path / f"{job_name}_monitoring_alert_{y_m_d}.md"
+            write_file(result.alert_file, alert_content)
+
+        # Show brief message to user
+        header("🚨 ETL PROCESS MONITORING ALERTS 🚨")
+        print(f"Hi BI Developer - you have NEW ALERTS!")
+        print(f"Check the detailed report at: {result.alert_file}")
+        print(f"Found {len(alert_df)} processes that haven't completed within {threshold_hours} hours.")
+        if notify:
+            print("Slack notification sent to #logs_monitoring_alerts")
+
+    # Send success notification if no alerts
+    elif notify:
+        send_success_notification(
+            monitoring_type=result.alert_type,
+            message="All ETL processes completed within expected timeframe"
+        )
+
+    insert_log(project_id, job_name, job_action, "end", "Logs monitoring completed", client, dry_run, step_id=next_step_id())
+    result.duration_sec = round(time.monotonic() - started, 1)
+    return result
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    flags = parser.parse_args()
+
+    # Get BigQuery client
+    client = get_bq_client(flags.project_id, flags.dry_run)
+
+    # Get standardized date parameters
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+
+    run_logs_monitoring(flags.project_id, flags.job_name, flags.job_action, y_m_d, run_time, client, flags.dry_run)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Run all monitoring check families in one process.
+
+Logs, table health and KPI checks run concurrently on one shared BigQuery
+client. Instead of one Slack message per check, the suite writes one
+consolidated markdown report and sends one Slack digest.
+
+Run Commands
+
+python monitoring/monitoring_suite.py ppltx-m--tutorial-dev --job_action daily --dry-run
+python monitoring/monitoring_suite.py ppltx-m--tutorial-dev --job_action daily
+python monitoring/monitoring_suite.py ppltx-m--tutorial-dev --checks logs tables --dry-run
+"""
+import sys
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from utilities.io import header, write_file
+from utilities.bq import get_bq_client
+from utilities.cli import create_standard_cli
+from utilities.formatting import get_date_params
+from utilities.paths import ensure_dirs, get_standard_paths
+from utilities.slack import send_digest_notification
+from utilities.monitoring_utils import MonitorResult, compose_suite_report
+from monitoring.logs_monitoring.logs_monitoring import run_logs_monitoring
+from monitoring.table_monitoring.table_monitoring import run_table_monitoring
+from monitoring.kpis_monitoring.kpis_monitoring import run_kpis_monitoring
+
+# check name -> (job_name used in logs, display name, run function)
+CHECKS = {
+    "logs": ("log", "ETL Process", run_logs_monitoring),
+    "tables": ("tables", "Table Health", run_table_monitoring),
+    "kpis": ("kpis", "KPI", run_kpis_monitoring),
+}
+
+suite_logs_path = get_standard_paths(__file__)["temp_root"] / "monitoring" / "monitoring_suite" / "logs"
+
+
+def run_monitoring_suite(project_id: str, job_action: str, y_m_d: str, run_time, client, dry_run: bool = False, checks=None) -> list:
+    """
+    Run the selected check families concurrently on a shared client.
+
+    Individual checks do not notify Slack; a check that raises is reported
+    as an errored MonitorResult instead of stopping the other checks.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        job_action (str): Job action (e.g., 'daily')
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        client: Shared BigQuery client
+        dry_run (bool): If True, render queries without executing them
+        checks (list): Check names from CHECKS (default: all)
+
+    Returns:
+        list: One MonitorResult per check, in CHECKS order
+    """
+    selected = checks or list(CHECKS)
+    with ThreadPoolExecutor(max_workers=len(selected)) as executor:
+        futures = {
+            name: executor.submit(
+                CHECKS[name][2], project_id, CHECKS[name][0], job_action, y_m_d, run_time, client, dry_run, False
+            )
+            for name in selected
+        }
+
+        results = []
+        for name, future in futures.items():
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"[ERROR] {name} monitoring failed: {e}")
+                results.append(MonitorResult(name=CHECKS[name][2].__name__.removeprefix("run_"), alert_type=CHECKS[name][1], errors={"run": str(e)}))
+    return results
+
+
+def report_monitoring_suite(results: list, y_m_d: str, run_time, dry_run: bool = False) -> str:
+    """
+    Write the consolidated report of a suite run and send the Slack digest.
+
+    Args:
+        results (list): MonitorResults from run_monitoring_suite
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        dry_run (bool): If True, do not notify Slack
+
+    Returns:
+        str: The report
+    """
+    report = compose_suite_report(results, y_m_d, run_time)
+    ensure_dirs(suite_logs_path)
+    report_file = suite_logs_path / f"monitoring_suite_{y_m_d}.md"
+    write_file(report_file, report)
+    print(report)
+    print(f"Report written to: {report_file}")
+
+    problem_count = sum(1 for r in results if r.status != "ok")
+    if not dry_run:
+        send_digest_notification("Monitoring", report, failed_count=problem_count)
+    return report
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--checks", nargs="+", default=None, choices=list(CHECKS), help="Check families to run")
+    flags = parser.parse_args()
+
+    # Get BigQuery client, shared by all checks
+    client = get_bq_client(flags.project_id, flags.dry_run)
+
+    # Get standardized date parameters
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+
+    header(f"Monitoring suite for {flags.project_id}: {', '.join(flags.checks or CHECKS)}")
+    results = run_monitoring_suite(flags.project_id, flags.job_action, y_m_d, run_time, client, flags.dry_run, flags.checks)
+    report_monitoring_suite(results, y_m_d, run_time, flags.dry_run)
+
+    # A family with alerts and failed checks still fails the run
+    sys.exit(1 if any(r.has_errors for r in results) else 0)
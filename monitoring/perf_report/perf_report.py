@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pipeline performance report from logs.daily_logs.
+
+Rebuilds every run's step durations from consecutive log rows, reports p50,
+p95 and max per job, step and task over the report window, and flags steps
+whose p50 regressed against the trailing baseline. Output is a markdown file
+for the weekly ops review (or plain tables with --format table).
+
+python monitoring/perf_report/perf_report.py ppltx-m--tutorial-dev
+python monitoring/perf_report/perf_report.py ppltx-m--tutorial-dev --start 2026-10-12 --end 2026-10-18
+python monitoring/perf_report/perf_report.py ppltx-m--tutorial-dev --jobs fact kpi_daily --format table
+python monitoring/perf_report/perf_report.py local --fixture monitoring/perf_report/fixtures/daily_logs_sample.csv --end 2026-10-18
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root = Path(__file__).resolve().parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from utilities.io import header, read_file, write_file, read_json
+from utilities.bq import get_bq_client
+from utilities.cli import create_standard_cli
+from utilities.formatting import get_date_params, df_to_string_table, df_to_markdown_table
+from utilities.paths import get_standard_paths, get_perf_report_paths
+from utilities.retry import run_query_with_retry
+from utilities.labels import build_job_labels
+from utilities.constants import DEFAULT_MONITOR_QUERY_TIMEOUT_SEC
+from utilities.perf_analytics import (
+    DEFAULT_PERF_SETTINGS,
+    RUN_STEP,
+    reconstruct_step_durations,
+    summarize_durations,
+    detect_regressions,
+)
+
+# --- setup paths ---
+paths = get_standard_paths(__file__)
+project_root = paths['project_root']
+config_path, sql_template_path, logs_path, error_path = get_perf_report_paths(project_root)
+
+
+def load_step_logs(project_id: str, client, start_date: str, end_date: str, settings: dict, run_time, dry_run: bool = False, fixture=None) -> pd.DataFrame:
+    """
+    Load log rows from BigQuery, or from a local CSV fixture.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        client: BigQuery client or None in dry-run
+        start_date (str): First date to read (baseline start)
+        end_date (str): Last date to read
+        settings (dict): perf_report config block
+        run_time (datetime): Current run time
+        dry_run (bool): Render the query without executing it
+        fixture (Optional[Path]): CSV with logs.daily_logs columns
+
+    Returns:
+        pd.DataFrame: Log rows between start_date and end_date
+    """
+    if fixture is not None:
+        logs = pd.read_csv(fixture, dtype={"dt": str})
+        return logs[(logs["dt"] >= start_date) & (logs["dt"] <= end_date)]
+
+    query = read_file(sql_template_path).format(
+        run_time=run_time,
+        project=project_id,
+        start_date=start_date,
+        end_date=end_date,
+        job_types=", ".join(f"'{job_type}'" for job_type in settings["job_types"]),
+    )
+    write_file(logs_path / "step_logs.sql", query)
+    if dry_run or client is None:
+        header("[DRY-RUN] Would execute: step_logs.sql")
+        return pd.DataFrame(columns=["ts", "dt", "uid", "username", "job_name", "job_type", "file_name", "step_id", "step_name", "message"])
+
+    timeout_sec = settings.get("deadlines", {}).get("query_timeout_sec", DEFAULT_MONITOR_QUERY_TIMEOUT_SEC)
+    labels = build_job_labels("perf_report", "perf_report", task="step_logs")
+    return run_query_with_retry(client, query, timeout_sec=timeout_sec, to_dataframe=True, labels=labels)
+
+
+def compose_perf_report(durations: pd.DataFrame, window_start: str, window_end: str, settings: dict, run_time, fmt: str = "markdown") -> str:
+    """
+    Build the performance report of a window.
+
+    Args:
+        durations (pd.DataFrame): Step durations of the window and its baseline
+        window_start (str): First report date
+        window_end (str): Last report date
+        settings (dict): Perf settings (baseline_days, regression_ratio, top_n, ...)
+        run_time (datetime): Current run time
+        fmt (str): markdown or table
+
+    Returns:
+        str: Report text
+    """
+    to_table = df_to_markdown_table if fmt == "markdown" else df_to_string_table
+    window = durations[(durations["date"] >= window_start) & (durations["date"] <= window_end)]
+    summary = summarize_durations(window)
+    regressions = detect_regressions(durations[durations["date"] <= window_end], window_start, settings)
+    flagged = regressions[regressions["raise_flag"]] if not regressions.empty else regressions
+
+    runs = summary[summary["step_name"] == RUN_STEP].drop(columns=["step_name", "task"])
+    steps = summary[summary["step_name"] != RUN_STEP]
+    slowest = steps.sort_values("p95_sec", ascending=False).head(settings["top_n"])
+
+    sections = [
+        f"# Pipeline Performance Report - {window_start} to {window_end}",
+        "## Summary",
+        "\n".join([
+            f"- **Runs**: {window['run_id'].nunique()}",
+            f"- **Jobs**: {window['job_name'].nunique()}",
+            f"- **Baseline**: {settings['baseline_days']} days before {window_start}",
+            f"- **Regressions**: {len(flagged)} (p50 > {settings['regression_ratio']}x baseline and +{settings['min_delta_sec']}s)",
+            f"- **Generated**: {run_time.strftime('%Y-%m-%d %H:%M:%S')}",
+        ]),
+        "## Regressions",
+        to_table(flagged.drop(columns=["raise_flag"])) if not flagged.empty else "No regressions",
+        "## Run Duration per Job (sec)",
+        to_table(runs.reset_index(drop=True)),
+        f"## Slowest Steps (top {settings['top_n']} by p95, sec)",
+        to_table(slowest.reset_index(drop=True)),
+        "## Step Durations (sec)",
+        to_table(steps.reset_index(drop=True)),
+    ]
+    return "\n\n".join(sections) + "\n"
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--start", default=None, help="First report date (default: end - window_days + 1)")
+    parser.add_argument("--end", default=None, help="Last report date (default: processing date)")
+    parser.add_argument("--jobs", nargs="+", default=None, help="Only these jobs")
+    parser.add_argument("--fixture", default=None, help="CSV of logs.daily_logs rows instead of BigQuery")
+    parser.add_argument("--format", dest="fmt", default="markdown", choices=["markdown", "table"], help="Report format")
+    flags = parser.parse_args()
+
+    settings = {**DEFAULT_PERF_SETTINGS, "job_types": ["daily"], **read_json(config_path).get("perf_report", {})}
+
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+    window_end = flags.end or y_m_d
+    window_start = flags.start or (datetime.strptime(window_end, "%Y-%m-%d") - timedelta(days=settings["window_days"] - 1)).strftime("%Y-%m-%d")
+    baseline_start = (datetime.strptime(window_start, "%Y-%m-%d") - timedelta(days=settings["baseline_days"])).strftime("%Y-%m-%d")
+
+    client = None if flags.fixture else get_bq_client(flags.project_id, flags.dry_run)
+    header(f"Performance report {window_start} to {window_end} (baseline from {baseline_start})")
+    logs = load_step_logs(flags.project_id, client, baseline_start, window_end, settings, run_time, flags.dry_run, flags.fixture)
+    if flags.jobs:
+        logs = logs[logs["job_name"].isin(flags.jobs)]
+    if logs.empty:
+        print("[WARNING] No log rows in range")
+        sys.exit(0)
+
+    durations = reconstruct_step_durations(logs)
+    report = compose_perf_report(durations, window_start, window_end, settings, run_time, flags.fmt)
+    suffix = "md" if flags.fmt == "markdown" else "txt"
+    report_file = logs_path / f"perf_report_{window_start}_{window_end}.{suffix}"
+    write_file(report_file, report)
+    print(report)
+    print(f"Report written to: {report_file}")
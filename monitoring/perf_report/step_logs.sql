@@ -0,0 +1,21 @@
+/*
+Run time
+{run_time}
+Step rows of every job between {start_date} and {end_date}, for step duration analytics.
+*/
+SELECT
+  ts,
+  dt,
+  uid,
+  username,
+  job_name,
+  job_type,
+  file_name,
+  step_id,
+  step_name,
+  message
+FROM `{project}.logs.daily_logs`
+WHERE TRUE
+  AND dt BETWEEN '{start_date}' AND '{end_date}'
+  AND job_type IN ({job_types})
+ORDER BY username, job_name, ts, step_id;
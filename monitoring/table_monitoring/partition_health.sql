@@ -0,0 +1,21 @@
+/*
+Run time
+{run_time}
+Partition metadata for {dataset}: {table_names}
+Metadata only: reads INFORMATION_SCHEMA.PARTITIONS, no table data is scanned
+ */
+
+SELECT
+  table_schema AS dataset,
+  table_name AS `table`,
+  partition_id,
+  total_rows,
+  total_logical_bytes,
+  last_modified_time AS last_modified_utc
+FROM `{project_id}.{dataset}`.INFORMATION_SCHEMA.PARTITIONS
+WHERE table_name IN ({table_list})
+  AND (
+    partition_id IS NULL                                   -- unpartitioned table
+    OR partition_id IN ('__NULL__', '__UNPARTITIONED__')
+    OR partition_id >= FORMAT_DATE('%Y%m%d', DATE("{start_date}"))
+  )
@@ -2,12 +2,20 @@
 # -*- coding: utf-8 -*-
 
 """
+Table health monitoring from partition metadata.
+
+Reads INFORMATION_SCHEMA.PARTITIONS once per dataset (metadata only, no data
+scanned), keeps the observed partitions in a local history
+(state/table_health/) and flags tables whose expected partition is missing,
+that were not modified within thresh_in_hours, or whose partition row count
+is far from the median of the previous partitions.
+
 python monitoring/table_monitoring/table_monitoring.py ppltx-m--tutorial-dev --job_name tables --job_action daily --dry-run
 """
 
 import sys
+import time
 from pathlib import Path
-import pandas as pd
 
 # Ensure project root is on sys.path BEFORE importing utilities
 project_root = Path(__file__).resolve().parent.parent.parent
@@ -21,133 +29,194 @@ from utilities.daily_logs import insert_log, next_step_id
 from utilities.cli import create_standard_cli
 from utilities.formatting import get_date_params, df_to_string_table
 from utilities.paths import get_standard_paths, get_table_monitoring_paths
-from utilities.slack import send_alert_notification, send_success_notification
-from utilities.monitoring_utils import compose_alert_markdown, write_and_notify, require_keys
+from utilities.slack import send_success_notification
+from utilities.monitoring_utils import compose_alert_markdown, write_and_notify, require_keys, MonitorResult
+from utilities.watchdog import Deadline, QueryTimeoutError, record_timeout
+from utilities.retry import run_query_with_retry
+from utilities.labels import build_job_labels
+from utilities.constants import DEFAULT_MONITOR_QUERY_TIMEOUT_SEC, TABLE_HEALTH_DIR
+from utilities.partition_health import (
+    DEFAULT_HEALTH_SETTINGS,
+    get_partition_history_dir,
+    load_partition_history,
+    append_partition_history,
+    compact_partition_history,
+    get_retention_start_date,
+    get_metadata_start_date,
+    evaluate_partition_health,
+)
 
 # --- setup paths ---
 paths = get_standard_paths(__file__)
 project_root = paths['project_root']
 config_path, sql_template_path, logs_path, error_path, alerts_path = get_table_monitoring_paths(project_root)
 
-# --- CLI ---
-parser = create_standard_cli()
-flags = parser.parse_args()
-
-project_id = flags.project_id
-job_name = flags.job_name
-job_action = flags.job_action
-days_back = flags.days_back
-dry_run = flags.dry_run
-
-# Get BigQuery client
-client = get_bq_client(project_id, dry_run)
-
-# Get standardized date parameters
-date_today, run_time, y_m_d = get_date_params(days_back)
-
-# Get table configuration
-insert_log(project_id, job_name, job_action, "init_config", "Loading table configuration", client, dry_run, step_id=next_step_id())
-tables_config = read_json(config_path)
-
-if not tables_config or "tables" not in tables_config:
-    header(f"Could not load table configuration at: {config_path}")
-    sys.exit(1)
-
-insert_log(project_id, job_name, job_action, "validate_config", "Configuration validation completed", client, dry_run, step_id=next_step_id())
-
-# Load SQL template
-insert_log(project_id, job_name, job_action, "load_query_template", "Loading SQL template", client, dry_run, step_id=next_step_id())
-sql_template = read_file(sql_template_path)
-
-# Dictionary for results
-results_list = []
-check_flag_column = 'raise_flag'
-
-# Iterate all the tables in the config
-for table_id, table_conf in tables_config["tables"].items():
-    if not table_conf.get("enabled", True):
-        continue
-        
-    header(f"Checking table: {table_id}")
-    
-    insert_log(project_id, job_name, job_action, "render_query", f"Rendering SQL query for table: {table_id}", client, dry_run, step_id=next_step_id())
-    
-    # Validate required config keys
-    require_keys(table_conf, ["dataset", "table", "description", "thresh_in_hours"], f"tables_config.tables[{table_id}]")
-    # Query parameters
-    query_params = {
+
+def build_partition_query_params(project_id: str, dataset: str, tables: list, start_date: str, run_time) -> dict:
+    """Return the format parameters of partition_health.sql for the tables of one dataset."""
+    return {
         "project_id": project_id,
-        "dataset": table_conf["dataset"],
-        "table": table_conf["table"],
-        "description": table_conf["description"],
-        "thresh_in_hours": table_conf["thresh_in_hours"],
+        "dataset": dataset,
+        "table_names": ", ".join(tables),
+        "table_list": ", ".join(f"'{table}'" for table in tables),
+        "start_date": start_date,
         "run_time": run_time.strftime('%Y-%m-%d %H:%M:%S')
     }
-    
-    query = sql_template.format(**query_params)
-    
-    insert_log(project_id, job_name, job_action, "write_outputs", f"Writing SQL to temp folder for table: {table_id}", client, dry_run, step_id=next_step_id())
-    # Write query to log
-    write_file(logs_path / f"table_{table_conf['table']}.sql", query)
-    
-    if not dry_run:
-        try:
-            insert_log(project_id, job_name, job_action, "execute_query", f"Executing BigQuery query for table: {table_id}", client, dry_run, step_id=next_step_id())
-            job_id = client.query(query)
-            query_df = job_id.to_dataframe()
-            
-            # Add threshold comparison
-            query_df['thresh_in_hours'] = table_conf["thresh_in_hours"]
-            query_df['raise_flag'] = query_df['hours_diff'] > table_conf["thresh_in_hours"]
-            
-            insert_log(project_id, job_name, job_action, "aggregate_results", f"Processing results for table: {table_id}", client, dry_run, step_id=next_step_id())
-            results_list.append(query_df)
-            
-        except Exception as error:
-            error_message = f"The error is {error}"
-            header(f"Hi BI Developer we have a problem with table {table_id}\nOpen file {str(error_path)}/{table_conf['table']}_error.md")
-            print(error_message)
-            write_file(error_path / f"{table_conf['table']}_error.md", error_message)
-
-# Combine all results
-if results_list:
-    df_all = pd.concat(results_list, ignore_index=True)
-    
-    # Final check – only if df_all has data
-    if not df_all.empty and (df_all[check_flag_column]).any():
-        
-        # Create detailed alert report with table
-        alert_df = df_all[df_all[check_flag_column]]
-        alert_content = compose_alert_markdown(
-            title=f"Table Freshness Alert - {y_m_d}",
-            summary="*These tables are not fresh (exceeded freshness threshold)*",
-            df=alert_df,
-            run_time=run_time,
+
+
+def run_table_monitoring(project_id: str, job_name: str, job_action: str, y_m_d: str, run_time, client, dry_run: bool = False, notify: bool = True) -> MonitorResult:
+    """
+    Check freshness and partition volume of every enabled table.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        job_name (str): Logical job name used in logs and alert file names
+        job_action (str): Job action (e.g., 'daily')
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        client: BigQuery client (may be shared with other checks)
+        dry_run (bool): If True, render queries without executing them
+        notify (bool): If True, send this check's own Slack alert/success message
+
+    Returns:
+        MonitorResult: One row per table, errors and alert file
+    """
+    started = time.monotonic()
+    result = MonitorResult(name="table_monitoring", alert_type="Table Health")
+
+    # Get table configuration
+    insert_log(project_id, job_name, job_action, "init_config", "Loading table configuration", client, dry_run, step_id=next_step_id())
+    tables_config = read_json(config_path)
+
+    if not tables_config or "tables" not in tables_config:
+        header(f"Could not load table configuration at: {config_path}")
+        raise ValueError(f"Could not load table configuration at: {config_path}")
+
+    # Deadlines: cancel slow queries, hedge slow read-only ones
+    deadlines = tables_config.get("deadlines", {})
+    run_deadline = Deadline(deadlines.get("run_timeout_sec"))
+    query_timeout_sec = deadlines.get("query_timeout_sec", DEFAULT_MONITOR_QUERY_TIMEOUT_SEC)
+    hedge_after_sec = deadlines.get("hedge_after_sec")
+
+    # Group enabled tables by dataset: one metadata query per dataset
+    table_confs = {}
+    datasets = {}
+    for table_id, table_conf in tables_config["tables"].items():
+        if not table_conf.get("enabled", True):
+            continue
+        require_keys(table_conf, ["dataset", "table", "description", "thresh_in_hours"], f"tables_config.tables[{table_id}]")
+        table_confs[f"{table_conf['dataset']}.{table_conf['table']}"] = table_conf
+        datasets.setdefault(table_conf["dataset"], []).append(table_conf["table"])
+
+    insert_log(project_id, job_name, job_action, "validate_config", "Configuration validation completed", client, dry_run, step_id=next_step_id())
+
+    # Load SQL template
+    insert_log(project_id, job_name, job_action, "load_query_template", "Loading SQL template", client, dry_run, step_id=next_step_id())
+    sql_template = read_file(sql_template_path)
+
+    # Local partition history: baselines are computed locally
+    health_settings = tables_config.get("partition_health", {})
+    history_dir = get_partition_history_dir(TABLE_HEALTH_DIR, project_id)
+    history = load_partition_history(history_dir)
+
+    for dataset, tables in datasets.items():
+        header(f"Reading partition metadata: {dataset} ({len(tables)} tables)")
+
+        insert_log(project_id, job_name, job_action, "render_query", f"Rendering partition metadata query for dataset: {dataset}", client, dry_run, step_id=next_step_id())
+        start_date = get_metadata_start_date(
+            history,
+            [f"{dataset}.{table}" for table in tables],
+            y_m_d,
+            health_settings.get("backfill_days", 28),
+            health_settings.get("refetch_days", 3),
         )
+        query = sql_template.format(**build_partition_query_params(project_id, dataset, tables, start_date, run_time))
+
+        insert_log(project_id, job_name, job_action, "write_outputs", f"Writing SQL to temp folder for dataset: {dataset}", client, dry_run, step_id=next_step_id())
+        # Write query to log
+        write_file(logs_path / f"partitions_{dataset}.sql", query)
+
+        if not dry_run:
+            try:
+                insert_log(project_id, job_name, job_action, "execute_query", f"Executing partition metadata query for dataset: {dataset} (from {start_date})", client, dry_run, step_id=next_step_id())
+                query_df = run_query_with_retry(
+                    client, query, timeout_sec=query_timeout_sec, deadline=run_deadline, hedge_after_sec=hedge_after_sec, to_dataframe=True,
+                    labels=build_job_labels("monitoring", job_name, job_action, y_m_d, dataset),
+                )
 
-        alert_file = write_and_notify(
-            alerts_path=alerts_path,
-            filename_stem=f"{job_name}_monitoring_alert_{y_m_d}",
-            content=alert_content,
-            alert_type="Table Freshness",
-            count=len(alert_df),
-            details="Tables exceeded freshness threshold",
+                insert_log(project_id, job_name, job_action, "aggregate_results", f"Appending {len(query_df)} partitions to history for dataset: {dataset}", client, dry_run, step_id=next_step_id())
+                append_partition_history(history_dir, query_df, run_time, dataset)
+
+            except QueryTimeoutError as error:
+                record_timeout(project_id, job_name, job_action, dataset, error, client, dry_run)
+                write_file(error_path / f"{dataset}_error.md", f"The error is {error}")
+                result.errors[dataset] = str(error)
+            except Exception as error:
+                error_message = f"The error is {error}"
+                header(f"Hi BI Developer we have a problem with dataset {dataset}\nOpen file {str(error_path)}/{dataset}_error.md")
+                print(error_message)
+                write_file(error_path / f"{dataset}_error.md", error_message)
+                result.errors[dataset] = str(error)
+
+    if not dry_run:
+        # One part per dataset per run: fold them into one and drop partitions past the baseline window
+        compacted = compact_partition_history(
+            history_dir, run_time, get_retention_start_date(table_confs, y_m_d, health_settings),
+            health_settings.get("compact_after_parts", DEFAULT_HEALTH_SETTINGS["compact_after_parts"]),
         )
-        
-        # Show brief message to user
-        header("🚨 TABLE FRESHNESS ALERTS 🚨")
-        print(f"Hi BI Developer - you have NEW ALERTS!")
-        print(f"Check the detailed report at: {alert_file}")
-        print(f"Found {len(alert_df)} tables that are not fresh.")
-        print("Slack notification sent to #logs_monitoring_alerts")
-    
-    # Write summary report
-    insert_log(project_id, job_name, job_action, "write_summary", "Writing summary report", client, dry_run, step_id=next_step_id())
-    summary_content = f"""# Table Freshness Report - {y_m_d}
+        if compacted:
+            insert_log(project_id, job_name, job_action, "compact_history", f"Compacted partition history into: {compacted.name}", client, dry_run, step_id=next_step_id())
+        insert_log(project_id, job_name, job_action, "evaluate_tables", "Evaluating table health against local partition history", client, dry_run, step_id=next_step_id())
+        # Tables of a dataset whose metadata query failed are not evaluated
+        failed = set(result.errors)
+        result.df = evaluate_partition_health(
+            load_partition_history(history_dir),
+            {table_id: conf for table_id, conf in table_confs.items() if conf["dataset"] not in failed},
+            y_m_d,
+            health_settings,
+        )
+        df_all = result.df
+
+        # Final check – only if df_all has data
+        if not result.alerts.empty:
+
+            # Create detailed alert report with table
+            alert_df = result.alerts
+            alert_content = compose_alert_markdown(
+                title=f"Table Health Alert - {y_m_d}",
+                summary="*These tables have missing, stale, or abnormally small/large partitions*",
+                df=alert_df,
+                run_time=run_time,
+            )
+
+            if notify:
+                result.alert_file = write_and_notify(
+                    alerts_path=alerts_path,
+                    filename_stem=f"{job_name}_monitoring_alert_{y_m_d}",
+                    content=alert_content,
+                    alert_type=result.alert_type,
+                    count=len(alert_df),
+                    details="Tables with missing, stale or abnormal partitions",
+                )
+            else:
+                result.alert_file = alerts_path / f"{job_name}_monitoring_alert_{y_m_d}.md"
+                write_file(result.alert_file, alert_content)
+
+            # Show brief message to user
+            header("🚨 TABLE HEALTH ALERTS 🚨")
+            print(f"Hi BI Developer - you have NEW ALERTS!")
+            print(f"Check the detailed report at: {result.alert_file}")
+            print(f"Found {len(alert_df)} tables with health issues.")
+            if notify:
+                print("Slack notification sent to #logs_monitoring_alerts")
+
+        # Write summary report
+        insert_log(project_id, job_name, job_action, "write_summary", "Writing summary report", client, dry_run, step_id=next_step_id())
+        summary_content = f"""# Table Health Report - {y_m_d}
 
 ## Summary
 - **Total Tables Checked**: {len(df_all)}
-- **Tables with Alerts**: {len(df_all[df_all[check_flag_column]]) if not df_all.empty else 0}
+- **Tables with Alerts**: {len(result.alerts)}
 - **Check Time**: {run_time.strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Results
@@ -156,19 +225,35 @@ if results_list:
 
 ## Alerts
 """
-    
-    if not df_all.empty and (df_all[check_flag_column]).any():
-        summary_content += f"\n{df_to_string_table(df_all[df_all[check_flag_column]])}"
-    else:
-        summary_content += "\n✅ All tables are fresh!"
-    
-    write_file(logs_path / f"table_monitoring_{y_m_d}.md", summary_content)
-
-# Send success notification if no alerts
-if not results_list or df_all.empty or not (df_all[check_flag_column]).any():
-    send_success_notification(
-        monitoring_type="Table Freshness",
-        message="All tables are fresh and up to date"
-    )
-
-insert_log(project_id, job_name, job_action, "end", "Table monitoring completed", client, dry_run, step_id=next_step_id())
+
+        if not result.alerts.empty:
+            summary_content += f"\n{df_to_string_table(result.alerts)}"
+        else:
+            summary_content += "\n✅ All tables are fresh and partition volumes look normal!"
+
+        write_file(logs_path / f"table_monitoring_{y_m_d}.md", summary_content)
+
+    # Send success notification if no alerts
+    if notify and result.alerts.empty:
+        send_success_notification(
+            monitoring_type=result.alert_type,
+            message="All tables are fresh and partition volumes look normal"
+        )
+
+    insert_log(project_id, job_name, job_action, "end", "Table monitoring completed", client, dry_run, step_id=next_step_id())
+    result.duration_sec = round(time.monotonic() - started, 1)
+    return result
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    flags = parser.parse_args()
+
+    # Get BigQuery client
+    client = get_bq_client(flags.project_id, flags.dry_run)
+
+    # Get standardized date parameters
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+
+    run_table_monitoring(flags.project_id, flags.job_name, flags.job_action, y_m_d, run_time, client, flags.dry_run)
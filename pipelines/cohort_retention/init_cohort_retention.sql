@@ -0,0 +1,51 @@
+/*
+ Initialize COHORT RETENTION matrix
+ run_time
+ {run_time}
+ One row per cohort_dt x day_n, partitioned by activity_dt = cohort_dt + day_n (the day the cell matures),
+ so each daily load only writes the processed date's partition.
+ */
+
+CREATE OR REPLACE TABLE `{project}.{dataset_dst}.{table_dst}`
+(
+  activity_dt           DATE,
+  cohort_dt             DATE,
+  day_n                 INTEGER,
+  cohort_size           INTEGER,
+  retained_users        INTEGER,
+  retention             FLOAT64,
+  updated_at            TIMESTAMP
+)
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "{description}"{layout_options})
+AS
+WITH day_ns AS (
+  SELECT day_n
+  FROM UNNEST([{day_ns}]) AS day_n
+),
+cohorts AS (
+  SELECT user_id, install_dt AS cohort_dt
+  FROM `{project}.{dataset_src}.{table_users}`
+  WHERE install_dt < DATE("{date}")
+),
+activity AS (
+  SELECT DISTINCT user_id, dt
+  FROM `{project}.{dataset_src}.{table_sessions}`
+  WHERE dt <= DATE("{date}")
+)
+SELECT
+  DATE_ADD(c.cohort_dt, INTERVAL d.day_n DAY) AS activity_dt,
+  c.cohort_dt,
+  d.day_n,
+  COUNT(DISTINCT c.user_id) AS cohort_size,
+  COUNT(DISTINCT a.user_id) AS retained_users,
+  SAFE_DIVIDE(COUNT(DISTINCT a.user_id), COUNT(DISTINCT c.user_id)) AS retention,
+  CURRENT_TIMESTAMP() AS updated_at
+FROM cohorts c
+CROSS JOIN day_ns d
+LEFT JOIN activity a
+  ON a.user_id = c.user_id
+ AND a.dt = DATE_ADD(c.cohort_dt, INTERVAL d.day_n DAY)
+WHERE DATE_ADD(c.cohort_dt, INTERVAL d.day_n DAY) <= DATE("{date}")
+GROUP BY 1, 2, 3;
@@ -0,0 +1,43 @@
+/*
+ Add the cohorts maturing on the processed date into COHORT RETENTION matrix
+ run_time: {run_time}
+ Reads only the {date} activity partition and the cohorts installed on {date} - day_n for day_n in ({day_ns})
+*/
+
+INSERT INTO `{project}.{dataset_dst}.{table_dst}`
+  (activity_dt, cohort_dt, day_n, cohort_size, retained_users, retention, updated_at)
+WITH cohorts AS (
+  SELECT
+    user_id,
+    install_dt AS cohort_dt,
+    DATE_DIFF(DATE("{date}"), install_dt, DAY) AS day_n
+  FROM `{project}.{dataset_src}.{table_users}`
+  WHERE install_dt BETWEEN DATE_SUB(DATE("{date}"), INTERVAL {max_day_n} DAY) AND DATE_SUB(DATE("{date}"), INTERVAL 1 DAY)
+    AND DATE_DIFF(DATE("{date}"), install_dt, DAY) IN ({day_ns})
+),
+activity AS (
+  SELECT DISTINCT user_id
+  FROM `{project}.{dataset_src}.{table_sessions}`
+  WHERE dt = DATE("{date}")
+)
+SELECT
+  DATE("{date}") AS activity_dt,
+  c.cohort_dt,
+  c.day_n,
+  COUNT(DISTINCT c.user_id) AS cohort_size,
+  COUNT(DISTINCT a.user_id) AS retained_users,
+  SAFE_DIVIDE(COUNT(DISTINCT a.user_id), COUNT(DISTINCT c.user_id)) AS retention,
+  CURRENT_TIMESTAMP() AS updated_at
+FROM cohorts c
+LEFT JOIN activity a USING (user_id)
+GROUP BY 1, 2, 3;
+
+
+/*
+ Validation:
+
+SELECT day_n, cohort_dt, cohort_size, retained_users, retention
+FROM `{project}.{dataset_dst}.{table_dst}`
+WHERE {partition_att} = DATE("{date}")
+ORDER BY day_n
+ */
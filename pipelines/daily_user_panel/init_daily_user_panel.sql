@@ -18,8 +18,9 @@ CREATE OR REPLACE TABLE `{project}.{dataset_dst}.{table_dst}`
 --   t_XpEarned            INTEGER,
 --   last_activity_dt      DATE
 )
-PARTITION BY {partition_att}
-OPTIONS (description = "{description}")
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "{description}"{layout_options})
 AS
 SELECT
   dt,
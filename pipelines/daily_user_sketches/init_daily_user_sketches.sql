@@ -0,0 +1,29 @@
+/*
+ Initialize DAILY USER SKETCHES table
+ run_time
+ {run_time}
+ One HLL++ sketch of user_id per dt x country x device_type.
+ Rolling uniques (WAU/MAU, 28-day actives per breakdown) are answered with HLL_COUNT.MERGE over stored sketches.
+ */
+
+CREATE OR REPLACE TABLE `{project}.{dataset_dst}.{table_dst}`
+(
+  dt                    DATE,
+  country               STRING,
+  device_type           STRING,
+  users_sketch          BYTES,
+  sessions              INTEGER
+)
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "{description}"{layout_options})
+AS
+SELECT
+  dt,
+  IFNULL(country, 'unknown') AS country,
+  IFNULL(device_type, 'unknown') AS device_type,
+  HLL_COUNT.INIT(user_id, {hll_precision}) AS users_sketch,
+  COUNT(*) AS sessions
+FROM `{project}.{dataset_src}.{table_src}`
+WHERE dt <= DATE("{date}")
+GROUP BY 1, 2, 3;
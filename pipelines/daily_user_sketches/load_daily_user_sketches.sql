@@ -0,0 +1,28 @@
+/*
+ Add the processed date sketches into DAILY USER SKETCHES table
+ run_time: {run_time}
+*/
+
+INSERT INTO `{project}.{dataset_dst}.{table_dst}` (dt, country, device_type, users_sketch, sessions)
+SELECT
+  dt,
+  IFNULL(country, 'unknown') AS country,
+  IFNULL(device_type, 'unknown') AS device_type,
+  HLL_COUNT.INIT(user_id, {hll_precision}) AS users_sketch,
+  COUNT(*) AS sessions
+FROM `{project}.{dataset_src}.{table_src}`
+WHERE {partition_att} = DATE("{date}")
+GROUP BY 1, 2, 3;
+
+
+/*
+ Validation (28-day actives per country, merged from stored sketches):
+
+SELECT
+  country,
+  HLL_COUNT.MERGE(users_sketch) AS actives_28d
+FROM `{project}.{dataset_dst}.{table_dst}`
+WHERE {partition_att} BETWEEN DATE_SUB(DATE("{date}"), INTERVAL 27 DAY) AND DATE("{date}")
+GROUP BY country
+ORDER BY actives_28d DESC
+ */
@@ -5,7 +5,9 @@ run_time
 */
 
 CREATE OR REPLACE TABLE `{project}.{dataset_dst}.{table_dst}`
-OPTIONS (description = "Curated dimension of first-seen users") AS
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "Curated dimension of first-seen users"{layout_options}) AS
 WITH firsts AS (
   SELECT
     user_id,
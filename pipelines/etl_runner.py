@@ -8,6 +8,8 @@ Run Commands
 
 python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name fact --job_action init --dry-run
 python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name fact --job_action daily --dry-run
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name fact --job_action init --chunked --dry-run
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name fact --job_action init --sample 1 --dry-run
 
 --- daily_user_panel ---
 
@@ -18,6 +20,7 @@ python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name daily_user_panel
 
 python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name user_panel --job_action init --dry-run
 python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name user_panel --job_action daily --dry-run
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name fact --job_action daily --script --dry-run
 
 --- curated layer (new) ---
 
@@ -30,21 +33,45 @@ python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name fct_sessions --j
 python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name fct_purchases --job_action init  --dry-run
 python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name fct_purchases --job_action daily --dry-run
 
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name kpi_daily --job_action init  --dry-run
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name kpi_daily --job_action daily --dry-run
+
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name daily_user_sketches --job_action init  --dry-run
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name daily_user_sketches --job_action daily --dry-run
+
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name cohort_retention --job_action init  --dry-run
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name cohort_retention --job_action daily --dry-run
+
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name segment_cube --job_action init  --dry-run
+python pipelines/etl_runner.py ppltx-m--tutorial-dev --job_name segment_cube --job_action daily --dry-run
+
 """
 import sys
 from pathlib import Path
+from datetime import datetime
+from typing import Optional
 
 # Ensure project root is on sys.path BEFORE importing utilities
 project_root_boot = Path(__file__).resolve().parent.parent 
 if str(project_root_boot) not in sys.path:
     sys.path.insert(0, str(project_root_boot))
 
-from utilities.io import header, read_file, write_file, read_json
+from utilities.io import header, read_file, write_file
 from utilities.bq import get_bq_client
 from utilities.daily_logs import insert_log, next_step_id
 from utilities.cli import create_standard_cli
 from utilities.formatting import get_date_params, format_query_template
-from utilities.paths import get_standard_paths, get_job_temp_paths, get_task_paths
+from utilities.paths import get_standard_paths, get_job_temp_paths
+from utilities.compiler import get_cached_plan, load_or_compile_job
+from utilities.watchdog import Deadline, QueryTimeoutError, record_timeout, is_read_only
+from utilities.admission import get_task_priority
+from utilities.retry import RetryPolicy, build_job_id_prefix, run_query_with_retry
+from utilities.run_context import get_run_id
+from utilities.labels import build_job_labels
+from utilities.chunked_init import run_chunked_task
+from utilities.job_script import build_job_script, run_job_script
+from utilities.sampling import get_sampling, ensure_sandbox_dataset
+from utilities.constants import DEFAULT_TASK_TIMEOUT_SEC, ETL_END_MESSAGE, ETL_FAILED_END_MESSAGE
 
 # --- setup paths ---
 paths = get_standard_paths(__file__)
@@ -55,82 +82,270 @@ pipelines_root = paths['pipelines_root']
 monitoring_root = paths['monitoring_root']
 utilities_root = paths['utilities_root']
 
-# --- CLI ---
-parser = create_standard_cli()
-flags = parser.parse_args()
-
-project_id = flags.project_id
-job_name = flags.job_name
-job_action = flags.job_action
-days_back = flags.days_back
-dry_run = flags.dry_run
-
-# Get BigQuery client
-client = get_bq_client(project_id, dry_run)
-
-# Get date parameters
-date_today, run_time, y_m_d = get_date_params(days_back)
-
-# Get job-specific temp paths
-logs_path, error_path, alerts_path = get_job_temp_paths(job_name, temp_root)
-
-
-insert_log(project_id, job_name, job_action, "init_config", "Loading configuration files", client, dry_run, step_id=next_step_id())
-
-tasks_config = read_json(pipelines_root/ f"{job_name}/{job_name}_config.json")
 
-action_config = read_json(pipelines_root / "action_config.json")
-
-
-selected_tasks = action_config.get(job_action, [])
-selected_tasks = [task.replace("{job_name}", job_name) for task in selected_tasks]
-
-if not selected_tasks:
-    header(f"No tasks found for action: {job_action} in action_config.json")
-    sys.exit(0)
-
-etl_group = next(iter(tasks_config.values()))
-tasks = etl_group["tasks"]
-
-for task_name in selected_tasks:
-    if task_name not in tasks:
-        print(f"Task {task_name} not defined in config, skipping.")
-        continue
-
-    task_conf = tasks[task_name]
-    if not task_conf.get("isEnable", True):
-        continue
-    
-    # load and render query
-    insert_log(project_id, job_name, job_action, "load_query", f"Loading SQL template for task: {task_name}", client, dry_run, step_id=next_step_id())
-    sql_path, __ , _ = get_task_paths(job_name, task_name, project_root)
-    query_template = read_file(sql_path)
-    insert_log(project_id, job_name, job_action, "render_query", f"Rendering SQL template for task: {task_name}", client, dry_run, step_id=next_step_id())    
-    query = format_query_template(query_template, task_conf, project_id, job_name, job_action, y_m_d, run_time)
-
-    
-    # Write query to temp/logs folder 
-    write_file(logs_path / f"{task_name}.sql", query)
-
-    if flags.dry_run:
-        header(f"[DRY-RUN] Would execute: {task_name}")
-        continue
-
-    try:
-        insert_log(project_id, job_name, job_action, "execute_query", f"Executing BigQuery query for task: {task_name}", client, dry_run, step_id=next_step_id())
-        header(f"Running task: {task_name}")
-        if client:
-            client.query(query).result()
-        else:
-            print(f"[WARNING] No BigQuery client available")
-    except Exception as e:
-        sql_out_path = logs_path / f"{task_name}.sql"
-        msg = (
-            f"Error in task '{task_name}': {e}\n"
-            f"Rendered SQL: {sql_out_path}"
-        )
-        header(f"Hi BI Developer we have a problem\nOpen file {str(error_path)}/{task_name}_error.md")
+def run_job(
+    project_id: str,
+    job_name: str,
+    job_action: str,
+    y_m_d: str,
+    run_time: datetime,
+    client=None,
+    dry_run: bool = False,
+    task_overrides: Optional[dict] = None,
+    job_temp_root: Optional[Path] = None,
+    chunked: bool = False,
+    restart_chunks: bool = False,
+    script: bool = False,
+) -> dict:
+    """
+    Run every task of a job action for a single project.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        job_name (str): Pipeline job name (e.g., 'fact')
+        job_action (str): One of the actions in action_config.json
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        client: BigQuery client or None in dry-run
+        dry_run (bool): If True, render queries without executing them
+        task_overrides (Optional[dict]): Per-task config overrides, keyed by task name
+        job_temp_root (Optional[Path]): Temp root for rendered SQL and errors
+        chunked (bool): Rebuild tasks with a "chunking" block chunk by chunk
+            (utilities/chunked_init.py)
+        restart_chunks (bool): Ignore chunks finished by a previous chunked run
+        script (bool): Run the tasks as one transactional script
+            (utilities/job_script.py); also on for the actions listed in the
+            config's "script_actions"
+
+    Returns:
+        dict: Job result with status, executed tasks and task errors
+    """
+    task_overrides = task_overrides or {}
+    logs_path, error_path, alerts_path = get_job_temp_paths(job_name, job_temp_root or temp_root)
+    result = {
+        "project_id": project_id,
+        "job_name": job_name,
+        "job_action": job_action,
+        "date": y_m_d,
+        "status": "success",
+        "tasks": [],
+        "errors": {},
+        "queue_wait_sec": 0.0,
+    }
+
+    # Sampled mode (--sample) reads and writes the developer's sandbox dataset
+    if client and not dry_run:
+        ensure_sandbox_dataset(client, project_id)
+
+    insert_log(project_id, job_name, job_action, "init_config", "Loading configuration files", client, dry_run, step_id=next_step_id())
+
+    # Rendered and checked ahead of time; reused while configs and templates are unchanged
+    plan = get_cached_plan(pipelines_root, project_id, job_name, job_action, y_m_d, task_overrides)
+    insert_log(
+        project_id, job_name, job_action, "plan",
+        "Using cached compiled plan" if plan else "Compiling job plan (loading and rendering SQL templates)",
+        client, dry_run, step_id=next_step_id(),
+    )
+    if plan is None:
+        plan = load_or_compile_job(pipelines_root, project_id, job_name, job_action, y_m_d, run_time, task_overrides)
+
+    if plan["status"] == "skipped":
+        header(f"No tasks found for action: {job_action} in action_config.json")
+        result["status"] = "skipped"
+        return result
+
+    if plan["errors"]:
+        msg = f"Job '{job_name}' ({job_action}) does not compile, no task was run:\n" + "\n".join(f"- {e}" for e in plan["errors"])
+        header(f"Hi BI Developer we have a problem\nOpen file {str(error_path)}/compile_error.md")
         print(msg)
-        write_file(error_path / f"{task_name}_error.md", msg)
-# Log end
-insert_log(project_id, job_name, job_action, "end", "ETL pipeline completed successfully", client, dry_run, step_id=next_step_id())
+        write_file(error_path / "compile_error.md", msg)
+        result["status"] = "failed"
+        result["errors"]["compile"] = "; ".join(plan["errors"])
+        insert_log(project_id, job_name, job_action, "end", ETL_FAILED_END_MESSAGE.format(date=y_m_d), client, dry_run, step_id=next_step_id())
+        return result
+
+    pipeline_name = plan["pipeline_name"]
+    layout = plan["layout"]
+    deadlines = plan["deadlines"]
+    run_deadline = Deadline(deadlines.get("run_timeout_sec"))
+    retry_policy = RetryPolicy.from_conf(plan["retry"])
+
+    # Script mode: one job, one transaction for all tasks of the action
+    job_script = None
+    if (script or job_action in plan.get("script_actions", [])) and not chunked:
+        job_script = build_job_script([task for task in plan["tasks"] if task["status"] == "ok"])
+        if job_script["non_transactional"]:
+            print(f"[WARNING] {job_name} {job_action} runs task by task, a transaction cannot hold: {', '.join(job_script['non_transactional'])}")
+            job_script = None
+
+    for task in plan["tasks"]:
+        task_name = task["name"]
+        if task["status"] == "missing":
+            print(f"Task {task_name} not defined in config, skipping.")
+            continue
+        if task["status"] == "disabled":
+            continue
+        task_conf = task["task_conf"]
+        sql_path = Path(task["sql_path"])
+
+        query = task["query"]
+
+        # Write query to temp/logs folder
+        write_file(logs_path / f"{task_name}.sql", query)
+        result["tasks"].append(task_name)
+
+        if chunked and task_conf.get("chunking"):
+            insert_log(project_id, job_name, job_action, "execute_query", f"Executing chunked rebuild for task: {task_name}", client, dry_run, step_id=next_step_id())
+            header(f"Running chunked task: {task_name}")
+            try:
+                chunk_result = run_chunked_task(
+                    client, project_id, pipeline_name, job_name, job_action, task_name, task_conf, read_file(sql_path),
+                    lambda template, overrides: format_query_template(template, {**task_conf, **overrides}, project_id, job_name, job_action, y_m_d, run_time, layout),
+                    y_m_d, logs_path, sql_path.parent,
+                    dry_run=dry_run,
+                    restart=restart_chunks,
+                    policy=retry_policy,
+                    timeout_sec=task_conf.get("timeout_sec", deadlines.get("task_timeout_sec", DEFAULT_TASK_TIMEOUT_SEC)),
+                    deadline=run_deadline,
+                )
+            except Exception as e:
+                chunk_result = {"status": "failed", "errors": {"plan": str(e)}}
+            if chunk_result["status"] != "success":
+                msg = (
+                    f"Chunked rebuild of '{task_name}' failed: {chunk_result['errors']}\n"
+                    f"Re-run the same command to retry only the failed chunks.\n"
+                    f"Rendered SQL: {logs_path}/{task_name}_chunk_*.sql"
+                )
+                print(msg)
+                write_file(error_path / f"{task_name}_error.md", msg)
+                result["status"] = "failed"
+                result["errors"][task_name] = str(chunk_result["errors"])
+            continue
+
+        if job_script:
+            continue
+
+        if dry_run:
+            header(f"[DRY-RUN] Would execute: {task_name}")
+            continue
+
+        if run_deadline.expired():
+            error = QueryTimeoutError(run_deadline.timeout_sec, [])
+            record_timeout(project_id, job_name, job_action, task_name, error, client, dry_run)
+            result["status"] = "failed"
+            result["errors"][task_name] = f"Not started: run deadline of {run_deadline.timeout_sec}s exceeded"
+            continue
+
+        try:
+            insert_log(project_id, job_name, job_action, "execute_query", f"Executing BigQuery query for task: {task_name}", client, dry_run, step_id=next_step_id())
+            header(f"Running task: {task_name}")
+            if client:
+                timeout_sec = task_conf.get("timeout_sec", deadlines.get("task_timeout_sec", DEFAULT_TASK_TIMEOUT_SEC))
+                # Deterministic job ids: a retried DML never runs twice
+                job_id_prefix = build_job_id_prefix(job_name, task_name, y_m_d, get_run_id())
+                # Writes count against the per-table DML cap; backfills run as batch
+                dml_table = None
+                if not is_read_only(query) and task_conf.get("table_dst"):
+                    dml_table = f"{task_conf.get('dataset_dst')}.{task_conf['table_dst']}"
+                query_stats = {}
+                try:
+                    run_query_with_retry(
+                        client, query, job_id_prefix, retry_policy, timeout_sec, run_deadline,
+                        priority=get_task_priority(job_action, task_conf),
+                        dml_table=dml_table,
+                        stats=query_stats,
+                        labels=build_job_labels(pipeline_name, job_name, job_action, y_m_d, task_name),
+                    )
+                finally:
+                    result["queue_wait_sec"] = round(result["queue_wait_sec"] + query_stats.get("queue_wait_sec", 0.0), 3)
+            else:
+                print(f"[WARNING] No BigQuery client available")
+        except QueryTimeoutError as e:
+            record_timeout(project_id, job_name, job_action, task_name, e, client, dry_run)
+            write_file(error_path / f"{task_name}_error.md", f"Timeout in task '{task_name}': {e}\nRendered SQL: {logs_path / f'{task_name}.sql'}")
+            result["status"] = "failed"
+            result["errors"][task_name] = str(e)
+        except Exception as e:
+            sql_out_path = logs_path / f"{task_name}.sql"
+            msg = (
+                f"Error in task '{task_name}': {e}\n"
+                f"Rendered SQL: {sql_out_path}"
+            )
+            header(f"Hi BI Developer we have a problem\nOpen file {str(error_path)}/{task_name}_error.md")
+            print(msg)
+            write_file(error_path / f"{task_name}_error.md", msg)
+            result["status"] = "failed"
+            result["errors"][task_name] = str(e)
+
+    if job_script and job_script["statements"]:
+        if run_deadline.expired() and not dry_run:
+            error = QueryTimeoutError(run_deadline.timeout_sec, [])
+            record_timeout(project_id, job_name, job_action, "script", error, client, dry_run)
+            result["status"] = "failed"
+            result["errors"]["script"] = f"Not started: run deadline of {run_deadline.timeout_sec}s exceeded"
+        else:
+            header(f"{'[DRY-RUN] ' if dry_run else ''}Running tasks as one transaction: {', '.join(result['tasks'])}")
+            script_tasks = [task for task in plan["tasks"] if task["status"] == "ok"]
+            # The script may run as long as its tasks would one after the other
+            timeout_sec = sum(task["task_conf"].get("timeout_sec", deadlines.get("task_timeout_sec", DEFAULT_TASK_TIMEOUT_SEC)) for task in script_tasks)
+            dml_table = next((f"{task['task_conf'].get('dataset_dst')}.{task['task_conf']['table_dst']}" for task in script_tasks if task["task_conf"].get("table_dst")), None)
+            script_result = run_job_script(
+                client, project_id, pipeline_name, job_name, job_action, job_script, y_m_d, logs_path,
+                dry_run=dry_run,
+                policy=retry_policy,
+                timeout_sec=timeout_sec,
+                deadline=run_deadline,
+                priority=get_task_priority(job_action, script_tasks[0]["task_conf"]),
+                dml_table=dml_table,
+            )
+            result["queue_wait_sec"] = round(result["queue_wait_sec"] + script_result["queue_wait_sec"], 3)
+            result["statements"] = script_result["statements"]
+            if script_result["status"] != "success":
+                failed = script_result["failed_task"] or "script"
+                msg = (
+                    f"Error in task '{failed}' of the transactional script: {script_result['error']}\n"
+                    f"The transaction was rolled back, no task of {job_name} {job_action} was applied.\n"
+                    f"Rendered SQL: {logs_path / 'script.sql'}"
+                )
+                header(f"Hi BI Developer we have a problem\nOpen file {str(error_path)}/{failed}_error.md")
+                print(msg)
+                write_file(error_path / f"{failed}_error.md", msg)
+                result["status"] = "failed"
+                result["errors"][failed] = script_result["error"]
+
+    # Log end; the message carries the date so downstream sensors can match it
+    end_message = ETL_END_MESSAGE if result["status"] == "success" else ETL_FAILED_END_MESSAGE
+    insert_log(project_id, job_name, job_action, "end", end_message.format(date=y_m_d), client, dry_run, step_id=next_step_id())
+    return result
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--chunked", action="store_true", help="Rebuild init tasks with a chunking block in parallel chunks")
+    parser.add_argument("--restart-chunks", action="store_true", help="With --chunked, ignore chunks finished by a previous run")
+    parser.add_argument("--script", action="store_true", help="Run the tasks as one transactional multi-statement script")
+    flags = parser.parse_args()
+
+    # Get BigQuery client
+    client = get_bq_client(flags.project_id, flags.dry_run)
+
+    # Get date parameters
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+
+    sampling = get_sampling()
+    if sampling:
+        header(f"[SAMPLE] {sampling['pct']}% of users, sandbox dataset {flags.project_id}.{sampling['dataset']}")
+
+    run_job(
+        flags.project_id,
+        flags.job_name,
+        flags.job_action,
+        y_m_d,
+        run_time,
+        client=client,
+        dry_run=flags.dry_run,
+        chunked=flags.chunked,
+        restart_chunks=flags.restart_chunks,
+        script=flags.script,
+    )
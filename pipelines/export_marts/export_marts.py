@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Export the new and changed partitions of the curated marts to local (or
+mounted) columnar files, with a manifest per table (utilities/mart_export.py).
+
+Tasks in export_marts_config.json name the tables and their partition
+column; the "export" block sets the root directory (BI_EXPORT_DIR
+overrides it), the format (parquet or arrow), parallel partitions and read
+streams. Run it after the daily job graph; unchanged partitions are skipped.
+
+Run Commands
+
+python pipelines/export_marts/export_marts.py ppltx-m--tutorial-dev --dry-run
+python pipelines/export_marts/export_marts.py ppltx-m--tutorial-dev
+python pipelines/export_marts/export_marts.py ppltx-m--tutorial-dev --tables fct_sessions --full
+BI_EXPORT_DIR=/mnt/bi_exports python pipelines/export_marts/export_marts.py ppltx-m--tutorial-dev
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root_boot = Path(__file__).resolve().parent.parent.parent
+if str(project_root_boot) not in sys.path:
+    sys.path.insert(0, str(project_root_boot))
+
+import pandas as pd
+
+from utilities.io import header, read_file, write_file, read_json
+from utilities.bq import get_bq_client
+from utilities.daily_logs import insert_log, next_step_id
+from utilities.cli import create_standard_cli
+from utilities.formatting import get_date_params, df_to_string_table
+from utilities.paths import get_standard_paths, get_job_temp_paths
+from utilities.retry import RetryPolicy, run_query_with_retry
+from utilities.labels import build_job_labels
+from utilities.sampling import resolve_dataset
+from utilities.watchdog import Deadline
+from utilities.mart_export import DEFAULT_EXPORT_SETTINGS, get_export_root, export_partitioned_table
+from utilities.constants import DEFAULT_MONITOR_QUERY_TIMEOUT_SEC, ETL_END_MESSAGE, ETL_FAILED_END_MESSAGE
+
+JOB_NAME = "export_marts"
+
+# --- setup paths ---
+paths = get_standard_paths(__file__)
+
+project_root = paths['project_root']
+temp_root = paths['temp_root']
+pipelines_root = paths['pipelines_root']
+config_path = pipelines_root / JOB_NAME / f"{JOB_NAME}_config.json"
+sql_template_path = pipelines_root / JOB_NAME / "partition_snapshot.sql"
+
+
+def load_partition_snapshot(client, project_id: str, dataset: str, tables: list, y_m_d: str, run_time, logs_path: Path, timeout_sec: float, deadline: Deadline, policy: RetryPolicy, labels: dict, dry_run: bool = False) -> pd.DataFrame:
+    """
+    Return partition_id, total_rows and last_modified of every partition up to the date, for the tables of one dataset.
+
+    Args:
+        client: BigQuery client or None in dry-run
+        project_id (str): Google Cloud project ID
+        dataset (str): Dataset of the tables
+        tables (list): Table names
+        y_m_d (str): Last partition date to export
+        run_time (datetime): Current run time
+        logs_path (Path): Where the rendered SQL is written
+        timeout_sec (float): Query timeout
+        deadline (Deadline): Run deadline
+        policy (RetryPolicy): Retry settings
+        labels (dict): BigQuery job labels
+        dry_run (bool): Render the query without executing it
+
+    Returns:
+        pd.DataFrame: One row per partition (empty in dry-run)
+    """
+    query = read_file(sql_template_path).format(
+        run_time=run_time,
+        project=project_id,
+        dataset_src=dataset,
+        date=y_m_d,
+        table_names=", ".join(tables),
+        table_list=", ".join(f"'{table}'" for table in tables),
+    )
+    write_file(logs_path / f"partition_snapshot_{dataset}.sql", query)
+    if dry_run or client is None:
+        header(f"[DRY-RUN] Would execute: partition_snapshot_{dataset}.sql")
+        return pd.DataFrame(columns=["table_name", "partition_id", "total_rows", "last_modified"])
+    return run_query_with_retry(client, query, policy=policy, timeout_sec=timeout_sec, deadline=deadline, to_dataframe=True, labels=labels)
+
+
+def run_export(project_id: str, y_m_d: str, run_time, client=None, dry_run: bool = False, tables: list = None, full: bool = False, job_action: str = "daily") -> dict:
+    """
+    Export the new and changed partitions of every enabled export task.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        y_m_d (str): Last partition date to export
+        run_time (datetime): Current run time
+        client: BigQuery client or None in dry-run
+        dry_run (bool): Plan without reading or writing data
+        tables (list): Only export these tables (table_src names)
+        full (bool): Re-export every partition
+        job_action (str): Job action used in daily_logs
+
+    Returns:
+        dict: Job result with status, per-table summaries and errors
+    """
+    logs_path, error_path, alerts_path = get_job_temp_paths(JOB_NAME, temp_root)
+    result = {"project_id": project_id, "job_name": JOB_NAME, "date": y_m_d, "status": "success", "tables": [], "errors": {}}
+
+    insert_log(project_id, JOB_NAME, job_action, "init_config", "Loading configuration files", client, dry_run, step_id=next_step_id())
+    pipeline_name, export_group = next(iter(read_json(config_path).items()))
+    settings = {**DEFAULT_EXPORT_SETTINGS, **export_group.get("export", {})}
+    deadlines = export_group.get("deadlines", {})
+    run_deadline = Deadline(deadlines.get("run_timeout_sec"))
+    policy = RetryPolicy.from_conf(export_group.get("retry"))
+
+    # Enabled tasks grouped by dataset: one metadata query per dataset
+    datasets = {}
+    for task_name, task_conf in export_group["tasks"].items():
+        if not task_conf.get("isEnable", True) or (tables and task_conf["table_src"] not in tables):
+            continue
+        datasets.setdefault(resolve_dataset(task_conf["dataset_src"]), []).append(task_conf)
+
+    header(f"Exporting {sum(len(confs) for confs in datasets.values())} tables to {get_export_root(settings)} ({settings['format']})")
+    for dataset, task_confs in datasets.items():
+        insert_log(project_id, JOB_NAME, job_action, "execute_query", f"Reading partition snapshot for dataset: {dataset}", client, dry_run, step_id=next_step_id())
+        try:
+            snapshot = load_partition_snapshot(
+                client, project_id, dataset, [conf["table_src"] for conf in task_confs], y_m_d, run_time, logs_path,
+                deadlines.get("query_timeout_sec", DEFAULT_MONITOR_QUERY_TIMEOUT_SEC), run_deadline, policy,
+                build_job_labels(pipeline_name, JOB_NAME, job_action, y_m_d, f"snapshot_{dataset}"), dry_run,
+            )
+        except Exception as e:
+            print(f"[ERROR] Partition snapshot of {dataset} failed: {e}")
+            result["status"] = "failed"
+            result["errors"][dataset] = str(e)
+            continue
+
+        for task_conf in task_confs:
+            table = task_conf["table_src"]
+            insert_log(project_id, JOB_NAME, job_action, "export_table", f"Exporting changed partitions of: {dataset}.{table}", client, dry_run, step_id=next_step_id())
+            partitions = snapshot[snapshot["table_name"] == table][["partition_id", "total_rows", "last_modified"]]
+            partitions = partitions.astype(object).where(partitions.notna(), None).to_dict("records")
+            try:
+                summary = export_partitioned_table(
+                    client, project_id, dataset, table, task_conf["partition_att"], partitions, settings,
+                    policy=policy, full=full, dry_run=dry_run, last_partition_id=y_m_d.replace("-", ""),
+                )
+            except Exception as e:
+                summary = {"table": f"{dataset}.{table}", "status": "failed", "errors": {"table": str(e)}}
+            result["tables"].append(summary)
+            if summary["status"] != "success":
+                result["status"] = "failed"
+                result["errors"][f"{dataset}.{table}"] = str(summary["errors"])
+                write_file(error_path / f"export_{table}_error.md", f"Export of {dataset}.{table} failed: {summary['errors']}\nRe-run to retry only the failed partitions.")
+
+    end_message = ETL_END_MESSAGE if result["status"] == "success" else ETL_FAILED_END_MESSAGE
+    insert_log(project_id, JOB_NAME, job_action, "end", end_message.format(date=y_m_d), client, dry_run, step_id=next_step_id())
+    return result
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--tables", nargs="+", default=None, help="Tables to export (default: every enabled task)")
+    parser.add_argument("--full", action="store_true", help="Re-export every partition, not only new or changed ones")
+    flags = parser.parse_args()
+
+    client = get_bq_client(flags.project_id, flags.dry_run)
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+
+    result = run_export(flags.project_id, y_m_d, run_time, client, flags.dry_run, flags.tables, flags.full, flags.job_action)
+
+    summary_df = pd.DataFrame([
+        {
+            "table": summary["table"],
+            "status": summary["status"],
+            "exported": summary.get("exported", 0),
+            "unchanged": summary.get("unchanged", 0),
+            "removed": summary.get("removed", 0),
+            "rows": summary.get("rows", 0),
+            "mb": round(summary.get("bytes", 0) / 1024 ** 2, 1),
+        }
+        for summary in result["tables"]
+    ])
+    report = (
+        f"# Mart Export - {flags.project_id} - {y_m_d}\n\n"
+        f"{df_to_string_table(summary_df)}\n\n"
+        + ("".join(f"- {name}: {error}\n" for name, error in result["errors"].items()) or "✅ No errors\n")
+    )
+    logs_path, error_path, alerts_path = get_job_temp_paths(JOB_NAME, temp_root)
+    write_file(logs_path / f"export_marts_{y_m_d}.md", report)
+    print(report)
+    sys.exit(0 if result["status"] == "success" else 1)
@@ -0,0 +1,20 @@
+/*
+Run time
+{run_time}
+Partition snapshot of {dataset_src}: {table_names}
+Metadata only: reads INFORMATION_SCHEMA.PARTITIONS, no table data is scanned
+ */
+
+SELECT
+  table_name,
+  partition_id,
+  total_rows,
+  FORMAT_TIMESTAMP('%Y-%m-%dT%H:%M:%E6S', last_modified_time) AS last_modified
+FROM `{project}.{dataset_src}`.INFORMATION_SCHEMA.PARTITIONS
+WHERE table_name IN ({table_list})
+  AND (
+    partition_id IS NULL
+    OR partition_id IN ('__NULL__', '__UNPARTITIONED__')
+    OR partition_id <= FORMAT_DATE('%Y%m%d', DATE("{date}"))
+  )
+ORDER BY table_name, partition_id
@@ -2,13 +2,16 @@
  Initialize FACT table
  run_time
  {run_time}
+ Columns are the union registered by downstream jobs (pipelines/<job>/schemas/)
  */
 CREATE OR REPLACE TABLE `{project}.{dataset_dst}.{table_dst}`
-PARTITION BY {partition_att}
-options (description = "{description}")
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "{description}"{layout_options})
 AS
-SELECT  *
+SELECT {source_columns}
 FROM `ppltx-ba-course.{dataset_src}.{table_src}`
 WHERE
   {partition_att} <= DATE("{date}")
+  AND {chunk_filter}
 --   limit 1000
@@ -2,12 +2,13 @@
  This query inserts raw data into Fact table
  run_time
  {run_time}
+ Columns are the union registered by downstream jobs (pipelines/<job>/schemas/)
  */
 
-INSERT INTO `{project}.{dataset_dst}.{table_dst}`
-SELECT *
+INSERT INTO `{project}.{dataset_dst}.{table_dst}` ({source_columns})
+SELECT {source_columns}
 FROM `ppltx-ba-course.{dataset_src}.{table_src}`
-WHERE {partition_att} >= DATE("{date}") AND time < CURRENT_TIMESTAMP();
+WHERE {partition_att} = DATE("{date}") AND time < CURRENT_TIMESTAMP();
 
 /*
  Validation:
@@ -0,0 +1,8 @@
+/*
+ Expected rows of one init_fact chunk (chunked init verification)
+ */
+SELECT COUNT(*) AS expected_rows
+FROM `ppltx-ba-course.{dataset_src}.{table_src}`
+WHERE
+  {partition_att} <= DATE("{date}")
+  AND {chunk_filter}
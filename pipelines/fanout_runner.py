@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Run the pipeline job graph for many game projects concurrently in one process.
+
+Each project gets its own BigQuery client. Jobs are dispatched as soon as their
+upstream jobs (pipelines/job_graph.json) succeed, bounded by a global cap and
+a per-project cap. Results are aggregated into one summary and one Slack digest.
+
+Run Commands
+
+python pipelines/fanout_runner.py --projects ppltx-m--tutorial-dev ppltx-m--tutorial-prod --job_action daily --dry-run
+python pipelines/fanout_runner.py --projects-config pipelines/projects_config.json --job_action daily
+python pipelines/fanout_runner.py --projects ppltx-m--tutorial-dev --jobs fact daily_user_panel --max-concurrency 4 --dry-run
+python pipelines/fanout_runner.py --projects ppltx-m--tutorial-dev --job_action init --sample 1 --dry-run
+"""
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root_boot = Path(__file__).resolve().parent.parent
+if str(project_root_boot) not in sys.path:
+    sys.path.insert(0, str(project_root_boot))
+
+import pandas as pd
+
+from utilities.io import header, write_file, read_json
+from utilities.bq import get_bq_client
+from utilities.cli import create_fanout_cli
+from utilities.formatting import get_date_params, df_to_string_table
+from utilities.job_graph import load_job_graph, topological_order
+from utilities.paths import get_standard_paths, get_job_temp_paths
+from utilities.slack import send_digest_notification
+from utilities.admission import get_admission_controller, get_admission_metrics
+from utilities.sampling import get_sampling
+from pipelines.etl_runner import run_job
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_PROJECT_CONCURRENCY = 3
+
+# --- setup paths ---
+paths = get_standard_paths(__file__)
+
+project_root = paths['project_root']
+temp_root = paths['temp_root']
+pipelines_root = paths['pipelines_root']
+
+
+def resolve_projects(flags) -> dict:
+    """
+    Build the per-project settings from CLI flags and the projects config.
+
+    Args:
+        flags: Parsed fan-out CLI flags
+
+    Returns:
+        dict: project_id -> {"max_concurrency": int, "overrides": dict}
+    """
+    config_path = Path(flags.projects_config) if flags.projects_config else pipelines_root / "projects_config.json"
+    projects_config = read_json(config_path)
+    configured = projects_config.get("projects", {})
+
+    project_ids = flags.projects or [
+        project_id for project_id, conf in configured.items() if conf.get("isEnable", True)
+    ]
+    projects = {}
+    for project_id in project_ids:
+        conf = configured.get(project_id, {})
+        projects[project_id] = {
+            "max_concurrency": conf.get("max_concurrency", DEFAULT_PROJECT_CONCURRENCY),
+            "overrides": conf.get("overrides", {}),
+        }
+    return projects
+
+
+def run_fanout(projects: dict, graph: dict, job_action: str, y_m_d: str, run_time, max_concurrency: int, dry_run: bool) -> list:
+    """
+    Run the job graph for every project concurrently.
+
+    A job is submitted once all its upstream jobs in the same project succeeded;
+    if an upstream job fails, its downstream jobs are marked as skipped.
+
+    Args:
+        projects (dict): project_id -> {"max_concurrency", "overrides"}
+        graph (dict): job_name -> upstream job names
+        job_action (str): Action to run for every job
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        max_concurrency (int): Global cap on concurrently running jobs
+        dry_run (bool): If True, render queries without executing them
+
+    Returns:
+        list: One result dict per (project, job)
+    """
+    clients = {project_id: get_bq_client(project_id, dry_run) for project_id in projects}
+    order = topological_order(graph)
+    status = {(project_id, job): "pending" for project_id in projects for job in order}
+    running = {project_id: 0 for project_id in projects}
+    results = []
+    in_flight = {}
+
+    def timed_run(project_id, job_name):
+        started = time.monotonic()
+        result = run_job(
+            project_id,
+            job_name,
+            job_action,
+            y_m_d,
+            run_time,
+            client=clients[project_id],
+            dry_run=dry_run,
+            task_overrides=projects[project_id]["overrides"].get(job_name, {}),
+            job_temp_root=temp_root / "projects" / project_id,
+        )
+        result["duration_sec"] = round(time.monotonic() - started, 1)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        while True:
+            # Skip jobs whose upstream failed, then submit everything that is ready
+            for (project_id, job_name), state in list(status.items()):
+                if state != "pending":
+                    continue
+                upstream = [status[(project_id, dep)] for dep in graph[job_name]]
+                if any(s in ("failed", "skipped") for s in upstream):
+                    status[(project_id, job_name)] = "skipped"
+                    results.append({
+                        "project_id": project_id,
+                        "job_name": job_name,
+                        "job_action": job_action,
+                        "date": y_m_d,
+                        "status": "skipped",
+                        "tasks": [],
+                        "errors": {"upstream": "Upstream job failed"},
+                        "duration_sec": 0.0,
+                    })
+                    continue
+                if not all(s == "success" for s in upstream):
+                    continue
+                if len(in_flight) >= max_concurrency or running[project_id] >= projects[project_id]["max_concurrency"]:
+                    continue
+                future = executor.submit(timed_run, project_id, job_name)
+                in_flight[future] = (project_id, job_name)
+                running[project_id] += 1
+                status[(project_id, job_name)] = "running"
+
+            if not in_flight:
+                break
+
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                project_id, job_name = in_flight.pop(future)
+                running[project_id] -= 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {
+                        "project_id": project_id,
+                        "job_name": job_name,
+                        "job_action": job_action,
+                        "date": y_m_d,
+                        "status": "failed",
+                        "tasks": [],
+                        "errors": {"run_job": str(e)},
+                        "duration_sec": 0.0,
+                    }
+                # A skipped job (no tasks for the action) does not block its downstream
+                status[(project_id, job_name)] = "failed" if result["status"] == "failed" else "success"
+                results.append(result)
+
+    return results
+
+
+def compose_summary(results: list, job_action: str, y_m_d: str, run_time) -> str:
+    """Compose the markdown summary of a fan-out run."""
+    df = pd.DataFrame([
+        {
+            "project_id": r["project_id"],
+            "job_name": r["job_name"],
+            "status": r["status"],
+            "duration_sec": r.get("duration_sec", 0.0),
+            "queue_wait_sec": r.get("queue_wait_sec", 0.0),
+            "errors": "; ".join(f"{k}: {v}" for k, v in r["errors"].items()),
+        }
+        for r in results
+    ])
+    failed = df[df["status"] == "failed"] if not df.empty else df
+    skipped = df[df["status"] == "skipped"] if not df.empty else df
+    admission = pd.DataFrame(get_admission_metrics())
+    return (
+        f"# ETL Fan-out Summary - {job_action} - {y_m_d}\n\n"
+        f"## Summary\n"
+        f"- **Projects**: {df['project_id'].nunique() if not df.empty else 0}\n"
+        f"- **Jobs**: {len(df)}\n"
+        f"- **Failed**: {len(failed)}\n"
+        f"- **Skipped**: {len(skipped)}\n\n"
+        f"## Results\n\n{df_to_string_table(df)}\n\n"
+        f"## Admission Queue Wait\n\n{df_to_string_table(admission) if not admission.empty else 'No jobs admitted'}\n\n"
+        f"## Generated at\n{run_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+    )
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_fanout_cli()
+    flags = parser.parse_args()
+
+    projects = resolve_projects(flags)
+    if not projects:
+        header("No projects to run: pass --projects or enable projects in projects_config.json")
+        sys.exit(1)
+
+    graph = load_job_graph(pipelines_root / "job_graph.json", flags.jobs)
+    projects_config = read_json(pipelines_root / "projects_config.json")
+    max_concurrency = flags.max_concurrency or projects_config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+    # Per-project warehouse caps shared by every job in this process
+    get_admission_controller().configure(**projects_config.get("admission", {}))
+
+    # Get date parameters
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+
+    sampling = get_sampling()
+    if sampling:
+        header(f"[SAMPLE] {sampling['pct']}% of users, sandbox dataset <project>.{sampling['dataset']}")
+
+    header(f"Fan-out {flags.job_action} for {len(projects)} projects x {len(graph)} jobs (max concurrency {max_concurrency})")
+    results = run_fanout(projects, graph, flags.job_action, y_m_d, run_time, max_concurrency, flags.dry_run)
+
+    summary = compose_summary(results, flags.job_action, y_m_d, run_time)
+    logs_path, error_path, alerts_path = get_job_temp_paths("fanout", temp_root)
+    summary_file = logs_path / f"fanout_{flags.job_action}_{y_m_d}.md"
+    write_file(summary_file, summary)
+    print(summary)
+
+    failed_count = sum(1 for r in results if r["status"] == "failed")
+    if not flags.dry_run:
+        send_digest_notification("ETL Fan-out", summary, failed_count=failed_count)
+
+    sys.exit(1 if failed_count else 0)
@@ -5,9 +5,9 @@ run_time
 */
 
 CREATE OR REPLACE TABLE `{project}.{dataset_dst}.{table_dst}`
-PARTITION BY dt
-CLUSTER BY user_id
-OPTIONS (description = "Curated purchase-level fact") AS
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "Curated purchase-level fact"{layout_options}) AS
 SELECT
   DATE(time) AS dt,
   user_id,
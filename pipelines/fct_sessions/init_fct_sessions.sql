@@ -7,9 +7,9 @@ Session start detection:
 */
 
 CREATE OR REPLACE TABLE `{project}.{dataset_dst}.{table_dst}`
-PARTITION BY dt
-CLUSTER BY user_id
-OPTIONS (description = "Curated session-level fact") AS
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "Curated session-level fact"{layout_options}) AS
 SELECT
   DATE(MIN(COALESCE(event_start_time, time))) AS dt,
   ANY_VALUE(user_id) AS user_id,
@@ -24,4 +24,5 @@ SELECT
 FROM `{project}.{dataset_src}.{table_src}`
 WHERE user_id IS NOT NULL
   AND session_id IS NOT NULL
+  AND {chunk_filter}
 GROUP BY session_id;
@@ -0,0 +1,9 @@
+/*
+ Expected rows of one init_fct_sessions chunk (chunked init verification)
+ One row per session_id
+ */
+SELECT COUNT(DISTINCT session_id) AS expected_rows
+FROM `{project}.{dataset_src}.{table_src}`
+WHERE user_id IS NOT NULL
+  AND session_id IS NOT NULL
+  AND {chunk_filter}
@@ -0,0 +1,73 @@
+/*
+ Initialize KPI DAILY table
+ run_time
+ {run_time}
+ D1 retention on row dt is measured for the cohort installed on dt - 1 (the cohort maturing that day)
+ */
+
+CREATE OR REPLACE TABLE `{project}.{dataset_dst}.{table_dst}`
+(
+  dt                    DATE,
+  dau                   INTEGER,
+  sessions              INTEGER,
+  installs              INTEGER,
+  revenue               FLOAT64,
+  paying_users          INTEGER,
+  arpdau                FLOAT64,
+  d1_cohort_dt          DATE,
+  d1_cohort_size        INTEGER,
+  d1_retained_users     INTEGER,
+  retention_d1          FLOAT64,
+  updated_at            TIMESTAMP
+)
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "{description}"{layout_options})
+AS
+WITH sessions AS (
+  SELECT dt, COUNT(DISTINCT user_id) AS dau, COUNT(*) AS sessions
+  FROM `{project}.{dataset_src}.{table_sessions}`
+  WHERE dt <= DATE("{date}")
+  GROUP BY dt
+),
+installs AS (
+  SELECT install_dt AS dt, COUNT(*) AS installs
+  FROM `{project}.{dataset_src}.{table_users}`
+  WHERE install_dt <= DATE("{date}")
+  GROUP BY install_dt
+),
+purchases AS (
+  SELECT dt, SUM(price) AS revenue, COUNT(DISTINCT user_id) AS paying_users
+  FROM `{project}.{dataset_src}.{table_purchases}`
+  WHERE dt <= DATE("{date}")
+  GROUP BY dt
+),
+retention AS (
+  SELECT
+    DATE_ADD(u.install_dt, INTERVAL 1 DAY) AS dt,
+    COUNT(DISTINCT u.user_id) AS d1_cohort_size,
+    COUNT(DISTINCT s.user_id) AS d1_retained_users
+  FROM `{project}.{dataset_src}.{table_users}` u
+  LEFT JOIN `{project}.{dataset_src}.{table_sessions}` s
+    ON s.user_id = u.user_id
+   AND s.dt = DATE_ADD(u.install_dt, INTERVAL 1 DAY)
+  WHERE u.install_dt < DATE("{date}")
+  GROUP BY 1
+)
+SELECT
+  s.dt,
+  s.dau,
+  s.sessions,
+  IFNULL(i.installs, 0) AS installs,
+  IFNULL(p.revenue, 0) AS revenue,
+  IFNULL(p.paying_users, 0) AS paying_users,
+  SAFE_DIVIDE(IFNULL(p.revenue, 0), NULLIF(s.dau, 0)) AS arpdau,
+  DATE_SUB(s.dt, INTERVAL 1 DAY) AS d1_cohort_dt,
+  IFNULL(r.d1_cohort_size, 0) AS d1_cohort_size,
+  IFNULL(r.d1_retained_users, 0) AS d1_retained_users,
+  SAFE_DIVIDE(r.d1_retained_users, NULLIF(r.d1_cohort_size, 0)) AS retention_d1,
+  CURRENT_TIMESTAMP() AS updated_at
+FROM sessions s
+LEFT JOIN installs i USING (dt)
+LEFT JOIN purchases p USING (dt)
+LEFT JOIN retention r USING (dt);
@@ -0,0 +1,62 @@
+/*
+ Load KPI aggregates for the processed date into KPI DAILY table
+ run_time: {run_time}
+ Reads only the {date} partitions of the curated facts (and the {date} - 1 install cohort for D1 retention)
+*/
+
+INSERT INTO `{project}.{dataset_dst}.{table_dst}`
+  (dt, dau, sessions, installs, revenue, paying_users, arpdau, d1_cohort_dt, d1_cohort_size, d1_retained_users, retention_d1, updated_at)
+WITH sessions AS (
+  SELECT COUNT(DISTINCT user_id) AS dau, COUNT(*) AS sessions
+  FROM `{project}.{dataset_src}.{table_sessions}`
+  WHERE dt = DATE("{date}")
+),
+installs AS (
+  SELECT COUNT(*) AS installs
+  FROM `{project}.{dataset_src}.{table_users}`
+  WHERE install_dt = DATE("{date}")
+),
+purchases AS (
+  SELECT SUM(price) AS revenue, COUNT(DISTINCT user_id) AS paying_users
+  FROM `{project}.{dataset_src}.{table_purchases}`
+  WHERE dt = DATE("{date}")
+),
+active AS (
+  SELECT DISTINCT user_id
+  FROM `{project}.{dataset_src}.{table_sessions}`
+  WHERE dt = DATE("{date}")
+),
+retention AS (
+  SELECT
+    COUNT(DISTINCT u.user_id) AS d1_cohort_size,
+    COUNT(DISTINCT a.user_id) AS d1_retained_users
+  FROM `{project}.{dataset_src}.{table_users}` u
+  LEFT JOIN active a USING (user_id)
+  WHERE u.install_dt = DATE_SUB(DATE("{date}"), INTERVAL 1 DAY)
+)
+SELECT
+  DATE("{date}") AS dt,
+  s.dau,
+  s.sessions,
+  i.installs,
+  IFNULL(p.revenue, 0) AS revenue,
+  IFNULL(p.paying_users, 0) AS paying_users,
+  SAFE_DIVIDE(IFNULL(p.revenue, 0), NULLIF(s.dau, 0)) AS arpdau,
+  DATE_SUB(DATE("{date}"), INTERVAL 1 DAY) AS d1_cohort_dt,
+  r.d1_cohort_size,
+  r.d1_retained_users,
+  SAFE_DIVIDE(r.d1_retained_users, NULLIF(r.d1_cohort_size, 0)) AS retention_d1,
+  CURRENT_TIMESTAMP() AS updated_at
+FROM sessions s
+CROSS JOIN installs i
+CROSS JOIN purchases p
+CROSS JOIN retention r;
+
+
+/*
+ Validation:
+
+SELECT *
+FROM `{project}.{dataset_dst}.{table_dst}`
+WHERE {partition_att} = DATE("{date}")
+ */
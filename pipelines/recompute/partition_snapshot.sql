@@ -0,0 +1,16 @@
+/*
+Run time
+{run_time}
+Partition snapshot of {project}.{dataset_src}: {table_names}
+Metadata only: reads INFORMATION_SCHEMA.PARTITIONS, no table data is scanned
+ */
+
+SELECT
+  table_name,
+  partition_id,
+  total_rows,
+  FORMAT_TIMESTAMP('%Y-%m-%dT%H:%M:%E6S', last_modified_time) AS last_modified
+FROM `{project}.{dataset_src}`.INFORMATION_SCHEMA.PARTITIONS
+WHERE table_name IN ({table_list})
+  AND partition_id BETWEEN FORMAT_DATE('%Y%m%d', DATE("{start_date}")) AND FORMAT_DATE('%Y%m%d', DATE("{end_date}"))
+ORDER BY table_name, partition_id
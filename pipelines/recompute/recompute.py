@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recompute the downstream partitions of source partitions that changed since
+the last run: late-arriving events, backfills and corrections of past days
+(utilities/recompute.py).
+
+Each run compares a metadata-only snapshot of the watched sources'
+partitions (row counts, last_modified_time) over the last `lookback_days`
+with the stored one, propagates the changed dates down
+pipelines/job_graph.json and reruns the daily action of every affected
+job on every affected date, up to `parallelism` dates at a time (one at a
+time for jobs whose daily action is a transaction script: BigQuery aborts
+concurrent transactions on the same table). "rebuild" jobs run init once. Run it after the daily job graph, with the same
+--days-back; the first run only records the snapshot.
+
+Run Commands
+
+python pipelines/recompute/recompute.py ppltx-m--tutorial-dev --dry-run
+python pipelines/recompute/recompute.py ppltx-m--tutorial-dev
+python pipelines/recompute/recompute.py ppltx-m--tutorial-dev --dates 2026-10-01 2026-10-02
+"""
+import sys
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root_boot = Path(__file__).resolve().parent.parent.parent
+if str(project_root_boot) not in sys.path:
+    sys.path.insert(0, str(project_root_boot))
+
+import pandas as pd
+
+from pipelines.etl_runner import run_job
+from utilities.io import header, read_file, write_file
+from utilities.bq import get_bq_client
+from utilities.daily_logs import insert_log, next_step_id
+from utilities.cli import create_standard_cli
+from utilities.formatting import get_date_params, df_to_string_table
+from utilities.paths import get_standard_paths, get_job_temp_paths
+from utilities.retry import run_query_with_retry
+from utilities.labels import build_job_labels
+from utilities.job_graph import load_job_graph, load_recompute_settings
+from utilities.recompute import (
+    get_snapshot_path, load_snapshot, save_snapshot, get_watch_window, build_snapshot,
+    diff_snapshots, get_job_lineage, get_watched_tables, plan_recompute,
+)
+from utilities.constants import DEFAULT_MONITOR_QUERY_TIMEOUT_SEC, ETL_END_MESSAGE, ETL_FAILED_END_MESSAGE
+
+JOB_NAME = "recompute"
+
+# --- setup paths ---
+paths = get_standard_paths(__file__)
+
+project_root = paths['project_root']
+temp_root = paths['temp_root']
+pipelines_root = paths['pipelines_root']
+graph_path = pipelines_root / "job_graph.json"
+sql_template_path = pipelines_root / JOB_NAME / "partition_snapshot.sql"
+
+
+def read_partitions(client, tables: list, start_date: str, end_date: str, run_time, logs_path: Path, labels: dict, dry_run: bool = False) -> list:
+    """
+    Return the daily partitions of the watched tables, one metadata query per dataset.
+
+    Args:
+        client: BigQuery client or None in dry-run
+        tables (list): Fully qualified table ids
+        start_date (str): First watched date
+        end_date (str): Last watched date
+        run_time (datetime): Current run time
+        logs_path (Path): Where the rendered SQL is written
+        labels (dict): BigQuery job labels
+        dry_run (bool): Render the queries without executing them
+
+    Returns:
+        list: Dicts with table_id, partition_id, total_rows and last_modified
+            (empty in dry-run)
+    """
+    datasets = {}
+    for table_id in tables:
+        project, dataset, table = table_id.split(".")
+        datasets.setdefault((project, dataset), []).append(table)
+
+    rows = []
+    for (project, dataset), names in datasets.items():
+        query = read_file(sql_template_path).format(
+            run_time=run_time,
+            project=project,
+            dataset_src=dataset,
+            start_date=start_date,
+            end_date=end_date,
+            table_names=", ".join(names),
+            table_list=", ".join(f"'{name}'" for name in names),
+        )
+        write_file(logs_path / f"partition_snapshot_{project}_{dataset}.sql", query)
+        if dry_run or client is None:
+            header(f"[DRY-RUN] Would execute: partition_snapshot_{project}_{dataset}.sql")
+            continue
+        df = run_query_with_retry(client, query, timeout_sec=DEFAULT_MONITOR_QUERY_TIMEOUT_SEC, to_dataframe=True, labels=labels)
+        for row in df.astype(object).where(df.notna(), None).to_dict("records"):
+            rows.append({**row, "table_id": f"{project}.{dataset}.{row['table_name']}"})
+    return rows
+
+
+def run_step(project_id: str, step: dict, y_m_d: str, run_time, client, dry_run: bool) -> list:
+    """
+    Rerun one job of the plan: init once for rebuild jobs, else daily per affected date.
+
+    Returns:
+        list: One result per run with job, date, action, status and error
+    """
+    if step["mode"] == "rebuild":
+        runs = [("init", y_m_d)]
+    else:
+        runs = [("daily", date) for date in step["dates"]]
+
+    def run_one(run: tuple) -> dict:
+        job_action, date = run
+        try:
+            job_result = run_job(
+                project_id, step["job"], job_action, date, run_time, client=client, dry_run=dry_run,
+                job_temp_root=temp_root / JOB_NAME / date,
+            )
+            error = "; ".join(f"{name}: {msg}" for name, msg in job_result.get("errors", {}).items())
+            status = job_result["status"]
+        except Exception as e:
+            status, error = "failed", str(e)
+        return {"job": step["job"], "date": date, "action": job_action, "status": status, "error": error or None}
+
+    with ThreadPoolExecutor(max_workers=max(1, step["parallelism"])) as pool:
+        return list(pool.map(run_one, runs))
+
+
+def run_recompute(project_id: str, y_m_d: str, run_time, client=None, dry_run: bool = False, dates: list = None, job_action: str = "daily") -> dict:
+    """
+    Detect changed source partitions and recompute what depends on them.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        y_m_d (str): Processing date of the daily runs; earlier dates are watched
+        run_time (datetime): Current run time
+        client: BigQuery client or None in dry-run
+        dry_run (bool): Plan without running jobs or storing the snapshot
+        dates (list): Treat these dates of every watched table as changed
+            instead of diffing snapshots (manual backfill)
+        job_action (str): Job action used in daily_logs
+
+    Returns:
+        dict: status, baseline (first run), changed tables, plan steps,
+            runs and errors
+    """
+    logs_path, error_path, alerts_path = get_job_temp_paths(JOB_NAME, temp_root)
+    result = {"project_id": project_id, "job_name": JOB_NAME, "date": y_m_d, "status": "success", "baseline": False, "changed": {}, "plan": [], "runs": [], "errors": {}}
+
+    insert_log(project_id, JOB_NAME, job_action, "init_config", "Loading job graph and lineage", client, dry_run, step_id=next_step_id())
+    graph = load_job_graph(graph_path)
+    recompute_conf = load_recompute_settings(graph_path)
+    settings = recompute_conf["settings"]
+    lineage = get_job_lineage(pipelines_root, project_id, list(graph), y_m_d, run_time)
+    watched = get_watched_tables(lineage, project_id, settings["watch"])
+    start_date, end_date = get_watch_window(y_m_d, settings["lookback_days"])
+    header(f"Watching {len(watched)} tables from {start_date} to {end_date}: {', '.join(watched)}")
+
+    insert_log(project_id, JOB_NAME, job_action, "execute_query", f"Reading partition snapshot of {len(watched)} tables", client, dry_run, step_id=next_step_id())
+    rows = read_partitions(client, watched, start_date, end_date, run_time, logs_path, build_job_labels(JOB_NAME, JOB_NAME, job_action, y_m_d, "snapshot"), dry_run)
+    snapshot = build_snapshot(rows, start_date, end_date, run_time)
+    snapshot_path = get_snapshot_path(project_id)
+    previous = load_snapshot(snapshot_path)
+
+    if dates:
+        result["changed"] = {table: sorted(d for d in dates if d <= y_m_d) for table in watched}
+    elif previous is None:
+        result["baseline"] = True
+        if not dry_run:
+            save_snapshot(snapshot_path, snapshot)
+        print(f"[WARNING] No previous partition snapshot: recorded the baseline at {snapshot_path}, nothing to recompute")
+    elif not dry_run:
+        result["changed"] = diff_snapshots(previous, snapshot, watched)
+    else:
+        print("[DRY-RUN] Partition snapshot not read: pass --dates to plan a recompute")
+
+    result["plan"] = plan_recompute(graph, recompute_conf["jobs"], lineage, result["changed"], y_m_d)
+    for table, changed_dates in result["changed"].items():
+        insert_log(project_id, JOB_NAME, job_action, "changed_partitions", f"{len(changed_dates)} changed partitions of: {table} ({', '.join(changed_dates)})", client, dry_run, step_id=next_step_id())
+
+    # Jobs run in dependency order; the dates of one job in parallel, unless its
+    # daily action is a transaction script (concurrent ones on a table abort)
+    failed_jobs = set()
+    for step in result["plan"]:
+        upstream_failed = [job for job in graph[step["job"]] if job in failed_jobs]
+        if upstream_failed:
+            failed_jobs.add(step["job"])
+            result["runs"].append({"job": step["job"], "date": ", ".join(step["dates"]), "action": "-", "status": "skipped", "error": f"Upstream job failed: {', '.join(upstream_failed)}"})
+            continue
+        insert_log(
+            project_id, JOB_NAME, job_action, "recompute_job",
+            f"Recomputing {step['mode']} of: {step['job']} for {len(step['dates'])} dates ({', '.join(step['dates'])})",
+            client, dry_run, step_id=next_step_id(),
+        )
+        parallelism = 1 if lineage[step["job"]]["script"] else settings["parallelism"]
+        runs = run_step(project_id, {**step, "parallelism": parallelism}, y_m_d, run_time, client, dry_run)
+        result["runs"].extend(runs)
+        for run in runs:
+            if run["status"] != "success":
+                failed_jobs.add(step["job"])
+                result["errors"][f"{run['job']} {run['action']} {run['date']}"] = run["error"] or run["status"]
+
+    if result["errors"] or any(run["status"] == "skipped" for run in result["runs"]):
+        result["status"] = "failed"
+        write_file(
+            error_path / f"recompute_{y_m_d}_error.md",
+            "".join(f"- {name}: {error}\n" for name, error in result["errors"].items())
+            + "The partition snapshot was not updated: the next run recomputes the same changes.",
+        )
+    elif not (dry_run or dates or result["baseline"]):
+        save_snapshot(snapshot_path, snapshot)
+
+    end_message = ETL_END_MESSAGE if result["status"] == "success" else ETL_FAILED_END_MESSAGE
+    insert_log(project_id, JOB_NAME, job_action, "end", end_message.format(date=y_m_d), client, dry_run, step_id=next_step_id())
+    return result
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--dates", nargs="+", default=None, help="Recompute these source dates (YYYY-MM-DD) instead of detecting changes")
+    flags = parser.parse_args()
+
+    client = get_bq_client(flags.project_id, flags.dry_run)
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+
+    result = run_recompute(flags.project_id, y_m_d, run_time, client, flags.dry_run, flags.dates, flags.job_action)
+
+    changed_df = pd.DataFrame([
+        {"table": table, "partitions": len(changed_dates), "dates": ", ".join(changed_dates)}
+        for table, changed_dates in result["changed"].items()
+    ])
+    plan_df = pd.DataFrame([
+        {
+            "job": step["job"],
+            "mode": step["mode"],
+            "dates": ", ".join(step["dates"]),
+            "triggered_by": "; ".join(f"{upstream}: {len(upstream_dates)}" for upstream, upstream_dates in step["triggers"].items()),
+        }
+        for step in result["plan"]
+    ])
+    runs_df = pd.DataFrame(result["runs"]).fillna("-")
+    report = (
+        f"# Change-Driven Recompute - {flags.project_id} - {y_m_d}\n\n"
+        + ("Baseline partition snapshot recorded; nothing to compare yet.\n\n" if result["baseline"] else "")
+        + "## Changed Partitions\n\n"
+        + (df_to_string_table(changed_df) if not changed_df.empty else "No changed partitions") + "\n\n"
+        + "## Plan\n\n"
+        + (df_to_string_table(plan_df) if not plan_df.empty else "Nothing to recompute") + "\n\n"
+        + "## Runs\n\n"
+        + (df_to_string_table(runs_df) if not runs_df.empty else "No runs") + "\n\n"
+        + ("".join(f"- {name}: {error}\n" for name, error in result["errors"].items()) or "✅ No errors\n")
+    )
+    logs_path, error_path, alerts_path = get_job_temp_paths(JOB_NAME, temp_root)
+    write_file(logs_path / f"recompute_{y_m_d}.md", report)
+    print(report)
+    sys.exit(0 if result["status"] == "success" else 1)
@@ -0,0 +1,124 @@
+/*
+ Initialize SEGMENT CUBE table
+ run_time
+ {run_time}
+ Dashboard rollup, two grains per dt:
+ - grain 'activity': dt x country x device_type; active users (HLL++ sketch), sessions, session seconds, matches
+ - grain 'purchase': dt x country x device_type x product_id x payment_provider; payers (HLL++ sketch), purchases, revenue
+ A user's country and device on a day are those of their first session that day, else their install attributes.
+ Queries are routed here by utilities/cube.py.
+ */
+
+CREATE OR REPLACE TABLE `{project}.{dataset_dst}.{table_dst}`
+(
+  dt                    DATE,
+  grain                 STRING,
+  country               STRING,
+  device_type           STRING,
+  product_id            STRING,
+  payment_provider      STRING,
+  users_sketch          BYTES,
+  sessions              INTEGER,
+  session_seconds       INTEGER,
+  matches               INTEGER,
+  payers_sketch         BYTES,
+  purchases             INTEGER,
+  revenue               FLOAT64,
+  updated_at            TIMESTAMP
+)
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "{description}"{layout_options})
+AS
+WITH sessions AS (
+  SELECT
+    dt,
+    user_id,
+    IFNULL(country, 'unknown') AS country,
+    IFNULL(device_type, 'unknown') AS device_type,
+    session_length_seconds,
+    session_start_ts
+  FROM `{project}.{dataset_src}.{table_sessions}`
+  WHERE dt <= DATE("{date}")
+),
+day_segment AS (
+  SELECT
+    dt,
+    user_id,
+    ARRAY_AGG(STRUCT(country, device_type) ORDER BY session_start_ts LIMIT 1)[OFFSET(0)] AS segment
+  FROM sessions
+  GROUP BY dt, user_id
+),
+session_cells AS (
+  SELECT
+    dt,
+    country,
+    device_type,
+    HLL_COUNT.INIT(user_id, {hll_precision}) AS users_sketch,
+    COUNT(*) AS sessions,
+    SUM(session_length_seconds) AS session_seconds
+  FROM sessions
+  GROUP BY 1, 2, 3
+),
+match_cells AS (
+  SELECT
+    p.dt,
+    COALESCE(s.segment.country, u.country_at_install, 'unknown') AS country,
+    COALESCE(s.segment.device_type, u.device_type_at_install, 'unknown') AS device_type,
+    SUM(p.t_Match_Start) AS matches
+  FROM `{project}.{dataset_panels}.{table_panel}` p
+  LEFT JOIN day_segment s USING (dt, user_id)
+  LEFT JOIN `{project}.{dataset_src}.{table_users}` u USING (user_id)
+  WHERE p.dt <= DATE("{date}")
+  GROUP BY 1, 2, 3
+),
+purchase_cells AS (
+  SELECT
+    p.dt,
+    COALESCE(s.segment.country, u.country_at_install, 'unknown') AS country,
+    COALESCE(s.segment.device_type, u.device_type_at_install, 'unknown') AS device_type,
+    IFNULL(CAST(p.product_id AS STRING), 'unknown') AS product_id,
+    IFNULL(p.payment_provider, 'unknown') AS payment_provider,
+    HLL_COUNT.INIT(p.user_id, {hll_precision}) AS payers_sketch,
+    COUNT(*) AS purchases,
+    SUM(p.price) AS revenue
+  FROM `{project}.{dataset_src}.{table_purchases}` p
+  LEFT JOIN day_segment s USING (dt, user_id)
+  LEFT JOIN `{project}.{dataset_src}.{table_users}` u USING (user_id)
+  WHERE p.dt <= DATE("{date}")
+  GROUP BY 1, 2, 3, 4, 5
+)
+SELECT
+  dt,
+  'activity' AS grain,
+  country,
+  device_type,
+  CAST(NULL AS STRING) AS product_id,
+  CAST(NULL AS STRING) AS payment_provider,
+  s.users_sketch,
+  IFNULL(s.sessions, 0) AS sessions,
+  IFNULL(s.session_seconds, 0) AS session_seconds,
+  IFNULL(m.matches, 0) AS matches,
+  CAST(NULL AS BYTES) AS payers_sketch,
+  0 AS purchases,
+  0.0 AS revenue,
+  CURRENT_TIMESTAMP() AS updated_at
+FROM session_cells s
+FULL OUTER JOIN match_cells m USING (dt, country, device_type)
+UNION ALL
+SELECT
+  dt,
+  'purchase' AS grain,
+  country,
+  device_type,
+  product_id,
+  payment_provider,
+  CAST(NULL AS BYTES) AS users_sketch,
+  0 AS sessions,
+  0 AS session_seconds,
+  0 AS matches,
+  payers_sketch,
+  purchases,
+  revenue,
+  CURRENT_TIMESTAMP() AS updated_at
+FROM purchase_cells;
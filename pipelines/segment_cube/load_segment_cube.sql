@@ -0,0 +1,110 @@
+/*
+ Add the processed date slice into SEGMENT CUBE table
+ run_time: {run_time}
+ Reads only the {date} partitions of fct_sessions, fct_purchases and daily_user_panel
+*/
+
+INSERT INTO `{project}.{dataset_dst}.{table_dst}`
+  (dt, grain, country, device_type, product_id, payment_provider, users_sketch, sessions, session_seconds, matches, payers_sketch, purchases, revenue, updated_at)
+WITH sessions AS (
+  SELECT
+    user_id,
+    IFNULL(country, 'unknown') AS country,
+    IFNULL(device_type, 'unknown') AS device_type,
+    session_length_seconds,
+    session_start_ts
+  FROM `{project}.{dataset_src}.{table_sessions}`
+  WHERE dt = DATE("{date}")
+),
+day_segment AS (
+  SELECT
+    user_id,
+    ARRAY_AGG(STRUCT(country, device_type) ORDER BY session_start_ts LIMIT 1)[OFFSET(0)] AS segment
+  FROM sessions
+  GROUP BY user_id
+),
+session_cells AS (
+  SELECT
+    country,
+    device_type,
+    HLL_COUNT.INIT(user_id, {hll_precision}) AS users_sketch,
+    COUNT(*) AS sessions,
+    SUM(session_length_seconds) AS session_seconds
+  FROM sessions
+  GROUP BY 1, 2
+),
+match_cells AS (
+  SELECT
+    COALESCE(s.segment.country, u.country_at_install, 'unknown') AS country,
+    COALESCE(s.segment.device_type, u.device_type_at_install, 'unknown') AS device_type,
+    SUM(p.t_Match_Start) AS matches
+  FROM `{project}.{dataset_panels}.{table_panel}` p
+  LEFT JOIN day_segment s USING (user_id)
+  LEFT JOIN `{project}.{dataset_src}.{table_users}` u USING (user_id)
+  WHERE p.dt = DATE("{date}")
+  GROUP BY 1, 2
+),
+purchase_cells AS (
+  SELECT
+    COALESCE(s.segment.country, u.country_at_install, 'unknown') AS country,
+    COALESCE(s.segment.device_type, u.device_type_at_install, 'unknown') AS device_type,
+    IFNULL(CAST(p.product_id AS STRING), 'unknown') AS product_id,
+    IFNULL(p.payment_provider, 'unknown') AS payment_provider,
+    HLL_COUNT.INIT(p.user_id, {hll_precision}) AS payers_sketch,
+    COUNT(*) AS purchases,
+    SUM(p.price) AS revenue
+  FROM `{project}.{dataset_src}.{table_purchases}` p
+  LEFT JOIN day_segment s USING (user_id)
+  LEFT JOIN `{project}.{dataset_src}.{table_users}` u USING (user_id)
+  WHERE p.dt = DATE("{date}")
+  GROUP BY 1, 2, 3, 4
+)
+SELECT
+  DATE("{date}") AS dt,
+  'activity' AS grain,
+  country,
+  device_type,
+  CAST(NULL AS STRING) AS product_id,
+  CAST(NULL AS STRING) AS payment_provider,
+  s.users_sketch,
+  IFNULL(s.sessions, 0) AS sessions,
+  IFNULL(s.session_seconds, 0) AS session_seconds,
+  IFNULL(m.matches, 0) AS matches,
+  CAST(NULL AS BYTES) AS payers_sketch,
+  0 AS purchases,
+  0.0 AS revenue,
+  CURRENT_TIMESTAMP() AS updated_at
+FROM session_cells s
+FULL OUTER JOIN match_cells m USING (country, device_type)
+UNION ALL
+SELECT
+  DATE("{date}") AS dt,
+  'purchase' AS grain,
+  country,
+  device_type,
+  product_id,
+  payment_provider,
+  CAST(NULL AS BYTES) AS users_sketch,
+  0 AS sessions,
+  0 AS session_seconds,
+  0 AS matches,
+  payers_sketch,
+  purchases,
+  revenue,
+  CURRENT_TIMESTAMP() AS updated_at
+FROM purchase_cells;
+
+
+/*
+ Validation (revenue per country and provider, and actives per device, from the cube):
+
+SELECT country, payment_provider, SUM(revenue) AS revenue, HLL_COUNT.MERGE(payers_sketch) AS payers
+FROM `{project}.{dataset_dst}.{table_dst}`
+WHERE {partition_att} = DATE("{date}") AND grain = 'purchase'
+GROUP BY 1, 2 ORDER BY revenue DESC;
+
+SELECT device_type, HLL_COUNT.MERGE(users_sketch) AS dau, SUM(sessions) AS sessions, SUM(matches) AS matches
+FROM `{project}.{dataset_dst}.{table_dst}`
+WHERE {partition_att} = DATE("{date}") AND grain = 'activity'
+GROUP BY 1
+ */
@@ -5,8 +5,9 @@
  */
 
 CREATE OR REPLACE TABLE`{project}.{dataset_dst}.{table_dst}`
-PARTITION BY {partition_att}
-OPTIONS (description = "{description}")
+{partition_by_clause}
+{cluster_by_clause}
+OPTIONS (description = "{description}"{layout_options})
 AS
 SELECT
   user_id,
@@ -23,4 +24,5 @@ SELECT
   MAX(dt) as last_activity_dt
 FROM `{project}.{dataset_src}.{table_src}`
 WHERE dt <= DATE("{date}")
+  AND {chunk_filter}
 GROUP BY user_id;
@@ -0,0 +1,8 @@
+/*
+ Expected rows of one init_user_panel chunk (chunked init verification)
+ One row per user_id
+ */
+SELECT COUNT(DISTINCT user_id) AS expected_rows
+FROM `{project}.{dataset_src}.{table_src}`
+WHERE dt <= DATE("{date}")
+  AND {chunk_filter}
@@ -3,7 +3,13 @@
 # ║  ETL + Monitoring (All-in-One)           ║
 # ╚═══════════════════════════════════════════╝
 
-# Run complete pipeline: ETL + Monitoring
+# Preferred: the resident scheduler (scheduler/scheduler_daemon.py) owns the daily
+# schedule, waits on data sensors and catches up missed dates. Keep it running
+# (systemd, supervisor, or restart it from cron if it is not alive):
+# @reboot cd /path/to/gaming-bi-system && nohup python scheduler/scheduler_daemon.py ppltx-m--tutorial-dev >> temp/scheduler/daemon.log 2>&1 &
+# Check it with: python scheduler/scheduler_daemon.py ppltx-m--tutorial-dev --status
+
+# Legacy: run complete pipeline: ETL + Monitoring
 # ┌───────────── minute (0 - 59)
 # │ ┌───────────── hour (0 - 23)
 # │ │ ┌───────────── day of the month (1 - 31)
@@ -9,3 +9,11 @@ sleep 300
 $PY "$ROOT_DIR/pipelines/etl_runner.py" "$PROJECT_ID" --job_name fct_sessions   --job_action daily
 sleep 300
 $PY "$ROOT_DIR/pipelines/etl_runner.py" "$PROJECT_ID" --job_name fct_purchases  --job_action daily
+sleep 300
+$PY "$ROOT_DIR/pipelines/etl_runner.py" "$PROJECT_ID" --job_name kpi_daily      --job_action daily
+sleep 300
+$PY "$ROOT_DIR/pipelines/etl_runner.py" "$PROJECT_ID" --job_name daily_user_sketches --job_action daily
+sleep 300
+$PY "$ROOT_DIR/pipelines/etl_runner.py" "$PROJECT_ID" --job_name cohort_retention --job_action daily
+sleep 300
+$PY "$ROOT_DIR/pipelines/etl_runner.py" "$PROJECT_ID" --job_name segment_cube --job_action daily
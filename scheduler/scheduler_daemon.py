@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Resident scheduler: owns the daily schedule instead of crontab + execute_*.sh.
+
+Jobs come from pipelines/job_graph.json plus the extra jobs (monitoring suite)
+of scheduler/schedule_config.json. A job runs for a date once its not_before
+time passed, its upstream jobs succeeded and its sensors pass; missed dates
+are caught up. Status per date is kept in state/scheduler/<project_id>.json.
+
+Run Commands
+
+python scheduler/scheduler_daemon.py ppltx-m--tutorial-dev
+python scheduler/scheduler_daemon.py ppltx-m--tutorial-dev --once --dry-run
+python scheduler/scheduler_daemon.py ppltx-m--tutorial-dev --start-date 2026-10-12
+python scheduler/scheduler_daemon.py ppltx-m--tutorial-dev --status
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root_boot = Path(__file__).resolve().parent.parent
+if str(project_root_boot) not in sys.path:
+    sys.path.insert(0, str(project_root_boot))
+
+import pandas as pd
+
+from utilities.io import header, read_json
+from utilities.bq import get_bq_client
+from utilities.cli import create_standard_cli
+from utilities.formatting import df_to_string_table
+from utilities.job_graph import load_job_graph
+from utilities.paths import get_standard_paths
+from utilities.run_context import new_run_id, set_run_id, set_run_info
+from utilities.scheduler import Clock, DailyScheduler, ScheduleState, build_schedule_graph
+from utilities.sensors import check_source_partition, check_job_end
+from utilities.constants import SCHEDULER_STATE_DIR
+from pipelines.etl_runner import run_job
+from monitoring.monitoring_suite import run_monitoring_suite, report_monitoring_suite
+
+# --- setup paths ---
+paths = get_standard_paths(__file__)
+
+project_root = paths['project_root']
+pipelines_root = paths['pipelines_root']
+scheduler_root = project_root / "scheduler"
+sensors_root = scheduler_root / "sensors"
+
+STATUS_COLUMNS = ["date", "job_name", "status", "attempts", "finished_at", "duration_sec", "detail"]
+
+
+def get_state_path(project_id: str, dry_run: bool = False) -> Path:
+    """Return the scheduler state file of a project; dry-runs keep their own."""
+    return SCHEDULER_STATE_DIR / (f"{project_id}.dry_run.json" if dry_run else f"{project_id}.json")
+
+
+def create_scheduler(project_id: str, schedule_conf: dict, client, dry_run: bool = False, clock=None, state_path=None) -> DailyScheduler:
+    """
+    Wire the scheduling logic to the ETL runner, the monitoring suite and BigQuery sensors.
+
+    Args:
+        project_id (str): Google Cloud project ID
+        schedule_conf (dict): Parsed schedule_config.json
+        client: BigQuery client or None in dry-run
+        dry_run (bool): Render queries only; sensors pass without querying
+        clock (Optional[Clock]): Time source (default: wall clock)
+        state_path (Optional[Path]): State file (default: get_state_path)
+
+    Returns:
+        DailyScheduler: Ready to tick() or run_forever()
+    """
+    clock = clock or Clock()
+    jobs_conf = schedule_conf.get("jobs", {})
+    job_action = schedule_conf.get("scheduler", {}).get("job_action", "daily")
+    graph = build_schedule_graph(schedule_conf, load_job_graph(pipelines_root / "job_graph.json"))
+
+    def is_monitoring(job_name):
+        return jobs_conf.get(job_name, {}).get("type") == "monitoring"
+
+    def run_scheduled(job_name, y_m_d, run_time):
+        # One run id per scheduled execution: fresh job ids and one artifact run each
+        set_run_id(new_run_id())
+        set_run_info(started_at=run_time.isoformat(timespec="seconds"), date=y_m_d)
+        header(f"Scheduled {job_name} for {y_m_d}")
+        if is_monitoring(job_name):
+            results = run_monitoring_suite(project_id, job_action, y_m_d, run_time, client, dry_run, jobs_conf[job_name].get("checks"))
+            report_monitoring_suite(results, y_m_d, run_time, dry_run)
+            errors = {r.name: "; ".join(r.errors.values()) for r in results if r.has_errors}
+            return {"status": "failed" if errors else "success", "errors": errors}
+        return run_job(project_id, job_name, job_action, y_m_d, run_time, client=client, dry_run=dry_run)
+
+    def sense(job_name, sensor_conf, y_m_d, now):
+        if dry_run:
+            return True, "dry-run"
+        try:
+            if sensor_conf["type"] == "source_partition":
+                return check_source_partition(client, sensor_conf, y_m_d, now, sensors_root / "source_partition.sql")
+            if sensor_conf["type"] == "job_end":
+                return check_job_end(client, project_id, sensor_conf["job_name"], job_action, y_m_d, now, sensors_root / "job_end.sql")
+            return False, f"unknown sensor type: {sensor_conf['type']}"
+        except Exception as e:
+            print(f"[WARNING] Sensor {sensor_conf.get('type')} of {job_name} failed: {e}")
+            return False, f"sensor error: {e}"
+
+    def already_done(job_name, y_m_d):
+        if dry_run or is_monitoring(job_name):
+            return False
+        try:
+            return check_job_end(client, project_id, job_name, job_action, y_m_d, clock.now(), sensors_root / "job_end.sql")[0]
+        except Exception as e:
+            print(f"[WARNING] Could not check logs for {job_name} on {y_m_d}: {e}")
+            return False
+
+    state = ScheduleState(state_path or get_state_path(project_id, dry_run))
+    return DailyScheduler(schedule_conf, graph, state, clock, run_scheduled, sense, already_done)
+
+
+def format_status(state: ScheduleState, days: int = 3) -> str:
+    """Render the job status of the latest `days` dates as a table."""
+    rows = state.rows()
+    if not rows:
+        return "No scheduled runs yet"
+    df = pd.DataFrame(rows).reindex(columns=STATUS_COLUMNS)
+    latest_dates = sorted(df["date"].unique(), reverse=True)[:days]
+    df = df[df["date"].isin(latest_dates)].fillna("")
+    lines = [
+        f"Start date: {state.start_date}",
+        f"Last poll: {state.heartbeat}",
+        "",
+        df_to_string_table(df.reset_index(drop=True)),
+    ]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--schedule-config", dest="schedule_config", default=None, help="Path to schedule config JSON")
+    parser.add_argument("--once", action="store_true", help="Run a single poll and exit")
+    parser.add_argument("--status", action="store_true", help="Print job status per date and exit")
+    parser.add_argument("--status-days", dest="status_days", type=int, default=3, help="Dates shown by --status")
+    parser.add_argument("--start-date", dest="start_date", default=None, help="Catch up from this date (YYYY-MM-DD)")
+    flags = parser.parse_args()
+    if flags.sample is not None:
+        # Sensors read production tables and logs; sampled runs belong to etl_runner/fanout_runner
+        parser.error("--sample is not supported by the scheduler; use etl_runner.py or fanout_runner.py")
+
+    state_path = get_state_path(flags.project_id, flags.dry_run)
+    if flags.status:
+        header(f"Scheduler status for {flags.project_id}")
+        print(format_status(ScheduleState(state_path), flags.status_days))
+        sys.exit(0)
+
+    config_path = Path(flags.schedule_config) if flags.schedule_config else scheduler_root / "schedule_config.json"
+    schedule_conf = read_json(config_path)
+    if not schedule_conf:
+        print(f"[ERROR] Could not load schedule config: {config_path}")
+        sys.exit(2)
+
+    client = get_bq_client(flags.project_id, flags.dry_run)
+    scheduler = create_scheduler(flags.project_id, schedule_conf, client, flags.dry_run, state_path=state_path)
+    if flags.start_date:
+        scheduler.state.start_date = flags.start_date
+
+    header(f"Scheduler for {flags.project_id}: {', '.join(scheduler.order)}")
+    try:
+        scheduler.run_forever(max_polls=1 if flags.once else None)
+    except KeyboardInterrupt:
+        scheduler.state.save()
+        print("Scheduler stopped")
@@ -0,0 +1,13 @@
+/*
+Run time
+{run_time}
+Sensor: did {job_name} log a successful end for {date}?
+*/
+SELECT COUNT(1) AS end_count
+FROM `{project}.logs.daily_logs`
+WHERE TRUE
+  AND dt >= '{date}'
+  AND job_name = '{job_name}'
+  AND job_type = '{job_action}'
+  AND step_name = 'end'
+  AND message = '{end_message}';
@@ -0,0 +1,15 @@
+/*
+Run time
+{run_time}
+Sensor: has the source partition {partition} of {table_ref} landed and settled?
+Metadata only, no table data is scanned.
+*/
+SELECT
+  partition_id,
+  total_rows,
+  FORMAT_TIMESTAMP('%Y-%m-%d %H:%M:%S', last_modified_time) AS last_modified_utc
+FROM `{source_project}.{dataset}.INFORMATION_SCHEMA.PARTITIONS`
+WHERE TRUE
+  AND table_name = '{table}'
+  AND partition_id BETWEEN '{baseline_start}' AND '{partition}'
+ORDER BY partition_id;
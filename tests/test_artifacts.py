@@ -0,0 +1,54 @@
+"""Artifact store: rendered SQL of repeated runs shares one blob."""
+
+from datetime import datetime
+
+import pytest
+
+from utilities import artifacts
+from utilities.run_context import set_run_id
+
+LOAD_FACT = """/*
+ This query inserts raw data into Fact table
+ run_time
+ {run_time}
+ */
+
+INSERT INTO `p.dwh.fact` (user_id, time)
+SELECT user_id, time
+FROM `ppltx-ba-course.raw.events`
+WHERE dt = DATE("2026-10-01");
+"""
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point the artifact store at a temp/ under tmp_path."""
+    temp_dir = tmp_path / "temp"
+    monkeypatch.setattr(artifacts, "TEMP_DIR", temp_dir)
+    monkeypatch.setattr(artifacts, "ARTIFACT_RUNS_DIR", temp_dir / "runs")
+    monkeypatch.setattr(artifacts, "ARTIFACT_OBJECTS_DIR", temp_dir / "objects")
+    monkeypatch.setattr(artifacts, "_MAINTAINED", True)
+    return temp_dir
+
+
+def test_runs_of_the_same_job_and_date_share_one_blob(store):
+    path = store / "pipelines" / "fact" / "logs" / "load_fact.sql"
+    run_paths = []
+    for run_id, run_time in [("run_a", datetime(2026, 10, 2, 7, 0, 1, 123456)), ("run_b", datetime(2026, 10, 2, 9, 30, 5, 654321))]:
+        set_run_id(run_id)
+        run_paths.append(artifacts.store_artifact(path, LOAD_FACT.format(run_time=run_time)))
+
+    blobs = [blob for blob in (store / "objects").rglob("*") if blob.is_file()]
+    assert len(blobs) == 1
+    assert run_paths[0].stat().st_ino == run_paths[1].stat().st_ino == blobs[0].stat().st_ino
+    assert "09:30:05" in path.read_text(encoding="utf-8")  # the latest path is this run's exact file
+
+
+def test_different_queries_get_their_own_blob(store):
+    path = store / "pipelines" / "fact" / "logs" / "load_fact.sql"
+    set_run_id("run_a")
+    artifacts.store_artifact(path, LOAD_FACT.format(run_time="t"))
+    set_run_id("run_b")
+    artifacts.store_artifact(path, LOAD_FACT.format(run_time="t").replace("2026-10-01", "2026-10-02"))
+
+    assert len([blob for blob in (store / "objects").rglob("*") if blob.is_file()]) == 2
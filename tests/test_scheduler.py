@@ -0,0 +1,114 @@
+"""DailyScheduler driven by a FakeClock: sensor gating, upstream order, retries and catch-up."""
+
+from datetime import datetime
+
+from utilities.scheduler import DailyScheduler, FakeClock, ScheduleState
+
+GRAPH = {"fact": [], "daily_user_panel": ["fact"]}
+
+
+def make_scheduler(tmp_path, clock, sensor_ok=lambda y_m_d, now: True, results=None, settings=None):
+    """Return (scheduler, runs): runs lists the (job, date) pairs run_fn was called with."""
+    conf = {
+        "scheduler": {"not_before": "07:00", "retry_after_min": 30, "max_attempts": 2, **(settings or {})},
+        "jobs": {"fact": {"sensors": [{"type": "source_partition"}]}},
+    }
+    runs = []
+
+    def run_fn(job_name, y_m_d, run_time):
+        runs.append((job_name, y_m_d))
+        status = (results or {}).get((job_name, y_m_d), "success")
+        return {"status": status, "errors": {"load": "boom"} if status == "failed" else {}}
+
+    def sensor_fn(job_name, sensor_conf, y_m_d, now):
+        ok = sensor_ok(y_m_d, now)
+        return ok, "" if ok else "source partition not settled"
+
+    state = ScheduleState(tmp_path / "schedule_state.json")
+    return DailyScheduler(conf, GRAPH, state, clock, run_fn, sensor_fn), runs
+
+
+def test_jobs_wait_for_not_before_and_sensors(tmp_path):
+    clock = FakeClock(datetime(2026, 10, 1, 6, 0))
+    settled_at = datetime(2026, 10, 1, 9, 0)
+    scheduler, runs = make_scheduler(tmp_path, clock, sensor_ok=lambda y_m_d, now: now >= settled_at)
+
+    assert scheduler.tick() == []  # before not_before
+    clock.advance(hours=1, minutes=30)
+    assert scheduler.tick() == []  # due, but the source has not settled
+    assert scheduler.state.get("fact", "2026-10-01")["status"] == "waiting"
+    assert scheduler.state.get("daily_user_panel", "2026-10-01")["status"] == "waiting"
+
+    clock.advance(hours=2)
+    actions = scheduler.tick()
+    # Upstream first, downstream in the same poll
+    assert runs == [("fact", "2026-10-01"), ("daily_user_panel", "2026-10-01")]
+    assert [a["status"] for a in actions] == ["success", "success"]
+
+    clock.advance(hours=1)
+    assert scheduler.tick() == []  # done jobs do not run again
+    assert len(runs) == 2
+
+
+def test_failed_job_retries_then_blocks_downstream(tmp_path):
+    clock = FakeClock(datetime(2026, 10, 1, 8, 0))
+    scheduler, runs = make_scheduler(tmp_path, clock, results={("fact", "2026-10-01"): "failed"})
+
+    scheduler.tick()
+    assert runs == [("fact", "2026-10-01")]
+    assert scheduler.state.get("daily_user_panel", "2026-10-01")["status"] == "waiting"
+
+    clock.advance(minutes=10)
+    scheduler.tick()
+    assert len(runs) == 1  # retry_after_min not elapsed
+
+    clock.advance(minutes=30)
+    scheduler.tick()
+    assert runs == [("fact", "2026-10-01")] * 2
+    assert scheduler.state.get("fact", "2026-10-01")["attempts"] == 2
+    assert scheduler.state.get("daily_user_panel", "2026-10-01")["status"] == "blocked"
+
+    clock.advance(hours=2)
+    scheduler.tick()
+    assert len(runs) == 2  # max_attempts reached
+
+
+def test_missed_dates_are_caught_up_oldest_first(tmp_path):
+    clock = FakeClock(datetime(2026, 10, 1, 8, 0))
+    scheduler, runs = make_scheduler(tmp_path, clock)
+    scheduler.tick()
+    assert runs == [("fact", "2026-10-01"), ("daily_user_panel", "2026-10-01")]
+
+    # The daemon is down for three days; a new process resumes from the state file
+    clock.advance(days=3)
+    scheduler, runs = make_scheduler(tmp_path, clock)
+    scheduler.tick()
+    assert runs == [
+        ("fact", "2026-10-02"), ("daily_user_panel", "2026-10-02"),
+        ("fact", "2026-10-03"), ("daily_user_panel", "2026-10-03"),
+        ("fact", "2026-10-04"), ("daily_user_panel", "2026-10-04"),
+    ]
+
+
+def test_catch_up_stops_at_catchup_days(tmp_path):
+    clock = FakeClock(datetime(2026, 10, 1, 8, 0))
+    scheduler, runs = make_scheduler(tmp_path, clock, settings={"catchup_days": 2})
+    scheduler.tick()
+
+    clock.advance(days=10)
+    scheduler, runs = make_scheduler(tmp_path, clock, settings={"catchup_days": 2})
+    scheduler.tick()
+    assert [date for job, date in runs if job == "fact"] == ["2026-10-09", "2026-10-10", "2026-10-11"]
+
+
+def test_sensor_gates_only_its_date_during_catch_up(tmp_path):
+    clock = FakeClock(datetime(2026, 10, 1, 8, 0))
+    scheduler, runs = make_scheduler(tmp_path, clock)
+    scheduler.tick()
+
+    # Two missed days; the newest source partition is still loading
+    clock.advance(days=2)
+    scheduler, runs = make_scheduler(tmp_path, clock, sensor_ok=lambda y_m_d, now: y_m_d != "2026-10-03")
+    scheduler.tick()
+    assert runs == [("fact", "2026-10-02"), ("daily_user_panel", "2026-10-02")]
+    assert scheduler.state.get("fact", "2026-10-03")["status"] == "waiting"
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Look up files kept by the artifact store (temp/runs/), e.g. the SQL that ran
+for a job on a date, and run its compression/retention maintenance.
+
+python tools/artifacts_lookup.py --job_name fact --date 2026-10-18
+python tools/artifacts_lookup.py --job_name fact --date 2026-10-18 --task load_fact --all-runs
+python tools/artifacts_lookup.py --job_name fact --date 2026-10-18 --project ppltx-m--tutorial-dev
+python tools/artifacts_lookup.py --runs
+python tools/artifacts_lookup.py --maintain
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root_boot = Path(__file__).resolve().parent.parent
+if str(project_root_boot) not in sys.path:
+    sys.path.insert(0, str(project_root_boot))
+
+import pandas as pd
+
+from utilities.io import header
+from utilities.formatting import df_to_string_table
+from utilities.artifacts import iter_runs, read_run_manifest, read_run_artifact, maintain_artifacts, get_store_size
+
+
+def create_lookup_cli() -> argparse.ArgumentParser:
+    """Create the CLI parser of the artifact lookup command."""
+    parser = argparse.ArgumentParser(description="Look up stored run artifacts")
+    parser.add_argument("--job_name", default=None, help="Pipeline job name")
+    parser.add_argument("--date", default=None, help="Processing date (YYYY-MM-DD)")
+    parser.add_argument("--task", default=None, help="Task name (default: every task)")
+    parser.add_argument("--project", default=None, help="Project ID for fan-out runs (temp/projects/<project>/...)")
+    parser.add_argument("--all-runs", dest="all_runs", action="store_true", help="Show every matching run, not only the latest")
+    parser.add_argument("--runs", action="store_true", help="List stored runs")
+    parser.add_argument("--maintain", action="store_true", help="Compress old runs and apply retention")
+    return parser
+
+
+def find_sql(job_name: str, y_m_d: str, task_name=None, project_id=None, all_runs: bool = False) -> list:
+    """
+    Find the rendered SQL a job wrote for a processing date.
+
+    Args:
+        job_name (str): Pipeline job name
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        task_name (Optional[str]): Restrict to one task
+        project_id (Optional[str]): Fan-out project; single-project runs when None
+        all_runs (bool): Return matches from every run instead of the newest one
+
+    Returns:
+        list: Dicts with run_id, path and sql, newest run first
+    """
+    prefix = f"projects/{project_id}/" if project_id else ""
+    logs_dir = f"{prefix}pipelines/{job_name}/logs/"
+    matches = []
+    for run in iter_runs():
+        if run.get("date") != y_m_d:
+            continue
+        latest = {}
+        for entry in read_run_manifest(run):
+            path = entry["path"]
+            if not path.startswith(logs_dir) or not path.endswith(".sql"):
+                continue
+            if task_name and Path(path).stem != task_name:
+                continue
+            latest[path] = entry  # last write of a path wins within a run
+        for path in latest:
+            matches.append({"run_id": run["run_id"], "path": path, "sql": read_run_artifact(run, path)})
+        if latest and not all_runs:
+            break
+    return matches
+
+
+if __name__ == "__main__":
+    flags = create_lookup_cli().parse_args()
+
+    if flags.maintain:
+        stats = maintain_artifacts()
+        header("Artifact store maintenance")
+        print(f"Compressed runs: {stats['compressed']}")
+        print(f"Deleted runs: {stats['deleted']}")
+        print(f"Removed blobs: {stats['objects_removed']}")
+        print(f"Store size: {get_store_size() / 1024 / 1024:.1f} MB")
+        sys.exit(0)
+
+    if flags.runs:
+        runs = pd.DataFrame([
+            {"run_id": r["run_id"], "date": r.get("date"), "started_at": r.get("started_at"), "compressed": r["location"].is_file()}
+            for r in iter_runs()
+        ])
+        print(df_to_string_table(runs) if not runs.empty else "No stored runs")
+        sys.exit(0)
+
+    if not flags.job_name or not flags.date:
+        print("[ERROR] --job_name and --date are required for a lookup")
+        sys.exit(2)
+
+    matches = find_sql(flags.job_name, flags.date, flags.task, flags.project, flags.all_runs)
+    if not matches:
+        print(f"[WARNING] No stored SQL for job {flags.job_name} on {flags.date}")
+        sys.exit(1)
+    for match in matches:
+        header(f"{match['path']} (run {match['run_id']})")
+        print(match["sql"])
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Record or replay the daily ETL job graph and the monitoring suite against a
+cassette (utilities/cassette.py).
+
+--mode record runs everything live and writes every query result into the
+cassette plus a summary of job statuses and monitor alert counts. --mode
+replay runs the same code offline from the cassette and compares the
+outcome with the recorded summary; it exits with code 1 on any difference
+or cassette miss. Local state (KPI history, table health) starts empty in
+both modes, so the rendered queries match.
+
+python tools/cassette_suite.py ppltx-m--tutorial-dev --mode record
+python tools/cassette_suite.py ppltx-m--tutorial-dev --mode replay
+python tools/cassette_suite.py ppltx-m--tutorial-dev --mode replay --cassette cassettes/2026-10-18 --jobs fact daily_user_panel --checks kpis
+"""
+import os
+import sys
+import json
+import time
+import shutil
+from pathlib import Path
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root_boot = Path(__file__).resolve().parent.parent
+if str(project_root_boot) not in sys.path:
+    sys.path.insert(0, str(project_root_boot))
+
+# Isolated local state; must be set before utilities.constants is imported
+SUITE_STATE_DIR = project_root_boot / "temp" / "cassette" / "state"
+os.environ["BI_STATE_DIR"] = str(SUITE_STATE_DIR)
+
+from utilities.io import header, write_file
+from utilities.cli import create_standard_cli
+from utilities.formatting import get_date_params
+from utilities.paths import get_standard_paths, get_job_temp_paths
+from utilities.cassette import CASSETTE_MODES, CassetteMiss, get_cassette
+from utilities.constants import CASSETTES_DIR
+from utilities.job_graph import load_job_graph
+from utilities.bq import get_bq_client
+from pipelines.fanout_runner import run_fanout
+from monitoring.monitoring_suite import CHECKS, run_monitoring_suite, report_monitoring_suite
+
+# --- setup paths ---
+paths = get_standard_paths(__file__)
+temp_root = paths['temp_root']
+pipelines_root = paths['pipelines_root']
+
+SUMMARY_FILE = "suite.json"
+
+
+def summarize(job_results: list, monitor_results: list) -> dict:
+    """Return the comparable outcome of a suite run: job statuses and monitor alert counts."""
+    return {
+        "jobs": {r["job_name"]: r["status"] for r in job_results},
+        "monitors": {
+            r.name: {"status": r.status, "alerts": int(len(r.alerts)), "errors": sorted(r.errors)}
+            for r in monitor_results
+        },
+    }
+
+
+def diff_summaries(recorded: dict, replayed: dict) -> list:
+    """Return one line per replayed job or monitor whose outcome differs from the recording."""
+    lines = []
+    for section in ("jobs", "monitors"):
+        for name in sorted(replayed.get(section, {})):
+            before, after = recorded.get(section, {}).get(name), replayed.get(section, {}).get(name)
+            if before != after:
+                lines.append(f"{section}.{name}: recorded {before}, replayed {after}")
+    return lines
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--mode", required=True, choices=CASSETTE_MODES, help="Record live results or replay them offline")
+    parser.add_argument("--cassette", default=str(CASSETTES_DIR / "default"), help="Cassette directory")
+    parser.add_argument("--jobs", nargs="+", default=None, help="Jobs from the job graph (default: all)")
+    parser.add_argument("--checks", nargs="+", default=None, choices=list(CHECKS), help="Check families (default: all)")
+    flags = parser.parse_args()
+
+    cassette_dir = Path(flags.cassette).resolve()
+    os.environ["BI_CASSETTE"] = flags.mode
+    os.environ["BI_CASSETTE_DIR"] = str(cassette_dir)
+    shutil.rmtree(SUITE_STATE_DIR, ignore_errors=True)
+    shutil.rmtree(temp_root / "cassette" / "misses", ignore_errors=True)
+
+    started = time.monotonic()
+    try:
+        get_cassette()
+    except CassetteMiss as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+    graph = load_job_graph(pipelines_root / "job_graph.json", flags.jobs)
+
+    header(f"Cassette {flags.mode}: {cassette_dir.name} ({flags.project_id}, {y_m_d})")
+    job_results = run_fanout(
+        {flags.project_id: {"max_concurrency": 1, "overrides": {}}},
+        graph, "daily", y_m_d, run_time, max_concurrency=1, dry_run=False,
+    )
+    client = get_bq_client(flags.project_id)
+    monitor_results = run_monitoring_suite(flags.project_id, "daily", y_m_d, run_time, client, checks=flags.checks)
+    # The Slack digest is written to temp/cassette/slack/ instead of being sent
+    report_monitoring_suite(monitor_results, y_m_d, run_time)
+
+    summary = summarize(job_results, monitor_results)
+    elapsed = round(time.monotonic() - started, 1)
+    logs_path, error_path, alerts_path = get_job_temp_paths("cassette_suite", temp_root)
+    misses = sorted(p.stem for p in (temp_root / "cassette" / "misses").glob("*.sql"))
+
+    if flags.mode == "record":
+        (cassette_dir / SUMMARY_FILE).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        print(json.dumps(summary, indent=2))
+        print(f"Recorded {cassette_dir} in {elapsed}s")
+        sys.exit(0)
+
+    recorded = json.loads((cassette_dir / SUMMARY_FILE).read_text(encoding="utf-8"))
+    differences = diff_summaries(recorded, summary) + [f"cassette miss: {key}" for key in misses]
+    report = "\n".join([f"# Cassette replay - {cassette_dir.name} ({y_m_d})", "", f"Replayed in {elapsed}s", ""] + (
+        [f"- {line}" for line in differences] if differences else ["Replay matches the recording"]
+    )) + "\n"
+    write_file(logs_path / f"cassette_replay_{cassette_dir.name}.md", report)
+    print(report)
+    sys.exit(1 if differences else 0)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Render every pipeline task and monitor check for a date and check them
+statically, without running anything (utilities/compiler.py).
+
+Walks the jobs of pipelines/job_graph.json x action_config.json and the KPI,
+table and logs monitoring configs, reports placeholders without a value, invalid
+layout/schema config, and tables that are read but that no pipeline task
+writes (typos in table names; only when every job is compiled, not with
+--jobs), and writes the table lineage of every query.
+Plans that compile are cached, so the next etl_runner run reuses them.
+Exits with code 1 when anything fails to compile.
+
+python tools/compile.py ppltx-m--tutorial-dev
+python tools/compile.py ppltx-m--tutorial-dev --jobs fact user_panel --actions daily --no-monitors
+python tools/compile.py ppltx-m--tutorial-dev --days-back 1 --live
+"""
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root_boot = Path(__file__).resolve().parent.parent
+if str(project_root_boot) not in sys.path:
+    sys.path.insert(0, str(project_root_boot))
+
+import pandas as pd
+
+from utilities.io import header, read_file, write_file, read_json
+from utilities.bq import get_bq_client
+from utilities.cli import create_standard_cli
+from utilities.formatting import get_date_params, df_to_markdown_table
+from utilities.paths import get_standard_paths, get_job_temp_paths
+from utilities.sampling import apply_sampling
+from utilities.compiler import (
+    compile_job,
+    check_lineage,
+    extract_lineage,
+    render_checked,
+    get_plan_key,
+    get_plan_path,
+    save_plan,
+)
+from utilities.constants import DEFAULT_KPI_BACKFILL_DAYS
+from monitoring.kpis_monitoring import kpis_monitoring
+from monitoring.table_monitoring import table_monitoring
+from monitoring.logs_monitoring import logs_monitoring
+
+# --- setup paths ---
+paths = get_standard_paths(__file__)
+
+project_root = paths['project_root']
+temp_root = paths['temp_root']
+pipelines_root = paths['pipelines_root']
+
+
+def list_pipeline_jobs(job_names: list) -> list:
+    """
+    Return the etl_runner jobs: those of job_graph.json with a <job>/<job>_config.json, optionally filtered.
+
+    Other pipelines with their own runner (export_marts) follow the same config
+    naming but are not etl_runner jobs.
+    """
+    graph_jobs = read_json(pipelines_root / "job_graph.json").get("jobs", {})
+    jobs = []
+    for config_path in sorted(pipelines_root.glob("*/*_config.json")):
+        job_name = config_path.parent.name
+        if config_path.name == f"{job_name}_config.json" and job_name in graph_jobs and (not job_names or job_name in job_names):
+            jobs.append(job_name)
+    for job_name in sorted(set(job_names or []) - set(jobs)):
+        print(f"[WARNING] {job_name} is not an etl_runner job (pipelines/job_graph.json), skipping")
+    return jobs
+
+
+def compile_monitor_query(name: str, source: str, query_template: str, params: dict) -> dict:
+    """Render one monitor query and extract its lineage, in the shape of a plan task."""
+    query, errors = render_checked(query_template, params, source)
+    reads, writes = extract_lineage(query) if query is not None else ([], [])
+    return {"name": name, "status": "error" if errors else "ok", "query": query, "reads": reads, "writes": writes, "errors": errors}
+
+
+def compile_monitors(project_id: str, y_m_d: str, run_time: datetime) -> list:
+    """
+    Render every enabled KPI, table and logs check as its monitor would.
+
+    KPI and partition queries start backfill_days before the date, as on a
+    first run with an empty local history.
+
+    Returns:
+        list: Pseudo-plans (job_name, job_action "monitor", tasks) per monitor
+    """
+    start_of = lambda days: (datetime.strptime(y_m_d, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+    plans = []
+
+    kpis_config = read_json(kpis_monitoring.config_path)
+    backfill_days = kpis_config.get("history", {}).get("backfill_days", DEFAULT_KPI_BACKFILL_DAYS)
+    tasks = []
+    for kpi_group in kpis_config.get("tables", {}).values():
+        for kpi_name, kpi_conf in kpi_group["kpis"].items():
+            if not kpi_conf.get("isEnable", True):
+                continue
+            template_path = kpis_monitoring.get_kpi_template_path(kpi_name, kpi_conf)
+            params = kpis_monitoring.build_kpi_query_params(project_id, "daily", y_m_d, run_time, kpi_name, kpi_conf, start_of(backfill_days))
+            # Sampled mode reads the sandbox copy of the KPI tables, as in the monitor
+            query_sql, params = apply_sampling(read_file(template_path), params)
+            tasks.append(compile_monitor_query(f"kpi_{kpi_name}", template_path.name, query_sql, params))
+    plans.append({"job_name": "kpis_monitoring", "job_action": "monitor", "tasks": tasks})
+
+    tables_config = read_json(table_monitoring.config_path)
+    backfill_days = tables_config.get("partition_health", {}).get("backfill_days", 28)
+    datasets = {}
+    for table_conf in tables_config.get("tables", {}).values():
+        if table_conf.get("enabled", True):
+            datasets.setdefault(table_conf["dataset"], []).append(table_conf["table"])
+    tasks = []
+    for dataset, tables in datasets.items():
+        params = table_monitoring.build_partition_query_params(project_id, dataset, tables, start_of(backfill_days), run_time)
+        task = compile_monitor_query(f"partitions_{dataset}", table_monitoring.sql_template_path.name, read_file(table_monitoring.sql_template_path), params)
+        # The monitored tables are read through INFORMATION_SCHEMA.PARTITIONS
+        task["reads"] = sorted(set(task["reads"]) | {f"{project_id}.{dataset}.{table}" for table in tables})
+        tasks.append(task)
+    plans.append({"job_name": "table_monitoring", "job_action": "monitor", "tasks": tasks})
+
+    logs_config = read_json(logs_monitoring.config_path)
+    logs_sql = read_file(logs_monitoring.sql_path)
+    tasks = []
+    for monitoring_name, monitoring_config in logs_config.get("tables", {}).items():
+        params = logs_monitoring.build_log_query_params(project_id, "daily", y_m_d, run_time, monitoring_config)
+        tasks.append(compile_monitor_query(f"log_{monitoring_name}", logs_monitoring.sql_path.name, logs_sql, params))
+    plans.append({"job_name": "logs_monitoring", "job_action": "monitor", "tasks": tasks})
+    return plans
+
+
+def check_sources(client, project_id: str, plans: list) -> list:
+    """Return one error per table outside the project that does not exist."""
+    sources = sorted({
+        ref for plan in plans for task in plan["tasks"] for ref in task["reads"]
+        if not ref.startswith(f"{project_id}.") and "INFORMATION_SCHEMA" not in ref
+    })
+    errors = []
+    for ref in sources:
+        try:
+            client.get_table(ref)
+        except Exception as e:
+            errors.append(f"source {ref}: {e}")
+    return errors
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    parser.add_argument("--jobs", nargs="+", default=None, help="Pipeline jobs (default: every job of job_graph.json)")
+    parser.add_argument("--actions", nargs="+", default=None, help="Job actions (default: every action in action_config.json)")
+    parser.add_argument("--no-monitors", dest="monitors", action="store_false", help="Skip the monitoring configs")
+    parser.add_argument("--live", action="store_true", help="Also check that source tables outside the project exist")
+    flags = parser.parse_args()
+
+    project_id = flags.project_id
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+    logs_path, error_path, alerts_path = get_job_temp_paths("compile", temp_root)
+    actions = flags.actions or list(read_json(pipelines_root / "action_config.json"))
+    jobs = list_pipeline_jobs(flags.jobs)
+
+    header(f"Compiling {len(jobs)} jobs x {', '.join(actions)} for {y_m_d}")
+    plans = []
+    for job_name in jobs:
+        for job_action in actions:
+            plan = compile_job(pipelines_root, project_id, job_name, job_action, y_m_d, run_time)
+            if plan["status"] == "skipped":
+                continue
+            plans.append(plan)
+            if plan["status"] == "ok":
+                # Warm the cache etl_runner reads
+                save_plan(get_plan_path(project_id, job_name, job_action, y_m_d, get_plan_key(pipelines_root, project_id, job_name, job_action, y_m_d)), plan)
+            print(f"{'✅' if plan['status'] == 'ok' else '❌'} {job_name} {job_action}")
+    if flags.monitors:
+        plans.extend(compile_monitors(project_id, y_m_d, run_time))
+
+    # Rendered SQL and lineage of every query: one row per table read or written
+    rows = []
+    errors = []
+    compiled = failed = 0
+    for plan in plans:
+        errors.extend(f"{plan['job_name']} {plan['job_action']}: {e}" for e in plan.get("errors", []))
+        for task in plan["tasks"]:
+            if plan["job_action"] == "monitor":
+                errors.extend(f"{plan['job_name']}: {e}" for e in task["errors"])
+            compiled += task["status"] == "ok"
+            failed += task["status"] == "error"
+            if task.get("query") is not None:
+                write_file(logs_path / plan["job_name"] / plan["job_action"] / f"{task['name']}.sql", task["query"])
+            for access, refs in (("read", task["reads"]), ("write", task["writes"])):
+                rows.extend(
+                    {"job_name": plan["job_name"], "job_action": plan["job_action"], "task": task["name"], "access": access, "table": ref}
+                    for ref in refs
+                )
+    if flags.jobs:
+        # Tables of the other jobs are not compiled, so their readers would all be flagged
+        print("[WARNING] --jobs given: skipping the check for tables no pipeline task writes")
+    else:
+        errors.extend(check_lineage(plans, project_id))
+
+    if flags.live and not flags.dry_run:
+        client = get_bq_client(project_id)
+        if client is None:
+            print("[WARNING] No BigQuery client available, skipping --live")
+        else:
+            errors.extend(check_sources(client, project_id, plans))
+
+    lineage_df = pd.DataFrame(rows, columns=["job_name", "job_action", "task", "access", "table"])
+    report = "\n".join([
+        f"# Compile - {project_id} - {y_m_d}",
+        "",
+        "## Summary",
+        f"- **Queries compiled**: {compiled} of {compiled + failed}",
+        f"- **Errors**: {len(errors)}",
+        "",
+        "## Errors",
+        "",
+        "\n".join(f"- {e}" for e in errors) if errors else "✅ Everything compiles",
+        "",
+        "## Lineage",
+        "",
+        df_to_markdown_table(lineage_df),
+        "",
+        f"## Generated at\n{run_time.strftime('%Y-%m-%d %H:%M:%S')}",
+    ]) + "\n"
+    write_file(logs_path / f"compile_{y_m_d}.md", report)
+    write_file(logs_path / f"lineage_{y_m_d}.csv", lineage_df.to_csv(index=False))
+    print(report)
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare the live layout of every pipeline table with the "layout" block of its
+*_config.json (partition column, partition expiration, clustering columns,
+require-partition-filter) and report drift.
+
+python tools/layout_check.py ppltx-m--tutorial-dev
+python tools/layout_check.py ppltx-m--tutorial-dev --job_name fct_sessions
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path BEFORE importing utilities
+project_root_boot = Path(__file__).resolve().parent.parent
+if str(project_root_boot) not in sys.path:
+    sys.path.insert(0, str(project_root_boot))
+
+import pandas as pd
+
+from utilities.io import header, write_file, read_json
+from utilities.bq import get_bq_client
+from utilities.cli import create_standard_cli
+from utilities.formatting import get_date_params, df_to_string_table
+from utilities.layout import validate_layout, get_live_layout, diff_layout
+from utilities.paths import get_standard_paths, get_job_temp_paths
+
+# --- setup paths ---
+paths = get_standard_paths(__file__)
+
+project_root = paths['project_root']
+temp_root = paths['temp_root']
+pipelines_root = paths['pipelines_root']
+
+
+def collect_declared_layouts(job_names: list) -> list:
+    """
+    Return the declared layout and destination table of each pipeline job.
+
+    Args:
+        job_names (list): Jobs to include; empty for every pipeline config
+
+    Returns:
+        list: Dicts with job_name, table_id and layout
+    """
+    declared = []
+    for config_path in sorted(pipelines_root.glob("*/*_config.json")):
+        job_name = config_path.parent.name
+        if config_path.name != f"{job_name}_config.json" or (job_names and job_name not in job_names):
+            continue
+        etl_group = next(iter(read_json(config_path).values()))
+        layout = etl_group.get("layout")
+        if layout is None:
+            print(f"[WARNING] No layout declared in {config_path.name}, skipping.")
+            continue
+        validate_layout(layout, config_path.name)
+        init_conf = etl_group["tasks"].get(f"init_{job_name}", {})
+        declared.append({
+            "job_name": job_name,
+            "table_id": f"{init_conf['dataset_dst']}.{init_conf['table_dst']}",
+            "layout": layout,
+        })
+    return declared
+
+
+def check_layouts(client, project_id: str, declared: list) -> pd.DataFrame:
+    """
+    Compare declared layouts with live table metadata.
+
+    Args:
+        client: BigQuery client
+        project_id (str): Google Cloud project ID
+        declared (list): Output of collect_declared_layouts
+
+    Returns:
+        pd.DataFrame: One row per drifting key (or missing table)
+    """
+    rows = []
+    for item in declared:
+        try:
+            table = client.get_table(f"{project_id}.{item['table_id']}")
+        except Exception as e:
+            rows.append({"job_name": item["job_name"], "table_id": item["table_id"], "key": "table", "expected": "exists", "live": f"error: {e}"})
+            continue
+        for drift in diff_layout(item["layout"], get_live_layout(table)):
+            rows.append({"job_name": item["job_name"], "table_id": item["table_id"], **drift})
+    return pd.DataFrame(rows, columns=["job_name", "table_id", "key", "expected", "live"])
+
+
+if __name__ == "__main__":
+    # --- CLI ---
+    parser = create_standard_cli()
+    # Every pipeline table unless --job_name names one
+    parser.set_defaults(job_name=None)
+    flags = parser.parse_args()
+
+    project_id = flags.project_id
+    job_names = [flags.job_name] if flags.job_name else []
+
+    date_today, run_time, y_m_d = get_date_params(flags.days_back)
+    logs_path, error_path, alerts_path = get_job_temp_paths("layout_check", temp_root)
+
+    declared = collect_declared_layouts(job_names)
+    header(f"Layout check for {len(declared)} tables")
+
+    if flags.dry_run:
+        for item in declared:
+            print(f"[DRY-RUN] Would check {project_id}.{item['table_id']}: {item['layout']}")
+        sys.exit(0)
+
+    client = get_bq_client(project_id, flags.dry_run)
+    if client is None:
+        print("[WARNING] No BigQuery client available")
+        sys.exit(1)
+
+    drift_df = check_layouts(client, project_id, declared)
+    report = (
+        f"# Layout Check - {project_id} - {y_m_d}\n\n"
+        f"## Summary\n"
+        f"- **Tables Checked**: {len(declared)}\n"
+        f"- **Tables with Drift**: {drift_df['table_id'].nunique()}\n\n"
+        f"## Drift\n\n{df_to_string_table(drift_df) if not drift_df.empty else '✅ All tables match their declared layout'}\n\n"
+        f"## Generated at\n{run_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+    )
+    write_file(logs_path / f"layout_check_{y_m_d}.md", report)
+    print(report)
+    sys.exit(1 if not drift_df.empty else 0)
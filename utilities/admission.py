@@ -0,0 +1,176 @@
+"""
+Admission control for BigQuery jobs in Gaming BI System.
+
+Every query path (ETL tasks, monitoring queries, run_query_and_df and
+daily_logs loads) asks the process-wide controller for a slot before it
+submits a job. Per project, the controller caps:
+
+- in-flight queries (all query jobs, DML included)
+- in-flight DML statements per destination table
+- in-flight load jobs
+
+Waiters are admitted by priority class first (interactive before batch),
+then in arrival order. Priority classes also set the BigQuery job priority:
+backfills run as BATCH, monitors and daily tasks as INTERACTIVE. Time spent
+waiting for a slot is recorded per class and kind (get_admission_metrics).
+"""
+
+import time
+import threading
+import itertools
+from contextlib import contextmanager
+from typing import Optional
+
+from .constants import DEFAULT_MAX_INFLIGHT_QUERIES, DEFAULT_MAX_DML_PER_TABLE, DEFAULT_MAX_LOAD_JOBS
+
+PRIORITY_RANK = {"interactive": 0, "batch": 1}
+ACTION_PRIORITY = {"init": "batch"}  # other actions run interactive
+SLOW_ADMISSION_SEC = 1.0
+
+
+def get_task_priority(job_action: str, task_conf: Optional[dict] = None) -> str:
+    """Return the priority class of a task: its "priority" key, else by action."""
+    priority = (task_conf or {}).get("priority") or ACTION_PRIORITY.get(job_action, "interactive")
+    if priority not in PRIORITY_RANK:
+        raise ValueError(f"Unknown priority class: {priority} (expected one of {', '.join(PRIORITY_RANK)})")
+    return priority
+
+
+def get_job_priority(priority: str):
+    """Map a priority class to bigquery.QueryPriority."""
+    from google.cloud import bigquery
+    return bigquery.QueryPriority.BATCH if priority == "batch" else bigquery.QueryPriority.INTERACTIVE
+
+
+class AdmissionController:
+    """Process-wide slot accounting for BigQuery jobs, per project."""
+
+    def __init__(self, max_queries: int = DEFAULT_MAX_INFLIGHT_QUERIES, max_dml_per_table: int = DEFAULT_MAX_DML_PER_TABLE, max_loads: int = DEFAULT_MAX_LOAD_JOBS):
+        self.max_queries = max_queries
+        self.max_dml_per_table = max_dml_per_table
+        self.max_loads = max_loads
+        self._cond = threading.Condition()
+        self._queries = {}   # project -> in-flight queries
+        self._dml = {}       # (project, table) -> in-flight DML
+        self._loads = {}     # project -> in-flight loads
+        self._waiting = []   # pending requests
+        self._seq = itertools.count()
+        self._metrics = {}   # (priority, kind) -> counters
+
+    def configure(self, max_queries: Optional[int] = None, max_dml_per_table: Optional[int] = None, max_loads: Optional[int] = None) -> None:
+        """Change caps; waiters are re-evaluated immediately."""
+        with self._cond:
+            if max_queries is not None:
+                self.max_queries = max_queries
+            if max_dml_per_table is not None:
+                self.max_dml_per_table = max_dml_per_table
+            if max_loads is not None:
+                self.max_loads = max_loads
+            self._cond.notify_all()
+
+    def _fits(self, request: dict) -> bool:
+        project, kind, table = request["project"], request["kind"], request["table"]
+        if kind == "load":
+            return self._loads.get(project, 0) < self.max_loads
+        if self._queries.get(project, 0) >= self.max_queries:
+            return False
+        return kind != "dml" or self._dml.get((project, table), 0) < self.max_dml_per_table
+
+    def _is_next(self, request: dict) -> bool:
+        """A request goes first unless a better-ranked waiter could run now too."""
+        if not self._fits(request):
+            return False
+        return not any(
+            other["order"] < request["order"] and self._fits(other)
+            for other in self._waiting
+            if other is not request
+        )
+
+    def _update(self, request: dict, delta: int) -> None:
+        project, kind, table = request["project"], request["kind"], request["table"]
+        if kind == "load":
+            self._loads[project] = self._loads.get(project, 0) + delta
+            return
+        self._queries[project] = self._queries.get(project, 0) + delta
+        if kind == "dml":
+            self._dml[(project, table)] = self._dml.get((project, table), 0) + delta
+
+    @contextmanager
+    def admit(self, project: str, kind: str = "query", table: Optional[str] = None, priority: str = "interactive"):
+        """
+        Hold a slot while the body submits and waits for a job.
+
+        Args:
+            project (str): Project the job runs in (caps are per project)
+            kind (str): One of query, dml, load
+            table (Optional[str]): Destination table for DML
+            priority (str): interactive or batch
+
+        Yields:
+            float: Seconds spent waiting for the slot
+        """
+        request = {
+            "project": project,
+            "kind": kind,
+            "table": table,
+            "order": (PRIORITY_RANK[priority], next(self._seq)),
+        }
+        started = time.monotonic()
+        with self._cond:
+            self._waiting.append(request)
+            while not self._is_next(request):
+                self._cond.wait()
+            self._waiting.remove(request)
+            self._update(request, +1)
+            # Waiters held back only by this better-ranked request may fit now
+            self._cond.notify_all()
+            waited = time.monotonic() - started
+            self._record(priority, kind, waited)
+
+        if waited >= SLOW_ADMISSION_SEC:
+            print(f"[WARNING] Waited {waited:.1f}s for a {priority} {kind} slot in {project}")
+        try:
+            yield waited
+        finally:
+            with self._cond:
+                self._update(request, -1)
+                self._cond.notify_all()
+
+    def _record(self, priority: str, kind: str, waited: float) -> None:
+        stats = self._metrics.setdefault((priority, kind), {"admitted": 0, "total_wait_sec": 0.0, "max_wait_sec": 0.0})
+        stats["admitted"] += 1
+        stats["total_wait_sec"] += waited
+        stats["max_wait_sec"] = max(stats["max_wait_sec"], waited)
+
+    def metrics(self) -> list:
+        """Return queue wait metrics, one dict per (priority, kind)."""
+        with self._cond:
+            return [
+                {
+                    "priority": priority,
+                    "kind": kind,
+                    "admitted": stats["admitted"],
+                    "total_wait_sec": round(stats["total_wait_sec"], 3),
+                    "avg_wait_sec": round(stats["total_wait_sec"] / stats["admitted"], 3),
+                    "max_wait_sec": round(stats["max_wait_sec"], 3),
+                }
+                for (priority, kind), stats in sorted(self._metrics.items())
+            ]
+
+
+_CONTROLLER = AdmissionController()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller."""
+    return _CONTROLLER
+
+
+def admit(project: str, kind: str = "query", table: Optional[str] = None, priority: str = "interactive"):
+    """Shortcut for get_admission_controller().admit(...)."""
+    return _CONTROLLER.admit(project, kind, table, priority)
+
+
+def get_admission_metrics() -> list:
+    """Return queue wait metrics of the process-wide controller."""
+    return _CONTROLLER.metrics()
@@ -0,0 +1,341 @@
+"""
+Artifact store for Gaming BI System temp files.
+
+Every file written under temp/ through utilities.io.write_file is also kept
+per run, so later runs no longer overwrite the history:
+
+    temp/objects/<sha[:2]>/<sha256>            content-addressed blobs (read-only)
+    temp/runs/<run_id>/run.json                run id, start time, processing date
+    temp/runs/<run_id>/manifest.jsonl          one line per written file
+    temp/runs/<run_id>/<path under temp/>      hard link to the blob
+    temp/runs/<run_id>.tar.gz                  compressed run, after a few days
+
+Run files are hard links to the blobs, so identical rendered SQL is stored
+once however many runs share it. SQL blobs are keyed by the query without
+comments: rendered templates carry the run time in their header comment,
+and the run copy keeps the comments of the first run that wrote the query
+(each run's start time is in its run.json). The familiar "latest" path (e.g.
+temp/pipelines/fact/logs/load_fact.sql) is a regular, writable copy. Old runs
+are compressed, and runs beyond the age or total size limits are deleted;
+blobs no longer linked from any run are removed with them, once they are
+older than a grace period (another process may be about to link them).
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import tarfile
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from .constants import (
+    TEMP_DIR,
+    ARTIFACT_RUNS_DIR,
+    ARTIFACT_OBJECTS_DIR,
+    DEFAULT_ARTIFACT_COMPRESS_AFTER_DAYS,
+    DEFAULT_ARTIFACT_RETENTION_DAYS,
+    DEFAULT_ARTIFACT_MAX_MB,
+    DEFAULT_ARTIFACT_GRACE_SEC,
+)
+from .run_context import get_run_id, get_run_info
+
+MANIFEST_FILE = "manifest.jsonl"
+RUN_FILE = "run.json"
+ARCHIVE_SUFFIX = ".tar.gz"
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+_LOCK = threading.Lock()
+_MAINTAINED = False
+
+
+def is_artifact_path(path: Path) -> bool:
+    """Return True for files under temp/ that are not part of the store itself."""
+    try:
+        relative = Path(path).resolve().relative_to(TEMP_DIR.resolve())
+    except ValueError:
+        return False
+    return bool(relative.parts) and relative.parts[0] not in (ARTIFACT_RUNS_DIR.name, ARTIFACT_OBJECTS_DIR.name)
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Point dst at src with a hard link, or copy when links are not supported."""
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _content_key(path: Path, data: bytes) -> str:
+    """Return the blob key of a file: sha256 of its content, of the query without comments for SQL."""
+    if path.suffix == ".sql":
+        data = " ".join(_COMMENT_RE.sub(" ", data.decode("utf-8")).split()).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _store_object(sha: str, data: bytes) -> Path:
+    """Write a blob once, or refresh its time when reused; return the object path."""
+    obj = ARTIFACT_OBJECTS_DIR / sha[:2] / sha
+    try:
+        # A fresh mtime keeps other processes' collection away until the blob is linked
+        os.utime(obj)
+    except FileNotFoundError:
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_name(f".{sha}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.chmod(tmp, 0o444)  # blobs are shared by many runs: never edit in place
+        os.replace(tmp, obj)
+    return obj
+
+
+def _write_latest(path: Path, data: bytes) -> None:
+    """Replace a latest path with a writable copy of the content."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _write_run_file(run_dir: Path, run_id: str) -> None:
+    info = {"run_id": run_id, **get_run_info()}
+    (run_dir / RUN_FILE).write_text(json.dumps(info, default=str, indent=2), encoding="utf-8")
+
+
+def store_artifact(path: Path, content: str) -> Path:
+    """
+    Store a temp file in the current run and update its latest path.
+
+    Args:
+        path (Path): Destination under temp/
+        content (str): File content
+
+    Returns:
+        Path: The file's location inside the run directory
+    """
+    global _MAINTAINED
+    path = Path(path)
+    data = content.encode("utf-8")
+    run_id = get_run_id()
+    run_dir = ARTIFACT_RUNS_DIR / run_id
+    relative = path.resolve().relative_to(TEMP_DIR.resolve())
+
+    with _LOCK:
+        if not _MAINTAINED:
+            # Once per process, before this run's directory exists
+            _MAINTAINED = True
+            try:
+                maintain_artifacts(exclude_run_id=run_id)
+            except Exception as e:
+                print(f"[WARNING] Artifact maintenance failed: {e}")
+
+        sha = _content_key(path, data)
+        obj = _store_object(sha, data)
+        run_path = run_dir / relative
+        run_path.parent.mkdir(parents=True, exist_ok=True)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            _link_or_copy(obj, run_path)
+        except FileNotFoundError:
+            # Collected by another process between store and link: store it again
+            obj = _store_object(sha, data)
+            _link_or_copy(obj, run_path)
+        _write_latest(path, data)
+
+        _write_run_file(run_dir, run_id)
+        entry = {
+            "path": relative.as_posix(),
+            "sha256": sha,
+            "size": len(data),
+            "written_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(run_dir / MANIFEST_FILE, "a", encoding="utf-8") as manifest:
+            manifest.write(json.dumps(entry) + "\n")
+    return run_path
+
+
+def _run_time(run: Path) -> datetime:
+    """Last write time of a run directory or archive."""
+    return datetime.fromtimestamp(run.stat().st_mtime)
+
+
+def get_store_size() -> int:
+    """Bytes used by runs and blobs; hard-linked files are counted once."""
+    seen = set()
+    total = 0
+    for root in (ARTIFACT_RUNS_DIR, ARTIFACT_OBJECTS_DIR):
+        if not root.exists():
+            continue
+        for p in root.rglob("*"):
+            st = p.lstat()
+            if p.is_file() and (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_size
+    return total
+
+
+def compress_run(run_dir: Path) -> Path:
+    """Pack a run directory into <run_id>.tar.gz and remove the directory."""
+    archive = run_dir.with_name(run_dir.name + ARCHIVE_SUFFIX)
+    tmp = archive.with_name(f".{archive.name}.{os.getpid()}.tmp")
+    run_mtime = run_dir.stat().st_mtime
+    with tarfile.open(tmp, "w:gz") as tar:
+        tar.add(run_dir, arcname=run_dir.name)
+    os.utime(tmp, (run_mtime, run_mtime))  # keep the run's age for retention
+    os.replace(tmp, archive)
+    shutil.rmtree(run_dir, ignore_errors=True)
+    return archive
+
+
+def _delete_run(run: Path) -> None:
+    if run.is_dir():
+        shutil.rmtree(run, ignore_errors=True)
+    else:
+        run.unlink(missing_ok=True)
+
+
+def _remove_unreferenced(objects, now: datetime, grace_sec: float) -> tuple:
+    """Delete the given blobs that no run links to and that are past the grace period; return (count, bytes)."""
+    removed, freed = 0, 0
+    for obj in objects:
+        try:
+            st = obj.stat()
+        except FileNotFoundError:
+            continue
+        if st.st_nlink > 1 or now.timestamp() - st.st_mtime < grace_sec:
+            continue
+        os.chmod(obj, 0o644)
+        obj.unlink(missing_ok=True)
+        removed += 1
+        freed += st.st_size
+    return removed, freed
+
+
+def collect_unreferenced_objects(now: Optional[datetime] = None, grace_sec: float = DEFAULT_ARTIFACT_GRACE_SEC) -> int:
+    """
+    Delete blobs that no run links to; return the count.
+
+    Blobs written or reused in the last grace_sec seconds are kept: another
+    process may have stored them and not linked them yet.
+    """
+    if not ARTIFACT_OBJECTS_DIR.exists():
+        return 0
+    objects = (obj for obj in ARTIFACT_OBJECTS_DIR.glob("*/*") if not obj.name.startswith("."))
+    return _remove_unreferenced(objects, now or datetime.now(), grace_sec)[0]
+
+
+def _run_objects(run: Path) -> list:
+    """Return the blobs a run directory links to (archives link to none)."""
+    if not run.is_dir() or not (run / MANIFEST_FILE).exists():
+        return []
+    shas = set()
+    for line in (run / MANIFEST_FILE).read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            shas.add(json.loads(line)["sha256"])
+    return [ARTIFACT_OBJECTS_DIR / sha[:2] / sha for sha in sorted(shas)]
+
+
+def _run_own_bytes(run: Path) -> int:
+    """Bytes freed by deleting a run itself: the archive, or the run files no blob shares."""
+    if not run.is_dir():
+        return run.stat().st_size
+    return sum(p.lstat().st_size for p in run.rglob("*") if p.is_file() and p.lstat().st_nlink <= 1)
+
+
+def maintain_artifacts(
+    now: Optional[datetime] = None,
+    compress_after_days: int = DEFAULT_ARTIFACT_COMPRESS_AFTER_DAYS,
+    retention_days: int = DEFAULT_ARTIFACT_RETENTION_DAYS,
+    max_mb: int = DEFAULT_ARTIFACT_MAX_MB,
+    exclude_run_id: Optional[str] = None,
+) -> dict:
+    """
+    Compress old runs and apply age and size retention.
+
+    Args:
+        now (Optional[datetime]): Reference time (default: now)
+        compress_after_days (int): Compress run directories older than this
+        retention_days (int): Delete runs older than this
+        max_mb (int): Delete the oldest runs until the store is below this size
+        exclude_run_id (Optional[str]): Run that must not be touched (the current one)
+
+    Returns:
+        dict: Counts of compressed and deleted runs and removed blobs
+    """
+    now = now or datetime.now()
+    stats = {"compressed": 0, "deleted": 0, "objects_removed": 0}
+    if not ARTIFACT_RUNS_DIR.exists():
+        return stats
+
+    def runs():
+        return sorted(
+            (p for p in ARTIFACT_RUNS_DIR.iterdir()
+             if not p.name.startswith(".") and p.name.removesuffix(ARCHIVE_SUFFIX) != exclude_run_id),
+            key=_run_time,
+        )
+
+    for run in runs():
+        age = now - _run_time(run)
+        if age > timedelta(days=retention_days):
+            _delete_run(run)
+            stats["deleted"] += 1
+        elif run.is_dir() and age > timedelta(days=compress_after_days):
+            compress_run(run)
+            stats["compressed"] += 1
+
+    # Size retention over runs and blobs, oldest runs go first
+    stats["objects_removed"] += collect_unreferenced_objects(now)
+    remaining = runs()
+    size = get_store_size()
+    while remaining and size > max_mb * 1024 * 1024:
+        run = remaining.pop(0)
+        objects = _run_objects(run)
+        size -= _run_own_bytes(run)
+        _delete_run(run)
+        stats["deleted"] += 1
+        removed, freed = _remove_unreferenced(objects, now, DEFAULT_ARTIFACT_GRACE_SEC)
+        stats["objects_removed"] += removed
+        size -= freed
+    return stats
+
+
+def iter_runs() -> Iterator[dict]:
+    """Yield run.json of every stored run (directories and archives), newest first."""
+    if not ARTIFACT_RUNS_DIR.exists():
+        return
+    for run in sorted(ARTIFACT_RUNS_DIR.iterdir(), key=_run_time, reverse=True):
+        if run.name.startswith("."):
+            continue
+        if run.is_dir():
+            run_file = run / RUN_FILE
+            if run_file.exists():
+                yield {**json.loads(run_file.read_text(encoding="utf-8")), "location": run}
+        elif run.name.endswith(ARCHIVE_SUFFIX):
+            run_id = run.name.removesuffix(ARCHIVE_SUFFIX)
+            with tarfile.open(run) as tar:
+                member = tar.extractfile(f"{run_id}/{RUN_FILE}")
+                if member is not None:
+                    yield {**json.loads(member.read().decode("utf-8")), "location": run}
+
+
+def read_run_manifest(run: dict) -> list:
+    """Return the manifest entries of a run from iter_runs()."""
+    location = run["location"]
+    if location.is_dir():
+        lines = (location / MANIFEST_FILE).read_text(encoding="utf-8").splitlines()
+    else:
+        with tarfile.open(location) as tar:
+            lines = tar.extractfile(f"{run['run_id']}/{MANIFEST_FILE}").read().decode("utf-8").splitlines()
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def read_run_artifact(run: dict, relative_path: str) -> str:
+    """Return the content a run wrote to a temp/ relative path."""
+    location = run["location"]
+    if location.is_dir():
+        return (location / relative_path).read_text(encoding="utf-8")
+    with tarfile.open(location) as tar:
+        return tar.extractfile(f"{run['run_id']}/{relative_path}").read().decode("utf-8")
@@ -8,22 +8,33 @@ from google.auth import default as google_auth_default
 import os
 import warnings
 from typing import Optional
-import time
+
+from .labels import build_job_labels
+from .cassette import get_cassette, RecordingClient, ReplayClient
 
 
 def get_bq_client(project_id: str, dry_run: bool = False) -> Optional[bigquery.Client]:
     """
     Return a BigQuery client for the given project ID.
+
+    With BI_CASSETTE=record the client records every query into a cassette;
+    with BI_CASSETTE=replay a ReplayClient serves them back offline
+    (utilities/cassette.py).
     
     Args:
         project_id (str): Google Cloud project ID
         dry_run (bool): If True, return None for dry-run mode
         
     Returns:
-        Optional[bigquery.Client]: BigQuery client or None if dry_run
+        Optional[bigquery.Client]: BigQuery client (or its recording/replay
+            stand-in) or None if dry_run
     """
     if dry_run:
         return None
+
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        return ReplayClient(project_id, cassette)
     
     try:
         # Reduce noisy SDK warnings unless verbose
@@ -43,7 +54,8 @@ def get_bq_client(project_id: str, dry_run: bool = False) -> Optional[bigquery.C
 
         # Use ADC with explicit quota project to avoid SDK warning and charge the right project
         credentials, _ = google_auth_default(quota_project_id=project_id)
-        return bigquery.Client(project=project_id, credentials=credentials)
+        client = bigquery.Client(project=project_id, credentials=credentials)
+        return RecordingClient(client, cassette) if cassette is not None else client
     except Exception as e:
         if os.getenv("BI_VERBOSE"):
             print(f"[WARNING] Could not create BigQuery client: {e}")
@@ -77,7 +89,7 @@ def execute_query(
         return None
     
     try:
-        return client.query(query)
+        return client.query(query, job_config=bigquery.QueryJobConfig(labels=build_job_labels("adhoc")))
     except Exception as e:
         print(f"[ERROR] Query execution failed: {e}")
         return None
@@ -89,8 +101,9 @@ def run_query_and_df(
     dry_run: bool = False,
 ):
     """
-    Execute a query and return a pandas DataFrame with simple retries.
-    Retries on 429/5xx with backoff (1s, 2s, 4s).
+    Execute a query and return a pandas DataFrame.
+    Transient errors (rate limits, backend errors, 5xx, dropped connections)
+    are retried with jittered exponential backoff, see utilities.retry.
 
     Args:
         client: BigQuery client or None if dry-run
@@ -100,6 +113,9 @@ def run_query_and_df(
     Returns:
         DataFrame on success, or None when dry-run or failure
     """
+    # Local import: retry -> watchdog -> daily_logs -> bq
+    from .retry import run_query_with_retry
+
     if dry_run:
         print(f"[DRY-RUN] Would execute query: {query[:100]}...")
         return None
@@ -107,17 +123,8 @@ def run_query_and_df(
         print("[WARNING] No BigQuery client available")
         return None
 
-    backoff_secs = [0, 1, 2, 4]
-    for delay in backoff_secs:
-        try:
-            if delay:
-                time.sleep(delay)
-            job = client.query(query)
-            return job.to_dataframe()
-        except Exception as e:
-            msg = str(e)
-            # Basic retry for rate limits and transient errors
-            if any(code in msg for code in ["429", "500", "502", "503", "504"]) and delay != backoff_secs[-1]:
-                continue
-            print(f"[ERROR] Query to DataFrame failed: {e}")
-            return None
+    try:
+        return run_query_with_retry(client, query, to_dataframe=True)
+    except Exception as e:
+        print(f"[ERROR] Query to DataFrame failed: {e}")
+        return None
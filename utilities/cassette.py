@@ -0,0 +1,401 @@
+"""
+Record/replay BigQuery client for offline regression runs.
+
+With BI_CASSETTE=record, utilities.bq.get_bq_client wraps the real client:
+every query's normalized SQL, job metadata, error and result frame are
+written to a cassette directory (BI_CASSETTE_DIR, default cassettes/default).
+With BI_CASSETTE=replay it returns a ReplayClient that serves the same
+results back by normalized-SQL hash without credentials or network, so the
+ETL jobs and the monitors (thresholds, raise_flag handling, alert markdown,
+Slack payloads) run in seconds.
+
+Cassette layout:
+
+    cassette.json               recorded_at (run time pinned on replay)
+    queries/<hash>.json         normalized SQL and its interactions, in order
+    frames/<hash>_<n>.pkl       result frame of interaction n
+    tables/<table_ref>.json     get_table metadata (num_rows, ...)
+
+SQL is normalized by dropping comments (run_time lives there) and collapsing
+whitespace. Identical queries are served in recorded order, the last one
+repeating. In replay mode the run time, and so the processing date, is
+pinned to the recording's (utilities.formatting.get_date_params). In both modes Slack messages are
+written to temp/cassette/slack/ instead of being sent. Frames are pickled:
+only replay cassettes you recorded.
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+import concurrent.futures
+from pathlib import Path
+from types import SimpleNamespace
+from datetime import date, datetime
+from typing import Optional
+
+import pandas as pd
+
+from .constants import CASSETTES_DIR, TEMP_DIR
+
+CASSETTE_MODES = ("record", "replay")
+JOB_FIELDS = (
+    "job_id", "statement_type", "total_bytes_processed", "total_bytes_billed",
+    "slot_millis", "num_dml_affected_rows", "cache_hit", "state",
+)
+TABLE_FIELDS = ("num_rows", "num_bytes", "modified", "partitioning_type", "clustering_fields")
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_CASSETTES = {}
+_CASSETTES_LOCK = threading.Lock()
+_SLACK_LOCK = threading.Lock()
+_SLACK_COUNT = 0
+
+
+class CassetteMiss(LookupError):
+    """A replayed query or table is not in the cassette."""
+
+
+def normalize_sql(query: str) -> str:
+    """Drop comments and collapse whitespace (and a trailing semicolon)."""
+    return " ".join(_COMMENT_RE.sub(" ", query).split()).rstrip(";").strip()
+
+
+def sql_key(query: str) -> str:
+    """Return the cassette key of a query: a hash of its normalized SQL."""
+    return hashlib.sha256(normalize_sql(query).encode("utf-8")).hexdigest()[:20]
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _to_json_dict(item: dict) -> dict:
+    return {str(key): _to_json(value) for key, value in item.items()}
+
+
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+
+
+class Cassette:
+    """One cassette directory, shared by every client of the process."""
+
+    def __init__(self, path: Path, mode: str):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (expected record or replay)")
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._served = {}
+        self._fresh = set()
+        meta_file = self.path / "cassette.json"
+        if mode == "record":
+            self.meta = {"recorded_at": datetime.now().isoformat(timespec="seconds")}
+            _atomic_write(meta_file, json.dumps(self.meta, indent=2))
+        elif meta_file.exists():
+            self.meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        else:
+            raise CassetteMiss(f"No cassette at {self.path} (record one with BI_CASSETTE=record)")
+
+    def recorded_at(self) -> datetime:
+        """Return when the cassette was recorded."""
+        return datetime.fromisoformat(self.meta["recorded_at"])
+
+    def _entry(self, key: str) -> dict:
+        if key not in self._entries:
+            query_file = self.path / "queries" / f"{key}.json"
+            self._entries[key] = json.loads(query_file.read_text(encoding="utf-8")) if query_file.exists() else None
+        return self._entries[key]
+
+    def record(self, query: str, job=None, error: Optional[Exception] = None, frame: Optional[pd.DataFrame] = None) -> int:
+        """
+        Append an interaction of a query.
+
+        The first interaction recorded for a query in this process replaces
+        what an earlier recording held for it.
+
+        Args:
+            query (str): Rendered SQL
+            job: The BigQuery job (metadata is read from it)
+            error (Optional[Exception]): Error raised by the job
+            frame (Optional[pd.DataFrame]): Result frame
+
+        Returns:
+            int: Index of the interaction
+        """
+        key = sql_key(query)
+        with self._lock:
+            if key not in self._fresh:
+                self._fresh.add(key)
+                self._entries[key] = {"sql": normalize_sql(query), "interactions": []}
+            interactions = self._entries[key]["interactions"]
+            interaction = {"job": {field: _to_json(getattr(job, field, None)) for field in JOB_FIELDS}, "error": None, "frame": None}
+            if error is not None:
+                interaction["error"] = {
+                    "module": type(error).__module__,
+                    "type": type(error).__name__,
+                    "message": getattr(error, "message", None) or str(error),
+                    # errors[].reason decides retries of 400/403 (rateLimitExceeded, backendError)
+                    "errors": [_to_json_dict(item) for item in getattr(error, "errors", None) or [] if isinstance(item, dict)],
+                }
+            interactions.append(interaction)
+            index = len(interactions) - 1
+            self._save(key)
+        if frame is not None:
+            self.attach_frame(query, index, frame)
+        return index
+
+    def attach_frame(self, query: str, index: int, frame: pd.DataFrame) -> None:
+        """Store the result frame of a recorded interaction."""
+        key = sql_key(query)
+        frame_name = f"{key}_{index}.pkl"
+        (self.path / "frames").mkdir(parents=True, exist_ok=True)
+        frame.to_pickle(self.path / "frames" / frame_name)
+        with self._lock:
+            self._entries[key]["interactions"][index]["frame"] = frame_name
+            self._save(key)
+
+    def _save(self, key: str) -> None:
+        _atomic_write(self.path / "queries" / f"{key}.json", json.dumps(self._entries[key], indent=2))
+
+    def next(self, query: str) -> dict:
+        """
+        Return the next recorded interaction of a query.
+
+        Raises:
+            CassetteMiss: If the query was never recorded
+        """
+        key = sql_key(query)
+        with self._lock:
+            entry = self._entry(key)
+            if not entry or not entry["interactions"]:
+                miss_file = TEMP_DIR / "cassette" / "misses" / f"{key}.sql"
+                _atomic_write(miss_file, query)
+                raise CassetteMiss(f"Query {key} not in cassette {self.path} (rendered SQL: {miss_file})")
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            return entry["interactions"][min(served, len(entry["interactions"]) - 1)]
+
+    def load_frame(self, interaction: dict) -> pd.DataFrame:
+        """Return the frame of an interaction (empty when none was recorded)."""
+        if not interaction.get("frame"):
+            return pd.DataFrame()
+        return pd.read_pickle(self.path / "frames" / interaction["frame"])
+
+    def record_table(self, table_ref: str, table) -> None:
+        """Store table metadata returned by get_table."""
+        meta = {field: _to_json(getattr(table, field, None)) for field in TABLE_FIELDS}
+        _atomic_write(self.path / "tables" / f"{table_ref}.json", json.dumps(meta, indent=2))
+
+    def table(self, table_ref: str) -> SimpleNamespace:
+        """Return recorded table metadata."""
+        table_file = self.path / "tables" / f"{table_ref}.json"
+        if not table_file.exists():
+            raise CassetteMiss(f"Table {table_ref} not in cassette {self.path}")
+        return SimpleNamespace(**json.loads(table_file.read_text(encoding="utf-8")))
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the process cassette from BI_CASSETTE / BI_CASSETTE_DIR, or None when not set."""
+    mode = os.getenv("BI_CASSETTE")
+    if not mode:
+        return None
+    path = Path(os.getenv("BI_CASSETTE_DIR") or CASSETTES_DIR / "default").resolve()
+    with _CASSETTES_LOCK:
+        if path not in _CASSETTES:
+            _CASSETTES[path] = Cassette(path, mode)
+        return _CASSETTES[path]
+
+
+def get_pinned_now() -> Optional[datetime]:
+    """Return the recording time when replaying, so queries render as recorded."""
+    cassette = get_cassette()
+    return cassette.recorded_at() if cassette and cassette.mode == "replay" else None
+
+
+def capture_slack_payload(payload: dict) -> Optional[Path]:
+    """Write a Slack payload to temp/cassette/slack/ when a cassette is active."""
+    global _SLACK_COUNT
+    if get_cassette() is None:
+        return None
+    from .io import write_file
+
+    with _SLACK_LOCK:
+        _SLACK_COUNT += 1
+        payload_file = TEMP_DIR / "cassette" / "slack" / f"{_SLACK_COUNT:03d}.json"
+    write_file(payload_file, json.dumps(payload, indent=2, ensure_ascii=False))
+    return payload_file
+
+
+def _replay_error(error: dict) -> Exception:
+    """Rebuild a recorded error; google.api_core errors keep their class and reasons (and retry behaviour)."""
+    if error["module"] == "google.api_core.exceptions":
+        from google.api_core import exceptions
+
+        error_class = getattr(exceptions, error["type"], None)
+        if error_class is not None:
+            return error_class(error["message"], errors=error.get("errors") or ())
+    return RuntimeError(f"{error['type']}: {error['message']}")
+
+
+class RecordingQueryJob:
+    """A real query job whose outcome is written to the cassette."""
+
+    def __init__(self, job, query: str, cassette: Cassette):
+        self._job = job
+        self._query = query
+        self._cassette = cassette
+        self._index = None
+
+    def __getattr__(self, name):
+        return getattr(self._job, name)
+
+    def result(self, *args, **kwargs):
+        try:
+            rows = self._job.result(*args, **kwargs)
+        except concurrent.futures.TimeoutError:
+            raise
+        except Exception as e:
+            if self._index is None:
+                self._index = self._cassette.record(self._query, self._job, error=e)
+            raise
+        if self._index is None:
+            self._index = self._cassette.record(self._query, self._job)
+        return rows
+
+    def to_dataframe(self, *args, **kwargs):
+        frame = self._job.to_dataframe(*args, **kwargs)
+        if self._index is None:
+            self._index = self._cassette.record(self._query, self._job, frame=frame)
+        else:
+            self._cassette.attach_frame(self._query, self._index, frame)
+        return frame
+
+
+class RecordingClient:
+    """Wraps a bigquery.Client; queries and get_table are recorded, the rest passes through."""
+
+    def __init__(self, client, cassette: Cassette):
+        self._client = client
+        self._cassette = cassette
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def query(self, query, *args, **kwargs):
+        from google.api_core.exceptions import Conflict
+
+        try:
+            job = self._client.query(query, *args, **kwargs)
+        except Conflict:
+            raise
+        except Exception as e:
+            # Rejected at submission (e.g. invalid SQL): replayed as a failing job
+            self._cassette.record(query, error=e)
+            raise
+        return RecordingQueryJob(job, query, self._cassette)
+
+    def get_job(self, job_id, *args, **kwargs):
+        job = self._client.get_job(job_id, *args, **kwargs)
+        return RecordingQueryJob(job, job.query, self._cassette) if getattr(job, "query", None) else job
+
+    def get_table(self, table, *args, **kwargs):
+        result = self._client.get_table(table, *args, **kwargs)
+        self._cassette.record_table(str(table), result)
+        return result
+
+
+class ReplayRows(list):
+    """Rows of a replayed query (dicts), with total_rows like a RowIterator."""
+
+    @property
+    def total_rows(self) -> int:
+        return len(self)
+
+
+class ReplayJob:
+    """A finished job served from the cassette."""
+
+    def __init__(self, cassette: Cassette, interaction: Optional[dict] = None, job_id: Optional[str] = None):
+        self._cassette = cassette
+        self._interaction = interaction or {"job": {}, "error": None, "frame": None}
+        for field in JOB_FIELDS:
+            setattr(self, field, self._interaction["job"].get(field))
+        self.job_id = job_id or self.job_id or "replay"
+        self.state = "DONE"
+        error = self._interaction["error"]
+        reasons = [item["reason"] for item in (error or {}).get("errors") or [] if item.get("reason")]
+        self.error_result = {"reason": reasons[0] if reasons else error["type"], "message": error["message"]} if error else None
+
+    def done(self, *args, **kwargs) -> bool:
+        return True
+
+    def cancel(self, *args, **kwargs) -> bool:
+        return True
+
+    def _raise_recorded_error(self) -> None:
+        if self._interaction["error"]:
+            raise _replay_error(self._interaction["error"])
+
+    def result(self, *args, **kwargs):
+        self._raise_recorded_error()
+        return ReplayRows(self._cassette.load_frame(self._interaction).to_dict("records"))
+
+    def to_dataframe(self, *args, **kwargs) -> pd.DataFrame:
+        self._raise_recorded_error()
+        return self._cassette.load_frame(self._interaction)
+
+
+class ReplayClient:
+    """A BigQuery client stand-in serving a cassette; no credentials, no network."""
+
+    def __init__(self, project: str, cassette: Cassette):
+        self.project = project
+        self._cassette = cassette
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def query(self, query, job_config=None, job_id=None, **kwargs) -> ReplayJob:
+        from google.api_core.exceptions import Conflict
+
+        with self._lock:
+            if job_id is not None and job_id in self._jobs:
+                raise Conflict(f"Already Exists: Job {self.project}:{job_id}")
+        job = ReplayJob(self._cassette, self._cassette.next(query), job_id)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        return job
+
+    def get_job(self, job_id, *args, **kwargs) -> ReplayJob:
+        from google.api_core.exceptions import NotFound
+
+        with self._lock:
+            if job_id not in self._jobs:
+                raise NotFound(f"Not found: Job {self.project}:{job_id}")
+            return self._jobs[job_id]
+
+    def get_table(self, table, *args, **kwargs):
+        return self._cassette.table(str(table))
+
+    # Writes that are not queries (log rows, copies) succeed without doing anything
+    def load_table_from_dataframe(self, *args, **kwargs) -> ReplayJob:
+        return ReplayJob(self._cassette)
+
+    def copy_table(self, *args, **kwargs) -> ReplayJob:
+        return ReplayJob(self._cassette)
+
+    def delete_table(self, *args, **kwargs) -> None:
+        return None
+
+    def create_dataset(self, dataset, *args, **kwargs):
+        return dataset
@@ -0,0 +1,303 @@
+"""
+Chunked, resumable full-history rebuilds for init tasks.
+
+An init task with a "chunking" block can be rebuilt in pieces instead of one
+monolithic CTAS (etl_runner --chunked):
+
+1. The rebuild is split into chunks: date ranges of `column` ("date_range",
+   every `days` days up to the processing date; the first chunk has no lower
+   bound) or hash buckets of `column` ("hash", `buckets` chunks).
+2. Each chunk renders the init template with `{chunk_filter}` set to its
+   predicate and `table_dst` set to its own chunk table
+   (<table_dst>__init_chunk_NNN), so chunks run in parallel without DML
+   contention and each one can be re-run alone.
+3. A chunk is verified by its row count: with `verify_sql` (a template next
+   to the init SQL returning expected_rows for `{chunk_filter}`) the counts
+   must match, otherwise the chunk must not be empty unless `allow_empty`.
+4. Verified chunks are copied into <table_dst>__init_staging, whose row count
+   must equal the sum of the chunks, and staging then replaces table_dst with
+   one WRITE_TRUNCATE copy job: readers see the old table or the new one.
+5. Chunk and staging tables are dropped.
+
+Progress is kept in a manifest under state/chunked_init/, so re-running the
+same init resumes: finished chunks are skipped and only failed or missing
+chunks run again (--restart-chunks starts over).
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .io import read_file, write_file
+from .constants import DATE_FMT, CHUNKED_INIT_DIR
+from .labels import build_job_labels
+from .retry import RetryPolicy, build_job_id_prefix, run_query_with_retry
+from .run_context import get_run_id
+from .sampling import resolve_dataset
+from .watchdog import Deadline
+
+CHUNK_TABLE_SUFFIX = "__init_chunk_{index:03d}"
+STAGING_TABLE_SUFFIX = "__init_staging"
+DEFAULT_CHUNK_PARALLELISM = 4
+
+
+def plan_chunks(chunking: dict, y_m_d: str) -> list:
+    """
+    Split a rebuild into chunks.
+
+    Args:
+        chunking (dict): Task "chunking" block: strategy (date_range or hash),
+            column, and days + start_date (date_range) or buckets (hash)
+        y_m_d (str): Processing date in YYYY-MM-DD format (last day of the rebuild)
+
+    Returns:
+        list: Dicts with index, filter (SQL predicate) and label
+
+    Raises:
+        ValueError: If the chunking block is invalid
+    """
+    strategy = chunking.get("strategy")
+    column = chunking.get("column")
+    if not column:
+        raise ValueError("chunking.column is required")
+
+    if strategy == "hash":
+        buckets = int(chunking.get("buckets", 0))
+        if buckets < 2:
+            raise ValueError("chunking.buckets must be at least 2")
+        return [
+            {
+                "index": i,
+                "filter": f"MOD(ABS(FARM_FINGERPRINT(CAST({column} AS STRING))), {buckets}) = {i}",
+                "label": f"bucket {i}/{buckets}",
+            }
+            for i in range(buckets)
+        ]
+
+    if strategy == "date_range":
+        days = int(chunking.get("days", 0))
+        if days < 1 or not chunking.get("start_date"):
+            raise ValueError("chunking.days and chunking.start_date are required for date_range")
+        end = datetime.strptime(y_m_d, DATE_FMT).date()
+        start = datetime.strptime(chunking["start_date"], DATE_FMT).date()
+        chunks = []
+        lower = None
+        upper = min(start + timedelta(days=days - 1), end)
+        while True:
+            # The first chunk is open below so no history before start_date is lost
+            predicate = f"{column} <= DATE('{upper}')" if lower is None else f"{column} BETWEEN DATE('{lower}') AND DATE('{upper}')"
+            chunks.append({"index": len(chunks), "filter": predicate, "label": f"{lower or '...'} to {upper}"})
+            if upper >= end:
+                return chunks
+            lower = upper + timedelta(days=1)
+            upper = min(lower + timedelta(days=days - 1), end)
+
+    raise ValueError(f"Unknown chunking.strategy: {strategy} (expected date_range or hash)")
+
+
+def get_manifest_path(project_id: str, job_name: str, task_name: str, y_m_d: str) -> Path:
+    """Return the manifest file of a chunked init."""
+    return CHUNKED_INIT_DIR / project_id / job_name / f"{task_name}_{y_m_d}.json"
+
+
+def load_manifest(path: Path, chunks: list, restart: bool = False) -> dict:
+    """
+    Load the manifest of a previous attempt, or start a new one.
+
+    A previous manifest is reused only when it planned the same chunks and did
+    not complete.
+
+    Args:
+        path (Path): Manifest file
+        chunks (list): Planned chunks
+        restart (bool): Ignore a previous manifest
+
+    Returns:
+        dict: Manifest with status and one entry per chunk index
+    """
+    fresh = {
+        "status": "running",
+        "chunks": {str(c["index"]): {"filter": c["filter"], "label": c["label"], "status": "pending"} for c in chunks},
+    }
+    if restart or not path.exists():
+        return fresh
+    previous = json.loads(path.read_text(encoding="utf-8"))
+    same_plan = {k: v["filter"] for k, v in previous.get("chunks", {}).items()} == {k: v["filter"] for k, v in fresh["chunks"].items()}
+    if previous.get("status") == "completed" or not same_plan:
+        return fresh
+    previous["status"] = "running"
+    return previous
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    """Write the manifest atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _count_rows(client, table_ref: str) -> int:
+    return client.get_table(table_ref).num_rows
+
+
+def _copy_tables(client, sources: list, destination: str, labels: dict, timeout_sec: Optional[float]) -> None:
+    """Replace destination with the union of sources in one copy job."""
+    from google.cloud import bigquery
+
+    job_config = bigquery.CopyJobConfig(
+        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+        create_disposition=bigquery.CreateDisposition.CREATE_IF_NEEDED,
+        labels=labels,
+    )
+    client.copy_table(sources, destination, job_config=job_config).result(timeout=timeout_sec)
+
+
+def run_chunked_task(
+    client,
+    project_id: str,
+    pipeline_name: str,
+    job_name: str,
+    job_action: str,
+    task_name: str,
+    task_conf: dict,
+    query_template: str,
+    render: Callable[[str, dict], str],
+    y_m_d: str,
+    logs_path: Path,
+    job_dir: Path,
+    dry_run: bool = False,
+    restart: bool = False,
+    policy: Optional[RetryPolicy] = None,
+    timeout_sec: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+) -> dict:
+    """
+    Rebuild an init task's table chunk by chunk, then swap it into place.
+
+    Args:
+        client: BigQuery client or None in dry-run
+        project_id (str): Google Cloud project ID
+        pipeline_name (str): ETL group name, used in job labels
+        job_name (str): Pipeline job name
+        job_action (str): Job action (init)
+        task_name (str): Init task name
+        task_conf (dict): Task config with a "chunking" block
+        query_template (str): Init SQL template
+        render (Callable[[str, dict], str]): Renders a template of the task
+            with parameter overrides (table_dst, chunk_filter)
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        logs_path (Path): Where rendered chunk SQL is written
+        job_dir (Path): Pipeline directory holding verify_sql
+        dry_run (bool): Render chunk SQL only
+        restart (bool): Ignore the manifest of a previous attempt
+        policy (Optional[RetryPolicy]): Retry settings per chunk
+        timeout_sec (Optional[float]): Timeout of each chunk and copy job
+        deadline (Optional[Deadline]): Run deadline shared by all chunks
+
+    Returns:
+        dict: status (success or failed), chunks, done, rows and errors per chunk
+    """
+    chunking = task_conf["chunking"]
+    chunks = plan_chunks(chunking, y_m_d)
+    dataset = f"{project_id}.{resolve_dataset(task_conf['dataset_dst'])}"
+    table_dst = task_conf["table_dst"]
+    chunk_table = lambda index: table_dst + CHUNK_TABLE_SUFFIX.format(index=index)
+    staging_table = table_dst + STAGING_TABLE_SUFFIX
+    verify_template = read_file(job_dir / chunking["verify_sql"]) if chunking.get("verify_sql") else None
+
+    queries = {}
+    for chunk in chunks:
+        queries[chunk["index"]] = render(query_template, {"table_dst": chunk_table(chunk["index"]), "chunk_filter": chunk["filter"]})
+        write_file(logs_path / f"{task_name}_chunk_{chunk['index']:03d}.sql", queries[chunk["index"]])
+
+    result = {"status": "success", "chunks": len(chunks), "done": 0, "rows": 0, "errors": {}}
+    if dry_run or client is None:
+        print(f"[DRY-RUN] Would rebuild {table_dst} in {len(chunks)} chunks ({chunking['strategy']} on {chunking['column']})")
+        return result
+
+    manifest_path = get_manifest_path(project_id, job_name, task_name, y_m_d)
+    manifest = load_manifest(manifest_path, chunks, restart)
+    save_manifest(manifest_path, manifest)
+    lock = threading.Lock()
+    pending = [c for c in chunks if manifest["chunks"][str(c["index"])]["status"] != "done"]
+    skipped = len(chunks) - len(pending)
+    if skipped:
+        print(f"Resuming {task_name}: {skipped}/{len(chunks)} chunks already done")
+
+    def run_chunk(chunk):
+        index = chunk["index"]
+        target = f"{dataset}.{chunk_table(index)}"
+        labels = build_job_labels(pipeline_name, job_name, job_action, y_m_d, f"{task_name}_chunk_{index:03d}")
+        run_query_with_retry(
+            client, queries[index],
+            build_job_id_prefix(job_name, f"{task_name}_c{index:03d}", y_m_d, get_run_id()),
+            policy, timeout_sec, deadline,
+            priority="batch",
+            labels=labels,
+        )
+        rows = _count_rows(client, target)
+        expected = None
+        if verify_template:
+            verify_query = render(verify_template, {"chunk_filter": chunk["filter"]})
+            expected_df = run_query_with_retry(client, verify_query, timeout_sec=timeout_sec, deadline=deadline, to_dataframe=True, priority="batch", labels=labels)
+            expected = int(expected_df["expected_rows"].iloc[0])
+            if rows != expected:
+                raise ValueError(f"chunk {index} has {rows} rows, expected {expected}")
+        elif rows == 0 and not chunking.get("allow_empty", False):
+            raise ValueError(f"chunk {index} ({chunk['label']}) is empty")
+        return rows, expected
+
+    def track(chunk):
+        key = str(chunk["index"])
+        started = datetime.now()
+        try:
+            rows, expected = run_chunk(chunk)
+            entry = {"status": "done", "rows": rows, "expected_rows": expected, "error": None}
+        except Exception as e:
+            entry = {"status": "failed", "error": str(e)}
+        entry["duration_sec"] = round((datetime.now() - started).total_seconds(), 1)
+        with lock:
+            manifest["chunks"][key].update(entry)
+            save_manifest(manifest_path, manifest)
+        print(f"  {task_name} chunk {chunk['index']:03d} ({chunk['label']}): {entry['status']}")
+
+    with ThreadPoolExecutor(max_workers=chunking.get("parallelism", DEFAULT_CHUNK_PARALLELISM)) as executor:
+        list(executor.map(track, pending))
+
+    entries = manifest["chunks"]
+    result["done"] = sum(1 for entry in entries.values() if entry["status"] == "done")
+    result["errors"] = {f"chunk_{int(k):03d}": entry["error"] for k, entry in entries.items() if entry["status"] != "done"}
+    if result["errors"]:
+        manifest["status"] = "failed"
+        save_manifest(manifest_path, manifest)
+        result["status"] = "failed"
+        return result
+
+    # Assemble staging from the verified chunks, check it, then swap it into place
+    swap_labels = build_job_labels(pipeline_name, job_name, job_action, y_m_d, f"{task_name}_swap")
+    chunk_refs = [f"{dataset}.{chunk_table(c['index'])}" for c in chunks]
+    try:
+        _copy_tables(client, chunk_refs, f"{dataset}.{staging_table}", swap_labels, timeout_sec)
+        result["rows"] = sum(entry["rows"] for entry in entries.values())
+        staging_rows = _count_rows(client, f"{dataset}.{staging_table}")
+        if staging_rows != result["rows"]:
+            raise ValueError(f"staging has {staging_rows} rows, chunks have {result['rows']}")
+        _copy_tables(client, [f"{dataset}.{staging_table}"], f"{dataset}.{table_dst}", swap_labels, timeout_sec)
+    except Exception as e:
+        manifest["status"] = "failed"
+        save_manifest(manifest_path, manifest)
+        result["status"] = "failed"
+        result["errors"]["swap"] = str(e)
+        return result
+
+    for ref in chunk_refs + [f"{dataset}.{staging_table}"]:
+        client.delete_table(ref, not_found_ok=True)
+    manifest["status"] = "completed"
+    manifest["rows"] = result["rows"]
+    save_manifest(manifest_path, manifest)
+    return result
@@ -5,6 +5,26 @@ This module provides standardized command-line interface functions.
 
 import argparse
 
+from .sampling import configure_sampling
+
+
+class _SamplingAction(argparse.Action):
+    """Store the flag and enable sampled development mode (utilities/sampling.py)."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, self.dest, values)
+        if namespace.sample is not None:
+            try:
+                configure_sampling(namespace.sample, namespace.sandbox)
+            except ValueError as e:
+                parser.error(str(e))
+
+
+def add_sampling_args(parser: argparse.ArgumentParser) -> None:
+    """Add --sample PCT and --sandbox DATASET to a parser."""
+    parser.add_argument("--sample", type=float, default=None, action=_SamplingAction, help="Run on a deterministic PCT%% of users in a sandbox dataset")
+    parser.add_argument("--sandbox", default=None, action=_SamplingAction, help="Sandbox dataset for --sample (default: dev_<developer>)")
+
 
 def create_standard_cli() -> argparse.ArgumentParser:
     """Create a standardized CLI parser for scripts.
@@ -15,6 +35,8 @@ def create_standard_cli() -> argparse.ArgumentParser:
         --job_action: One of init|daily|delete (default: daily)
         --dry-run: If set, do not execute queries
         --days-back: Integer days back for date params (default: 0)
+        --sample: Percent of users for sampled development mode
+        --sandbox: Sandbox dataset for --sample (default: dev_<developer>)
 
     Returns:
         Configured argparse.ArgumentParser
@@ -25,4 +47,34 @@ def create_standard_cli() -> argparse.ArgumentParser:
     parser.add_argument("--job_action", default="daily", choices=["init", "daily", "delete"], help="Job action")
     parser.add_argument("--dry-run", dest="dry_run", action="store_true", help="Run in dry-run mode")
     parser.add_argument("--days-back", type=int, default=0, help="Number of days back to process")
+    add_sampling_args(parser)
+    return parser
+
+
+def create_fanout_cli() -> argparse.ArgumentParser:
+    """Create the CLI parser for running one job graph across many projects.
+
+    Flags:
+        --projects: Project IDs to run (default: all enabled in projects config)
+        --projects-config: Path to a projects config JSON with per-project overrides
+        --jobs: Subset of jobs from the job graph (default: all)
+        --job_action: One of init|daily|delete (default: daily)
+        --max-concurrency: Global cap on concurrently running jobs
+        --dry-run: If set, do not execute queries
+        --days-back: Integer days back for date params (default: 0)
+        --sample: Percent of users for sampled development mode
+        --sandbox: Sandbox dataset for --sample (default: dev_<developer>)
+
+    Returns:
+        Configured argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(description="")
+    parser.add_argument("--projects", nargs="+", default=None, help="Google Cloud project IDs")
+    parser.add_argument("--projects-config", dest="projects_config", default=None, help="Path to projects config JSON")
+    parser.add_argument("--jobs", nargs="+", default=None, help="Jobs to run from the job graph")
+    parser.add_argument("--job_action", default="daily", choices=["init", "daily", "delete"], help="Job action")
+    parser.add_argument("--max-concurrency", dest="max_concurrency", type=int, default=None, help="Global concurrency cap")
+    parser.add_argument("--dry-run", dest="dry_run", action="store_true", help="Run in dry-run mode")
+    parser.add_argument("--days-back", type=int, default=0, help="Number of days back to process")
+    add_sampling_args(parser)
     return parser
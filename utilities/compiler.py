@@ -0,0 +1,356 @@
+"""
+Ahead-of-time compilation of pipeline jobs for Gaming BI System.
+
+Compiling a job renders every task of a job action for a date exactly as
+run_job would (action_config, task config, overrides, schema registry,
+layout clauses, sampling) and checks it statically:
+
+- every `{placeholder}` of a template has a value, so a config typo fails
+  before the first query instead of as a KeyError halfway through a run;
+- the task config, layout block and schema registry are valid;
+- the lineage of each query (tables it reads and writes) is extracted from
+  its backticked table references, so tools/compile.py can flag a table that
+  is read but that no task writes.
+
+The compiled plan is cached under state/compiled/<project>/<job>/, keyed by a
+hash of every pipeline config and template plus the job, action, date,
+overrides and sampling settings. run_job reuses a cached plan instead of
+re-reading and re-rendering templates, and recompiles as soon as any of those
+inputs change. The `run_time` comment of a cached query is the compile time.
+"""
+
+import os
+import re
+import json
+import string
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from typing import Optional
+
+from .io import read_file, read_json
+from .paths import get_task_paths
+from .layout import validate_layout
+from .schema_registry import get_schema_params
+from .formatting import build_query_params
+from .sampling import apply_sampling, get_sampling
+from .constants import COMPILED_PLANS_DIR, DEFAULT_COMPILED_PLANS_KEEP, LOGS_TABLE
+
+# Bump when the plan format changes so old cached plans are ignored
+PLAN_VERSION = 2
+
+# Comments, skipping quoted literals and backticked names (project ids may contain "--")
+_COMMENT_RE = re.compile(r"(`[^`]*`|'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")|/\*.*?\*/|--[^\n]*", re.DOTALL)
+# `project.dataset.table`, or `project.dataset`.INFORMATION_SCHEMA.VIEW
+_TABLE_REF_RE = re.compile(r"`([\w.-]+)`(\.INFORMATION_SCHEMA\.\w+)?")
+_WRITE_PREFIX_RE = re.compile(
+    r"(?:CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?TABLE(?:\s+IF\s+NOT\s+EXISTS)?"
+    r"|INSERT\s+(?:INTO\s+)?|MERGE\s+(?:INTO\s+)?|UPDATE|DELETE\s+(?:FROM\s+)?|TRUNCATE\s+TABLE)\s*$",
+    re.IGNORECASE,
+)
+
+
+def template_placeholders(query_template: str) -> set:
+    """
+    Return the root names of the `{placeholders}` of a template.
+
+    Raises:
+        ValueError: If the template has unbalanced braces
+    """
+    names = set()
+    for _, field_name, _, _ in string.Formatter().parse(query_template):
+        if field_name:
+            names.add(re.split(r"[.\[]", field_name, maxsplit=1)[0])
+    return names
+
+
+def render_checked(query_template: str, params: dict, source: str) -> tuple:
+    """
+    Render a template, reporting every missing placeholder at once.
+
+    Args:
+        query_template (str): SQL template
+        params (dict): Format parameters
+        source (str): Template name used in error messages
+
+    Returns:
+        tuple: (query or None, list of errors)
+    """
+    try:
+        missing = sorted(template_placeholders(query_template) - set(params))
+    except ValueError as e:
+        return None, [f"{source}: invalid template: {e}"]
+    if missing:
+        return None, [f"{source}: no value for placeholder {{{name}}}" for name in missing]
+    try:
+        return query_template.format(**params), []
+    except (KeyError, IndexError, ValueError, AttributeError) as e:
+        return None, [f"{source}: cannot render: {e!r}"]
+
+
+def extract_lineage(query: str) -> tuple:
+    """
+    Return the tables a rendered query reads and writes.
+
+    A reference directly after CREATE TABLE, INSERT INTO, MERGE, UPDATE,
+    DELETE FROM or TRUNCATE TABLE is a write; every other one is a read.
+    Comments (e.g. validation snippets) are ignored.
+
+    Args:
+        query (str): Rendered SQL
+
+    Returns:
+        tuple: (sorted reads, sorted writes) as fully qualified table names
+    """
+    sql = _COMMENT_RE.sub(lambda m: m.group(1) or " ", query)
+    reads, writes = set(), set()
+    for match in _TABLE_REF_RE.finditer(sql):
+        ref, view = match.groups()
+        if view:
+            ref += view
+        elif ref.count(".") < 2:
+            # Column or alias in backticks
+            continue
+        target = writes if _WRITE_PREFIX_RE.search(sql[max(0, match.start() - 80):match.start()]) else reads
+        target.add(ref)
+    return sorted(reads), sorted(writes)
+
+
+def compile_job(
+    pipelines_root: Path,
+    project_id: str,
+    job_name: str,
+    job_action: str,
+    y_m_d: str,
+    run_time: datetime,
+    task_overrides: Optional[dict] = None,
+) -> dict:
+    """
+    Render and check every task of a job action.
+
+    Args:
+        pipelines_root (Path): pipelines/ directory
+        project_id (str): Google Cloud project ID
+        job_name (str): Pipeline job name
+        job_action (str): One of the actions in action_config.json
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        task_overrides (Optional[dict]): Per-task config overrides, keyed by task name
+
+    Returns:
+        dict: Plan with status (ok, skipped or error), pipeline settings
+            (pipeline_name, layout, deadlines, retry, script_actions),
+            job-level errors and one entry per selected task (name, status,
+            task_conf, sql_path, query, reads, writes, errors)
+    """
+    task_overrides = task_overrides or {}
+    plan = {
+        "version": PLAN_VERSION,
+        "project_id": project_id,
+        "job_name": job_name,
+        "job_action": job_action,
+        "date": y_m_d,
+        "compiled_at": run_time.strftime("%Y-%m-%d %H:%M:%S"),
+        "status": "ok",
+        "pipeline_name": None,
+        "layout": None,
+        "deadlines": {},
+        "retry": None,
+        "script_actions": [],
+        "errors": [],
+        "tasks": [],
+    }
+
+    tasks_config = read_json(pipelines_root / f"{job_name}/{job_name}_config.json")
+    action_config = read_json(pipelines_root / "action_config.json")
+    selected_tasks = [task.replace("{job_name}", job_name) for task in action_config.get(job_action, [])]
+
+    if not selected_tasks:
+        plan["status"] = "skipped"
+        return plan
+    if not tasks_config:
+        plan["status"] = "error"
+        plan["errors"].append(f"Missing {job_name}/{job_name}_config.json")
+        return plan
+
+    pipeline_name, etl_group = next(iter(tasks_config.items()))
+    plan.update({
+        "pipeline_name": pipeline_name,
+        "layout": etl_group.get("layout"),
+        "deadlines": etl_group.get("deadlines", {}),
+        "retry": etl_group.get("retry"),
+        "script_actions": etl_group.get("script_actions", []),
+    })
+    if plan["layout"] is not None:
+        try:
+            validate_layout(plan["layout"], f"{job_name}_config.json")
+        except ValueError as e:
+            plan["status"] = "error"
+            plan["errors"].append(str(e))
+            return plan
+
+    tasks = etl_group.get("tasks", {})
+    for task_name in selected_tasks:
+        task = {"name": task_name, "status": "ok", "task_conf": {}, "sql_path": None, "query": None, "reads": [], "writes": [], "errors": []}
+        plan["tasks"].append(task)
+        if task_name not in tasks:
+            task["status"] = "missing"
+            continue
+        task_conf = dict(tasks[task_name])
+        task_conf.update(task_overrides.get(task_name, {}))
+        task["task_conf"] = task_conf
+        if not task_conf.get("isEnable", True):
+            task["status"] = "disabled"
+            continue
+
+        sql_path, _, _ = get_task_paths(job_name, task_name, pipelines_root.parent)
+        task["sql_path"] = str(sql_path)
+        if not sql_path.exists():
+            task["errors"].append(f"{task_name}: template {sql_path.name} not found")
+        else:
+            query_template = read_file(sql_path)
+            try:
+                # Column projection / validation against the schema registry
+                task_conf.update(get_schema_params(pipelines_root, job_name, task_name, task_conf, query_template))
+            except ValueError as e:
+                task["errors"].append(f"{task_name}: {e}")
+            params = build_query_params(task_conf, project_id, job_name, job_action, y_m_d, run_time, plan["layout"])
+            query_template, params = apply_sampling(query_template, params)
+            query, errors = render_checked(query_template, params, sql_path.name)
+            task["errors"].extend(errors)
+            if query is not None:
+                task["query"] = query
+                task["reads"], task["writes"] = extract_lineage(query)
+        if task["errors"]:
+            task["status"] = "error"
+            plan["errors"].extend(task["errors"])
+
+    if plan["errors"]:
+        plan["status"] = "error"
+    return plan
+
+
+def check_lineage(plans: list, project_id: str, extra_reads: Optional[dict] = None) -> list:
+    """
+    Flag tables of the project that are read but that no compiled task writes.
+
+    Tables outside the project (sources), INFORMATION_SCHEMA views and the
+    daily_logs table are not checked.
+
+    Args:
+        plans (list): Compiled plans of every job and action
+        project_id (str): Google Cloud project ID
+        extra_reads (Optional[dict]): Reads of non-pipeline queries (monitors),
+            keyed by the name to report
+
+    Returns:
+        list: One error per unknown table, naming the readers
+    """
+    written = {ref for plan in plans for task in plan["tasks"] for ref in task["writes"]}
+    readers = {}
+    for plan in plans:
+        for task in plan["tasks"]:
+            for ref in task["reads"]:
+                readers.setdefault(ref, set()).add(f"{plan['job_name']}.{task['name']}")
+    for name, refs in (extra_reads or {}).items():
+        for ref in refs:
+            readers.setdefault(ref, set()).add(name)
+
+    errors = []
+    for ref, names in sorted(readers.items()):
+        if ref in written or not ref.startswith(f"{project_id}.") or "INFORMATION_SCHEMA" in ref:
+            continue
+        # daily_logs is written by insert_log (in the sandbox dataset in sampled mode)
+        if ref.rsplit(".", 1)[-1] == LOGS_TABLE.rsplit(".", 1)[-1]:
+            continue
+        errors.append(f"{ref} is read by {', '.join(sorted(names))} but no pipeline task writes it")
+    return errors
+
+
+def get_plan_key(pipelines_root: Path, project_id: str, job_name: str, job_action: str, y_m_d: str, task_overrides: Optional[dict] = None) -> str:
+    """
+    Return the cache key of a compiled plan.
+
+    Any change to a pipeline config, template or schema file (including
+    another job's consumer schema) changes the key. Files are keyed by path,
+    modification time and size, so no file is read.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(pipelines_root.rglob("*")):
+        if path.suffix in (".sql", ".json") and path.is_file():
+            st = path.stat()
+            digest.update(f"{path.relative_to(pipelines_root)}:{st.st_mtime_ns}:{st.st_size}\n".encode("utf-8"))
+    digest.update(json.dumps(
+        [PLAN_VERSION, project_id, job_name, job_action, y_m_d, task_overrides or {}, get_sampling()],
+        sort_keys=True, default=str,
+    ).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def get_plan_path(project_id: str, job_name: str, job_action: str, y_m_d: str, key: str) -> Path:
+    """Return the cache file of a compiled plan."""
+    return COMPILED_PLANS_DIR / project_id / job_name / f"{job_action}_{y_m_d}_{key}.json"
+
+
+def save_plan(path: Path, plan: dict) -> None:
+    """Write a plan atomically and keep only the newest plans of the job."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(plan, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+    cached = sorted(path.parent.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in cached[DEFAULT_COMPILED_PLANS_KEEP:]:
+        old.unlink(missing_ok=True)
+
+
+def get_cached_plan(
+    pipelines_root: Path,
+    project_id: str,
+    job_name: str,
+    job_action: str,
+    y_m_d: str,
+    task_overrides: Optional[dict] = None,
+) -> Optional[dict]:
+    """Return the cached plan of a job action (with "cached" set), or None when it must be compiled."""
+    key = get_plan_key(pipelines_root, project_id, job_name, job_action, y_m_d, task_overrides)
+    path = get_plan_path(project_id, job_name, job_action, y_m_d, key)
+    if not path.exists():
+        return None
+    try:
+        plan = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        print(f"[WARNING] Ignoring unreadable compiled plan {path}")
+        return None
+    if plan.get("version") != PLAN_VERSION:
+        return None
+    plan["cached"] = True
+    return plan
+
+
+def load_or_compile_job(
+    pipelines_root: Path,
+    project_id: str,
+    job_name: str,
+    job_action: str,
+    y_m_d: str,
+    run_time: datetime,
+    task_overrides: Optional[dict] = None,
+) -> dict:
+    """
+    Return the cached plan of a job action, compiling and caching it if needed.
+
+    Plans with errors are returned but not cached, so a fixed config is
+    picked up by the next run. Arguments are those of compile_job.
+
+    Returns:
+        dict: Plan (see compile_job), with "cached" set when reused
+    """
+    plan = get_cached_plan(pipelines_root, project_id, job_name, job_action, y_m_d, task_overrides)
+    if plan is not None:
+        return plan
+    plan = compile_job(pipelines_root, project_id, job_name, job_action, y_m_d, run_time, task_overrides)
+    if plan["status"] == "ok":
+        key = get_plan_key(pipelines_root, project_id, job_name, job_action, y_m_d, task_overrides)
+        save_plan(get_plan_path(project_id, job_name, job_action, y_m_d, key), plan)
+    plan["cached"] = False
+    return plan
@@ -2,16 +2,22 @@
 Project-wide constants for the Gaming BI System.
 
 Groups:
-- Paths: repo roots and temp directories
+- Paths: repo roots, temp, local state and cassette directories
 - Formatting: display/date formats
 - BigQuery: canonical table names
 - Defaults: default thresholds and flags
 """
+import os
 from pathlib import Path
 
 # Root directory paths
 ROOT_DIR = Path(__file__).resolve().parents[1]
 TEMP_DIR = ROOT_DIR / "temp"
+# BI_STATE_DIR isolates local state, e.g. for cassette replays
+STATE_DIR = Path(os.getenv("BI_STATE_DIR") or ROOT_DIR / "state")
+CASSETTES_DIR = ROOT_DIR / "cassettes"
+# Local columnar copies of the curated marts (BI_EXPORT_DIR overrides)
+EXPORTS_DIR = ROOT_DIR / "exports"
 
 # Directory names
 LOGS_DIR = "logs"
@@ -22,6 +28,18 @@ ALERTS_DIR = "alerts"
 TEMP_MONITORING = TEMP_DIR / "monitoring"
 TEMP_PIPELINES = TEMP_DIR / "pipelines"
 
+# Local state (persistent across runs, unlike temp/)
+KPI_HISTORY_DIR = STATE_DIR / "kpi_history"
+TABLE_HEALTH_DIR = STATE_DIR / "table_health"
+SCHEDULER_STATE_DIR = STATE_DIR / "scheduler"
+CHUNKED_INIT_DIR = STATE_DIR / "chunked_init"
+COMPILED_PLANS_DIR = STATE_DIR / "compiled"
+RECOMPUTE_STATE_DIR = STATE_DIR / "recompute"
+
+# Artifact store (per-run copies of temp files)
+ARTIFACT_RUNS_DIR = TEMP_DIR / "runs"
+ARTIFACT_OBJECTS_DIR = TEMP_DIR / "objects"
+
 # Titles and formatting
 TITLE_MONITORING = "[Logs Monitoring]"
 TITLE_PIPELINE = "[ETL Pipeline]"
@@ -31,6 +49,35 @@ DATETIME_FMT = "%Y-%m-%d %H:%M:%S"
 # BigQuery table names
 LOGS_TABLE = "logs.daily_logs"
 
+# `end` step messages of an ETL job; the scheduler's job_end sensor matches the success one
+ETL_END_MESSAGE = "ETL pipeline completed successfully for {date}"
+ETL_FAILED_END_MESSAGE = "ETL pipeline completed with errors for {date}"
+
 # Default values
 DEFAULT_THRESHOLD_HOURS = 24
 DEFAULT_DAYS_BACK = 0
+DEFAULT_KPI_BACKFILL_DAYS = 35
+DEFAULT_KPI_REFETCH_DAYS = 1
+DEFAULT_KPI_COMPACT_AFTER_PARTS = 50
+DEFAULT_TASK_TIMEOUT_SEC = 3600
+DEFAULT_MONITOR_QUERY_TIMEOUT_SEC = 600
+DEFAULT_RETRY_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_BASE_DELAY_SEC = 2.0
+DEFAULT_RETRY_MAX_DELAY_SEC = 60.0
+DEFAULT_RETRY_BUDGET_SEC = 300.0
+DEFAULT_MAX_INFLIGHT_QUERIES = 20
+DEFAULT_MAX_DML_PER_TABLE = 2
+DEFAULT_MAX_LOAD_JOBS = 4
+DEFAULT_ARTIFACT_COMPRESS_AFTER_DAYS = 2
+DEFAULT_ARTIFACT_RETENTION_DAYS = 30
+DEFAULT_ARTIFACT_MAX_MB = 2048
+# Unlinked blobs younger than this may still be linked by another process
+DEFAULT_ARTIFACT_GRACE_SEC = 3600
+DEFAULT_SCHEDULER_POLL_SEC = 300
+DEFAULT_SCHEDULER_CATCHUP_DAYS = 7
+DEFAULT_SCHEDULER_MAX_ATTEMPTS = 3
+DEFAULT_SCHEDULER_RETRY_AFTER_MIN = 30
+DEFAULT_SENSOR_SETTLE_MINUTES = 60
+DEFAULT_SAMPLE_COLUMN = "user_id"
+DEFAULT_SANDBOX_TABLE_EXPIRATION_DAYS = 7
+DEFAULT_COMPILED_PLANS_KEEP = 30
@@ -0,0 +1,117 @@
+"""
+Cost and slot attribution from INFORMATION_SCHEMA.JOBS metadata.
+
+Jobs are attributed through their labels (utilities/labels.py); jobs without
+labels are grouped as UNLABELED. Bytes billed are converted to an on-demand
+cost estimate with a configurable price per TiB, slot time to slot-hours.
+
+- summarize_costs: totals per group (default pipeline, job_name, task)
+- daily_costs: totals per day
+- day_over_day: one day against the day before, per group
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+UNLABELED = "(unlabeled)"
+LABEL_COLUMNS = ["pipeline", "job_name", "task", "job_action", "processing_date", "run_id"]
+COST_GROUP_KEYS = ["pipeline", "job_name", "task"]
+METRICS = ["jobs", "gib_billed", "slot_hours", "est_cost_usd"]
+DEFAULT_USD_PER_TIB = 6.25
+
+DEFAULT_COST_SETTINGS = {
+    "region": "us",
+    "job_types": ["QUERY", "LOAD"],
+    "lookback_days": 14,
+    "top_n": 10,
+    "usd_per_tib": DEFAULT_USD_PER_TIB,
+}
+
+
+def normalize_jobs(jobs: pd.DataFrame, usd_per_tib: float = DEFAULT_USD_PER_TIB) -> pd.DataFrame:
+    """
+    Add derived metrics to raw job rows.
+
+    Args:
+        jobs (pd.DataFrame): Rows of jobs_usage.sql (or a fixture with the same columns)
+        usd_per_tib (float): On-demand price per TiB billed
+
+    Returns:
+        pd.DataFrame: Jobs with label columns filled and gib_billed,
+            slot_hours, duration_sec and est_cost_usd columns
+    """
+    df = jobs.copy()
+    for column in LABEL_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+        df[column] = df[column].fillna(UNLABELED).astype(str)
+    df["job_date"] = pd.to_datetime(df["job_date"]).dt.strftime("%Y-%m-%d")
+    bytes_billed = pd.to_numeric(df["total_bytes_billed"], errors="coerce").fillna(0)
+    df["gib_billed"] = bytes_billed / 2**30
+    df["slot_hours"] = pd.to_numeric(df["total_slot_ms"], errors="coerce").fillna(0) / 3_600_000
+    df["duration_sec"] = pd.to_numeric(df["duration_ms"], errors="coerce") / 1000
+    df["est_cost_usd"] = bytes_billed / 2**40 * usd_per_tib
+    return df
+
+
+def summarize_costs(jobs: pd.DataFrame, by: Optional[list] = None) -> pd.DataFrame:
+    """
+    Total jobs, GiB billed, slot-hours, estimated cost and duration per group.
+
+    Args:
+        jobs (pd.DataFrame): Output of normalize_jobs
+        by (Optional[list]): Group columns (default: pipeline, job_name, task)
+
+    Returns:
+        pd.DataFrame: One row per group, most expensive first
+    """
+    by = by or COST_GROUP_KEYS
+    if jobs.empty:
+        return pd.DataFrame(columns=by + METRICS + ["p50_duration_sec", "max_duration_sec"])
+    grouped = jobs.groupby(by)
+    summary = pd.DataFrame({
+        "jobs": grouped.size(),
+        "gib_billed": grouped["gib_billed"].sum(),
+        "slot_hours": grouped["slot_hours"].sum(),
+        "est_cost_usd": grouped["est_cost_usd"].sum(),
+        "p50_duration_sec": grouped["duration_sec"].median(),
+        "max_duration_sec": grouped["duration_sec"].max(),
+    }).reset_index()
+    return summary.sort_values(["est_cost_usd", "slot_hours"], ascending=False).reset_index(drop=True).round(3)
+
+
+def daily_costs(jobs: pd.DataFrame) -> pd.DataFrame:
+    """Totals per job_date, oldest first."""
+    return summarize_costs(jobs, ["job_date"]).sort_values("job_date").reset_index(drop=True)
+
+
+def day_over_day(jobs: pd.DataFrame, day: str, by: Optional[list] = None) -> pd.DataFrame:
+    """
+    Compare each group's totals on `day` with the day before.
+
+    Args:
+        jobs (pd.DataFrame): Output of normalize_jobs
+        day (str): Day to compare (YYYY-MM-DD)
+        by (Optional[list]): Group columns (default: pipeline, job_name, task)
+
+    Returns:
+        pd.DataFrame: gib_billed and slot_hours of both days with deltas,
+            largest cost change first
+    """
+    by = by or COST_GROUP_KEYS
+    previous_day = (pd.Timestamp(day) - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    current = summarize_costs(jobs[jobs["job_date"] == day], by).set_index(by)
+    previous = summarize_costs(jobs[jobs["job_date"] == previous_day], by).set_index(by)
+    compared = current[["gib_billed", "slot_hours", "est_cost_usd"]].join(
+        previous[["gib_billed", "slot_hours", "est_cost_usd"]], how="outer", lsuffix="", rsuffix="_prev"
+    ).fillna(0)
+    if compared.empty:
+        return compared.reset_index()
+    compared["delta_gib"] = compared["gib_billed"] - compared["gib_billed_prev"]
+    compared["delta_slot_hours"] = compared["slot_hours"] - compared["slot_hours_prev"]
+    compared["delta_cost_usd"] = compared["est_cost_usd"] - compared["est_cost_usd_prev"]
+    compared["delta_cost_pct"] = (compared["delta_cost_usd"] / compared["est_cost_usd_prev"].where(compared["est_cost_usd_prev"] > 0)) * 100
+    compared = compared.reset_index()
+    order = compared["delta_cost_usd"].abs().sort_values(ascending=False).index
+    return compared.loc[order].reset_index(drop=True).round(3)
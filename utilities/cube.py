@@ -0,0 +1,187 @@
+"""
+Query router for the segment cube (pipelines/segment_cube/).
+
+Dashboards ask for a few measures per date range, optionally grouped by and
+filtered on segments. Without the cube every refresh re-aggregates
+fct_sessions / fct_purchases. route_aggregate answers such a request from
+the pre-aggregated cube when it can, and otherwise from the raw fact that
+holds the measures:
+
+    route = route_aggregate(pipelines_root, project_id, ["revenue", "payers"],
+                            "2026-09-01", "2026-09-30", group_by=["country"])
+    route["source"]   # "segment_cube"
+    route["query"]    # SUM(revenue), HLL_COUNT.MERGE(payers_sketch) per country
+
+A request goes to the cube when its dimensions and filters are all cube
+dimensions (dt, country, device_type, product_id, payment_provider) and no
+exact distinct count is asked for. Users and payers come from HLL++ sketches,
+about 0.5% off at precision 15. Activity measures (users, sessions, matches)
+cannot be split by product_id or payment_provider, from the cube or the facts.
+
+Other requests fall back to the one fact table holding every measure, dimension
+and filter, e.g. revenue by currency from fct_purchases, or exact=True. If no
+such table exists, ValueError explains why.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from .io import read_json
+from .labels import build_job_labels
+from .retry import RetryPolicy, run_query_with_retry
+from .sampling import resolve_dataset
+
+CUBE_JOB = "segment_cube"
+CUBE_DIMENSIONS = ("dt", "country", "device_type", "product_id", "payment_provider")
+PURCHASE_DIMENSIONS = ("product_id", "payment_provider")
+
+# measure -> grain of the cube rows holding it, cube aggregate, raw source and raw aggregate
+MEASURES = {
+    "users": {"grain": "activity", "cube": "HLL_COUNT.MERGE(users_sketch)", "fact": "sessions", "raw": "COUNT(DISTINCT user_id)", "distinct": True},
+    "sessions": {"grain": "activity", "cube": "SUM(sessions)", "fact": "sessions", "raw": "COUNT(*)"},
+    "session_seconds": {"grain": "activity", "cube": "SUM(session_seconds)", "fact": "sessions", "raw": "SUM(session_length_seconds)"},
+    "matches": {"grain": "activity", "cube": "SUM(matches)", "fact": "panel", "raw": "SUM(t_Match_Start)"},
+    "payers": {"grain": "purchase", "cube": "HLL_COUNT.MERGE(payers_sketch)", "fact": "purchases", "raw": "COUNT(DISTINCT user_id)", "distinct": True},
+    "purchases": {"grain": "purchase", "cube": "SUM(purchases)", "fact": "purchases", "raw": "COUNT(*)"},
+    "revenue": {"grain": "purchase", "cube": "SUM(revenue)", "fact": "purchases", "raw": "SUM(price)"},
+}
+
+# Columns each raw fact can be grouped or filtered by
+FACT_COLUMNS = {
+    "sessions": ("dt", "user_id", "session_id", "device_type", "country"),
+    "purchases": ("dt", "user_id", "transaction_id", "product_id", "product_name", "currency", "is_first_purchase", "payment_provider"),
+    "panel": ("dt", "user_id", "Level"),
+}
+
+
+def get_cube_sources(pipelines_root: Path) -> dict:
+    """
+    Return the fully qualified cube and fact tables from segment_cube_config.json.
+
+    Datasets are redirected to the sandbox in sampled mode.
+
+    Returns:
+        dict: cube, sessions, purchases and panel -> `dataset.table`
+    """
+    _, cube_group = next(iter(read_json(pipelines_root / CUBE_JOB / f"{CUBE_JOB}_config.json").items()))
+    conf = cube_group["tasks"][f"load_{CUBE_JOB}"]
+    return {
+        "cube": f"{resolve_dataset(conf['dataset_dst'])}.{conf['table_dst']}",
+        "sessions": f"{resolve_dataset(conf['dataset_src'])}.{conf['table_sessions']}",
+        "purchases": f"{resolve_dataset(conf['dataset_src'])}.{conf['table_purchases']}",
+        "panel": f"{resolve_dataset(conf['dataset_panels'])}.{conf['table_panel']}",
+    }
+
+
+def _sql_literal(value) -> str:
+    """Render a filter value as a SQL literal."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _where(start_date: str, end_date: str, filters: dict, extra: Optional[list] = None) -> str:
+    """Return the WHERE clause of a date range, equality / IN filters and extra predicates."""
+    predicates = [f'dt BETWEEN DATE("{start_date}") AND DATE("{end_date}")'] + (extra or [])
+    for column, value in filters.items():
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        predicates.append(f"{column} IN ({', '.join(_sql_literal(v) for v in values)})")
+    return "\n  AND ".join(predicates)
+
+
+def _select(project_id: str, table: str, aggregates: list, group_by: list, where: str) -> str:
+    """Return an aggregate query over one table."""
+    select = ",\n  ".join(list(group_by) + aggregates)
+    query = f"SELECT\n  {select}\nFROM `{project_id}.{table}`\nWHERE {where}"
+    if group_by:
+        positions = ", ".join(str(i) for i in range(1, len(group_by) + 1))
+        query += f"\nGROUP BY {positions}\nORDER BY {positions}"
+    return query
+
+
+def route_aggregate(
+    pipelines_root: Path,
+    project_id: str,
+    measures: list,
+    start_date: str,
+    end_date: str,
+    group_by: Optional[list] = None,
+    filters: Optional[dict] = None,
+    exact: bool = False,
+) -> dict:
+    """
+    Build the query of an aggregate request, on the segment cube when it can answer it.
+
+    Args:
+        pipelines_root (Path): pipelines/ directory
+        project_id (str): Google Cloud project ID
+        measures (list): Measure names (see MEASURES)
+        start_date (str): First date, YYYY-MM-DD
+        end_date (str): Last date, YYYY-MM-DD
+        group_by (Optional[list]): Dimensions to group by
+        filters (Optional[dict]): Column -> value or list of values
+        exact (bool): Exact distinct counts (users, payers) instead of sketches
+
+    Returns:
+        dict: source (segment_cube, sessions, purchases or panel), table,
+            query and reason (why the cube was not used, None when it was)
+
+    Raises:
+        ValueError: If a measure is unknown or no table can answer the request
+    """
+    group_by = list(group_by or [])
+    filters = dict(filters or {})
+    unknown = [m for m in measures if m not in MEASURES]
+    if not measures or unknown:
+        raise ValueError(f"Unknown measures: {', '.join(unknown) or '(none)'} (expected some of {', '.join(MEASURES)})")
+    sources = get_cube_sources(pipelines_root)
+    columns = group_by + list(filters)
+    grains = {MEASURES[m]["grain"] for m in measures}
+
+    if "activity" in grains and set(columns) & set(PURCHASE_DIMENSIONS):
+        raise ValueError(f"{', '.join(m for m in measures if MEASURES[m]['grain'] == 'activity')} cannot be split by {', '.join(PURCHASE_DIMENSIONS)}")
+
+    reason = None
+    if exact and any(MEASURES[m].get("distinct") for m in measures):
+        reason = "exact distinct counts requested"
+    elif not set(columns) <= set(CUBE_DIMENSIONS):
+        reason = f"not a cube dimension: {', '.join(sorted(set(columns) - set(CUBE_DIMENSIONS)))}"
+
+    if reason is None:
+        # Purchase rows hold no activity measures and the other way round: read only the rows needed
+        extra = [f"grain = '{grains.pop()}'"] if len(grains) == 1 else []
+        aggregates = [f"{MEASURES[m]['cube']} AS {m}" for m in measures]
+        query = _select(project_id, sources["cube"], aggregates, group_by, _where(start_date, end_date, filters, extra))
+        return {"source": CUBE_JOB, "table": sources["cube"], "query": query, "reason": None}
+
+    facts = {MEASURES[m]["fact"] for m in measures}
+    fact = facts.pop() if len(facts) == 1 else None
+    if fact is None or not set(columns) <= set(FACT_COLUMNS[fact]):
+        raise ValueError(f"Neither the cube ({reason}) nor a single fact table can answer {', '.join(measures)} by {', '.join(columns) or 'date range'}")
+    aggregates = [f"{MEASURES[m]['raw']} AS {m}" for m in measures]
+    query = _select(project_id, sources[fact], aggregates, group_by, _where(start_date, end_date, filters))
+    return {"source": fact, "table": sources[fact], "query": query, "reason": reason}
+
+
+def run_aggregate(client, pipelines_root: Path, project_id: str, measures: list, start_date: str, end_date: str, group_by: Optional[list] = None, filters: Optional[dict] = None, exact: bool = False, policy: Optional[RetryPolicy] = None, timeout_sec: Optional[float] = None):
+    """
+    Run an aggregate request on the table chosen by route_aggregate.
+
+    Args:
+        client: BigQuery client
+        policy (Optional[RetryPolicy]): Retry settings
+        timeout_sec (Optional[float]): Query timeout
+        Other arguments: see route_aggregate
+
+    Returns:
+        pd.DataFrame: One row per group, one column per dimension and measure
+    """
+    route = route_aggregate(pipelines_root, project_id, measures, start_date, end_date, group_by, filters, exact)
+    if route["reason"]:
+        print(f"[WARNING] Reading {route['table']} instead of the segment cube: {route['reason']}")
+    return run_query_with_retry(
+        client, route["query"], policy=policy, timeout_sec=timeout_sec, to_dataframe=True,
+        labels=build_job_labels(CUBE_JOB, route["source"], task="aggregate"),
+    )
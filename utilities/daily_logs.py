@@ -10,24 +10,32 @@ import uuid
 import platform
 import os
 import inspect
+import threading
 from typing import Optional
 import pandas as pd
+from google.cloud import bigquery
 
 from .constants import LOGS_TABLE
 from .bq import get_bq_client
+from .admission import admit
+from .labels import build_job_labels
+from .sampling import get_sampling
 
 
 _STEP_COUNTER = 0
+_STEP_LOCK = threading.Lock()
 
 
 def next_step_id() -> int:
     """Return the next sequential step id for the current process.
 
     This counter is process-local and is not persisted across runs.
+    It is thread-safe so concurrent jobs in one process get unique ids.
     """
     global _STEP_COUNTER
-    _STEP_COUNTER += 1
-    return _STEP_COUNTER
+    with _STEP_LOCK:
+        _STEP_COUNTER += 1
+        return _STEP_COUNTER
 
 
 def insert_log(
@@ -41,7 +49,7 @@ def insert_log(
     step_id: Optional[int] = None,
     file_name: Optional[str] = None,
 ) -> bool:
-    """Insert a log record into `logs.daily_logs`.
+    """Insert a log record into `logs.daily_logs` (`<sandbox>.daily_logs` with --sample).
 
     Args:
         project_id: Target GCP project
@@ -66,7 +74,9 @@ def insert_log(
             return False
 
     try:
-        log_table = f"{project_id}.{LOGS_TABLE}"
+        # Sampled runs log to the sandbox so sensors and reports never see them
+        sampling = get_sampling()
+        log_table = f"{project_id}.{sampling['dataset']}.daily_logs" if sampling else f"{project_id}.{LOGS_TABLE}"
 
         assigned_step_id = step_id if step_id is not None else next_step_id()
 
@@ -98,7 +108,9 @@ def insert_log(
         }
 
         df = pd.DataFrame(log_record, index=[0])
-        client.load_table_from_dataframe(df, log_table).result()
+        job_config = bigquery.LoadJobConfig(labels=build_job_labels("daily_logs", job_name, job_action, task=step_name))
+        with admit(project_id, "load"):
+            client.load_table_from_dataframe(df, log_table, job_config=job_config).result()
         return True
     except Exception as e:
         print(f"[WARNING] Could not log to BigQuery: {e}")
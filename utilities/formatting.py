@@ -5,13 +5,52 @@ used across all ETL and monitoring scripts.
 """
 
 from datetime import datetime, date, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import pandas as pd
 
+from .layout import build_layout_params
+from .run_context import set_run_info
+from .sampling import apply_sampling
+from .cassette import get_pinned_now
 
-def format_query_template(query_template: str, task_conf: dict, project_id: str, job_name: str, job_action: str, y_m_d: str, run_time: datetime) -> str:
+
+def build_query_params(task_conf: dict, project_id: str, job_name: str, job_action: str, y_m_d: str, run_time: datetime, layout: Optional[dict] = None) -> dict:
+    """
+    Return the format parameters of a pipeline task template.
+
+    Args:
+        task_conf (dict): Task-specific configuration
+        project_id (str): Google Cloud project ID
+        job_name (str): Job name
+        job_action (str): Job action
+        y_m_d (str): Date string in YYYY-MM-DD format
+        run_time (datetime): Current run time
+        layout (Optional[dict]): Layout block of the job config
+
+    Returns:
+        dict: Task config plus layout clauses and the standard parameters
+    """
+    return {
+        "chunk_filter": "TRUE",
+        **task_conf,
+        **build_layout_params(layout),
+        "date": y_m_d,
+        "run_time": run_time,
+        "project": project_id,
+        "job_name": job_name,
+        "job_action": job_action,
+    }
+
+
+def format_query_template(query_template: str, task_conf: dict, project_id: str, job_name: str, job_action: str, y_m_d: str, run_time: datetime, layout: Optional[dict] = None) -> str:
     """
     Format a SQL query template with standard parameters.
+
+    Init templates get the DDL clauses of the job's layout block as
+    {partition_by_clause}, {cluster_by_clause} and {layout_options}, and
+    {chunk_filter} (TRUE unless a chunked init sets it per chunk). In
+    sampled mode (--sample) source tables are sampled and datasets point to
+    the developer's sandbox (utilities/sampling.py).
     
     Args:
         query_template (str): SQL template string
@@ -21,18 +60,14 @@ def format_query_template(query_template: str, task_conf: dict, project_id: str,
         job_action (str): Job action
         y_m_d (str): Date string in YYYY-MM-DD format
         run_time (datetime): Current run time
+        layout (Optional[dict]): Layout block of the job config
         
     Returns:
         str: Formatted SQL query
     """
-    return query_template.format(
-        **task_conf,
-        date=y_m_d,
-        run_time=run_time,
-        project=project_id,
-        job_name=job_name,
-        job_action=job_action
-    )
+    params = build_query_params(task_conf, project_id, job_name, job_action, y_m_d, run_time, layout)
+    query_template, params = apply_sampling(query_template, params)
+    return query_template.format(**params)
 
 
 def df_to_string_table(df: pd.DataFrame) -> str:
@@ -51,7 +86,7 @@ def df_to_string_table(df: pd.DataFrame) -> str:
     # Find the maximum width of each column, but cap at reasonable limits
     column_widths = {}
     for column in df.columns:
-        max_content_width = df[column].astype(str).apply(len).max()
+        max_content_width = df[column].map(str).map(len).max()
         column_width = min(max(max_content_width, len(column)), 30)  # Cap at 30 chars
         column_widths[column] = column_width
     
@@ -102,6 +137,31 @@ def df_to_compact_table(df: pd.DataFrame) -> str:
     return "\n".join(lines)
 
 
+def df_to_markdown_table(df: pd.DataFrame) -> str:
+    """
+    Convert DataFrame to a markdown pipe table.
+    
+    Args:
+        df (pd.DataFrame): DataFrame to format
+        
+    Returns:
+        str: Markdown table string
+    """
+    if df.empty:
+        return "No data to display"
+    
+    def cell(value) -> str:
+        return "" if pd.isna(value) else str(value).replace("|", "\\|")
+    
+    lines = [
+        "| " + " | ".join(str(column) for column in df.columns) + " |",
+        "|" + "|".join("---" for _ in df.columns) + "|",
+    ]
+    for _, row in df.iterrows():
+        lines.append("| " + " | ".join(cell(row[column]) for column in df.columns) + " |")
+    return "\n".join(lines)
+
+
 def get_date_params(days_back: int = 0) -> tuple[date, datetime, str]:
     """
     Get standardized date parameters.
@@ -112,8 +172,11 @@ def get_date_params(days_back: int = 0) -> tuple[date, datetime, str]:
     Returns:
         tuple[date, datetime, str]: (date_today, run_time, y_m_d)
     """
-    date_today = date.today()
-    run_time = datetime.now()
+    # Cassette replays run at the time they were recorded
+    run_time = get_pinned_now() or datetime.now()
+    date_today = run_time.date()
     y_m_d = (date_today + timedelta(days=-days_back)).strftime("%Y-%m-%d")
+    # Every entry point calls this once: tag the run's artifacts with its date
+    set_run_info(date=y_m_d)
     
     return date_today, run_time, y_m_d
@@ -9,6 +9,8 @@ from pathlib import Path
 from datetime import datetime, date
 from typing import Union, Dict, Any
 
+from .artifacts import is_artifact_path, store_artifact
+
 
 def header(msg: str) -> None:
     """
@@ -43,11 +45,17 @@ def read_file(path: Path) -> str:
 def write_file(path: Path, content: str) -> None:
     """
     Write content to a text file, creating directories if needed.
+
+    Files under temp/ are also kept in the current run of the artifact
+    store (see utilities.artifacts), so later runs do not lose them.
     
     Args:
         path (Path): Path where to write the file
         content (str): Content to write to file
     """
+    if is_artifact_path(path):
+        store_artifact(path, content)
+        return
     ensure_dir(path.parent)
     with open(path, "w", newline='', encoding='utf-8') as file:
         file.write(content)
@@ -0,0 +1,138 @@
+"""
+Job graph utilities for Gaming BI System.
+This module loads the pipeline dependency graph (pipelines/job_graph.json)
+and resolves execution order between jobs.
+
+Jobs also declare how they are recomputed when upstream partitions change
+(pipelines/recompute/recompute.py):
+
+    "kpi_daily": {
+      "depends_on": ["dim_user", "fct_sessions", "fct_purchases"],
+      "recompute": "partition",            # or "rebuild" (one init run)
+      "lag_days": {"dim_user": [0, 1]}     # output dates affected by an upstream date
+    }
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .io import read_json
+
+RECOMPUTE_MODES = ("partition", "rebuild")
+DEFAULT_RECOMPUTE_SETTINGS = {
+    "lookback_days": 90,
+    "parallelism": 4,
+    "watch": [],
+}
+
+
+def load_job_graph(path: Path, jobs: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """
+    Load the job graph and return upstream dependencies per job.
+
+    Args:
+        path (Path): Path to job_graph.json
+        jobs (Optional[List[str]]): Restrict the graph to these jobs; dependencies
+            on jobs outside the selection are dropped
+
+    Returns:
+        Dict[str, List[str]]: Mapping of job name to its upstream job names
+
+    Raises:
+        ValueError: If the graph is missing, references unknown jobs or has a cycle
+    """
+    graph_conf = read_json(path).get("jobs", {})
+    if not graph_conf:
+        raise ValueError(f"No jobs defined in job graph: {path}")
+
+    unknown = [job for job in (jobs or []) if job not in graph_conf]
+    if unknown:
+        raise ValueError(f"Jobs not defined in job graph: {', '.join(unknown)}")
+
+    selected = jobs or list(graph_conf.keys())
+    graph = {}
+    for job in selected:
+        depends_on = graph_conf[job].get("depends_on", [])
+        missing = [dep for dep in depends_on if dep not in graph_conf]
+        if missing:
+            raise ValueError(f"Job {job} depends on unknown jobs: {', '.join(missing)}")
+        graph[job] = [dep for dep in depends_on if dep in selected]
+
+    topological_order(graph)  # validates there is no cycle
+    return graph
+
+
+def topological_order(graph: Dict[str, List[str]]) -> List[str]:
+    """
+    Return jobs ordered so every job comes after its upstream jobs.
+
+    Ties keep the declaration order of the graph.
+
+    Args:
+        graph (Dict[str, List[str]]): Mapping of job name to upstream job names
+
+    Returns:
+        List[str]: Jobs in dependency order
+
+    Raises:
+        ValueError: If the graph has a cycle
+    """
+    ordered = []
+    done = set()
+    while len(ordered) < len(graph):
+        ready = [job for job, deps in graph.items() if job not in done and all(dep in done for dep in deps)]
+        if not ready:
+            remaining = [job for job in graph if job not in done]
+            raise ValueError(f"Cycle detected in job graph between: {', '.join(remaining)}")
+        for job in ready:
+            ordered.append(job)
+            done.add(job)
+    return ordered
+
+
+def downstream_jobs(graph: Dict[str, List[str]], job_name: str) -> List[str]:
+    """
+    Return every job that transitively depends on the given job.
+
+    Args:
+        graph (Dict[str, List[str]]): Mapping of job name to upstream job names
+        job_name (str): Upstream job name
+
+    Returns:
+        List[str]: Downstream jobs in dependency order
+    """
+    affected = {job_name}
+    for job in topological_order(graph):
+        if any(dep in affected for dep in graph[job]):
+            affected.add(job)
+    affected.discard(job_name)
+    return [job for job in topological_order(graph) if job in affected]
+
+
+def load_recompute_settings(path: Path) -> dict:
+    """
+    Load how every job of the graph is recomputed after upstream changes.
+
+    Args:
+        path (Path): Path to job_graph.json
+
+    Returns:
+        dict: settings (top-level "recompute" block over
+            DEFAULT_RECOMPUTE_SETTINGS) and jobs: job name -> {"mode",
+            "lag_days": upstream job or table -> list of day offsets}
+
+    Raises:
+        ValueError: If a mode is unknown or a lag is negative
+    """
+    graph_conf = read_json(path)
+    jobs = {}
+    for job, conf in graph_conf.get("jobs", {}).items():
+        mode = conf.get("recompute", "partition")
+        if mode not in RECOMPUTE_MODES:
+            raise ValueError(f"Job {job}: recompute must be one of {', '.join(RECOMPUTE_MODES)}, got {mode}")
+        lag_days = conf.get("lag_days", {})
+        for upstream, lags in lag_days.items():
+            if not lags or any(not isinstance(lag, int) or lag < 0 for lag in lags):
+                raise ValueError(f"Job {job}: lag_days.{upstream} must be a non-empty list of days >= 0")
+        jobs[job] = {"mode": mode, "lag_days": lag_days}
+    return {"settings": {**DEFAULT_RECOMPUTE_SETTINGS, **graph_conf.get("recompute", {})}, "jobs": jobs}
@@ -0,0 +1,291 @@
+"""
+Transactional multi-statement scripts for pipeline jobs.
+
+In script mode (etl_runner --script, or the job action listed in the
+config's "script_actions"), the tasks of a job action are not submitted as
+one query job each. Their rendered queries are concatenated into a single
+BigQuery script:
+
+    BEGIN
+    BEGIN TRANSACTION;
+    -- task: clear_table
+    DELETE ...;
+    -- task: load_user_panel
+    UPDATE ...;
+    INSERT ...;
+    COMMIT TRANSACTION;
+    EXCEPTION WHEN ERROR THEN
+    ROLLBACK TRANSACTION;
+    RAISE USING MESSAGE = @@error.message;
+    END;
+
+The job pays one submission, admission and scheduling round-trip instead of
+one per task, and its writes are all-or-nothing. A failure after the DELETE
+rolls the partition back instead of leaving it empty until the next run.
+
+BigQuery runs every statement of a script as a child job. Afterwards the
+child jobs are listed and mapped back to their task by the script line they
+start on, so type, affected rows, bytes and slot time are logged per
+statement. When the script fails, the failed statement is also found this way.
+
+A transaction can only hold SELECT and DML (INSERT, UPDATE, DELETE, MERGE).
+A job whose tasks contain anything else (CREATE, DROP, TRUNCATE, ...) runs
+task by task.
+"""
+
+import re
+from pathlib import Path
+from typing import Optional
+
+from .io import write_file
+from .daily_logs import insert_log, next_step_id
+from .labels import build_job_labels
+from .retry import RetryPolicy, build_job_id_prefix, run_query_with_retry
+from .run_context import get_run_id
+from .watchdog import Deadline, QueryTimeoutError, record_timeout
+
+TRANSACTIONAL_KEYWORDS = {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "MERGE"}
+
+SCRIPT_HEADER = "BEGIN\nBEGIN TRANSACTION;\n"
+SCRIPT_FOOTER = (
+    "COMMIT TRANSACTION;\n"
+    "EXCEPTION WHEN ERROR THEN\n"
+    "ROLLBACK TRANSACTION;\n"
+    "RAISE USING MESSAGE = @@error.message;\n"
+    "END;\n"
+)
+
+# Literals and backticked names (project ids may contain "--"), comments, statement separators
+_TOKEN_RE = re.compile(r"(`[^`]*`|'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")|(/\*.*?\*/|--[^\n]*)|(;)", re.DOTALL)
+
+
+def _code_span(sql: str) -> Optional[tuple]:
+    """Return (start, end) of the code in a piece of SQL without separators, ignoring leading and trailing comments."""
+    code_start = code_end = None
+    position = 0
+    for match in list(_TOKEN_RE.finditer(sql)) + [None]:
+        gap_end = match.start() if match else len(sql)
+        gap = sql[position:gap_end]
+        if gap.strip():
+            code_start = code_start if code_start is not None else position + len(gap) - len(gap.lstrip())
+            code_end = position + len(gap.rstrip())
+        if match is None:
+            break
+        if match.group(1):
+            code_start = code_start if code_start is not None else match.start()
+            code_end = match.end()
+        position = match.end()
+    return (code_start, code_end) if code_start is not None else None
+
+
+def split_statements(query: str) -> list:
+    """
+    Split a rendered query into its statements.
+
+    Semicolons inside literals, backticked names and comments do not split.
+    Comments before a statement are kept with it, while comments after the
+    last statement (e.g. validation snippets) are dropped.
+
+    Args:
+        query (str): Rendered SQL, with or without a final semicolon
+
+    Returns:
+        list: Statements, each ending with a semicolon
+    """
+    pieces = []
+    start = 0
+    for match in _TOKEN_RE.finditer(query):
+        if match.group(3):
+            pieces.append(query[start:match.start()])
+            start = match.end()
+    pieces.append(query[start:])
+
+    statements = []
+    for piece in pieces:
+        span = _code_span(piece)
+        if span:
+            statements.append(piece[:span[1]].strip() + ";")
+    return statements
+
+
+def statement_keyword(statement: str) -> str:
+    """Return the first keyword of a statement, ignoring comments."""
+    span = _code_span(statement.rstrip().rstrip(";"))
+    match = re.match(r"[(\s]*([A-Za-z_]+)", statement[span[0]:]) if span else None
+    return match.group(1).upper() if match else ""
+
+
+def build_job_script(tasks: list) -> dict:
+    """
+    Concatenate the rendered queries of a job's tasks into one transactional script.
+
+    Args:
+        tasks (list): Compiled plan tasks to run, in order (name and query)
+
+    Returns:
+        dict: script, statements (task, index, keyword, first and last
+            script line of each), and non_transactional ("task: KEYWORD" of
+            every statement a transaction cannot hold)
+    """
+    lines = SCRIPT_HEADER.splitlines()
+    statements = []
+    non_transactional = []
+    for task in tasks:
+        lines.append(f"-- task: {task['name']}")
+        for index, statement in enumerate(split_statements(task["query"]), start=1):
+            keyword = statement_keyword(statement)
+            if keyword not in TRANSACTIONAL_KEYWORDS:
+                non_transactional.append(f"{task['name']}: {keyword or '?'}")
+            statement_lines = statement.splitlines()
+            # Child jobs report the line the statement's code starts on, after any leading comments
+            leading = statement[:_code_span(statement)[0]].count("\n")
+            statements.append({
+                "task": task["name"],
+                "index": index,
+                "keyword": keyword,
+                "start_line": len(lines) + 1 + leading,
+                "end_line": len(lines) + len(statement_lines),
+            })
+            lines.extend(statement_lines)
+    lines.extend(SCRIPT_FOOTER.splitlines())
+    return {"script": "\n".join(lines) + "\n", "statements": statements, "non_transactional": non_transactional}
+
+
+def match_statement(statements: list, line: Optional[int]) -> Optional[dict]:
+    """Return the script statement spanning a line (None for BEGIN/COMMIT/ROLLBACK and unknown lines)."""
+    if line is None:
+        return None
+    for statement in statements:
+        if statement["start_line"] <= line <= statement["end_line"]:
+            return statement
+    return None
+
+
+def collect_statement_stats(client, script_job_id: str, statements: list) -> list:
+    """
+    Return the statistics of a script's child jobs, mapped back to their tasks.
+
+    Args:
+        client: BigQuery client
+        script_job_id (str): Job id of the script
+        statements (list): Statements of build_job_script
+
+    Returns:
+        list: One dict per child job in script order: task, statement
+            ("2/3" within its task), statement_type, rows, bytes_processed,
+            slot_sec, duration_sec and error
+    """
+    per_task = {}
+    for statement in statements:
+        per_task[statement["task"]] = per_task.get(statement["task"], 0) + 1
+
+    children = []
+    for child in client.list_jobs(parent_job=script_job_id):
+        frames = child.script_statistics.stack_frames if child.script_statistics else []
+        line = frames[0].start_line if frames else None
+        statement = match_statement(statements, line)
+        duration = (child.ended - child.started).total_seconds() if child.started and child.ended else None
+        children.append({
+            "line": line or 0,
+            "task": statement["task"] if statement else None,
+            "statement": f"{statement['index']}/{per_task[statement['task']]}" if statement else None,
+            "statement_type": getattr(child, "statement_type", None),
+            "rows": getattr(child, "num_dml_affected_rows", None),
+            "bytes_processed": getattr(child, "total_bytes_processed", None),
+            "slot_sec": round((getattr(child, "slot_millis", None) or 0) / 1000, 1),
+            "duration_sec": round(duration, 1) if duration is not None else None,
+            "error": (child.error_result or {}).get("message") if child.error_result else None,
+        })
+    return sorted(children, key=lambda child: child["line"])
+
+
+def run_job_script(
+    client,
+    project_id: str,
+    pipeline_name: str,
+    job_name: str,
+    job_action: str,
+    job_script: dict,
+    y_m_d: str,
+    logs_path: Path,
+    dry_run: bool = False,
+    policy: Optional[RetryPolicy] = None,
+    timeout_sec: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    priority: str = "interactive",
+    dml_table: Optional[str] = None,
+) -> dict:
+    """
+    Run a job's tasks as one transactional script and log per-statement statistics.
+
+    Args:
+        client: BigQuery client or None in dry-run
+        project_id (str): Google Cloud project ID
+        pipeline_name (str): ETL group name, used in job labels
+        job_name (str): Pipeline job name
+        job_action (str): Job action
+        job_script (dict): Output of build_job_script
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        logs_path (Path): Where the script SQL is written (script.sql)
+        dry_run (bool): Write the script without running it
+        policy (Optional[RetryPolicy]): Retry settings of the script job
+        timeout_sec (Optional[float]): Timeout of the whole script
+        deadline (Optional[Deadline]): Run deadline
+        priority (str): Priority class of the script job
+        dml_table (Optional[str]): Table counted against the per-table DML cap
+
+    Returns:
+        dict: status (success or failed), job_id, statements (see
+            collect_statement_stats), failed_task, error and queue_wait_sec
+    """
+    tasks = list(dict.fromkeys(statement["task"] for statement in job_script["statements"]))
+    write_file(logs_path / "script.sql", job_script["script"])
+    result = {"status": "success", "job_id": None, "statements": [], "failed_task": None, "error": None, "queue_wait_sec": 0.0}
+    if dry_run or client is None:
+        print(f"[DRY-RUN] Would execute {len(job_script['statements'])} statements of {', '.join(tasks)} in one transaction")
+        return result
+
+    insert_log(
+        project_id, job_name, job_action, "execute_query",
+        f"Executing transactional script of {len(job_script['statements'])} statements ({', '.join(tasks)}) for task: script",
+        client, dry_run, step_id=next_step_id(),
+    )
+    query_stats = {}
+    try:
+        run_query_with_retry(
+            client, job_script["script"], build_job_id_prefix(job_name, "script", y_m_d, get_run_id()), policy, timeout_sec, deadline,
+            priority=priority,
+            dml_table=dml_table,
+            stats=query_stats,
+            labels=build_job_labels(pipeline_name, job_name, job_action, y_m_d, "script"),
+        )
+    except QueryTimeoutError as e:
+        record_timeout(project_id, job_name, job_action, "script", e, client, dry_run)
+        result["status"] = "failed"
+        result["error"] = str(e)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["job_id"] = query_stats.get("job_id")
+    result["queue_wait_sec"] = round(query_stats.get("queue_wait_sec", 0.0), 3)
+
+    if result["job_id"]:
+        try:
+            result["statements"] = collect_statement_stats(client, result["job_id"], job_script["statements"])
+        except Exception as e:
+            print(f"[WARNING] Could not read the statements of script {result['job_id']}: {e}")
+    for child in result["statements"]:
+        if child["task"] is None:
+            continue
+        if child["error"]:
+            result["failed_task"] = result["failed_task"] or child["task"]
+        gb = (child["bytes_processed"] or 0) / 1024 ** 3
+        insert_log(
+            project_id, job_name, job_action, "statement_stats",
+            f"{child['statement_type']} {child['statement']} for task: {child['task']}: "
+            f"{child['rows'] if child['rows'] is not None else '-'} rows, {gb:.2f} GB processed, "
+            f"{child['slot_sec']}s slot time, {child['duration_sec']}s"
+            + (f", failed: {child['error']}" if child["error"] else ""),
+            client, dry_run, step_id=next_step_id(),
+        )
+    return result
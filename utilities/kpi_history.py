@@ -0,0 +1,309 @@
+"""
+Local KPI history store for Gaming BI System.
+
+Keeps a columnar (Parquet) history of daily KPI values per project under
+state/kpi_history/<project_id>/. Every monitoring run appends one part file
+per KPI with the newest dates fetched from the warehouse; readers keep the
+most recently ingested value per (kpi, date). Once the parts pass a
+threshold they are compacted into one deduplicated part, so the directory
+holds at most one row per (kpi, date) plus the parts of the latest runs. Baselines such as
+previous day, rolling mean, same weekday and z-score are computed locally,
+vectorized over all stored series.
+"""
+
+import os
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pandas as pd
+
+from .io import ensure_dir
+
+HISTORY_COLUMNS = ["kpi", "date", "metric", "table_name", "ingested_at"]
+
+
+def get_kpi_history_dir(history_root: Path, project_id: str) -> Path:
+    """Return the history directory for a project."""
+    return history_root / project_id
+
+
+def load_kpi_history(history_dir: Path, parts: Optional[list] = None) -> pd.DataFrame:
+    """
+    Load the KPI history of a project.
+
+    Args:
+        history_dir (Path): Project history directory
+        parts (Optional[list]): Part files to read (default: all)
+
+    Returns:
+        pd.DataFrame: One row per (kpi, date) with the latest ingested value
+    """
+    parts = list_history_parts(history_dir) if parts is None else parts
+    if not parts:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    history = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+    history["date"] = pd.to_datetime(history["date"]).dt.normalize()
+    history = (
+        history.sort_values("ingested_at")
+        .drop_duplicates(subset=["kpi", "date"], keep="last")
+        .sort_values(["kpi", "date"])
+        .reset_index(drop=True)
+    )
+    return history[HISTORY_COLUMNS]
+
+
+def append_kpi_history(history_dir: Path, df: pd.DataFrame, kpi_name: str, run_time: datetime) -> Optional[Path]:
+    """
+    Append fetched KPI values as a new part file.
+
+    Args:
+        history_dir (Path): Project history directory
+        df (pd.DataFrame): Query result with date, metric and table_name columns
+        kpi_name (str): KPI name
+        run_time (datetime): Current run time, stored as ingested_at
+
+    Returns:
+        Optional[Path]: Written part file, or None when there was nothing to append
+    """
+    if df is None or df.empty:
+        return None
+
+    part = pd.DataFrame({
+        "kpi": kpi_name,
+        "date": pd.to_datetime(df["date"]).dt.normalize(),
+        "metric": pd.to_numeric(df["metric"], errors="coerce").astype("float64"),
+        "table_name": df["table_name"].astype(str) if "table_name" in df else "",
+        "ingested_at": pd.Timestamp(run_time),
+    })
+    ensure_dir(history_dir)
+    part_file = history_dir / f"part-{run_time.strftime('%Y%m%dT%H%M%S%f')}-{kpi_name}.parquet"
+    part.to_parquet(part_file, index=False)
+    return part_file
+
+
+def list_history_parts(history_dir: Path) -> list:
+    """Return the part files of a history directory, oldest first."""
+    return sorted(history_dir.glob("part-*.parquet")) if history_dir.exists() else []
+
+
+def replace_history_parts(history_dir: Path, history: pd.DataFrame, parts: list, run_time: datetime) -> Path:
+    """
+    Write a loaded history as one part file and remove the parts it was read from.
+
+    The new part is written under a temporary name first, so readers never see
+    a partial file. Parts appended after `parts` were listed are kept.
+
+    Args:
+        history_dir (Path): History directory
+        history (pd.DataFrame): Deduplicated history loaded from `parts`
+        parts (list): Part files to replace
+        run_time (datetime): Current run time, used for the compacted file name
+
+    Returns:
+        Path: Compacted part file
+    """
+    compacted = history_dir / f"part-{run_time.strftime('%Y%m%dT%H%M%S%f')}-compacted.parquet"
+    tmp = history_dir / f".{compacted.name}.tmp"
+    history.to_parquet(tmp, index=False)
+    os.replace(tmp, compacted)
+    for part in parts:
+        if part != compacted:
+            part.unlink(missing_ok=True)
+    return compacted
+
+
+def compact_kpi_history(history_dir: Path, run_time: datetime, max_parts: int = 1) -> Optional[Path]:
+    """
+    Rewrite all part files of a project into a single deduplicated part.
+
+    Every run appends one part per KPI, so the monitoring run compacts once
+    the history holds more than `max_parts` files.
+
+    Args:
+        history_dir (Path): Project history directory
+        run_time (datetime): Current run time, used for the compacted file name
+        max_parts (int): Part files kept before compacting
+
+    Returns:
+        Optional[Path]: Compacted part file, or None when there were at most
+            max_parts part files
+    """
+    parts = list_history_parts(history_dir)
+    if len(parts) <= max(1, max_parts):
+        return None
+    return replace_history_parts(history_dir, load_kpi_history(history_dir, parts), parts, run_time)
+
+
+def get_fetch_start_date(history: pd.DataFrame, kpi_name: str, y_m_d: str, backfill_days: int, refetch_days: int) -> str:
+    """
+    Return the first date to fetch from the warehouse for a KPI.
+
+    With no stored history the last `backfill_days` are fetched; otherwise only
+    the dates after the last stored one, plus the last `refetch_days` stored
+    dates to pick up late-arriving rows.
+
+    Args:
+        history (pd.DataFrame): Loaded KPI history
+        kpi_name (str): KPI name
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        backfill_days (int): Days to fetch when the KPI has no history
+        refetch_days (int): Stored days to re-fetch
+
+    Returns:
+        str: Start date in YYYY-MM-DD format
+    """
+    end = datetime.strptime(y_m_d, "%Y-%m-%d")
+    backfill_start = end - timedelta(days=backfill_days)
+    stored = history.loc[(history["kpi"] == kpi_name) & (history["date"] <= pd.Timestamp(end)), "date"]
+    if stored.empty:
+        return backfill_start.strftime("%Y-%m-%d")
+    start = stored.max() + timedelta(days=1 - refetch_days)
+    return max(start, backfill_start).strftime("%Y-%m-%d")
+
+
+def compute_kpi_baselines(history: pd.DataFrame, rolling_days: int = 7, zscore_days: int = 28) -> pd.DataFrame:
+    """
+    Compute comparison baselines for every KPI and date in the history.
+
+    The history is pivoted to a daily calendar (one column per KPI) so every
+    baseline is a single vectorized shift/rolling operation across all KPIs.
+    Baselines only use days strictly before the evaluated date.
+
+    Args:
+        history (pd.DataFrame): Loaded KPI history
+        rolling_days (int): Window for the rolling mean
+        zscore_days (int): Window for the z-score mean and standard deviation
+
+    Returns:
+        pd.DataFrame: kpi, date, metric, previous_metric, pct_change,
+            rolling_mean, same_weekday, zscore, table_name
+    """
+    if history.empty:
+        return pd.DataFrame(columns=[
+            "kpi", "date", "metric", "previous_metric", "pct_change",
+            "rolling_mean", "same_weekday", "zscore", "table_name",
+        ])
+
+    wide = history.pivot(index="date", columns="kpi", values="metric")
+    wide = wide.reindex(pd.date_range(wide.index.min(), wide.index.max(), freq="D"))
+    before = wide.shift(1)
+
+    zscore_mean = before.rolling(zscore_days, min_periods=7).mean()
+    zscore_std = before.rolling(zscore_days, min_periods=7).std()
+    frames = {
+        "metric": wide,
+        "previous_metric": before,
+        "pct_change": (wide - before).abs() / before.where(before != 0),
+        "rolling_mean": before.rolling(rolling_days, min_periods=1).mean(),
+        "same_weekday": wide.shift(7),
+        "zscore": (wide - zscore_mean) / zscore_std.where(zscore_std != 0),
+    }
+    long = pd.concat(
+        {name: frame.stack(future_stack=True) for name, frame in frames.items()},
+        axis=1,
+    )
+    long.index.names = ["date", "kpi"]
+    long = long.reset_index()
+    long = long[long["metric"].notna()]
+
+    table_names = history.drop_duplicates("kpi", keep="last").set_index("kpi")["table_name"]
+    long["table_name"] = long["kpi"].map(table_names)
+    return long[[
+        "kpi", "date", "metric", "previous_metric", "pct_change",
+        "rolling_mean", "same_weekday", "zscore", "table_name",
+    ]].sort_values(["kpi", "date"]).reset_index(drop=True)
+
+
+def flag_kpis(rows: pd.DataFrame, kpi_confs: dict) -> pd.Series:
+    """
+    Return the raise flag of each evaluated KPI row.
+
+    A KPI raises a flag when its relative change versus the previous day
+    exceeds `thresh_in_percent`, or when `zscore_thresh` is configured and
+    the absolute z-score exceeds it.
+    """
+    thresh = rows["kpi"].map({k: c["thresh_in_percent"] for k, c in kpi_confs.items()})
+    zscore_thresh = rows["kpi"].map({k: c.get("zscore_thresh") for k, c in kpi_confs.items()}).astype("float64")
+    raise_flag = rows["pct_change"].gt(thresh) | rows["zscore"].abs().gt(zscore_thresh)
+    return raise_flag.fillna(False).astype(bool)
+
+
+def evaluate_kpis(baselines: pd.DataFrame, kpi_confs: dict, y_m_d: str) -> pd.DataFrame:
+    """
+    Evaluate the latest value of each KPI on or before the processing date.
+
+    Args:
+        baselines (pd.DataFrame): Output of compute_kpi_baselines
+        kpi_confs (dict): kpi_name -> KPI config
+        y_m_d (str): Processing date in YYYY-MM-DD format
+
+    Returns:
+        pd.DataFrame: One row per KPI with a boolean raise_flag column first
+            (see flag_kpis)
+    """
+    current = baselines[
+        baselines["kpi"].isin(list(kpi_confs)) & (baselines["date"] <= pd.Timestamp(y_m_d))
+    ]
+    latest = current.sort_values("date").groupby("kpi", as_index=False).tail(1).copy()
+    if latest.empty:
+        return pd.DataFrame(columns=["raise_flag"] + list(baselines.columns))
+
+    latest.insert(0, "raise_flag", flag_kpis(latest, kpi_confs))
+    latest["date"] = latest["date"].dt.strftime("%Y-%m-%d")
+    return latest.round(4).reset_index(drop=True)
+
+
+def evaluate_kpi_range(baselines: pd.DataFrame, kpi_confs: dict, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Evaluate every KPI on every date of a range, as daily runs would have.
+
+    Baselines only use earlier days, so the flag of each date is the one a
+    daily run on that date would have raised (given the same data).
+
+    Args:
+        baselines (pd.DataFrame): Output of compute_kpi_baselines, covering
+            the range plus the baseline lookback
+        kpi_confs (dict): kpi_name -> KPI config
+        start_date (str): First evaluated date (YYYY-MM-DD)
+        end_date (str): Last evaluated date (YYYY-MM-DD)
+
+    Returns:
+        pd.DataFrame: One row per (kpi, date) with raise_flag first
+    """
+    rows = baselines[
+        baselines["kpi"].isin(list(kpi_confs))
+        & baselines["date"].between(pd.Timestamp(start_date), pd.Timestamp(end_date))
+    ].copy()
+    if rows.empty:
+        return pd.DataFrame(columns=["raise_flag"] + list(baselines.columns))
+
+    rows.insert(0, "raise_flag", flag_kpis(rows, kpi_confs))
+    rows["date"] = rows["date"].dt.strftime("%Y-%m-%d")
+    return rows.sort_values(["date", "kpi"]).round(4).reset_index(drop=True)
+
+
+def build_alert_timeline(evaluated: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Summarize a range evaluation as one row per calendar day.
+
+    Args:
+        evaluated (pd.DataFrame): Output of evaluate_kpi_range
+        start_date (str): First date of the range
+        end_date (str): Last date of the range
+
+    Returns:
+        pd.DataFrame: date, evaluated (KPIs with a value), alerts (count) and
+            flagged (comma-separated KPI names); days without data are kept
+    """
+    dates = pd.date_range(start_date, end_date, freq="D").strftime("%Y-%m-%d")
+    grouped = evaluated.groupby("date")
+    timeline = pd.DataFrame({
+        "date": dates,
+        "evaluated": grouped.size().reindex(dates, fill_value=0).to_numpy(),
+        "alerts": grouped["raise_flag"].sum().reindex(dates, fill_value=0).astype(int).to_numpy(),
+    })
+    flagged = evaluated.loc[evaluated["raise_flag"].astype(bool)].groupby("date")["kpi"].agg(lambda kpis: ", ".join(sorted(kpis)))
+    timeline["flagged"] = timeline["date"].map(flagged).fillna("")
+    return timeline
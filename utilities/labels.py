@@ -0,0 +1,61 @@
+"""
+BigQuery job labels for Gaming BI System.
+
+Every job the system submits carries the same label set, so
+INFORMATION_SCHEMA.JOBS can attribute bytes billed and slot time to a
+pipeline, job and task (monitoring/cost_report/):
+
+    pipeline    ETL group (e.g. ppltx_fact_etl), monitoring, scheduler, daily_logs, ...
+    job_name    Job (fact, kpi_daily, log, tables, ...)
+    task        Task or check (load_fact, dau, dataset name, log step)
+    job_action  init / daily / delete
+    date        Processing date
+    run_id      Run id (utilities/run_context.py)
+
+Values are lowercased and reduced to the characters BigQuery accepts.
+"""
+
+import re
+from typing import Optional
+
+from .run_context import get_run_id, get_run_info
+
+LABEL_KEYS = ("pipeline", "job_name", "task", "job_action", "date", "run_id")
+MAX_LABEL_LENGTH = 63
+_INVALID_CHARS = re.compile(r"[^a-z0-9_-]")
+
+
+def sanitize_label_value(value) -> str:
+    """Return a valid BigQuery label value: lowercase letters, digits, _ and -, max 63 chars."""
+    return _INVALID_CHARS.sub("_", str(value).lower())[:MAX_LABEL_LENGTH]
+
+
+def build_job_labels(
+    pipeline: str,
+    job_name: Optional[str] = None,
+    job_action: Optional[str] = None,
+    y_m_d: Optional[str] = None,
+    task: Optional[str] = None,
+) -> dict:
+    """
+    Build the label set of a BigQuery job.
+
+    Args:
+        pipeline (str): Pipeline or component submitting the job
+        job_name (Optional[str]): Job name
+        job_action (Optional[str]): Job action
+        y_m_d (Optional[str]): Processing date (default: the run's date)
+        task (Optional[str]): Task or check name
+
+    Returns:
+        dict: Label key -> sanitized value; unknown fields are left out
+    """
+    values = {
+        "pipeline": pipeline,
+        "job_name": job_name,
+        "task": task,
+        "job_action": job_action,
+        "date": y_m_d or get_run_info().get("date"),
+        "run_id": get_run_id(),
+    }
+    return {key: sanitize_label_value(value) for key, value in values.items() if value}
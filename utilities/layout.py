@@ -0,0 +1,128 @@
+"""
+Physical table layout utilities for Gaming BI System.
+
+Each pipeline config declares the physical layout of its destination table
+in a group-level "layout" block:
+
+    "layout": {
+      "partition_by": "dt",
+      "partition_expiration_days": null,
+      "cluster_by": ["user_id"],
+      "require_partition_filter": false
+    }
+
+This module renders the DDL clauses used by init templates and compares the
+declared layout against live BigQuery table metadata to detect drift.
+"""
+
+from typing import Optional
+
+LAYOUT_KEYS = ["partition_by", "partition_expiration_days", "cluster_by", "require_partition_filter"]
+MAX_CLUSTER_COLUMNS = 4
+
+
+def validate_layout(layout: dict, context: str) -> None:
+    """
+    Validate a layout block; raise ValueError if it is malformed.
+
+    Args:
+        layout (dict): Layout block from a pipeline config
+        context (str): Config location used in error messages
+    """
+    unknown = [key for key in layout if key not in LAYOUT_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown layout keys in {context}: {', '.join(unknown)}")
+
+    cluster_by = layout.get("cluster_by") or []
+    if not isinstance(cluster_by, list):
+        raise ValueError(f"layout.cluster_by must be a list in {context}")
+    if len(cluster_by) > MAX_CLUSTER_COLUMNS:
+        raise ValueError(f"layout.cluster_by allows at most {MAX_CLUSTER_COLUMNS} columns in {context}")
+
+    expiration = layout.get("partition_expiration_days")
+    if expiration is not None and (not isinstance(expiration, int) or expiration <= 0):
+        raise ValueError(f"layout.partition_expiration_days must be a positive integer in {context}")
+
+    if not layout.get("partition_by") and (expiration or layout.get("require_partition_filter")):
+        raise ValueError(f"layout partition options require layout.partition_by in {context}")
+
+
+def build_layout_params(layout: Optional[dict]) -> dict:
+    """
+    Render the DDL clauses of a layout block for init templates.
+
+    Args:
+        layout (Optional[dict]): Layout block, or None for an unpartitioned table
+
+    Returns:
+        dict: partition_by_clause, cluster_by_clause and layout_options (a
+            leading-comma list of OPTIONS entries, empty when none apply)
+    """
+    layout = layout or {}
+    partition_by = layout.get("partition_by")
+    cluster_by = layout.get("cluster_by") or []
+
+    options = []
+    if layout.get("partition_expiration_days"):
+        options.append(f"partition_expiration_days = {layout['partition_expiration_days']}")
+    if partition_by:
+        options.append(f"require_partition_filter = {'TRUE' if layout.get('require_partition_filter') else 'FALSE'}")
+
+    return {
+        "partition_by_clause": f"PARTITION BY {partition_by}" if partition_by else "",
+        "cluster_by_clause": f"CLUSTER BY {', '.join(cluster_by)}" if cluster_by else "",
+        "layout_options": "".join(f", {option}" for option in options),
+    }
+
+
+def get_live_layout(table) -> dict:
+    """
+    Extract the layout of a live table in the same shape as a layout block.
+
+    Args:
+        table: google.cloud.bigquery.Table returned by client.get_table
+
+    Returns:
+        dict: Live layout with the LAYOUT_KEYS keys
+    """
+    partitioning = table.time_partitioning
+    partition_by = None
+    expiration_days = None
+    if partitioning is not None:
+        # Ingestion-time partitioned tables have no field
+        partition_by = partitioning.field or "_PARTITIONTIME"
+        if partitioning.expiration_ms:
+            expiration_days = int(partitioning.expiration_ms // (24 * 60 * 60 * 1000))
+    elif table.range_partitioning is not None:
+        partition_by = table.range_partitioning.field
+
+    return {
+        "partition_by": partition_by,
+        "partition_expiration_days": expiration_days,
+        "cluster_by": list(table.clustering_fields or []),
+        "require_partition_filter": bool(table.require_partition_filter),
+    }
+
+
+def diff_layout(expected: dict, live: dict) -> list:
+    """
+    Compare a declared layout with a live one.
+
+    Args:
+        expected (dict): Layout block from the pipeline config
+        live (dict): Output of get_live_layout
+
+    Returns:
+        list: One dict per drifting key with key, expected and live values
+    """
+    drift = []
+    for key in LAYOUT_KEYS:
+        expected_value = expected.get(key)
+        live_value = live.get(key)
+        if key == "cluster_by":
+            expected_value = list(expected_value or [])
+        if key == "require_partition_filter":
+            expected_value = bool(expected_value)
+        if expected_value != live_value:
+            drift.append({"key": key, "expected": expected_value, "live": live_value})
+    return drift
@@ -0,0 +1,313 @@
+"""
+Incremental export of partitioned warehouse tables to local columnar files.
+
+pipelines/export_marts/export_marts.py uses this module to copy the curated
+marts to a local or mounted directory, so notebooks read files instead of
+scanning the tables again:
+
+1. A metadata-only query on INFORMATION_SCHEMA.PARTITIONS returns each
+   partition's row count and last_modified_time.
+2. A partition is exported when the table's manifest does not have it, its
+   last_modified_time changed (e.g. a re-run or a MERGE touched it) or its
+   file is gone. Partitions up to the run date that no longer exist are
+   removed; later ones, outside the snapshot, are kept.
+3. Each partition is read with the BigQuery Storage Read API in up to
+   `max_streams` parallel streams (optional dependency
+   google-cloud-bigquery-storage), or else with tabledata.list on the
+   partition decorator; neither runs a query, so exports bill no bytes.
+4. Each partition is written atomically to one file,
+   <root>/<project>/<dataset>/<table>/<YYYYMMDD>.<ext>, keeping the partition
+   column (no hive directories, whose string keys clash with the DATE column),
+   as Parquet (lazy scans with pyarrow.dataset / DuckDB / polars; row-group
+   statistics prune by date) or Arrow IPC (uncompressed, can be
+   memory-mapped), and recorded in the table's _manifest.json after every
+   partition, so an interrupted export resumes. Scanners skip _manifest.json.
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .constants import EXPORTS_DIR
+from .retry import RetryPolicy, is_retryable
+
+MANIFEST_FILE = "_manifest.json"
+EXPORT_FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+SPECIAL_PARTITIONS = ("__NULL__", "__UNPARTITIONED__", "__STREAMING_UNPARTITIONED__")
+DEFAULT_EXPORT_SETTINGS = {
+    "root": None,
+    "format": "parquet",
+    "compression": "zstd",
+    "parallelism": 4,
+    "max_streams": 4,
+}
+
+
+def get_export_root(settings: dict) -> Path:
+    """Return the export root: BI_EXPORT_DIR, else the config "root", else exports/."""
+    root = os.getenv("BI_EXPORT_DIR") or settings.get("root")
+    return Path(root) if root else EXPORTS_DIR
+
+
+def get_table_export_dir(root: Path, project_id: str, dataset: str, table: str) -> Path:
+    """Return the directory holding a table's partition files and manifest."""
+    return root / project_id / dataset / table
+
+
+def load_export_manifest(table_dir: Path) -> dict:
+    """Load a table's manifest, or an empty one."""
+    path = table_dir / MANIFEST_FILE
+    if not path.exists():
+        return {"partitions": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_export_manifest(table_dir: Path, manifest: dict) -> None:
+    """Write a table's manifest atomically."""
+    table_dir.mkdir(parents=True, exist_ok=True)
+    path = table_dir / MANIFEST_FILE
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def partition_date(partition_id: str) -> str:
+    """Return the YYYY-MM-DD date of a daily partition id (YYYYMMDD)."""
+    return datetime.strptime(partition_id, "%Y%m%d").strftime("%Y-%m-%d")
+
+
+def plan_partition_exports(partitions: list, manifest: dict, table_dir: Path, full: bool = False, last_partition_id: Optional[str] = None) -> tuple:
+    """
+    Decide which partitions to export and which to remove.
+
+    Args:
+        partitions (list): Dicts with partition_id, total_rows and
+            last_modified (partition snapshot of the table)
+        manifest (dict): The table's export manifest
+        table_dir (Path): Export directory of the table
+        full (bool): Re-export every partition
+        last_partition_id (Optional[str]): Last partition (YYYYMMDD) the
+            snapshot covers; exported partitions after it are kept
+
+    Returns:
+        tuple: (partitions to export, partition ids to remove, special
+            partition ids that cannot be exported by date)
+    """
+    exported = manifest.get("partitions", {})
+    to_export, special = [], []
+    current = set()
+    for partition in partitions:
+        partition_id = partition["partition_id"]
+        if partition_id is None or partition_id in SPECIAL_PARTITIONS:
+            special.append(partition_id or "__UNPARTITIONED__")
+            continue
+        current.add(partition_id)
+        entry = exported.get(partition_id)
+        if (
+            full
+            or entry is None
+            or entry.get("last_modified") != partition["last_modified"]
+            or (entry.get("path") and not (table_dir / entry["path"]).exists())
+        ):
+            to_export.append(partition)
+    to_remove = sorted(
+        partition_id for partition_id in set(exported) - current
+        if last_partition_id is None or partition_id <= last_partition_id
+    )
+    return to_export, to_remove, special
+
+
+def read_partition(client, table_ref: str, partition_att: str, partition_id: str, max_streams: int):
+    """
+    Read one daily partition as a pyarrow Table, without running a query.
+
+    Uses the Storage Read API with up to max_streams parallel streams when
+    google-cloud-bigquery-storage is installed, else tabledata.list on the
+    `table$YYYYMMDD` partition decorator.
+
+    Args:
+        client: BigQuery client
+        table_ref (str): project.dataset.table
+        partition_att (str): Partition column
+        partition_id (str): YYYYMMDD
+        max_streams (int): Upper bound of parallel read streams
+
+    Returns:
+        pyarrow.Table: Partition rows (None when the partition is empty)
+    """
+    import pyarrow as pa
+
+    try:
+        from google.cloud import bigquery_storage
+    except ImportError:
+        bigquery_storage = None
+
+    if bigquery_storage is None:
+        table = client.list_rows(f"{table_ref}${partition_id}").to_arrow(create_bqstorage_client=False)
+        return table if table.num_rows else None
+
+    project, dataset, table_name = table_ref.split(".")
+    read_client = bigquery_storage.BigQueryReadClient(credentials=client._credentials)
+    session = read_client.create_read_session(
+        parent=f"projects/{client.project}",
+        read_session=bigquery_storage.types.ReadSession(
+            table=f"projects/{project}/datasets/{dataset}/tables/{table_name}",
+            data_format=bigquery_storage.types.DataFormat.ARROW,
+            read_options=bigquery_storage.types.ReadSession.TableReadOptions(
+                row_restriction=f"{partition_att} = DATE '{partition_date(partition_id)}'",
+            ),
+        ),
+        max_stream_count=max_streams,
+    )
+    if not session.streams:
+        return None
+    with ThreadPoolExecutor(max_workers=len(session.streams)) as pool:
+        tables = list(pool.map(lambda stream: read_client.read_rows(stream.name).to_arrow(session), session.streams))
+    return pa.concat_tables(tables)
+
+
+def write_partition_file(table, path: Path, fmt: str, compression: Optional[str] = None) -> int:
+    """
+    Write a partition file atomically.
+
+    Args:
+        table (pyarrow.Table): Partition rows
+        path (Path): Destination file
+        fmt (str): parquet or arrow (Arrow IPC, uncompressed for memory-mapping)
+        compression (Optional[str]): Parquet codec
+
+    Returns:
+        int: File size in bytes
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if fmt == "arrow":
+        import pyarrow.feather as feather
+        feather.write_feather(table, tmp, compression="uncompressed")
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp, compression=compression or "none")
+    os.replace(tmp, path)
+    return path.stat().st_size
+
+
+def export_partitioned_table(
+    client,
+    project_id: str,
+    dataset: str,
+    table: str,
+    partition_att: str,
+    partitions: list,
+    settings: dict,
+    policy: Optional[RetryPolicy] = None,
+    full: bool = False,
+    dry_run: bool = False,
+    last_partition_id: Optional[str] = None,
+) -> dict:
+    """
+    Export the new and changed partitions of one table.
+
+    Args:
+        client: BigQuery client or None in dry-run
+        project_id (str): Google Cloud project ID
+        dataset (str): Dataset of the table
+        table (str): Table name
+        partition_att (str): Daily partition column
+        partitions (list): Partition snapshot (partition_id, total_rows, last_modified)
+        settings (dict): "export" block of the job config
+        policy (Optional[RetryPolicy]): Retry settings for partition reads
+        full (bool): Re-export every partition
+        dry_run (bool): Plan without reading or writing anything
+        last_partition_id (Optional[str]): Last partition (YYYYMMDD) the
+            snapshot covers; newer exports are not removed
+
+    Returns:
+        dict: Table summary with planned, exported, unchanged and removed
+            partitions, rows, bytes, status and per-partition errors
+    """
+    policy = policy or RetryPolicy()
+    fmt = settings["format"]
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"export.format must be one of {', '.join(EXPORT_FORMATS)}, got {fmt}")
+    table_ref = f"{project_id}.{dataset}.{table}"
+    table_dir = get_table_export_dir(get_export_root(settings), project_id, dataset, table)
+    manifest = load_export_manifest(table_dir)
+    to_export, to_remove, special = plan_partition_exports(partitions, manifest, table_dir, full, last_partition_id)
+    summary = {
+        "table": f"{dataset}.{table}",
+        "planned": len(to_export),
+        "exported": 0,
+        "unchanged": len(partitions) - len(to_export) - len(special),
+        "removed": len(to_remove),
+        "rows": 0,
+        "bytes": 0,
+        "status": "success",
+        "errors": {},
+    }
+    for partition_id in special:
+        print(f"[WARNING] {table_ref}: partition {partition_id} has no date and is not exported")
+    if dry_run:
+        print(f"[DRY-RUN] Would export {len(to_export)} partitions of {table_ref} to {table_dir} and remove {len(to_remove)}")
+        return summary
+
+    manifest.update({
+        "table": table_ref,
+        "partition_att": partition_att,
+        "format": fmt,
+    })
+    partitions_entry = manifest.setdefault("partitions", {})
+    for partition_id in to_remove:
+        entry = partitions_entry.pop(partition_id)
+        if entry.get("path"):
+            (table_dir / entry["path"]).unlink(missing_ok=True)
+    lock = threading.Lock()
+
+    def export_one(partition: dict) -> None:
+        partition_id = partition["partition_id"]
+        relative = f"{partition_id}.{EXPORT_FORMATS[fmt]}"
+        attempt, slept = 1, 0.0
+        while True:
+            try:
+                arrow_table = read_partition(client, table_ref, partition_att, partition_id, settings["max_streams"])
+                break
+            except Exception as e:
+                delay = policy.delay(attempt)
+                if not is_retryable(e) or attempt >= policy.max_attempts or slept + delay > policy.budget_sec:
+                    raise
+                attempt, slept = attempt + 1, slept + delay
+                time.sleep(delay)
+        entry = {
+            "path": None,
+            "rows": 0,
+            "bytes": 0,
+            "last_modified": partition["last_modified"],
+            "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        if arrow_table is not None:
+            entry["bytes"] = write_partition_file(arrow_table, table_dir / relative, fmt, settings.get("compression"))
+            entry.update({"path": relative, "rows": arrow_table.num_rows})
+            manifest["schema"] = [{"name": field.name, "type": str(field.type)} for field in arrow_table.schema]
+        with lock:
+            partitions_entry[partition_id] = entry
+            summary["exported"] += 1
+            summary["rows"] += entry["rows"]
+            summary["bytes"] += entry["bytes"]
+            save_export_manifest(table_dir, manifest)
+
+    with ThreadPoolExecutor(max_workers=max(1, settings["parallelism"])) as pool:
+        futures = {pool.submit(export_one, partition): partition["partition_id"] for partition in to_export}
+        for future, partition_id in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                summary["errors"][partition_id] = str(e)
+                summary["status"] = "failed"
+
+    manifest["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    save_export_manifest(table_dir, manifest)
+    return summary
@@ -1,12 +1,16 @@
 """
 Shared helpers for monitoring scripts: compose markdown alerts, write files,
-and send Slack notifications in a consistent way.
+send Slack notifications in a consistent way, and a unified result model
+used to consolidate several checks into one report.
 """
 
 from pathlib import Path
 from datetime import datetime
+from dataclasses import dataclass, field
 from typing import Optional
 
+import pandas as pd
+
 from .io import write_file
 from .formatting import df_to_string_table
 from .slack import send_alert_notification
@@ -52,3 +56,69 @@ def require_keys(conf: dict, keys: list[str], context: str) -> None:
         raise ValueError(f"Missing keys in {context}: {', '.join(missing)}")
 
 
+@dataclass
+class MonitorResult:
+    """Outcome of one monitoring check family (logs, tables, KPIs).
+
+    Attributes:
+        name: Check family name (e.g., "logs_monitoring")
+        alert_type: Display name used in alerts (e.g., "ETL Process")
+        df: All check rows, with a boolean `raise_flag` column
+        errors: Check name -> error message for checks that failed to run
+        alert_file: Written alert markdown, when alerts were raised
+        duration_sec: Wall-clock duration of the check family
+    """
+    name: str
+    alert_type: str
+    df: pd.DataFrame = field(default_factory=pd.DataFrame)
+    errors: dict = field(default_factory=dict)
+    alert_file: Optional[Path] = None
+    duration_sec: float = 0.0
+
+    @property
+    def alerts(self) -> pd.DataFrame:
+        """Rows that raised a flag."""
+        if self.df.empty or "raise_flag" not in self.df:
+            return self.df.iloc[0:0]
+        return self.df[self.df["raise_flag"].astype(bool)]
+
+    @property
+    def has_errors(self) -> bool:
+        """True when a check failed to run, whether or not others raised alerts."""
+        return bool(self.errors)
+
+    @property
+    def status(self) -> str:
+        """One of: alert, error, ok."""
+        if not self.alerts.empty:
+            return "alert"
+        if self.errors:
+            return "error"
+        return "ok"
+
+
+def compose_suite_report(results: list, y_m_d: str, run_time: datetime) -> str:
+    """Compose one consolidated markdown report for several MonitorResults."""
+    overview = pd.DataFrame([
+        {
+            "check": r.name,
+            "status": r.status,
+            "rows": len(r.df),
+            "alerts": len(r.alerts),
+            "errors": len(r.errors),
+            "duration_sec": r.duration_sec,
+        }
+        for r in results
+    ])
+    sections = []
+    for r in results:
+        body = df_to_string_table(r.alerts) if not r.alerts.empty else "✅ No alerts"
+        if r.errors:
+            body += "\n\nErrors:\n" + "\n".join(f"- {name}: {msg}" for name, msg in r.errors.items())
+        sections.append(f"## {r.alert_type}\n\n{body}\n")
+    return (
+        f"# Monitoring Suite Report - {y_m_d}\n\n"
+        f"## Summary\n\n{df_to_string_table(overview)}\n\n"
+        + "\n".join(sections)
+        + f"\n## Generated at\n{run_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+    )
@@ -0,0 +1,239 @@
+"""
+Local partition metadata history for table health monitoring.
+
+Table monitoring reads INFORMATION_SCHEMA.PARTITIONS (one metadata-only query
+per dataset) and appends the observed partitions (row count, logical bytes,
+last modified time) as Parquet part files under
+state/table_health/<project_id>/. Readers keep the latest observation per
+(table, partition); once the parts pass a threshold they are compacted into
+one, without the partitions older than the checks need. Each table is then checked for:
+
+- missing:  the expected partition is absent or empty
+- stale:    the table was last modified more than thresh_in_hours ago
+- small / large: the expected partition's row count is outside
+  [min_row_ratio, max_row_ratio] x the median of the previous partitions
+"""
+
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pandas as pd
+
+from .io import ensure_dir
+from .kpi_history import list_history_parts, replace_history_parts
+
+HISTORY_COLUMNS = [
+    "table_id", "partition_id", "partition_date", "total_rows",
+    "total_logical_bytes", "last_modified_utc", "observed_at",
+]
+
+DEFAULT_HEALTH_SETTINGS = {
+    "backfill_days": 28,
+    "refetch_days": 3,
+    "baseline_days": 14,
+    "min_baseline_partitions": 7,
+    "min_row_ratio": 0.5,
+    "max_row_ratio": 2.0,
+    "compact_after_parts": 50,
+}
+
+
+def get_partition_history_dir(history_root: Path, project_id: str) -> Path:
+    """Return the partition history directory for a project."""
+    return history_root / project_id
+
+
+def load_partition_history(history_dir: Path, parts: Optional[list] = None) -> pd.DataFrame:
+    """
+    Load the partition metadata history of a project.
+
+    Args:
+        history_dir (Path): Project history directory
+        parts (Optional[list]): Part files to read (default: all)
+
+    Returns:
+        pd.DataFrame: One row per (table_id, partition_id) with the latest observation
+    """
+    parts = list_history_parts(history_dir) if parts is None else parts
+    if not parts:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    history = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+    return (
+        history.sort_values("observed_at")
+        .drop_duplicates(subset=["table_id", "partition_id"], keep="last")
+        .sort_values(["table_id", "partition_id"])
+        .reset_index(drop=True)[HISTORY_COLUMNS]
+    )
+
+
+def append_partition_history(history_dir: Path, df: pd.DataFrame, run_time: datetime, name: str) -> Optional[Path]:
+    """
+    Append observed partition metadata as a new part file.
+
+    Args:
+        history_dir (Path): Project history directory
+        df (pd.DataFrame): Query result with dataset, table, partition_id,
+            total_rows, total_logical_bytes and last_modified_utc columns
+        run_time (datetime): Current run time, stored as observed_at
+        name (str): Part file suffix (e.g., the dataset)
+
+    Returns:
+        Optional[Path]: Written part file, or None when there was nothing to append
+    """
+    if df is None or df.empty:
+        return None
+
+    partition_id = df["partition_id"].astype("string")
+    part = pd.DataFrame({
+        "table_id": df["dataset"].astype(str) + "." + df["table"].astype(str),
+        "partition_id": partition_id.fillna("__UNPARTITIONED__"),
+        # Daily partitions only; other partition ids (unpartitioned, __NULL__) have no date
+        "partition_date": pd.to_datetime(partition_id, format="%Y%m%d", errors="coerce"),
+        "total_rows": pd.to_numeric(df["total_rows"], errors="coerce").astype("float64"),
+        "total_logical_bytes": pd.to_numeric(df["total_logical_bytes"], errors="coerce").astype("float64"),
+        "last_modified_utc": pd.to_datetime(df["last_modified_utc"], utc=True),
+        "observed_at": pd.Timestamp(run_time),
+    })
+    ensure_dir(history_dir)
+    part_file = history_dir / f"part-{run_time.strftime('%Y%m%dT%H%M%S%f')}-{name}.parquet"
+    part.to_parquet(part_file, index=False)
+    return part_file
+
+
+def get_retention_start_date(table_confs: dict, y_m_d: str, settings: Optional[dict] = None) -> str:
+    """
+    Return the first partition date the checks still need.
+
+    That is the baseline window before each table's expected partition, or
+    the backfill window when it reaches further back.
+
+    Args:
+        table_confs (dict): table_id -> table config (optional expected_partition_lag_days)
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        settings (Optional[dict]): Overrides of DEFAULT_HEALTH_SETTINGS
+
+    Returns:
+        str: Start date in YYYY-MM-DD format
+    """
+    settings = {**DEFAULT_HEALTH_SETTINGS, **(settings or {})}
+    max_lag = max((conf.get("expected_partition_lag_days", 1) for conf in table_confs.values()), default=1)
+    days = max(settings["backfill_days"], settings["baseline_days"] + max_lag)
+    return (datetime.strptime(y_m_d, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def compact_partition_history(history_dir: Path, run_time: datetime, keep_since: str, max_parts: int = 1) -> Optional[Path]:
+    """
+    Rewrite the part files of a project into one part, without old partitions.
+
+    Every run appends one part per dataset; once the history holds more than
+    `max_parts` files they are compacted like the KPI history, dropping daily
+    partitions before `keep_since` (see get_retention_start_date).
+    Unpartitioned tables keep their latest observation.
+
+    Args:
+        history_dir (Path): Project history directory
+        run_time (datetime): Current run time, used for the compacted file name
+        keep_since (str): First partition date to keep (YYYY-MM-DD)
+        max_parts (int): Part files kept before compacting
+
+    Returns:
+        Optional[Path]: Compacted part file, or None when there were at most
+            max_parts part files
+    """
+    parts = list_history_parts(history_dir)
+    if len(parts) <= max(1, max_parts):
+        return None
+    history = load_partition_history(history_dir, parts)
+    history = history[history["partition_date"].isna() | (history["partition_date"] >= pd.Timestamp(keep_since))]
+    return replace_history_parts(history_dir, history.reset_index(drop=True), parts, run_time)
+
+
+def get_metadata_start_date(history: pd.DataFrame, table_ids: list, y_m_d: str, backfill_days: int, refetch_days: int) -> str:
+    """
+    Return the first partition date to read from metadata for a group of tables.
+
+    Tables without stored history need `backfill_days` of partitions to build a
+    baseline; otherwise the last `refetch_days` are re-read to catch reloads.
+
+    Args:
+        history (pd.DataFrame): Loaded partition history
+        table_ids (list): Tables queried together (one dataset)
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        backfill_days (int): Days to read for tables without history
+        refetch_days (int): Days to re-read for tables with history
+
+    Returns:
+        str: Start date in YYYY-MM-DD format
+    """
+    end = datetime.strptime(y_m_d, "%Y-%m-%d")
+    known = set(history.loc[history["partition_date"].notna(), "table_id"])
+    days = refetch_days if all(table_id in known for table_id in table_ids) else backfill_days
+    return (end - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def evaluate_partition_health(history: pd.DataFrame, table_confs: dict, y_m_d: str, settings: Optional[dict] = None, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Evaluate freshness and volume of every configured table.
+
+    Args:
+        history (pd.DataFrame): Loaded partition history
+        table_confs (dict): table_id -> table config (thresh_in_hours, optional
+            expected_partition_lag_days, check_volume)
+        y_m_d (str): Processing date in YYYY-MM-DD format
+        settings (Optional[dict]): Overrides of DEFAULT_HEALTH_SETTINGS
+        now (Optional[pd.Timestamp]): Current UTC time (default: now)
+
+    Returns:
+        pd.DataFrame: One row per table with a boolean raise_flag column first
+    """
+    settings = {**DEFAULT_HEALTH_SETTINGS, **(settings or {})}
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    last_modified = history.groupby("table_id")["last_modified_utc"].max()
+
+    rows = []
+    for table_id, conf in table_confs.items():
+        expected_date = pd.Timestamp(y_m_d) - pd.Timedelta(days=conf.get("expected_partition_lag_days", 1))
+        table_history = history[(history["table_id"] == table_id) & history["partition_date"].notna()]
+        partitioned = not table_history.empty or table_id not in last_modified.index
+        current = table_history[table_history["partition_date"] == expected_date]
+        current_rows = current["total_rows"].iloc[0] if not current.empty else None
+
+        previous = table_history[
+            (table_history["partition_date"] < expected_date)
+            & (table_history["partition_date"] >= expected_date - pd.Timedelta(days=settings["baseline_days"]))
+        ]
+        baseline_rows = previous["total_rows"].median() if len(previous) >= settings["min_baseline_partitions"] else None
+
+        modified = last_modified.get(table_id)
+        hours_diff = (now - modified) / pd.Timedelta(hours=1) if modified is not None and pd.notna(modified) else None
+
+        issues = []
+        if partitioned and not current_rows:
+            issues.append("missing")
+        if hours_diff is None or hours_diff > conf["thresh_in_hours"]:
+            issues.append("stale")
+        row_ratio = None
+        if current_rows and baseline_rows:
+            row_ratio = current_rows / baseline_rows
+            if conf.get("check_volume", True):
+                if row_ratio < settings["min_row_ratio"]:
+                    issues.append("small")
+                elif row_ratio > settings["max_row_ratio"]:
+                    issues.append("large")
+
+        rows.append({
+            "raise_flag": bool(issues),
+            "table_id": table_id,
+            "status": ", ".join(issues) or "ok",
+            "partition": expected_date.strftime("%Y-%m-%d") if partitioned else None,
+            "total_rows": current_rows,
+            "baseline_rows": baseline_rows,
+            "row_ratio": row_ratio,
+            "total_logical_bytes": current["total_logical_bytes"].iloc[0] if not current.empty else None,
+            "last_modified_utc": modified.strftime("%Y-%m-%d %H:%M:%S") if hours_diff is not None else None,
+            "hours_diff": hours_diff,
+            "thresh_in_hours": conf["thresh_in_hours"],
+        })
+    return pd.DataFrame(rows).round(2)
@@ -35,11 +35,14 @@ def get_project_root(file_path: str) -> Path:
     
     # For files in pipelines/ directory
     if 'pipelines' in current_path.parts:
-        return current_path.parents[1]  # Go up 2 levels from pipelines/
+        # The directory holding pipelines/ (job scripts may sit in pipelines/<job>/)
+        index = len(current_path.parts) - 1 - current_path.parts[::-1].index('pipelines')
+        return Path(*current_path.parts[:index])
     
-    # For files in monitoring/ directory  
+    # For files in monitoring/ directory (the suite sits in monitoring/ itself)
     if 'monitoring' in current_path.parts:
-        return current_path.parents[2]  # Go up 3 levels from monitoring/
+        index = len(current_path.parts) - 1 - current_path.parts[::-1].index('monitoring')
+        return Path(*current_path.parts[:index])
     
     # For files in utilities/ directory
     if 'utilities' in current_path.parts:
@@ -150,7 +153,7 @@ def get_table_monitoring_paths(project_root: Path) -> Tuple[Path, Path, Path, Pa
     config_path = project_root / "monitoring" / "table_monitoring" / "tables_config.json"
     
     # SQL template path
-    sql_template_path = project_root / "monitoring" / "table_monitoring" / "table_freshness_alert.sql"
+    sql_template_path = project_root / "monitoring" / "table_monitoring" / "partition_health.sql"
     
     # Temp paths
     temp_root = project_root / "temp"
@@ -165,6 +168,48 @@ def get_table_monitoring_paths(project_root: Path) -> Tuple[Path, Path, Path, Pa
     return config_path, sql_template_path, logs_path, error_path, alerts_path
 
 
+def get_perf_report_paths(project_root: Path) -> Tuple[Path, Path, Path, Path]:
+    """
+    Get paths for the pipeline performance report.
+    
+    Args:
+        project_root (Path): Project root directory
+        
+    Returns:
+        Tuple[Path, Path, Path, Path]: config_path, sql_template_path, logs_path, error_path
+    """
+    module_root = project_root / "monitoring" / "perf_report"
+    config_path = module_root / "perf_config.json"
+    sql_template_path = module_root / "step_logs.sql"
+    
+    temp_root = project_root / "temp" / "monitoring" / "perf_report"
+    logs_path = temp_root / "logs"
+    error_path = temp_root / "errors"
+    
+    return config_path, sql_template_path, logs_path, error_path
+
+
+def get_cost_report_paths(project_root: Path) -> Tuple[Path, Path, Path, Path]:
+    """
+    Get paths for the cost and slot attribution report.
+    
+    Args:
+        project_root (Path): Project root directory
+        
+    Returns:
+        Tuple[Path, Path, Path, Path]: config_path, sql_template_path, logs_path, error_path
+    """
+    module_root = project_root / "monitoring" / "cost_report"
+    config_path = module_root / "cost_config.json"
+    sql_template_path = module_root / "jobs_usage.sql"
+    
+    temp_root = project_root / "temp" / "monitoring" / "cost_report"
+    logs_path = temp_root / "logs"
+    error_path = temp_root / "errors"
+    
+    return config_path, sql_template_path, logs_path, error_path
+
+
 def get_standard_paths(file_path: str) -> dict:
     """
     Get all standard paths for a given file location.
@@ -0,0 +1,145 @@
+"""
+Pipeline performance analytics from logs.daily_logs.
+
+Every job writes one row per step (init_config, plan or load_query /
+render_query, execute_query, ..., end). A run is rebuilt from the rows of one host and job
+in (ts, step_id) order: it starts at init_config, or wherever the
+process-local step_id sequence restarts. A step lasts from its own log row
+to the next row of the same run, so execute_query measures the BigQuery job,
+plan the compiled plan lookup (or compilation) of a pipeline job and
+render_query the template rendering of a monitor. Steps that name a task in their
+message ("... for task: load_fact") are attributed to that task.
+
+On top of the step durations:
+
+- summarize_durations: count, p50, p95 and max per job, step and task
+- detect_regressions: window p50 vs. the p50 of a trailing baseline
+"""
+
+import re
+from typing import Optional
+
+import pandas as pd
+
+RUN_START_STEP = "init_config"
+RUN_STEP = "(run)"  # pseudo step holding whole-run durations
+TASK_PATTERN = re.compile(r"task: (\S+)")
+RUN_KEYS = ["username", "job_name", "job_type"]
+GROUP_KEYS = ["job_name", "step_name", "task"]
+
+DEFAULT_PERF_SETTINGS = {
+    "window_days": 7,
+    "baseline_days": 28,
+    "regression_ratio": 1.5,
+    "min_delta_sec": 30,
+    "min_baseline_runs": 5,
+    "top_n": 10,
+}
+
+
+def reconstruct_step_durations(logs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rebuild runs from log rows and compute the duration of every step.
+
+    Args:
+        logs (pd.DataFrame): logs.daily_logs rows (ts, username, job_name,
+            job_type, step_id, step_name, message)
+
+    Returns:
+        pd.DataFrame: One row per step and one RUN_STEP row per run, with
+            run_id, date, job_name, job_type, step_name, task, started_at,
+            duration_sec
+    """
+    columns = ["run_id", "date", "job_name", "job_type", "step_name", "task", "started_at", "duration_sec"]
+    if logs.empty:
+        return pd.DataFrame(columns=columns)
+
+    df = logs.copy()
+    df["ts"] = pd.to_datetime(df["ts"])
+    df["step_id"] = pd.to_numeric(df["step_id"], errors="coerce")
+    df = df.sort_values(RUN_KEYS + ["ts", "step_id"]).reset_index(drop=True)
+
+    same_stream = (df[RUN_KEYS] == df[RUN_KEYS].shift()).all(axis=1)
+    new_run = (
+        ~same_stream
+        | (df["step_name"] == RUN_START_STEP)
+        | (df["step_id"] <= df["step_id"].shift())
+    )
+    df["run_seq"] = new_run.cumsum()
+    run_start = df.groupby("run_seq")["ts"].transform("min")
+    df["run_id"] = df["username"].astype(str) + "|" + df["job_name"].astype(str) + "|" + run_start.dt.strftime("%Y-%m-%dT%H:%M:%S")
+    df["date"] = run_start.dt.strftime("%Y-%m-%d")
+    df["task"] = df["message"].fillna("").astype(str).str.extract(TASK_PATTERN, expand=False).fillna("")
+
+    next_ts = df.groupby("run_seq")["ts"].shift(-1)
+    df["duration_sec"] = (next_ts - df["ts"]).dt.total_seconds()
+    steps = df[df["duration_sec"].notna()].rename(columns={"ts": "started_at"})
+
+    runs = df.groupby("run_seq").agg(
+        run_id=("run_id", "first"),
+        date=("date", "first"),
+        job_name=("job_name", "first"),
+        job_type=("job_type", "first"),
+        started_at=("ts", "min"),
+        ended_at=("ts", "max"),
+    )
+    runs["step_name"] = RUN_STEP
+    runs["task"] = ""
+    runs["duration_sec"] = (runs["ended_at"] - runs["started_at"]).dt.total_seconds()
+
+    return pd.concat([steps[columns], runs[columns]], ignore_index=True)
+
+
+def summarize_durations(durations: pd.DataFrame) -> pd.DataFrame:
+    """
+    Percentiles of step durations per job, step and task.
+
+    Args:
+        durations (pd.DataFrame): Output of reconstruct_step_durations
+
+    Returns:
+        pd.DataFrame: job_name, step_name, task, runs, p50_sec, p95_sec, max_sec
+    """
+    if durations.empty:
+        return pd.DataFrame(columns=GROUP_KEYS + ["runs", "p50_sec", "p95_sec", "max_sec"])
+    grouped = durations.groupby(GROUP_KEYS)["duration_sec"]
+    summary = pd.DataFrame({
+        "runs": grouped.count(),
+        "p50_sec": grouped.quantile(0.5),
+        "p95_sec": grouped.quantile(0.95),
+        "max_sec": grouped.max(),
+    }).reset_index()
+    return summary.round(1)
+
+
+def detect_regressions(durations: pd.DataFrame, window_start: str, settings: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Compare the p50 of each job, step and task in the report window with its trailing baseline.
+
+    Args:
+        durations (pd.DataFrame): Output of reconstruct_step_durations
+        window_start (str): First date of the report window (YYYY-MM-DD); the
+            baseline is the baseline_days before it
+        settings (Optional[dict]): Overrides of DEFAULT_PERF_SETTINGS
+
+    Returns:
+        pd.DataFrame: One row per compared group with a boolean raise_flag
+            column first, flagged groups first
+    """
+    settings = {**DEFAULT_PERF_SETTINGS, **(settings or {})}
+    baseline_start = (pd.Timestamp(window_start) - pd.Timedelta(days=settings["baseline_days"])).strftime("%Y-%m-%d")
+    window = durations[durations["date"] >= window_start]
+    baseline = durations[(durations["date"] >= baseline_start) & (durations["date"] < window_start)]
+
+    current = window.groupby(GROUP_KEYS)["duration_sec"].agg(window_runs="count", window_p50="median")
+    previous = baseline.groupby(GROUP_KEYS)["duration_sec"].agg(baseline_runs="count", baseline_p50="median")
+    compared = current.join(previous, how="inner").reset_index()
+    compared = compared[compared["baseline_runs"] >= settings["min_baseline_runs"]]
+    if compared.empty:
+        return pd.DataFrame(columns=["raise_flag"] + GROUP_KEYS + ["baseline_p50", "window_p50", "ratio", "delta_sec", "baseline_runs", "window_runs"])
+
+    compared["ratio"] = compared["window_p50"] / compared["baseline_p50"].where(compared["baseline_p50"] > 0)
+    compared["delta_sec"] = compared["window_p50"] - compared["baseline_p50"]
+    compared["raise_flag"] = (compared["ratio"] > settings["regression_ratio"]) & (compared["delta_sec"] >= settings["min_delta_sec"])
+    compared = compared[["raise_flag"] + GROUP_KEYS + ["baseline_p50", "window_p50", "ratio", "delta_sec", "baseline_runs", "window_runs"]]
+    return compared.sort_values(["raise_flag", "delta_sec"], ascending=[False, False]).reset_index(drop=True).round(2)
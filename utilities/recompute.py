@@ -0,0 +1,233 @@
+"""
+Change-driven recomputation of the job graph for Gaming BI System.
+
+When a source backfills or corrects past days, pipelines/recompute/recompute.py
+reruns exactly the downstream partitions that depend on them:
+
+1. Watched tables are the sources the daily plans read that no job writes
+   (lineage of the compiled plans, utilities/compiler.py), plus the tables in
+   the "watch" list of job_graph.json (e.g. a mart corrected by hand).
+2. One metadata-only query per dataset reads their INFORMATION_SCHEMA.PARTITIONS
+   over the last `lookback_days` before the processing date. Each partition's
+   row count and last_modified_time are compared with the snapshot stored by
+   the last successful run under state/recompute/<project>/. Only dates
+   covered by both snapshots are compared; newer days belong to the regular
+   daily runs.
+3. Changed dates flow down the job graph in dependency order. A job reading
+   a changed table is affected on the same dates, shifted by its "lag_days"
+   for that upstream (kpi_daily's D1 retention on D + 1 depends on dim_user's
+   install date D). Dates after the processing date are left to the coming
+   daily runs. "partition" jobs rerun their daily action once per affected date.
+   "rebuild" jobs (whose daily load accumulates, like user_panel) run init
+   once, and their downstream treat the triggering dates as changed.
+4. The new snapshot is stored only when every recomputation succeeded, so a
+   failed run is retried in full by the next one.
+
+The first run records the snapshot and recomputes nothing.
+"""
+
+import os
+import json
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .constants import DATE_FMT, LOGS_TABLE, RECOMPUTE_STATE_DIR
+from .compiler import load_or_compile_job
+from .job_graph import topological_order
+from .sampling import get_sampling
+
+
+def get_snapshot_path(project_id: str) -> Path:
+    """Return the stored partition snapshot of a project (per sandbox in sampled mode)."""
+    sampling = get_sampling()
+    name = f"partitions_{sampling['dataset']}.json" if sampling else "partitions.json"
+    return RECOMPUTE_STATE_DIR / project_id / name
+
+
+def load_snapshot(path: Path) -> Optional[dict]:
+    """Load a stored snapshot, or None before the first run."""
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_snapshot(path: Path, snapshot: dict) -> None:
+    """Write a snapshot atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(snapshot, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def get_watch_window(y_m_d: str, lookback_days: int) -> tuple:
+    """Return the first and last date watched for changes: the lookback days before the processing date."""
+    end = datetime.strptime(y_m_d, DATE_FMT) - timedelta(days=1)
+    start = end - timedelta(days=lookback_days - 1)
+    return start.strftime(DATE_FMT), end.strftime(DATE_FMT)
+
+
+def build_snapshot(rows: list, start_date: str, end_date: str, taken_at: datetime) -> dict:
+    """
+    Build a snapshot from INFORMATION_SCHEMA.PARTITIONS rows.
+
+    Args:
+        rows (list): Dicts with table_id, partition_id (YYYYMMDD), total_rows
+            and last_modified; partitions that are not days are ignored
+        start_date (str): First watched date
+        end_date (str): Last watched date
+        taken_at (datetime): Snapshot time
+
+    Returns:
+        dict: start_date, end_date, taken_at and tables: table_id ->
+            date -> {"rows", "last_modified"}
+    """
+    tables = {}
+    for row in rows:
+        try:
+            date = datetime.strptime(str(row["partition_id"]), "%Y%m%d").strftime(DATE_FMT)
+        except ValueError:
+            continue
+        if start_date <= date <= end_date:
+            tables.setdefault(row["table_id"], {})[date] = {
+                "rows": None if row["total_rows"] is None else int(row["total_rows"]),
+                "last_modified": row["last_modified"],
+            }
+    return {"start_date": start_date, "end_date": end_date, "taken_at": taken_at.strftime("%Y-%m-%d %H:%M:%S"), "tables": tables}
+
+
+def diff_snapshots(previous: dict, current: dict, tables: list) -> dict:
+    """
+    Return the dates whose partitions changed between two snapshots.
+
+    A partition changed when it was added, removed, or its row count or
+    last_modified_time differ. Only dates inside both snapshot windows are
+    compared, and tables without a previous snapshot are not compared yet.
+
+    Args:
+        previous (dict): Snapshot of the last successful run
+        current (dict): New snapshot
+        tables (list): Watched table ids
+
+    Returns:
+        dict: table_id -> sorted changed dates (tables without changes left out)
+    """
+    start = max(previous["start_date"], current["start_date"])
+    end = min(previous["end_date"], current["end_date"])
+    changed = {}
+    for table in tables:
+        if table not in previous["tables"]:
+            continue
+        before = previous["tables"][table]
+        after = current["tables"].get(table, {})
+        dates = sorted(
+            date for date in set(before) | set(after)
+            if start <= date <= end and before.get(date) != after.get(date)
+        )
+        if dates:
+            changed[table] = dates
+    return changed
+
+
+def get_job_lineage(pipelines_root: Path, project_id: str, jobs: list, y_m_d: str, run_time: datetime) -> dict:
+    """
+    Return the tables the daily plan of every job reads and writes, and whether it runs as a script.
+
+    Args:
+        pipelines_root (Path): pipelines/ directory
+        project_id (str): Google Cloud project ID
+        jobs (list): Job names
+        y_m_d (str): Processing date the plans are compiled for
+        run_time (datetime): Current run time
+
+    Returns:
+        dict: job name -> {"reads", "writes"} (sorted fully qualified table
+            ids) and "script" (daily action runs as one transaction)
+
+    Raises:
+        ValueError: If a daily plan does not compile
+    """
+    lineage = {}
+    for job in jobs:
+        plan = load_or_compile_job(pipelines_root, project_id, job, "daily", y_m_d, run_time)
+        if plan["status"] != "ok":
+            raise ValueError(f"Daily plan of {job} does not compile: {'; '.join(plan['errors'])}")
+        lineage[job] = {
+            "reads": sorted({ref for task in plan["tasks"] for ref in task["reads"]}),
+            "writes": sorted({ref for task in plan["tasks"] for ref in task["writes"]}),
+            "script": "daily" in plan.get("script_actions", []),
+        }
+    return lineage
+
+
+def get_watched_tables(lineage: dict, project_id: str, extra: Optional[list] = None) -> list:
+    """
+    Return the tables to watch: reads of the job plans that no job writes, plus extra tables.
+
+    Args:
+        lineage (dict): job name -> {"reads", "writes"} of its daily plan
+        project_id (str): Google Cloud project ID
+        extra (Optional[list]): Additional `dataset.table` or `project.dataset.table` ids
+
+    Returns:
+        list: Sorted fully qualified table ids
+    """
+    written = {ref for job in lineage.values() for ref in job["writes"]}
+    watched = {
+        ref for job in lineage.values() for ref in job["reads"]
+        if ref not in written and "INFORMATION_SCHEMA" not in ref
+        and ref.rsplit(".", 1)[-1] != LOGS_TABLE.rsplit(".", 1)[-1]
+    }
+    watched.update(ref if ref.count(".") == 2 else f"{project_id}.{ref}" for ref in (extra or []))
+    return sorted(watched)
+
+
+def shift_dates(dates, lags: list) -> set:
+    """Return every date shifted by every lag in days."""
+    return {
+        (datetime.strptime(date, DATE_FMT) + timedelta(days=lag)).strftime(DATE_FMT)
+        for date in dates for lag in lags
+    }
+
+
+def plan_recompute(graph: dict, recompute_jobs: dict, lineage: dict, changed: dict, y_m_d: str) -> list:
+    """
+    Propagate changed partitions down the job graph.
+
+    Args:
+        graph (dict): job name -> upstream job names
+        recompute_jobs (dict): job name -> {"mode", "lag_days"} (see
+            utilities.job_graph.load_recompute_settings)
+        lineage (dict): job name -> {"reads", "writes"} of its daily plan
+        changed (dict): table id -> changed dates
+        y_m_d (str): Processing date, already run by the daily graph; later
+            affected dates are left to the coming daily runs
+
+    Returns:
+        list: Steps in dependency order: job, mode, dates (sorted) and
+            triggers (upstream job or table -> its changed dates)
+    """
+    writer = {ref: job for job, tables in lineage.items() for ref in tables["writes"]}
+    affected = {table: set(dates) for table, dates in changed.items()}
+    steps = []
+    for job in topological_order(graph):
+        conf = recompute_jobs.get(job, {"mode": "partition", "lag_days": {}})
+        dates, triggers = set(), {}
+        for ref in lineage.get(job, {}).get("reads", []):
+            if ref in lineage[job]["writes"] or not affected.get(ref):
+                continue
+            upstream = writer.get(ref, ref)
+            triggers.setdefault(upstream, set()).update(affected[ref])
+            dates |= shift_dates(affected[ref], conf["lag_days"].get(upstream, [0]))
+        dates = {date for date in dates if date <= y_m_d}
+        if not dates:
+            continue
+        for ref in lineage[job]["writes"]:
+            affected.setdefault(ref, set()).update(dates)
+        steps.append({
+            "job": job,
+            "mode": conf["mode"],
+            "dates": sorted(dates),
+            "triggers": {upstream: sorted(upstream_dates) for upstream, upstream_dates in triggers.items()},
+        })
+    return steps
@@ -0,0 +1,219 @@
+"""
+Retry engine for BigQuery calls in Gaming BI System.
+
+Each attempt holds an admission slot (utilities.admission) while its job
+runs; the slot is released during backoff.
+
+Errors are classified by exception type and BigQuery error reason rather than
+by message text. Retryable errors are retried with jittered exponential
+backoff, bounded by a maximum number of attempts and a total sleep budget.
+
+ETL tasks are submitted with deterministic job ids:
+
+    <job_name>_<task_name>_<YYYYMMDD>_<run_id>_a<attempt>
+
+After an ambiguous failure (e.g., the connection dropped after the job was
+created) the same job id is submitted again: BigQuery answers 409 Conflict
+and the existing job is awaited instead of running the DML a second time.
+The attempt number only advances once the previous job is known to have
+finished with an error, which leaves the table unchanged.
+"""
+
+import re
+import time
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+from google.api_core import exceptions as api_exceptions
+
+from .constants import (
+    DEFAULT_RETRY_MAX_ATTEMPTS,
+    DEFAULT_RETRY_BASE_DELAY_SEC,
+    DEFAULT_RETRY_MAX_DELAY_SEC,
+    DEFAULT_RETRY_BUDGET_SEC,
+)
+from .watchdog import Deadline, QueryTimeoutError, run_query_with_deadline
+from .admission import admit, get_job_priority
+from .labels import build_job_labels
+
+# BigQuery error reasons worth retrying (https://cloud.google.com/bigquery/docs/error-messages)
+RETRYABLE_REASONS = {
+    "backendError",
+    "internalError",
+    "jobBackendError",
+    "jobInternalError",
+    "rateLimitExceeded",
+    "jobRateLimitExceeded",
+    "tableUnavailable",
+}
+
+RETRYABLE_EXCEPTIONS = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.GatewayTimeout,
+    ConnectionError,
+)
+
+_JOB_ID_RE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff settings; `budget_sec` caps the total time spent sleeping."""
+    max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS
+    base_delay_sec: float = DEFAULT_RETRY_BASE_DELAY_SEC
+    max_delay_sec: float = DEFAULT_RETRY_MAX_DELAY_SEC
+    budget_sec: float = DEFAULT_RETRY_BUDGET_SEC
+
+    @classmethod
+    def from_conf(cls, conf: Optional[dict]) -> "RetryPolicy":
+        """Build a policy from a config "retry" block; missing keys keep defaults."""
+        conf = conf or {}
+        return cls(**{key: conf[key] for key in cls.__dataclass_fields__ if key in conf})
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter backoff delay before the next attempt."""
+        return random.uniform(0, min(self.max_delay_sec, self.base_delay_sec * 2 ** (attempt - 1)))
+
+
+def get_error_reasons(error: Exception) -> set:
+    """Return the BigQuery error reasons attached to an API exception."""
+    reasons = set()
+    for item in getattr(error, "errors", None) or []:
+        if isinstance(item, dict) and item.get("reason"):
+            reasons.add(item["reason"])
+    return reasons
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Decide whether an error is transient.
+
+    Args:
+        error (Exception): Raised exception
+
+    Returns:
+        bool: True for transient HTTP/transport errors or retryable BigQuery reasons
+    """
+    if isinstance(error, QueryTimeoutError):
+        return False
+    if isinstance(error, RETRYABLE_EXCEPTIONS):
+        return True
+    try:
+        from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
+        from google.auth.exceptions import TransportError
+        if isinstance(error, (RequestsConnectionError, RequestsTimeout, TransportError)):
+            return True
+    except ImportError:
+        pass
+    # 400/403 carry retryable reasons such as rateLimitExceeded or backendError
+    return bool(get_error_reasons(error) & RETRYABLE_REASONS)
+
+
+def build_job_id_prefix(job_name: str, task_name: str, y_m_d: str, run_id: str) -> str:
+    """Return the deterministic job id prefix of a task; the attempt is appended per submission."""
+    return _JOB_ID_RE.sub("_", f"{job_name}_{task_name}_{y_m_d.replace('-', '')}_{run_id}")
+
+
+def _job_failed(client, job_id: str) -> bool:
+    """Return True when the job exists and finished with an error; unknown state counts as not failed."""
+    try:
+        job = client.get_job(job_id)
+        return job.state == "DONE" and job.error_result is not None
+    except Exception:
+        return False
+
+
+def run_query_with_retry(
+    client,
+    query: str,
+    job_id_prefix: Optional[str] = None,
+    policy: Optional[RetryPolicy] = None,
+    timeout_sec: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    hedge_after_sec: Optional[float] = None,
+    to_dataframe: bool = False,
+    job_config=None,
+    priority: str = "interactive",
+    dml_table: Optional[str] = None,
+    stats: Optional[dict] = None,
+    labels: Optional[dict] = None,
+):
+    """
+    Run a query with deadlines, retrying transient errors.
+
+    Args:
+        client: BigQuery client
+        query (str): SQL to run
+        job_id_prefix (Optional[str]): Deterministic job id prefix (see
+            build_job_id_prefix); random job ids when None
+        policy (Optional[RetryPolicy]): Backoff settings
+        timeout_sec (Optional[float]): Deadline of each attempt
+        deadline (Optional[Deadline]): Run deadline shared by all attempts
+        hedge_after_sec (Optional[float]): Hedging delay for read-only queries
+        to_dataframe (bool): Return a DataFrame instead of the row iterator
+        job_config: Optional bigquery.QueryJobConfig
+        priority (str): Priority class (interactive or batch), used for
+            admission order and the BigQuery job priority
+        dml_table (Optional[str]): Destination table when the query is DML,
+            counted against the per-table DML cap
+        stats (Optional[dict]): Filled with attempts, queue_wait_sec and the
+            job_id of the last submission (when job_id_prefix is set)
+        labels (Optional[dict]): Job labels (see utilities.labels); jobs without
+            them are labelled pipeline=adhoc with the run id and date
+
+    Returns:
+        Query rows (RowIterator) or a pandas DataFrame
+
+    Raises:
+        QueryTimeoutError: If a deadline was hit
+        Exception: The last error when it is not retryable or retries are exhausted
+    """
+    from google.cloud import bigquery
+
+    policy = policy or RetryPolicy()
+    deadline = deadline or Deadline()
+    job_config = job_config or bigquery.QueryJobConfig()
+    job_config.priority = get_job_priority(priority)
+    job_config.labels = {**(job_config.labels or {}), **(labels or build_job_labels("adhoc"))}
+    stats = stats if stats is not None else {}
+    stats.setdefault("queue_wait_sec", 0.0)
+    slept = 0.0
+    attempt = 1
+    tries = 0
+    while True:
+        if deadline.expired():
+            raise QueryTimeoutError(deadline.timeout_sec, [])
+        job_id = f"{job_id_prefix}_a{attempt}" if job_id_prefix else None
+        tries += 1
+        stats["attempts"] = tries
+        stats["job_id"] = job_id
+        try:
+            with admit(client.project, "dml" if dml_table else "query", dml_table, priority) as waited:
+                stats["queue_wait_sec"] += waited
+                if deadline.expired():
+                    raise QueryTimeoutError(deadline.timeout_sec, [])
+                return run_query_with_deadline(
+                    client,
+                    query,
+                    deadline.cap(timeout_sec),
+                    job_config=job_config,
+                    hedge_after_sec=hedge_after_sec,
+                    to_dataframe=to_dataframe,
+                    job_id=job_id,
+                )
+        except Exception as e:
+            if not is_retryable(e) or tries >= policy.max_attempts:
+                raise
+            delay = policy.delay(tries)
+            if slept + delay > policy.budget_sec:
+                raise
+            print(f"[WARNING] Retryable error on attempt {tries}/{policy.max_attempts} ({type(e).__name__}: {e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+            slept += delay
+            # Reuse the job id unless that job is known to have failed
+            if job_id is None or _job_failed(client, job_id):
+                attempt += 1
@@ -0,0 +1,51 @@
+"""
+Run context for Gaming BI System.
+
+A run id identifies one scheduled execution (one process, or several
+processes sharing BI_RUN_ID). It is part of every deterministic BigQuery job
+id, so retries inside a run reuse job ids while a later re-run of the same
+date gets fresh ones.
+"""
+
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Optional
+
+_RUN_ID: Optional[str] = None
+_RUN_INFO = {"started_at": datetime.now().isoformat(timespec="seconds")}
+_RUN_LOCK = threading.Lock()
+
+
+def new_run_id() -> str:
+    """Generate a fresh run id: <start timestamp>_<random suffix>."""
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+def get_run_id() -> str:
+    """Return the current run id; taken from BI_RUN_ID or generated once per process."""
+    global _RUN_ID
+    with _RUN_LOCK:
+        if _RUN_ID is None:
+            _RUN_ID = os.getenv("BI_RUN_ID") or new_run_id()
+        return _RUN_ID
+
+
+def set_run_id(run_id: str) -> None:
+    """Set the run id explicitly (e.g., when resuming a previous run)."""
+    global _RUN_ID
+    with _RUN_LOCK:
+        _RUN_ID = run_id
+
+
+def set_run_info(**info) -> None:
+    """Record run attributes (e.g., processing date) stored with the run's artifacts."""
+    with _RUN_LOCK:
+        _RUN_INFO.update(info)
+
+
+def get_run_info() -> dict:
+    """Return a copy of the recorded run attributes."""
+    with _RUN_LOCK:
+        return dict(_RUN_INFO)
@@ -0,0 +1,152 @@
+"""
+Sampled development mode for Gaming BI System.
+
+With `--sample PCT` (utilities/cli.py) a process runs the pipelines on a
+deterministic PCT% of users, in a per-developer sandbox dataset:
+
+- Source tables outside the project (e.g. `ppltx-ba-course.project_game.
+  playpltx_fact`) are rendered as a subquery keeping only users whose
+  FARM_FINGERPRINT(user_id) falls in the sample. The same users are kept in
+  every table and every run, so joins still line up.
+- Every `{dataset...}` placeholder is redirected to the sandbox dataset
+  (`dev_<developer>` from BI_DEVELOPER or the OS user, or --sandbox), so the
+  whole chain fact -> panels -> curated -> KPIs reads and writes sandbox
+  tables built from the sample.
+- daily_logs rows go to `<sandbox>.daily_logs` and Slack notifications are
+  not sent, so sampled runs never look like production runs.
+- KPI monitors scale count metrics (`"sample_scaling": "count"`) by
+  100 / PCT; ratios are left as they are.
+
+The mode is process-wide, like the run id (utilities/run_context.py).
+"""
+
+import os
+import re
+import getpass
+import threading
+from typing import Optional
+
+from .constants import DEFAULT_SAMPLE_COLUMN, DEFAULT_SANDBOX_TABLE_EXPIRATION_DAYS
+
+SAMPLE_BUCKETS = 10000
+SANDBOX_PREFIX = "dev_"
+
+# `<literal project>.{dataset}.{table}`: a source outside the rendered project
+_EXTERNAL_REF = re.compile(r"`(?!\{project\})([a-z][a-z0-9-]*)\.\{(\w+)\}\.\{(\w+)\}`")
+
+_SAMPLING: Optional[dict] = None
+_SAMPLING_LOCK = threading.Lock()
+
+
+def get_sandbox_dataset(developer: Optional[str] = None) -> str:
+    """Return the developer's sandbox dataset: dev_<developer>, lowercased, BigQuery-safe."""
+    developer = developer or os.getenv("BI_DEVELOPER") or getpass.getuser()
+    return SANDBOX_PREFIX + re.sub(r"[^a-z0-9_]", "_", developer.lower())
+
+
+def configure_sampling(pct: Optional[float], sandbox: Optional[str] = None) -> Optional[dict]:
+    """
+    Enable (or with pct None, disable) sampled development mode for this process.
+
+    Args:
+        pct (Optional[float]): Share of users to keep, in percent (0 < pct <= 100)
+        sandbox (Optional[str]): Sandbox dataset (default: dev_<developer>)
+
+    Returns:
+        Optional[dict]: The sampling settings (pct, dataset, buckets)
+
+    Raises:
+        ValueError: If pct is out of range
+    """
+    global _SAMPLING
+    if pct is not None and not 0 < pct <= 100:
+        raise ValueError(f"--sample must be in (0, 100], got {pct}")
+    with _SAMPLING_LOCK:
+        if pct is None:
+            _SAMPLING = None
+        else:
+            # Keep at least one bucket so tiny samples are never empty
+            _SAMPLING = {
+                "pct": pct,
+                "dataset": sandbox or get_sandbox_dataset(),
+                "buckets": max(1, round(pct / 100 * SAMPLE_BUCKETS)),
+            }
+        return dict(_SAMPLING) if _SAMPLING else None
+
+
+def get_sampling() -> Optional[dict]:
+    """Return the sampling settings, or None when not in sampled mode."""
+    with _SAMPLING_LOCK:
+        return dict(_SAMPLING) if _SAMPLING else None
+
+
+def sample_predicate(column: str, buckets: int) -> str:
+    """SQL predicate keeping `buckets` of SAMPLE_BUCKETS hash buckets of `column`."""
+    return f"MOD(ABS(FARM_FINGERPRINT(CAST({column} AS STRING))), {SAMPLE_BUCKETS}) < {buckets}"
+
+
+def resolve_dataset(dataset: str) -> str:
+    """Return the dataset to use: the sandbox in sampled mode, else dataset itself."""
+    sampling = get_sampling()
+    return sampling["dataset"] if sampling else dataset
+
+
+def apply_sampling(query_template: str, params: dict) -> tuple:
+    """
+    Rewrite a query template and its parameters for sampled mode.
+
+    Args:
+        query_template (str): SQL template
+        params (dict): Format parameters of the template
+
+    Returns:
+        tuple: (query_template, params); unchanged when not in sampled mode
+    """
+    sampling = get_sampling()
+    if not sampling:
+        return query_template, params
+
+    predicate = sample_predicate(params.get("sample_column", DEFAULT_SAMPLE_COLUMN), sampling["buckets"])
+
+    def sample_source(match):
+        project, dataset_key, table_key = match.groups()
+        source = f"{project}.{params[dataset_key]}.{params[table_key]}"
+        return f"(SELECT * FROM `{source}` WHERE {predicate})"
+
+    query_template = _EXTERNAL_REF.sub(sample_source, query_template)
+    params = {
+        key: sampling["dataset"] if key.startswith("dataset") and isinstance(value, str) else value
+        for key, value in params.items()
+    }
+    return query_template, params
+
+
+def scale_metric(values, scaling: Optional[str]):
+    """
+    Scale a sampled KPI series back to full-population size.
+
+    Args:
+        values: Metric values (scalar or pandas Series)
+        scaling (Optional[str]): "count" to scale by 100 / pct; anything else
+            (ratios, averages) is returned unchanged
+
+    Returns:
+        The scaled values
+    """
+    sampling = get_sampling()
+    if not sampling or scaling != "count":
+        return values
+    return values * (SAMPLE_BUCKETS / sampling["buckets"])
+
+
+def ensure_sandbox_dataset(client, project_id: str) -> None:
+    """Create the sandbox dataset if missing; its tables expire after a few days."""
+    sampling = get_sampling()
+    if not sampling or client is None:
+        return
+    from google.cloud import bigquery
+
+    dataset = bigquery.Dataset(f"{project_id}.{sampling['dataset']}")
+    dataset.default_table_expiration_ms = DEFAULT_SANDBOX_TABLE_EXPIRATION_DAYS * 24 * 3600 * 1000
+    dataset.description = "Sampled development sandbox (--sample)"
+    client.create_dataset(dataset, exists_ok=True)
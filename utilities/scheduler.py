@@ -0,0 +1,337 @@
+"""
+Daily scheduling for Gaming BI System.
+
+The resident scheduler (scheduler/scheduler_daemon.py) replaces crontab and
+the execute_*.sh chains. Each processing date is a run date, exactly like a
+cron run with --days-back 0 on that day. On every poll the scheduler walks
+the due dates oldest first and runs a job for a date once:
+
+- the job's not_before time on that date has passed
+- its upstream jobs (pipelines/job_graph.json, or "depends_on" in the
+  schedule config) succeeded for the date
+- its sensors pass (e.g. the source partition exists and has settled)
+
+A job that already logged a successful `end` for the date (run by hand or by
+another host) is marked done without running again. Dates missed while the
+daemon was down are caught up automatically, back to catchup_days. Job status
+per date lives in a JSON state file under state/scheduler/, so a restart
+resumes where the previous process stopped. Time comes from a Clock;
+FakeClock drives whole days in tests without sleeping.
+"""
+
+import os
+import json
+import time
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from .constants import (
+    DATE_FMT,
+    DEFAULT_SCHEDULER_POLL_SEC,
+    DEFAULT_SCHEDULER_CATCHUP_DAYS,
+    DEFAULT_SCHEDULER_MAX_ATTEMPTS,
+    DEFAULT_SCHEDULER_RETRY_AFTER_MIN,
+)
+from .job_graph import topological_order
+
+DEFAULT_SCHEDULE_SETTINGS = {
+    "poll_sec": DEFAULT_SCHEDULER_POLL_SEC,
+    "catchup_days": DEFAULT_SCHEDULER_CATCHUP_DAYS,
+    "max_attempts": DEFAULT_SCHEDULER_MAX_ATTEMPTS,
+    "retry_after_min": DEFAULT_SCHEDULER_RETRY_AFTER_MIN,
+    "not_before": "07:00",
+    "job_action": "daily",
+    "keep_days": 30,
+}
+
+# Final states; everything else is re-evaluated on the next poll
+DONE_STATUSES = ("success", "external")
+
+
+class Clock:
+    """Wall clock used by the scheduler."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class FakeClock(Clock):
+    """Manually driven clock for tests; sleep() advances time instantly."""
+
+    def __init__(self, start: datetime):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        self._now += timedelta(seconds=seconds)
+
+    def advance(self, **delta) -> None:
+        """Move time forward, e.g. advance(hours=2)."""
+        self._now += timedelta(**delta)
+
+
+def build_schedule_graph(schedule_conf: dict, pipeline_graph: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Combine the pipeline job graph with the extra jobs of the schedule config.
+
+    Extra jobs (e.g. the monitoring suite) declare "depends_on" as a list of
+    jobs or "all" for every pipeline job. Jobs with "isEnable": false are
+    dropped, and so are dependencies on them.
+
+    Args:
+        schedule_conf (dict): Parsed schedule config
+        pipeline_graph (Dict[str, List[str]]): Graph from load_job_graph()
+
+    Returns:
+        Dict[str, List[str]]: Mapping of scheduled job name to upstream job names
+
+    Raises:
+        ValueError: If an extra job depends on an unknown job or the graph has a cycle
+    """
+    jobs_conf = schedule_conf.get("jobs", {})
+    graph = {job: list(deps) for job, deps in pipeline_graph.items()}
+    for job, conf in jobs_conf.items():
+        if job in pipeline_graph:
+            continue
+        depends_on = conf.get("depends_on", [])
+        depends_on = list(pipeline_graph) if depends_on == "all" else depends_on
+        unknown = [dep for dep in depends_on if dep not in pipeline_graph and dep not in jobs_conf]
+        if unknown:
+            raise ValueError(f"Scheduled job {job} depends on unknown jobs: {', '.join(unknown)}")
+        graph[job] = depends_on
+
+    disabled = {job for job, conf in jobs_conf.items() if not conf.get("isEnable", True)}
+    graph = {job: [dep for dep in deps if dep not in disabled] for job, deps in graph.items() if job not in disabled}
+    topological_order(graph)  # validates there is no cycle
+    return graph
+
+
+class ScheduleState:
+    """Per-date job status persisted as one JSON file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        else:
+            data = {}
+        self.start_date: Optional[str] = data.get("start_date")
+        self.runs: Dict[str, Dict[str, dict]] = data.get("runs", {})
+        self.heartbeat: Optional[str] = data.get("heartbeat")
+
+    def get(self, job_name: str, y_m_d: str) -> dict:
+        return self.runs.get(job_name, {}).get(y_m_d, {})
+
+    def update(self, job_name: str, y_m_d: str, **fields) -> dict:
+        entry = self.runs.setdefault(job_name, {}).setdefault(y_m_d, {})
+        entry.update(fields)
+        return entry
+
+    def prune(self, before: str) -> None:
+        """Forget dates older than `before` (YYYY-MM-DD)."""
+        for dates in self.runs.values():
+            for y_m_d in [d for d in dates if d < before]:
+                del dates[y_m_d]
+
+    def save(self) -> None:
+        """Write the state atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"start_date": self.start_date, "heartbeat": self.heartbeat, "runs": self.runs}
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def rows(self) -> list:
+        """Return one dict per (date, job), newest date first."""
+        rows = []
+        for job_name, dates in self.runs.items():
+            for y_m_d, entry in dates.items():
+                rows.append({"date": y_m_d, "job_name": job_name, **entry})
+        rows.sort(key=lambda r: r["job_name"])
+        return sorted(rows, key=lambda r: r["date"], reverse=True)
+
+
+class DailyScheduler:
+    """
+    Decide which (job, date) pairs are ready and run them.
+
+    Running, sensing and "already done" checks are injected, so the same
+    scheduling logic runs against BigQuery in the daemon and against fakes
+    in tests.
+
+    Args:
+        schedule_conf (dict): Parsed schedule config ("scheduler" settings and "jobs")
+        graph (Dict[str, List[str]]): Scheduled jobs and their upstream jobs
+        state (ScheduleState): Persistent job status per date
+        clock (Clock): Time source
+        run_fn (Callable): run_fn(job_name, y_m_d, run_time) -> result dict with
+            "status" ("success" or "failed") and optional "errors"
+        sensor_fn (Callable): sensor_fn(job_name, sensor_conf, y_m_d, now) -> (ok, detail)
+        done_fn (Optional[Callable]): done_fn(job_name, y_m_d) -> True when the
+            job already logged a successful end for the date
+    """
+
+    def __init__(
+        self,
+        schedule_conf: dict,
+        graph: Dict[str, List[str]],
+        state: ScheduleState,
+        clock: Clock,
+        run_fn: Callable,
+        sensor_fn: Callable,
+        done_fn: Optional[Callable] = None,
+    ):
+        self.settings = {**DEFAULT_SCHEDULE_SETTINGS, **schedule_conf.get("scheduler", {})}
+        self.jobs_conf = schedule_conf.get("jobs", {})
+        self.graph = graph
+        self.order = topological_order(graph)
+        self.state = state
+        self.clock = clock
+        self.run_fn = run_fn
+        self.sensor_fn = sensor_fn
+        self.done_fn = done_fn
+        self._recover_interrupted()
+
+    def _recover_interrupted(self) -> None:
+        """Runs left "running" by a stopped process count as failed attempts."""
+        now = self.clock.now().isoformat(timespec="seconds")
+        for row in self.state.rows():
+            if row.get("status") == "running":
+                self.state.update(row["job_name"], row["date"], status="failed", detail="interrupted", finished_at=now)
+
+    def _due_at(self, job_name: str, y_m_d: str) -> datetime:
+        not_before = self.jobs_conf.get(job_name, {}).get("not_before", self.settings["not_before"])
+        hour, minute = (int(part) for part in not_before.split(":"))
+        return datetime.strptime(y_m_d, DATE_FMT).replace(hour=hour, minute=minute)
+
+    def pending_dates(self, now: datetime) -> List[str]:
+        """Return the dates inside the catch-up window, oldest first."""
+        today = now.date()
+        if self.state.start_date is None:
+            # First start: schedule from today, older dates are not caught up
+            self.state.start_date = today.strftime(DATE_FMT)
+        first = max(
+            datetime.strptime(self.state.start_date, DATE_FMT).date(),
+            today - timedelta(days=self.settings["catchup_days"]),
+        )
+        return [(first + timedelta(days=i)).strftime(DATE_FMT) for i in range((today - first).days + 1)]
+
+    def _blocked_by(self, job_name: str, y_m_d: str) -> tuple:
+        """Return (failed upstream jobs, upstream jobs not done yet)."""
+        failed, waiting = [], []
+        for upstream in self.graph[job_name]:
+            entry = self.state.get(upstream, y_m_d)
+            if entry.get("status") in DONE_STATUSES:
+                continue
+            exhausted = entry.get("status") == "failed" and entry.get("attempts", 0) >= self.settings["max_attempts"]
+            if exhausted or entry.get("status") == "blocked":
+                failed.append(upstream)
+            else:
+                waiting.append(upstream)
+        return failed, waiting
+
+    def _check_sensors(self, job_name: str, y_m_d: str, now: datetime) -> tuple:
+        for sensor_conf in self.jobs_conf.get(job_name, {}).get("sensors", []):
+            ok, detail = self.sensor_fn(job_name, sensor_conf, y_m_d, now)
+            if not ok:
+                return False, detail
+        return True, ""
+
+    def tick(self) -> list:
+        """
+        Run every ready (job, date) once, oldest date first.
+
+        Returns:
+            list: Dicts with job_name, date and status of the jobs run or skipped this poll
+        """
+        now = self.clock.now()
+        self.state.heartbeat = now.isoformat(timespec="seconds")
+        dates = self.pending_dates(now)
+        actions = []
+
+        for y_m_d in dates:
+            for job_name in self.order:
+                entry = self.state.get(job_name, y_m_d)
+                status = entry.get("status")
+                if status in DONE_STATUSES:
+                    continue
+                if now < self._due_at(job_name, y_m_d):
+                    continue
+                if status == "failed":
+                    if entry.get("attempts", 0) >= self.settings["max_attempts"]:
+                        continue
+                    finished_at = datetime.fromisoformat(entry["finished_at"])
+                    if now < finished_at + timedelta(minutes=self.settings["retry_after_min"]):
+                        continue
+
+                failed, waiting = self._blocked_by(job_name, y_m_d)
+                if failed:
+                    self.state.update(job_name, y_m_d, status="blocked", detail=f"upstream failed: {', '.join(failed)}")
+                    continue
+                if waiting:
+                    self.state.update(job_name, y_m_d, status="waiting", detail=f"upstream: {', '.join(waiting)}")
+                    continue
+
+                if self.done_fn is not None and self.done_fn(job_name, y_m_d):
+                    self.state.update(job_name, y_m_d, status="external", detail="successful end already logged", finished_at=now.isoformat(timespec="seconds"))
+                    actions.append({"job_name": job_name, "date": y_m_d, "status": "external"})
+                    continue
+
+                ready, detail = self._check_sensors(job_name, y_m_d, now)
+                if not ready:
+                    self.state.update(job_name, y_m_d, status="waiting", detail=detail)
+                    continue
+
+                actions.append(self._run(job_name, y_m_d))
+                now = self.clock.now()
+
+        self.state.prune((datetime.strptime(dates[-1], DATE_FMT) - timedelta(days=self.settings["keep_days"])).strftime(DATE_FMT))
+        self.state.save()
+        return actions
+
+    def _run(self, job_name: str, y_m_d: str) -> dict:
+        started = self.clock.now()
+        attempts = self.state.get(job_name, y_m_d).get("attempts", 0) + 1
+        self.state.update(job_name, y_m_d, status="running", attempts=attempts, detail="", started_at=started.isoformat(timespec="seconds"))
+        self.state.save()
+
+        try:
+            result = self.run_fn(job_name, y_m_d, started)
+            status = "success" if result.get("status") in ("success", "skipped") else "failed"
+            detail = "; ".join(f"{task}: {error}" for task, error in result.get("errors", {}).items())
+        except Exception as e:
+            print(f"[ERROR] Scheduled job {job_name} for {y_m_d} failed: {e}")
+            status, detail = "failed", str(e)
+
+        finished = self.clock.now()
+        self.state.update(
+            job_name, y_m_d,
+            status=status,
+            detail=detail[:500],
+            finished_at=finished.isoformat(timespec="seconds"),
+            duration_sec=round((finished - started).total_seconds(), 1),
+        )
+        self.state.save()
+        return {"job_name": job_name, "date": y_m_d, "status": status, "attempts": attempts}
+
+    def run_forever(self, max_polls: Optional[int] = None) -> None:
+        """Poll until interrupted (or for max_polls polls)."""
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            try:
+                actions = self.tick()
+            except Exception as e:
+                # A resident process must survive a bad poll (e.g. BigQuery unavailable)
+                print(f"[ERROR] Scheduler poll failed: {e}")
+                actions = []
+            for action in actions:
+                print(f"[{self.clock.now().strftime('%Y-%m-%d %H:%M:%S')}] {action['job_name']} {action['date']}: {action['status']}")
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                self.clock.sleep(self.settings["poll_sec"])
@@ -0,0 +1,301 @@
+"""
+Schema registry for Gaming BI System.
+
+Versioned local schema files live next to each pipeline in
+pipelines/<job_name>/schemas/v<N>.json:
+
+- The ingesting job (fact) registers the catalog of source columns:
+    {"version": 1, "role": "source", "table": "fp_gaming_raw_data.fact", "columns": [...]}
+- Each downstream job registers the columns it consumes from that table:
+    {"version": 1, "role": "consumer", "source_job": "fact", "columns": [...]}
+
+Ingestion projects only the union of the consumers' columns. A template
+reading the source table fails at render time instead of in the warehouse
+when it references a catalog column its job did not register, or uses a
+column the catalog does not have against the source table.
+"""
+
+import re
+from pathlib import Path
+from typing import Optional
+
+from .io import read_json
+
+SCHEMAS_DIR = "schemas"
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`")
+_IDENTIFIER_RE = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]*\b")
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_SOURCE_REF_RE = re.compile(r"`[^`]*\{dataset_src\}\.\{table_src\}`")
+_BOUNDARY_RE = re.compile(r"\b(?:UNION|INTERSECT)\b", re.IGNORECASE)
+
+# Words that are never columns: reserved keywords, date parts and clause words
+SQL_KEYWORDS = frozenset("""
+    ALL AND ANY ARRAY AS ASC AT BETWEEN BY CASE CAST COLLATE CONTAINS CREATE CROSS CUBE CURRENT
+    DEFAULT DESC DISTINCT ELSE END ESCAPE EXCEPT EXCLUDE EXISTS EXTRACT FALSE FETCH FOLLOWING FOR
+    FROM FULL GROUP GROUPING GROUPS HAVING IF IGNORE IN INNER INSERT INTERSECT INTERVAL INTO IS
+    JOIN LATERAL LEFT LIKE LIMIT MATCHED MERGE NATURAL NOT NULL NULLS OF OFFSET ON OR ORDER OUTER
+    OVER PARTITION PRECEDING QUALIFY RANGE RECURSIVE REPLACE RESPECT RIGHT ROLLUP ROW ROWS SELECT
+    SET SOME STRUCT TABLE TABLESAMPLE THEN TO TRUE UNBOUNDED UNION UNNEST UPDATE USING VALUES WHEN
+    WHERE WINDOW WITH WITHIN
+    MICROSECOND MILLISECOND SECOND MINUTE HOUR DAY DAYOFWEEK DAYOFYEAR WEEK ISOWEEK MONTH QUARTER
+    YEAR ISOYEAR
+""".split())
+
+
+def get_schema_versions(pipelines_root: Path, job_name: str) -> list:
+    """Return the registered schema versions of a job, ascending."""
+    schema_dir = pipelines_root / job_name / SCHEMAS_DIR
+    if not schema_dir.exists():
+        return []
+    versions = []
+    for path in schema_dir.glob("v*.json"):
+        if path.stem[1:].isdigit():
+            versions.append(int(path.stem[1:]))
+    return sorted(versions)
+
+
+def load_schema(pipelines_root: Path, job_name: str, version: Optional[int] = None) -> Optional[dict]:
+    """
+    Load a registered schema of a job.
+
+    Args:
+        pipelines_root (Path): pipelines/ directory
+        job_name (str): Pipeline job name
+        version (Optional[int]): Schema version; latest when None
+
+    Returns:
+        Optional[dict]: Schema with version, role and columns, or None if the
+            job has no registered schema
+    """
+    versions = get_schema_versions(pipelines_root, job_name)
+    if not versions:
+        return None
+    version = version if version is not None else versions[-1]
+    if version not in versions:
+        raise ValueError(f"Schema version v{version} is not registered for job {job_name}")
+    schema = read_json(pipelines_root / job_name / SCHEMAS_DIR / f"v{version}.json")
+    schema["job_name"] = job_name
+    return schema
+
+
+def load_consumer_schemas(pipelines_root: Path, source_job: str) -> list:
+    """Return the latest schema of every job that consumes the source job's table."""
+    consumers = []
+    for job_dir in sorted(p for p in pipelines_root.iterdir() if p.is_dir()):
+        schema = load_schema(pipelines_root, job_dir.name)
+        if schema and schema.get("role") == "consumer" and schema.get("source_job") == source_job:
+            consumers.append(schema)
+    return consumers
+
+
+def get_source_projection(pipelines_root: Path, source_job: str) -> list:
+    """
+    Return the columns to ingest: the union of all consumer columns.
+
+    Columns keep the catalog order so the destination schema is stable.
+
+    Args:
+        pipelines_root (Path): pipelines/ directory
+        source_job (str): Ingesting job name (e.g., 'fact')
+
+    Returns:
+        list: Column names to project
+
+    Raises:
+        ValueError: If a consumer registers a column missing from the catalog
+    """
+    catalog = load_schema(pipelines_root, source_job)
+    if not catalog or catalog.get("role") != "source":
+        raise ValueError(f"No source schema registered for job {source_job}")
+
+    required = set(catalog.get("always_include", []))
+    for consumer in load_consumer_schemas(pipelines_root, source_job):
+        unknown = [c for c in consumer["columns"] if c not in catalog["columns"]]
+        if unknown:
+            raise ValueError(
+                f"Job {consumer['job_name']} (schema v{consumer['version']}) registers columns "
+                f"missing from the {source_job} catalog: {', '.join(unknown)}"
+            )
+        required.update(consumer["columns"])
+    return [c for c in catalog["columns"] if c in required]
+
+
+def extract_referenced_columns(query_template: str, candidates: list) -> set:
+    """
+    Return the candidate column names referenced by a SQL template.
+
+    Comments, string literals and backticked table references are ignored.
+
+    Args:
+        query_template (str): SQL template text
+        candidates (list): Column names to look for
+
+    Returns:
+        set: Referenced candidate columns
+    """
+    code = _LITERAL_RE.sub(" ", _COMMENT_RE.sub(" ", query_template))
+    code = re.sub(r"\{[^{}]*\}", " ", code)  # placeholders are not columns
+    lookup = {c.lower(): c for c in candidates}
+    return {lookup[token.lower()] for token in _IDENTIFIER_RE.findall(code) if token.lower() in lookup}
+
+
+def _mask_nested_subqueries(code: str) -> str:
+    """Blank out parenthesized subqueries, which read their own tables."""
+    chars = list(code)
+    stack = []
+    for i, ch in enumerate(code):
+        if ch == "(":
+            stack.append(i)
+        elif ch == ")" and stack:
+            start = stack.pop()
+            if re.match(r"\s*(?:SELECT|WITH)\b", code[start + 1:i], re.IGNORECASE):
+                chars[start + 1:i] = " " * (i - start - 1)
+    return "".join(chars)
+
+
+def extract_source_identifiers(query_template: str) -> set:
+    """
+    Return the identifiers a SQL template uses as columns of the task's source table.
+
+    Every SELECT reading `...{dataset_src}.{table_src}` directly is scanned:
+    its unqualified identifiers and those qualified by the source alias count,
+    while keywords, functions, qualifiers of other tables, output aliases
+    (`AS name`, and their reuse after FROM), CAST types and placeholders do
+    not. Nested subqueries are
+    skipped, and a SELECT that joins other tables only counts identifiers
+    qualified by the source alias.
+
+    Args:
+        query_template (str): SQL template text
+
+    Returns:
+        set: Identifiers, as written in the template
+    """
+    code = _STRING_RE.sub("''", _COMMENT_RE.sub(" ", query_template))
+    identifiers = set()
+    for ref in _SOURCE_REF_RE.finditer(code):
+        # Start: the enclosing parenthesis or statement, then its first SELECT at that depth
+        depth, start = 0, 0
+        for i in range(ref.start() - 1, -1, -1):
+            ch = code[i]
+            if ch == ")":
+                depth += 1
+            elif ch == "(":
+                if depth == 0:
+                    start = i + 1
+                    break
+                depth -= 1
+            elif ch == ";" and depth == 0:
+                start = i + 1
+                break
+        depth, select_at = 0, None
+        for match in re.finditer(r"[()]|\bSELECT\b", code[start:ref.start()], re.IGNORECASE):
+            token = match.group(0)
+            depth += {"(": 1, ")": -1}.get(token, 0)
+            if token.upper() == "SELECT" and depth == 0:
+                select_at = start + match.start()
+                break
+        if select_at is None:
+            continue
+        # End: the closing parenthesis, statement end or set operator at the same depth
+        depth, end = 0, len(code)
+        for i in range(ref.end(), len(code)):
+            ch = code[i]
+            if ch == "(":
+                depth += 1
+            elif ch == ")":
+                if depth == 0:
+                    end = i
+                    break
+                depth -= 1
+            elif ch == ";" and depth == 0:
+                end = i
+                break
+            elif depth == 0 and _BOUNDARY_RE.match(code, i) and not code[i - 1].isalnum():
+                end = i
+                break
+
+        alias_match = re.match(r"\s+(?:AS\s+)?([A-Za-z_][A-Za-z0-9_]*)", code[ref.end():end], re.IGNORECASE)
+        alias = alias_match.group(1) if alias_match and alias_match.group(1).upper() not in SQL_KEYWORDS else None
+        block = code[select_at:ref.start()] + " " * len(ref.group(0)) + code[ref.end():end]
+        block = _mask_nested_subqueries(re.sub(r"`[^`]*`|\{[^{}]*\}", lambda m: " " * len(m.group(0)), block))
+        joins = re.search(r"\bJOIN\b", block, re.IGNORECASE) is not None
+
+        tokens = list(_IDENTIFIER_RE.finditer(block))
+        alias_targets = {tokens[i + 1].start() for i, token in enumerate(tokens[:-1]) if token.group(0).upper() == "AS"}
+        output_aliases = {token.group(0).lower() for token in tokens if token.start() in alias_targets}
+        source_at = ref.start() - select_at
+        for token in tokens:
+            name = token.group(0)
+            before = block[:token.start()].rstrip()
+            after = block[token.end():].lstrip()
+            if name.upper() in SQL_KEYWORDS or token.start() in alias_targets or name == alias:
+                continue
+            if token.start() > source_at and name.lower() in output_aliases:
+                # GROUP BY / QUALIFY / ORDER BY may name a SELECT alias
+                continue
+            if after.startswith(("(", ".", "'")):
+                # Function call, qualifier or typed literal (DATE '2026-01-01')
+                continue
+            if before.endswith("."):
+                qualifier = _IDENTIFIER_RE.search(before[:-1].rstrip()[::-1])
+                if alias is None or qualifier is None or qualifier.group(0)[::-1] != alias:
+                    continue
+            elif joins:
+                continue
+            identifiers.add(name)
+    return identifiers
+
+
+def get_schema_params(pipelines_root: Path, job_name: str, task_name: str, task_conf: dict, query_template: str) -> dict:
+    """
+    Validate a task template against the registry and return extra render params.
+
+    - For the ingesting job, returns {"source_columns": "<comma separated projection>"}.
+    - For a consumer task reading the registered source table, raises if the
+      template uses columns missing from the catalog against the source
+      table, or references catalog columns the job did not register.
+
+    Args:
+        pipelines_root (Path): pipelines/ directory
+        job_name (str): Pipeline job name
+        task_name (str): Task name, used in error messages
+        task_conf (dict): Task config (may pin "schema_version")
+        query_template (str): SQL template text
+
+    Returns:
+        dict: Extra params for format_query_template
+
+    Raises:
+        ValueError: If the template references unregistered or unknown columns
+    """
+    schema = load_schema(pipelines_root, job_name, task_conf.get("schema_version"))
+    if schema is None:
+        return {}
+
+    if schema.get("role") == "source":
+        return {"source_columns": ", ".join(get_source_projection(pipelines_root, job_name))}
+
+    catalog = load_schema(pipelines_root, schema["source_job"])
+    source_table = f"{task_conf.get('dataset_src')}.{task_conf.get('table_src')}"
+    if catalog is None or source_table != catalog.get("table"):
+        return {}
+
+    known = {c.lower() for c in catalog["columns"]}
+    unknown = sorted(i for i in extract_source_identifiers(query_template) if i.lower() not in known)
+    if unknown:
+        raise ValueError(
+            f"Task {task_name} references columns missing from the {schema['source_job']} catalog "
+            f"(pipelines/{schema['source_job']}/{SCHEMAS_DIR}/v{catalog['version']}.json) of {source_table}: {', '.join(unknown)}"
+        )
+
+    referenced = extract_referenced_columns(query_template, catalog["columns"])
+    unregistered = sorted(referenced - set(schema["columns"]))
+    if unregistered:
+        raise ValueError(
+            f"Task {task_name} references columns of {source_table} not registered in "
+            f"pipelines/{job_name}/{SCHEMAS_DIR}/v{schema['version']}.json: {', '.join(unregistered)}"
+        )
+    return {}
@@ -0,0 +1,130 @@
+"""
+Data sensors for the Gaming BI scheduler.
+
+A sensor answers "may this job run for this date yet?" from metadata only:
+
+- source_partition: the source table's partition for the date (minus
+  partition_lag_days) exists, has rows, was not modified for settle_minutes
+  and, with min_row_ratio, is not much smaller than the median of the
+  previous partitions
+- job_end: a job logged a successful `end` step for the date in
+  logs.daily_logs
+
+Every sensor returns (ok, detail); detail says what is still missing and is
+shown by the scheduler status.
+"""
+
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pandas as pd
+
+from .io import read_file
+from .constants import DATE_FMT, ETL_END_MESSAGE, DEFAULT_SENSOR_SETTLE_MINUTES
+from .retry import run_query_with_retry
+from .labels import build_job_labels
+
+SENSOR_QUERY_TIMEOUT_SEC = 120
+BASELINE_PARTITIONS = 7
+
+
+def evaluate_source_partition(df: pd.DataFrame, partition: str, now_utc: pd.Timestamp, settle_minutes: int, min_row_ratio: Optional[float] = None) -> tuple:
+    """
+    Decide whether a source partition is complete.
+
+    Args:
+        df (pd.DataFrame): partition_id, total_rows, last_modified_utc rows of
+            the partition and the partitions before it
+        partition (str): Expected partition id (YYYYMMDD)
+        now_utc (pd.Timestamp): Current UTC time
+        settle_minutes (int): Minutes without writes before the partition counts as complete
+        min_row_ratio (Optional[float]): Minimum row count vs. the median of the previous partitions
+
+    Returns:
+        tuple: (ok, detail)
+    """
+    current = df[df["partition_id"].astype(str) == partition]
+    if current.empty or not current["total_rows"].iloc[0]:
+        return False, f"partition {partition} not landed"
+
+    settled_at = pd.Timestamp(current["last_modified_utc"].iloc[0], tz="UTC") + pd.Timedelta(minutes=settle_minutes)
+    if now_utc < settled_at:
+        return False, f"partition {partition} still changing (settles at {settled_at.strftime('%H:%M')} UTC)"
+
+    if min_row_ratio:
+        previous = df[df["partition_id"].astype(str) < partition]["total_rows"]
+        if len(previous) >= BASELINE_PARTITIONS // 2 + 1:
+            ratio = current["total_rows"].iloc[0] / previous.median()
+            if ratio < min_row_ratio:
+                return False, f"partition {partition} has {ratio:.0%} of the usual rows"
+    return True, f"partition {partition} settled"
+
+
+def check_source_partition(client, sensor_conf: dict, y_m_d: str, run_time: datetime, sql_path: Path) -> tuple:
+    """
+    Sensor: the source partition of a date exists and has settled.
+
+    Args:
+        client: BigQuery client
+        sensor_conf (dict): "table" (project.dataset.table), optional
+            partition_lag_days (default 1), settle_minutes, min_row_ratio
+        y_m_d (str): Run date in YYYY-MM-DD format
+        run_time (datetime): Current time
+        sql_path (Path): source_partition.sql template
+
+    Returns:
+        tuple: (ok, detail)
+    """
+    source_project, dataset, table = sensor_conf["table"].split(".")
+    partition_date = datetime.strptime(y_m_d, DATE_FMT) - timedelta(days=sensor_conf.get("partition_lag_days", 1))
+    partition = partition_date.strftime("%Y%m%d")
+    query = read_file(sql_path).format(
+        run_time=run_time,
+        table_ref=sensor_conf["table"],
+        source_project=source_project,
+        dataset=dataset,
+        table=table,
+        partition=partition,
+        baseline_start=(partition_date - timedelta(days=BASELINE_PARTITIONS)).strftime("%Y%m%d"),
+    )
+    labels = build_job_labels("scheduler", task="source_partition", y_m_d=y_m_d)
+    df = run_query_with_retry(client, query, timeout_sec=SENSOR_QUERY_TIMEOUT_SEC, to_dataframe=True, labels=labels)
+    return evaluate_source_partition(
+        df,
+        partition,
+        pd.Timestamp.now(tz="UTC"),
+        sensor_conf.get("settle_minutes", DEFAULT_SENSOR_SETTLE_MINUTES),
+        sensor_conf.get("min_row_ratio"),
+    )
+
+
+def check_job_end(client, project_id: str, job_name: str, job_action: str, y_m_d: str, run_time: datetime, sql_path: Path) -> tuple:
+    """
+    Sensor: a job logged a successful end for the date.
+
+    Args:
+        client: BigQuery client
+        project_id (str): Project holding logs.daily_logs
+        job_name (str): Job to look for
+        job_action (str): Job action (e.g., 'daily')
+        y_m_d (str): Run date in YYYY-MM-DD format
+        run_time (datetime): Current time
+        sql_path (Path): job_end.sql template
+
+    Returns:
+        tuple: (ok, detail)
+    """
+    query = read_file(sql_path).format(
+        run_time=run_time,
+        project=project_id,
+        job_name=job_name,
+        job_action=job_action,
+        date=y_m_d,
+        end_message=ETL_END_MESSAGE.format(date=y_m_d),
+    )
+    labels = build_job_labels("scheduler", job_name, job_action, y_m_d, "job_end")
+    df = run_query_with_retry(client, query, timeout_sec=SENSOR_QUERY_TIMEOUT_SEC, to_dataframe=True, labels=labels)
+    if df.empty or not df["end_count"].iloc[0]:
+        return False, f"{job_name} has not logged end for {y_m_d}"
+    return True, f"{job_name} logged end for {y_m_d}"
@@ -11,6 +11,9 @@ from typing import Optional
 from pathlib import Path
 import re
 
+from .sampling import get_sampling
+from .cassette import get_cassette, capture_slack_payload
+
 # Try to load .env file if python-dotenv is available
 try:
     from dotenv import load_dotenv
@@ -55,6 +58,13 @@ def _format_for_slack(content: str) -> str:
     return '\n'.join(result_lines)
 
 
+def _get_webhook_url() -> Optional[str]:
+    """Return the Slack webhook URL; cassette runs get a placeholder so payloads are still built."""
+    if get_cassette() is not None:
+        return "cassette://slack"
+    return os.getenv("SLACK_WEBHOOK_URL")
+
+
 def send_slack_webhook(
     webhook_url: str,
     text: str,
@@ -78,6 +88,10 @@ def send_slack_webhook(
     if not webhook_url:
         print("[WARNING] No Slack webhook URL provided")
         return False
+
+    if get_sampling():
+        print(f"[SAMPLE] Slack notification not sent from a sampled run: {title or text[:80]}")
+        return False
     
     # Build attachment structure
     attachment = {
@@ -98,6 +112,12 @@ def send_slack_webhook(
 
     payload = {"attachments": [attachment]}
 
+    # Cassette runs (utilities/cassette.py) keep the payload instead of posting it
+    payload_file = capture_slack_payload(payload)
+    if payload_file is not None:
+        print(f"[CASSETTE] Slack payload written to {payload_file}")
+        return True
+
     # Simple retry with backoff for 429/5xx
     backoff_secs = [1, 2, 4]
     for attempt, delay in enumerate([0] + backoff_secs):
@@ -136,7 +156,7 @@ def send_alert_notification(
     Returns:
         bool: True if successful, False otherwise
     """
-    webhook_url = os.getenv("SLACK_WEBHOOK_URL")
+    webhook_url = _get_webhook_url()
     
     if not webhook_url:
         print("[WARNING] SLACK_WEBHOOK_URL environment variable not set")
@@ -197,7 +217,7 @@ def send_success_notification(
     Returns:
         bool: True if successful, False otherwise
     """
-    webhook_url = os.getenv("SLACK_WEBHOOK_URL")
+    webhook_url = _get_webhook_url()
     
     if not webhook_url:
         return False
@@ -215,3 +235,43 @@ def send_success_notification(
         title=title,
         color="good"
     )
+
+
+def send_digest_notification(
+    digest_type: str,
+    summary: str,
+    failed_count: int = 0,
+) -> bool:
+    """
+    Send a single consolidated digest to Slack for a multi-run execution.
+    
+    Args:
+        digest_type (str): Type of digest (e.g., "ETL Fan-out")
+        summary (str): Markdown summary with one line per run
+        failed_count (int): Number of failed runs; controls the message color
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    webhook_url = _get_webhook_url()
+    
+    if not webhook_url:
+        print("[WARNING] SLACK_WEBHOOK_URL environment variable not set")
+        return False
+    
+    if failed_count:
+        title = f"🚨 {digest_type} Digest - {failed_count} FAILED"
+        color = "danger"
+    else:
+        # Successful digests follow the same opt-in as success notifications
+        if not os.getenv("SLACK_SEND_SUCCESS", "false").lower() == "true":
+            return True
+        title = f"✅ {digest_type} Digest - All Good"
+        color = "good"
+    
+    return send_slack_webhook(
+        webhook_url=webhook_url,
+        text=summary,
+        title=title,
+        color=color
+    )
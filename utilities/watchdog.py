@@ -0,0 +1,163 @@
+"""
+Query deadlines for Gaming BI System.
+
+Pipeline and monitoring configs declare a "deadlines" block:
+
+    "deadlines": {
+      "run_timeout_sec": 7200,     # whole job / monitor run
+      "task_timeout_sec": 1800,    # default per task (tasks may set "timeout_sec")
+      "hedge_after_sec": 60        # monitors only: re-submit slow read-only queries
+    }
+
+Queries are waited on with the smaller of their own timeout and what is left
+of the run deadline. When a deadline is hit the BigQuery job is cancelled, the
+timeout is recorded in logs.daily_logs and QueryTimeoutError is raised so the
+caller fails the task instead of blocking the rest of the chain.
+"""
+
+import re
+import time
+import concurrent.futures
+from typing import Optional
+
+from google.api_core.exceptions import Conflict
+
+from .daily_logs import insert_log, next_step_id
+
+HEDGE_POLL_SEC = 0.5
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+
+
+class QueryTimeoutError(TimeoutError):
+    """Raised when a query exceeded its deadline and was cancelled."""
+
+    def __init__(self, timeout_sec: float, job_ids: list):
+        self.timeout_sec = timeout_sec
+        self.job_ids = job_ids
+        super().__init__(f"Query exceeded its {timeout_sec:g}s deadline; cancelled job(s): {', '.join(job_ids) or 'none'}")
+
+
+class Deadline:
+    """Absolute deadline for a run; None timeout means no deadline."""
+
+    def __init__(self, timeout_sec: Optional[float] = None):
+        self.timeout_sec = timeout_sec
+        self.expires_at = time.monotonic() + timeout_sec if timeout_sec else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, 0 when expired, or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Return True once the deadline has passed."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cap(self, timeout_sec: Optional[float]) -> Optional[float]:
+        """Return the smaller of a query timeout and the time left in the run."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout_sec
+        if timeout_sec is None:
+            return remaining
+        return min(timeout_sec, remaining)
+
+
+def is_read_only(query: str) -> bool:
+    """Return True when the query is a single SELECT/WITH statement (safe to re-submit)."""
+    code = _COMMENT_RE.sub(" ", query).strip().rstrip(";")
+    return bool(re.match(r"(?is)^(select|with)\b", code)) and ";" not in code
+
+
+def _cancel(jobs: list) -> None:
+    """Best-effort cancellation of unfinished jobs."""
+    for job in jobs:
+        try:
+            if not job.done():
+                job.cancel()
+        except Exception as e:
+            print(f"[WARNING] Could not cancel job {getattr(job, 'job_id', '?')}: {e}")
+
+
+def submit_query(client, query: str, job_config=None, job_id: Optional[str] = None):
+    """Submit a query; an existing job with the same id is returned instead of re-running it."""
+    if job_id is None:
+        return client.query(query, job_config=job_config)
+    try:
+        return client.query(query, job_config=job_config, job_id=job_id)
+    except Conflict:
+        print(f"[WARNING] Job {job_id} already exists, waiting for it instead of resubmitting")
+        return client.get_job(job_id)
+
+
+def _wait_hedged(client, query: str, job_config, first_job, timeout_sec: Optional[float], hedge_after_sec: float):
+    """Wait for the first of an original and a hedged job; cancel the other."""
+    started = time.monotonic()
+    jobs = [first_job]
+    while True:
+        elapsed = time.monotonic() - started
+        finished = [job for job in jobs if job.done()]
+        if finished:
+            winner = finished[0]
+            _cancel([job for job in jobs if job is not winner])
+            winner.result()  # raises the job error, if any
+            return winner
+        if timeout_sec is not None and elapsed >= timeout_sec:
+            _cancel(jobs)
+            raise QueryTimeoutError(timeout_sec, [job.job_id for job in jobs])
+        if len(jobs) == 1 and elapsed >= hedge_after_sec:
+            print(f"[WARNING] Query still running after {hedge_after_sec}s, submitting hedged job")
+            jobs.append(client.query(query, job_config=job_config))
+        time.sleep(HEDGE_POLL_SEC)
+
+
+def run_query_with_deadline(
+    client,
+    query: str,
+    timeout_sec: Optional[float] = None,
+    job_config=None,
+    hedge_after_sec: Optional[float] = None,
+    to_dataframe: bool = False,
+    job_id: Optional[str] = None,
+):
+    """
+    Run a query, cancelling it when it exceeds its deadline.
+
+    Args:
+        client: BigQuery client
+        query (str): SQL to run
+        timeout_sec (Optional[float]): Deadline in seconds; None waits forever
+        job_config: Optional bigquery.QueryJobConfig
+        hedge_after_sec (Optional[float]): Submit a duplicate job after this many
+            seconds and keep whichever finishes first; only applied to
+            read-only queries
+        to_dataframe (bool): Return a DataFrame instead of the row iterator
+        job_id (Optional[str]): Deterministic job id; an existing job with this
+            id is awaited instead of submitting a new one
+
+    Returns:
+        Query rows (RowIterator) or a pandas DataFrame
+
+    Raises:
+        QueryTimeoutError: If the deadline was hit; the job(s) were cancelled
+    """
+    job = submit_query(client, query, job_config, job_id)
+
+    if hedge_after_sec is not None and (timeout_sec is None or hedge_after_sec < timeout_sec) and is_read_only(query):
+        job = _wait_hedged(client, query, job_config, job, timeout_sec, hedge_after_sec)
+    else:
+        try:
+            job.result(timeout=timeout_sec)
+        except concurrent.futures.TimeoutError:
+            _cancel([job])
+            raise QueryTimeoutError(timeout_sec, [job.job_id])
+
+    return job.to_dataframe() if to_dataframe else job.result()
+
+
+def record_timeout(project_id: str, job_name: str, job_action: str, target: str, error: Exception, client, dry_run: bool = False) -> None:
+    """Record a deadline hit as a "timeout" step in logs.daily_logs."""
+    print(f"[ERROR] Timeout in {job_name}/{target}: {error}")
+    insert_log(project_id, job_name, job_action, "timeout", f"Timeout in {target}: {error}", client, dry_run, step_id=next_step_id())